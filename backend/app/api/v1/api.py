@@ -1,6 +1,7 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import records, question
+from app.api.v1.endpoints import records, question, metrics
 
 api_router = APIRouter()
 api_router.include_router(records.router, prefix="/records", tags=["records"])
 api_router.include_router(question.router, prefix="/question", tags=["question"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
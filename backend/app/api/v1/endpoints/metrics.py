@@ -0,0 +1,48 @@
+from fastapi import APIRouter
+
+from app.core.http_client import http_client_pool
+from app.db.graph import neo4j_db
+from app.db.graph_cache import graph_cache
+from app.db.graph_write_queue import graph_write_queue
+from app.db.lexical import get_lexical_engine
+from app.db.vector_store import get_vector_engine
+from app.services.llm_service import llm_service
+from app.services.rate_limiter import llm_scheduler
+
+router = APIRouter()
+
+
+@router.get("")
+async def get_metrics():
+    """
+    Runtime metrics for capacity planning (connection pools, caches, queues).
+    """
+    vector_engine = get_vector_engine()
+    lexical_engine = get_lexical_engine()
+    return {
+        "http_pool": http_client_pool.stats(),
+        "vector_engine": vector_engine.stats() if vector_engine is not None else None,
+        "lexical_engine": lexical_engine.stats() if lexical_engine is not None else None,
+        "llm": llm_service.stats(),
+        "llm_scheduler": llm_scheduler.stats(),
+        "neo4j": neo4j_db.pool_stats(),
+        "graph_writes": graph_write_queue.stats(),
+        "graph_cache": graph_cache.stats(),
+    }
+
+
+@router.get("/graph-writes/failed")
+async def get_failed_graph_writes():
+    """
+    그래프 저장에 실패해 replay 대기 중인 기록 (userId, recordId, 오류, 실패 시각).
+    """
+    return graph_write_queue.failed()
+
+
+@router.post("/graph-writes/replay")
+async def replay_graph_writes():
+    """
+    보관 중인 실패 기록을 다시 저장 큐에 넣고 결과({replayed, committed})를 반환.
+    다시 실패한 기록은 다음 replay를 위해 다시 보관됨.
+    """
+    return await graph_write_queue.replay()
@@ -1,10 +1,18 @@
+import json
+
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from app.models.schemas.question_req import QuestionRequest, QuestionResponse
 from app.services.reasoning_service import reasoning_service
 
 router = APIRouter()
 
 
+def _format_sse(event: str, data: dict) -> str:
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
 @router.post("", response_model=QuestionResponse)
 async def ask_question(request: QuestionRequest):
     """
@@ -18,3 +26,30 @@ async def ask_question(request: QuestionRequest):
 
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/stream")
+async def ask_question_stream(request: QuestionRequest):
+    """
+    Streaming variant of /question (Server-Sent Events).
+    - candidates / reranked / graph: retrieval progress events
+    - token: answer tokens as the provider streams them
+    - final: the same payload as QuestionResponse
+    - error: emitted instead of final when the pipeline fails
+    """
+
+    async def event_stream():
+        try:
+            async for event, data in reasoning_service.stream_answer(request):
+                yield _format_sse(event, data)
+        except Exception as e:
+            import traceback
+
+            traceback.print_exc()
+            yield _format_sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
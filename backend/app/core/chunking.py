@@ -0,0 +1,105 @@
+import re
+from typing import List, Optional, Sequence, Tuple
+
+from app.core.tokenizer import tokenize
+
+# 문장 끝 (마침표/물음표/느낌표 뒤 공백, 또는 줄바꿈) - context_packer와 같은 기준
+_SENTENCE_END = re.compile(r"(?<=[.!?。])\s+|\n+")
+
+Span = Tuple[int, int]
+
+
+def sentence_spans(text: str) -> List[Span]:
+    """문장 단위 (start, end) offset 목록. 공백뿐인 구간은 제외."""
+    spans = []
+    start = 0
+    for match in _SENTENCE_END.finditer(text or ""):
+        if text[start:match.start()].strip():
+            spans.append((start, match.start()))
+        start = match.end()
+    if text and text[start:].strip():
+        spans.append((start, len(text)))
+    return spans
+
+
+def split_passages(text: str, max_chars: int, overlap_chars: int = 0) -> List[Span]:
+    """
+    긴 본문을 문장 경계에서 겹치는 passage (start, end) offset으로 분할.
+
+    - max_chars 이하 본문은 passage 하나
+    - 이웃 passage는 끝 문장들을 overlap_chars 이내로 공유 (문장이 잘려 문맥을 잃지 않도록)
+    - max_chars보다 긴 문장은 글자 수로 자름
+    """
+    if not text or not text.strip():
+        return []
+    if len(text) <= max_chars:
+        return [(0, len(text))]
+
+    units: List[Span] = []
+    for start, end in sentence_spans(text):
+        while end - start > max_chars:
+            units.append((start, start + max_chars))
+            start += max_chars
+        units.append((start, end))
+
+    passages: List[Span] = []
+    i = 0
+    while i < len(units):
+        start = units[i][0]
+        j = i
+        while j + 1 < len(units) and units[j + 1][1] - start <= max_chars:
+            j += 1
+        end = units[j][1]
+        passages.append((start, end))
+        if j + 1 >= len(units):
+            break
+        # 다음 passage는 끝에서 overlap_chars 안쪽 문장부터 시작 (항상 한 문장 이상 전진)
+        k = j + 1
+        while k - 1 > i and end - units[k - 1][0] <= overlap_chars:
+            k -= 1
+        i = k
+    return passages
+
+
+def best_passages(text: str, query: str, spans: Sequence[Span], limit: int) -> List[Span]:
+    """질문 용어와 겹치는 토큰이 많은 passage 순 (동점이면 앞쪽 passage)."""
+    terms = set(tokenize(query))
+    scored = [
+        (len(terms & set(tokenize(text[start:end]))), -index, (start, end))
+        for index, (start, end) in enumerate(spans)
+    ]
+    scored.sort(reverse=True)
+    return [span for _, _, span in scored[:limit]]
+
+
+def excerpt(text: str, spans: Sequence[Span], separator: str = " … ") -> str:
+    """선택된 passage를 본문 순서대로 이어 붙임 (겹치는 구간은 합침)."""
+    merged: List[List[int]] = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return separator.join(text[start:end].strip() for start, end in merged)
+
+
+def passage_context(
+    record: dict,
+    query: str,
+    max_chars: int,
+    overlap_chars: int,
+    limit: int,
+    spans: Optional[Sequence[Span]] = None,
+) -> dict:
+    """
+    기록의 content를 가장 관련 있는 passage들로 바꾼 사본 (rerank/답변 프롬프트용).
+
+    spans가 없으면 (텍스트 검색으로만 찾은 기록) 질문 용어 겹침으로 passage를 고른다.
+    원문 길이는 contentLength로 남긴다.
+    """
+    content = record.get("content") or ""
+    if len(content) <= max_chars:
+        return record
+    if not spans:
+        spans = best_passages(content, query, split_passages(content, max_chars, overlap_chars), limit)
+    return {**record, "content": excerpt(content, list(spans)[:limit]), "contentLength": len(content)}
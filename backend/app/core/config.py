@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Dict, Optional
 
 
 class Settings(BaseSettings):
@@ -11,14 +12,71 @@ class Settings(BaseSettings):
     MONGODB_URI: str
     DATABASE_NAME: str = "outbrain"
     COLLECTION_NAME: str = "diaries"
+    # 임베딩 저장 형식: "array"(double 배열), "float32", "int8", "bit" (BSON binary vector)
+    EMBEDDING_STORAGE: str = "array"
+    # 벡터 검색 엔진: "atlas"($vectorSearch), "exact"(프로세스 내 memory-mapped 행렬), "hnsw"
+    VECTOR_BACKEND: str = "atlas"  # "atlas", "exact" 또는 "hnsw"
+    VECTOR_STORE_PATH: str = ".cache/vectors"
+    # HNSW (VECTOR_BACKEND=hnsw)
+    HNSW_M: int = 16
+    HNSW_EF_CONSTRUCTION: int = 100
+    HNSW_EF_SEARCH: int = 64
+    HNSW_MIN_ROWS: int = 10000  # 이보다 기록이 적은 사용자는 exact 검색이 더 빠름
+    HNSW_SNAPSHOT_EVERY: int = 500  # 삽입 N건마다 그래프 스냅샷 저장
+    # 텍스트 검색 엔진: "atlas"(Atlas Search text_index) 또는 "local"(프로세스 내 BM25 역색인)
+    TEXT_SEARCH_BACKEND: str = "atlas"
+    LEXICAL_INDEX_PATH: str = ".cache/lexical"
+    LEXICAL_SAVE_EVERY: int = 50  # 변경 N건마다 색인 파일 저장 (종료 시에도 저장)
+    # Atlas 사용 시 벡터/텍스트 검색 + RRF + Time Decay를 한 번의 aggregation으로 실행
+    SEARCH_PUSHDOWN: bool = False
+    # 검색 branch별 timeout (초, 0 = 제한 없음). 벡터 branch는 질문 임베딩 시간 포함
+    RETRIEVAL_VECTOR_TIMEOUT: float = 3.0
+    RETRIEVAL_TEXT_TIMEOUT: float = 2.0
+    # 질문 검색 파라미터 (benchmarks/retrieval_sweep.py로 측정)
+    RETRIEVAL_TOP_K: int = 10  # rerank 전 후보 수
+    RETRIEVAL_VECTOR_WEIGHT: float = 0.5
+    RETRIEVAL_TEXT_WEIGHT: float = 0.5
+    RETRIEVAL_TIME_DECAY_WEIGHT: float = 0.3
+    RETRIEVAL_NUM_CANDIDATES_FACTOR: int = 10  # $vectorSearch numCandidates = limit * 배수
+    # Passage 단위 검색: 긴 기록을 겹치는 passage로 나눠 별도 컬렉션에 임베딩 저장 (Atlas 벡터 검색)
+    PASSAGE_RETRIEVAL: bool = False
+    PASSAGE_COLLECTION_NAME: str = "passages"
+    PASSAGE_MAX_CHARS: int = 600
+    PASSAGE_OVERLAP_CHARS: int = 120
+    PASSAGE_AGGREGATION: str = "max"  # passage 점수 -> 기록 점수: "max" 또는 "sum"
+    PASSAGES_PER_RECORD: int = 2  # rerank/답변 프롬프트에 넣을 기록당 passage 수
 
     # Neo4j
     NEO4J_URI: str = "bolt://localhost:7687"
     NEO4J_USER: str = "neo4j"
     NEO4J_PASSWORD: str = "password"
+    NEO4J_DATABASE: Optional[str] = None  # None이면 서버의 기본(home) 데이터베이스
+    NEO4J_MAX_POOL_SIZE: int = 100
+    NEO4J_ACQUISITION_TIMEOUT: float = 60.0  # 풀에서 연결을 기다리는 최대 시간 (초)
+    NEO4J_MAX_TRANSACTION_RETRY_TIME: float = 30.0  # managed transaction 재시도 시간 (초)
+    NEO4J_FETCH_SIZE: int = 1000  # 결과를 한 번에 가져오는 레코드 수
+    NEO4J_CAUSAL_CONSISTENCY: bool = True  # 세션 간 bookmark 공유 (쓰기 직후 읽기에서도 보임)
+    GRAPH_WRITE_MODE: str = "structured"  # "structured" (GraphWriter) or "cypher" (LLM 생성 Cypher)
+    # 그래프 저장 Micro-batching (GraphWriteQueue): 윈도우 동안 모은 기록을 한 트랜잭션으로 커밋
+    GRAPH_WRITE_BATCH_ENABLED: bool = True
+    GRAPH_WRITE_BATCH_WINDOW_MS: float = 50.0
+    GRAPH_WRITE_BATCH_MAX_RECORDS: int = 100
+    GRAPH_WRITE_FAILED_MAX: int = 1000  # replay용으로 보관하는 실패 기록 수
+    GRAPH_SCHEMA_AUTO_MIGRATE: bool = True  # 시작 시 적용 안 된 스키마 단계(제약/인덱스) 적용
+    GRAPH_SCHEMA_VERIFY: bool = True  # 시작 시 MERGE 키 조회 계획이 인덱스 seek인지 확인 (경고만 출력)
+    # 질문 컨텍스트 서브그래프 확장 (Neo4jDB.get_context_subgraph)
+    GRAPH_CONTEXT_HOPS: int = 2  # 1: 사건/감정, 2: +인물/행동/결과, 3: +관련 사건, 4: +관련 기록
+    # 기록별 컨텍스트 서브그래프 캐시 (GraphContextCache)
+    GRAPH_CACHE_ENABLED: bool = True
+    GRAPH_CACHE_MAX_ENTRIES: int = 5000
+    GRAPH_CACHE_MAX_MB: int = 64
+    GRAPH_CACHE_TTL_SECONDS: float = 3600.0
+    GRAPH_NODE_FANOUT: int = 10  # 노드 하나에서 hop당 따라가는 관계 수
+    GRAPH_HOP_FANOUT: int = 50  # hop 하나에서 추가되는 관계 수
+    GRAPH_MAX_DEGREE: int = 100  # 관계가 이보다 많은 노드(슈퍼노드)에서는 더 확장하지 않음
 
     # LLM Settings
-    LLM_PROVIDER: str = "openai"  # "openai" or "nvidia"
+    LLM_PROVIDER: str = "openai"  # "openai", "nvidia" or "local"
 
     # OpenAI
     OPENAI_API_KEY: str = ""
@@ -28,6 +86,61 @@ class Settings(BaseSettings):
     # NVIDIA NeMo (LLM)
     NVIDIA_API_KEY: str = ""
 
+    # Local Provider (LLM_PROVIDER=local, 네트워크 없는 결정적 임베딩/응답)
+    LOCAL_EMBEDDING_DIM: int = 384
+    LOCAL_LLM_LATENCY_MS: float = 0.0  # 채팅 계열 호출에 넣을 인위적인 지연
+
+    # HTTP Connection Pool (LLM Provider 호출용)
+    HTTP2_ENABLED: bool = True
+    HTTP_MAX_CONNECTIONS: int = 50
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 60.0
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_POOL_TIMEOUT: float = 5.0
+    HTTP_READ_TIMEOUT: float = 30.0
+    HTTP_EMBEDDING_TIMEOUT: float = 10.0
+    HTTP_CHAT_TIMEOUT: float = 30.0
+
+    # LLM Provider 요청 스케줄링 (동시성/RPM/TPM 한도, 0 = 제한 없음)
+    LLM_RATE_LIMITS: Dict[str, Dict[str, float]] = {
+        "openai": {"rpm": 500, "tpm": 200000, "concurrency": 16},
+        "nvidia": {"rpm": 40, "tpm": 0, "concurrency": 4},
+    }
+    LLM_MAX_RETRIES: int = 4
+    LLM_RETRY_BASE_DELAY: float = 0.5
+    LLM_RETRY_MAX_DELAY: float = 20.0  # 지수 백오프 상한 (Retry-After 헤더 값은 LLM_RETRY_AFTER_MAX까지 그대로 따름)
+    LLM_RETRY_AFTER_MAX: float = 60.0  # Retry-After가 이보다 길면 기다리지 않고 바로 실패
+    LLM_HEDGE_EMBEDDINGS: bool = True  # p95 지연을 넘긴 임베딩 요청을 한 번 더 전송
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+
+    # Embedding Micro-batching (동시 get_embedding 호출 병합)
+    EMBEDDING_BATCH_ENABLED: bool = True
+    EMBEDDING_BATCH_WINDOW_MS: float = 5.0
+    EMBEDDING_BATCH_MAX_SIZE: int = 64
+    EMBEDDING_BATCH_MAX_TOKENS: int = 100000
+
+    # Embedding Cache (content-addressed, 디스크 영구 저장)
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_PATH: str = ".cache/embeddings.sqlite3"
+    EMBEDDING_CACHE_MAX_MB: int = 256
+
+    # Reranking
+    RERANK_PROVIDER: str = "llm"  # "llm" or "local"
+    LOCAL_RERANK_WEIGHTS: Dict[str, float] = {
+        "cosine": 0.45,
+        "bm25": 0.3,
+        "time_decay": 0.1,
+        "rrf": 0.15,
+    }
+    LOCAL_RERANK_MAX_CHARS: int = 1000
+    RERANK_CACHE_ENABLED: bool = True
+    RERANK_CACHE_TTL_SECONDS: float = 3600.0
+    RERANK_CACHE_MAX_ENTRIES: int = 10000
+
+    # Answer Context (프롬프트에 들어가는 기록/그래프 컨텍스트 토큰 예산)
+    CONTEXT_TOKEN_BUDGET: int = 2000
+    CONTEXT_TOKEN_BUDGETS: Dict[str, int] = {}  # 모델별 예산, 예: {"gpt-4o": 3000}
+
     class Config:
         env_file = ".env"
         case_sensitive = True
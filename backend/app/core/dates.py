@@ -0,0 +1,45 @@
+from datetime import date, datetime
+from typing import Any, Dict, Optional
+
+# 1970-01-01 기준 일 수 (dateEpochDay) 계산용
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def to_date(value: Any) -> Optional[date]:
+    """date / datetime / "YYYY-MM-DD..." 문자열을 date로. 해석할 수 없으면 None."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str) and value:
+        try:
+            return date.fromisoformat(value[:10])
+        except ValueError:
+            return None
+    return None
+
+
+def epoch_day(value: Any) -> Optional[int]:
+    parsed = to_date(value)
+    return parsed.toordinal() - EPOCH_ORDINAL if parsed else None
+
+
+def today_epoch_day() -> int:
+    return date.today().toordinal() - EPOCH_ORDINAL
+
+
+def date_fields(value: Any) -> Dict[str, Any]:
+    """
+    기록 날짜로부터 색인/필터용 필드를 만든다.
+    - dateValue: 해당 날짜 00:00의 datetime (MongoDB Date)
+    - dateEpochDay: 1970-01-01 이후 일 수 (정수 범위 필터, time decay 계산용)
+    """
+    parsed = to_date(value)
+    if parsed is None:
+        return {}
+    return {
+        "dateValue": datetime(parsed.year, parsed.month, parsed.day),
+        "dateEpochDay": parsed.toordinal() - EPOCH_ORDINAL,
+    }
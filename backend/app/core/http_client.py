@@ -0,0 +1,129 @@
+import importlib.util
+from typing import Any, Dict
+
+import httpx
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# h2 패키지가 설치된 경우에만 HTTP/2를 사용 (httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class HTTPClientPool:
+    """
+    LLM Provider별 공유 httpx.AsyncClient 풀.
+
+    - Provider(openai, nvidia 등)마다 하나의 AsyncClient를 재사용하여
+      keep-alive / HTTP/2 멀티플렉싱으로 TLS 핸드셰이크를 줄임
+    - lifespan에서 connect/close 되며, 그 전에 호출되면 lazy하게 생성됨
+    - 풀 통계(in-use/idle 커넥션, 핸드셰이크 수)를 stats()로 제공
+    """
+
+    clients: Dict[str, httpx.AsyncClient] = {}
+    counters: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def timeout(read: float) -> httpx.Timeout:
+        """
+        요청별 read/write 제한. float를 그대로 넘기면 connect/pool까지 덮어쓰므로
+        HTTP_CONNECT_TIMEOUT/HTTP_POOL_TIMEOUT은 유지한 Timeout으로 전달해야 함.
+        """
+        return httpx.Timeout(
+            read,
+            connect=settings.HTTP_CONNECT_TIMEOUT,
+            pool=settings.HTTP_POOL_TIMEOUT,
+        )
+
+    @classmethod
+    def _build_client(cls) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        )
+        return httpx.AsyncClient(
+            http2=settings.HTTP2_ENABLED and HTTP2_AVAILABLE,
+            limits=limits,
+            timeout=cls.timeout(settings.HTTP_READ_TIMEOUT),
+        )
+
+    @classmethod
+    async def connect(cls, providers=("openai", "nvidia")):
+        for provider in providers:
+            cls.get_client(provider)
+        print(
+            f"Opened HTTP client pool for {list(cls.clients)} "
+            f"(http2={settings.HTTP2_ENABLED and HTTP2_AVAILABLE})"
+        )
+
+    @classmethod
+    async def close(cls):
+        if cls.clients:
+            for client in cls.clients.values():
+                await client.aclose()
+            cls.clients = {}
+            print("Closed HTTP client pool")
+
+    @classmethod
+    def get_client(cls, provider: str) -> httpx.AsyncClient:
+        client = cls.clients.get(provider)
+        if client is None or client.is_closed:
+            client = cls._build_client()
+            cls.clients[provider] = client
+            cls.counters.setdefault(
+                provider, {"requests": 0, "connections_opened": 0, "tls_handshakes": 0}
+            )
+        return client
+
+    @classmethod
+    def trace_extension(cls, provider: str) -> Dict[str, Any]:
+        """
+        httpcore trace 훅을 이용해 새 커넥션/TLS 핸드셰이크 횟수를 집계.
+        요청 시 `extensions=` 인자로 전달한다.
+        """
+        counters = cls.counters.setdefault(
+            provider, {"requests": 0, "connections_opened": 0, "tls_handshakes": 0}
+        )
+        counters["requests"] += 1
+
+        async def trace(event_name: str, info: dict):
+            if event_name == "connection.connect_tcp.complete":
+                counters["connections_opened"] += 1
+            elif event_name == "connection.start_tls.complete":
+                counters["tls_handshakes"] += 1
+
+        return {"trace": trace}
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        """
+        Provider별 풀 상태. 커넥션 목록은 httpcore 내부 구현에 의존하므로
+        조회할 수 없는 경우 0으로 보고한다.
+        """
+        result = {}
+        for provider, client in cls.clients.items():
+            pool = getattr(getattr(client, "_transport", None), "_pool", None)
+            connections = list(getattr(pool, "connections", []) or [])
+            in_use = idle = 0
+            for conn in connections:
+                try:
+                    if conn.is_closed():
+                        continue
+                    if conn.is_idle():
+                        idle += 1
+                    else:
+                        in_use += 1
+                except Exception:
+                    continue
+            result[provider] = {
+                "in_use": in_use,
+                "idle": idle,
+                "http2": settings.HTTP2_ENABLED and HTTP2_AVAILABLE,
+                **cls.counters.get(provider, {}),
+            }
+        return result
+
+
+http_client_pool = HTTPClientPool()
@@ -0,0 +1,171 @@
+import calendar
+import re
+from datetime import date, timedelta
+from typing import Optional, Tuple
+
+# 질문 속 한국어 시간 표현 -> (date_from, date_to) 기록 날짜 범위 (양 끝 포함)
+# 예) "지난주에 뭐 했지?", "작년 겨울에 누구 만났어?", "3월에 읽은 책"
+
+DateRange = Tuple[date, date]
+
+_NUM = r"(\d{1,2}|한|두|세|네|다섯|여섯|일곱|여덟|아홉|열)"
+_KOREAN_NUMBERS = {
+    "한": 1, "두": 2, "세": 3, "네": 4, "다섯": 5,
+    "여섯": 6, "일곱": 7, "여덟": 8, "아홉": 9, "열": 10,
+}
+
+# 계절 시작 월과 길이(개월). 겨울은 12월 ~ 다음 해 2월
+_SEASONS = {"봄": (3, 3), "여름": (6, 3), "가을": (9, 3), "겨울": (12, 3)}
+
+# 앞쪽 표현이 우선 (더 구체적인 표현부터)
+_YEAR_MONTH = re.compile(r"(\d{4})\s*년\s*(\d{1,2})\s*월")
+_REL_YEAR_MONTH = re.compile(r"(올해|금년|작년|지난\s*해|재작년)\s*(\d{1,2})\s*월")
+_REL_YEAR_SEASON = re.compile(r"(올해|금년|이번|작년|지난\s*해|재작년|지난)\s*(봄|여름|가을|겨울)")
+_AGO = re.compile(_NUM + r"\s*(일|주|주일|달|개월|년)\s*전")
+_RECENT = re.compile(r"(?:최근|지난)\s*" + _NUM + r"\s*(일|주|주일|달|개월|년)")
+_YEAR = re.compile(r"(\d{4})\s*년")
+_MONTH = re.compile(r"(?<![\d년])(\d{1,2})\s*월")
+_SEASON = re.compile(r"(?<![가-힣])(봄|여름|가을|겨울)")  # "돌봄" 등 제외
+
+_FIXED = [
+    (re.compile(r"그제|그저께"), lambda t: _day(t - timedelta(days=2))),
+    (re.compile(r"어제"), lambda t: _day(t - timedelta(days=1))),
+    (re.compile(r"오늘"), lambda t: _day(t)),
+    (re.compile(r"(지난|저번)\s*주"), lambda t: _week(t, -1)),
+    (re.compile(r"이번\s*주"), lambda t: _week(t, 0)),
+    (re.compile(r"(지난|저번)\s*달"), lambda t: _month(*_shift_month(t.year, t.month, -1))),
+    (re.compile(r"이번\s*달"), lambda t: _month(t.year, t.month)),
+    (re.compile(r"재작년"), lambda t: _year(t.year - 2)),
+    (re.compile(r"작년|지난\s*해"), lambda t: _year(t.year - 1)),
+    (re.compile(r"올해|금년"), lambda t: _year(t.year)),
+]
+
+_YEAR_OFFSETS = {"올해": 0, "금년": 0, "이번": 0, "작년": -1, "지난해": -1, "재작년": -2}
+
+
+def _number(token: str) -> int:
+    return int(token) if token.isdigit() else _KOREAN_NUMBERS[token]
+
+
+def _day(d: date) -> DateRange:
+    return d, d
+
+
+def _week(today: date, offset: int) -> DateRange:
+    monday = today - timedelta(days=today.weekday()) + timedelta(weeks=offset)
+    return monday, monday + timedelta(days=6)
+
+
+def _shift_month(year: int, month: int, offset: int) -> Tuple[int, int]:
+    index = year * 12 + (month - 1) + offset
+    return index // 12, index % 12 + 1
+
+
+def _month(year: int, month: int, months: int = 1) -> DateRange:
+    end_year, end_month = _shift_month(year, month, months - 1)
+    last_day = calendar.monthrange(end_year, end_month)[1]
+    return date(year, month, 1), date(end_year, end_month, last_day)
+
+
+def _year(year: int) -> DateRange:
+    return date(year, 1, 1), date(year, 12, 31)
+
+
+def _season(today: date, name: str, year_offset: Optional[int]) -> DateRange:
+    start_month, months = _SEASONS[name]
+    if year_offset is None:
+        # 연도 없이 "겨울에" -> 이미 시작된 가장 최근 계절
+        year = today.year if (today.month, 1) >= (start_month, 1) else today.year - 1
+    elif name == "겨울" and year_offset == 0 and today.month < 3:
+        # 1~2월에 "이번 겨울" -> 작년 12월에 시작된 겨울
+        year = today.year - 1
+    else:
+        # "작년 겨울" -> 작년 12월 ~ 올해 2월
+        year = today.year + year_offset
+    return _month(year, start_month, months)
+
+
+def _past_month(today: date, month: int) -> DateRange:
+    """연도 없는 "3월에" -> 이미 지났거나 진행 중인 가장 최근의 3월."""
+    year = today.year if month <= today.month else today.year - 1
+    return _month(year, month)
+
+
+def _since(today: date, amount: int, unit: str) -> date:
+    """최근 N일/주/달/년 기간의 시작 날짜."""
+    if unit == "일":
+        return today - timedelta(days=amount)
+    if unit in ("주", "주일"):
+        return today - timedelta(weeks=amount)
+    if unit in ("달", "개월"):
+        year, month = _shift_month(today.year, today.month, -amount)
+    else:
+        year, month = today.year - amount, today.month
+    return date(year, month, min(today.day, calendar.monthrange(year, month)[1]))
+
+
+def parse_date_range(text: str, today: Optional[date] = None) -> Optional[DateRange]:
+    """
+    질문에서 첫 번째로 인식되는 시간 표현을 기록 날짜 범위로 변환. 없으면 None.
+
+    - 오늘/어제/그제, 지난주/이번 주, 지난달/이번 달, 올해/작년/재작년
+    - 계절: 봄(3~5월) 여름(6~8월) 가을(9~11월) 겨울(12월~다음 해 2월), "작년 겨울"
+    - 월: "3월에", "작년 3월", "2024년 3월"
+    - 상대 기간: "3일 전"(그날), "2주 전"(그 주), "최근 한 달"(오늘까지)
+    """
+    if not text:
+        return None
+    today = today or date.today()
+
+    match = _YEAR_MONTH.search(text)
+    if match and 1 <= int(match.group(2)) <= 12:
+        return _month(int(match.group(1)), int(match.group(2)))
+
+    match = _REL_YEAR_MONTH.search(text)
+    if match and 1 <= int(match.group(2)) <= 12:
+        offset = _YEAR_OFFSETS[re.sub(r"\s", "", match.group(1))]
+        return _month(today.year + offset, int(match.group(2)))
+
+    match = _REL_YEAR_SEASON.search(text)
+    if match:
+        prefix = re.sub(r"\s", "", match.group(1))
+        if prefix != "지난":
+            return _season(today, match.group(2), _YEAR_OFFSETS[prefix])
+        # "지난 겨울" = 가장 최근에 끝난 계절 (지금이 그 계절이면 1년 전)
+        start, end = _season(today, match.group(2), None)
+        if end >= today:
+            start, end = _month(start.year - 1, start.month, 3)
+        return start, end
+
+    match = _AGO.search(text)
+    if match:
+        amount, unit = _number(match.group(1)), match.group(2)
+        if unit == "일":
+            return _day(today - timedelta(days=amount))
+        if unit in ("주", "주일"):
+            return _week(today, -amount)
+        if unit in ("달", "개월"):
+            return _month(*_shift_month(today.year, today.month, -amount))
+        return _year(today.year - amount)
+
+    match = _RECENT.search(text)
+    if match:
+        return _since(today, _number(match.group(1)), match.group(2)), today
+
+    for pattern, resolve in _FIXED:
+        if pattern.search(text):
+            return resolve(today)
+
+    match = _YEAR.search(text)
+    if match:
+        return _year(int(match.group(1)))
+
+    match = _MONTH.search(text)
+    if match and 1 <= int(match.group(1)) <= 12:
+        return _past_month(today, int(match.group(1)))
+
+    match = _SEASON.search(text)
+    if match:
+        return _season(today, match.group(1), None)
+
+    return None
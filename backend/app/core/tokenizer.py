@@ -0,0 +1,70 @@
+import re
+import unicodedata
+from functools import lru_cache
+from typing import List
+
+# 단어 경계 분리 (한글/영문/숫자 이외 문자 기준)
+_WORD_SPLIT = re.compile(r"[^\w]+", re.UNICODE)
+
+# 자주 쓰이는 조사/어미
+KOREAN_PARTICLES = (
+        "에서는", "에게서", "으로는", "이랑은", "까지는", "부터는",
+        "에서", "에게", "한테", "께서", "으로", "이랑", "하고", "까지", "부터",
+        "보다", "처럼", "마다", "조차", "이나", "이며", "에는", "와는", "과는",
+        "은", "는", "이", "가", "을", "를", "에", "께", "와", "과", "랑",
+        "도", "만", "의", "로", "나", "야",
+)
+
+# 길이별 집합 (긴 것부터 매칭)
+_PARTICLES_BY_LEN = [
+    (length, frozenset(p for p in KOREAN_PARTICLES if len(p) == length))
+    for length in sorted({len(p) for p in KOREAN_PARTICLES}, reverse=True)
+]
+
+
+def _is_hangul(ch: str) -> bool:
+    return "가" <= ch <= "힣"
+
+
+@lru_cache(maxsize=65536)
+def strip_particle(token: str) -> str:
+    """
+    한글 토큰 끝의 조사를 제거. 제거 후 최소 1글자는 남도록 한다.
+    예: "여자친구와" -> "여자친구", "카페에서" -> "카페"
+    """
+    if len(token) < 2 or not _is_hangul(token[-1]):
+        return token
+    for length, particles in _PARTICLES_BY_LEN:
+        if len(token) > length and token[-length:] in particles:
+            return token[:-length]
+    return token
+
+
+def tokenize(text: str, bigrams: bool = True) -> List[str]:
+    """
+    한국어 친화 토크나이저.
+    - 공백/구두점 기준 단어 토큰 (소문자화, 조사 제거)
+    - 3음절 이상 한글 단어는 음절 bigram을 추가 (형태소 분석기 없이 부분 일치 지원)
+    """
+    if not text:
+        return []
+
+    text = unicodedata.normalize("NFC", text).lower()
+    tokens: List[str] = []
+    for raw in _WORD_SPLIT.split(text):
+        if not raw or raw == "_":
+            continue
+        word = strip_particle(raw)
+        tokens.append(word)
+        if bigrams and len(word) > 2 and _is_hangul(word[0]):
+            tokens.extend(word[i : i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    토크나이저 없이 쓰는 대략적인 LLM 토큰 수 추정.
+    한글은 글자당 약 1토큰, 영문은 4글자당 약 1토큰으로 계산.
+    """
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return (ascii_chars // 4) + (len(text) - ascii_chars) + 1
@@ -1,35 +1,59 @@
-from neo4j import GraphDatabase, AsyncGraphDatabase
-from typing import List, Dict, Any
+import time
+from neo4j import GraphDatabase, AsyncGraphDatabase, READ_ACCESS, WRITE_ACCESS
+from typing import List, Dict, Any, Awaitable, Callable
 from app.core.config import get_settings
+from app.db.graph_cache import graph_cache, merge_fragments
+from app.db.graph_schema import SCHEMA_VERSION, graph_schema
 from app.models.domain.graph import GraphData
 
 settings = get_settings()
 
 
 class Neo4jDB:
+    """
+    Neo4j 연결과 managed transaction 실행 경로.
+
+    - execute_read: READ 세션 (neo4j:// 클러스터에서는 follower/read replica로 라우팅)
+    - execute_write: WRITE 세션 (leader로 라우팅)
+    - 두 경로 모두 session.execute_read/execute_write로 실행 -> leader 변경, deadlock 등
+      일시적 오류는 NEO4J_MAX_TRANSACTION_RETRY_TIME 동안 드라이버가 재시도
+    - 모든 세션이 하나의 bookmark manager를 공유해 쓰기 직후의 읽기도 그 쓰기를 봄 (causal consistency)
+    """
+
     driver = None
+    bookmark_manager = None
+    _stats = {
+        "read": {"transactions": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0, "active": 0},
+        "write": {"transactions": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0, "active": 0},
+    }
 
     @classmethod
     async def connect(cls):
         if cls.driver is None:
             # Check if using AsyncGraphDatabase
             cls.driver = AsyncGraphDatabase.driver(
-                settings.NEO4J_URI, auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD)
+                settings.NEO4J_URI,
+                auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD),
+                max_connection_pool_size=settings.NEO4J_MAX_POOL_SIZE,
+                connection_acquisition_timeout=settings.NEO4J_ACQUISITION_TIMEOUT,
+                max_transaction_retry_time=settings.NEO4J_MAX_TRANSACTION_RETRY_TIME,
+                fetch_size=settings.NEO4J_FETCH_SIZE,
             )
+            if settings.NEO4J_CAUSAL_CONSISTENCY:
+                cls.bookmark_manager = AsyncGraphDatabase.bookmark_manager()
             # Verify connectivity
             # await cls.driver.verify_connectivity()
 
-            # 성능 향상을 위한 인덱스 생성
-            async with cls.driver.session() as session:
-                await session.run(
-                    "CREATE INDEX user_record_idx IF NOT EXISTS FOR (r:Record) ON (r.userId, r.recordId)"
-                )
-                await session.run(
-                    "CREATE INDEX user_entity_idx IF NOT EXISTS FOR (e:Event) ON (e.userId)"
-                )
-                await session.run(
-                    "CREATE INDEX user_idx IF NOT EXISTS FOR (u:User) ON (u.userId)"
-                )
+            # MERGE 키 제약/인덱스 (버전 관리: app.db.graph_schema)
+            if settings.GRAPH_SCHEMA_AUTO_MIGRATE:
+                report = await graph_schema.migrate(cls.driver)
+                if report["to"] < SCHEMA_VERSION:
+                    print(
+                        f"[GraphSchema] Schema is at version {report['to']} (expected {SCHEMA_VERSION}); "
+                        "see python -m app.db.migrations.graph_schema --dry-run"
+                    )
+            if settings.GRAPH_SCHEMA_VERIFY:
+                await graph_schema.verify(cls.driver)
 
             print("Connected to Neo4j and verified indexes")
 
@@ -38,14 +62,84 @@ class Neo4jDB:
         if cls.driver:
             await cls.driver.close()
             cls.driver = None
+            cls.bookmark_manager = None
             print("Closed Neo4j Connection")
 
     @classmethod
-    def get_session(cls):
+    def get_session(cls, access_mode: str = WRITE_ACCESS):
         if cls.driver:
-            return cls.driver.session()
+            return cls.driver.session(
+                database=settings.NEO4J_DATABASE,
+                default_access_mode=access_mode,
+                bookmark_manager=cls.bookmark_manager,
+            )
         raise Exception("Neo4j driver not initialized")
 
+    @classmethod
+    async def _execute(cls, mode: str, work: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        if cls.driver is None:
+            raise Exception("Neo4j driver not initialized")
+        stats = cls._stats[mode]
+        stats["active"] += 1
+        started = time.perf_counter()
+        try:
+            async with cls.get_session(READ_ACCESS if mode == "read" else WRITE_ACCESS) as session:
+                if mode == "read":
+                    return await session.execute_read(work, *args, **kwargs)
+                return await session.execute_write(work, *args, **kwargs)
+        except Exception:
+            stats["errors"] += 1
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            stats["active"] -= 1
+            stats["transactions"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+    @classmethod
+    async def execute_read(cls, work: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        work(tx, *args, **kwargs)를 읽기 managed transaction으로 실행.
+        work는 재시도될 수 있으므로 결과를 transaction 안에서 모두 읽어 반환해야 함.
+        """
+        return await cls._execute("read", work, *args, **kwargs)
+
+    @classmethod
+    async def execute_write(cls, work: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """work(tx, *args, **kwargs)를 쓰기 managed transaction으로 실행 (재시도될 수 있음)."""
+        return await cls._execute("write", work, *args, **kwargs)
+
+    @classmethod
+    def pool_stats(cls) -> Dict[str, Any]:
+        """용량 계획용: 설정된 풀 한도, 주소별 열린/사용 중 연결 수, read/write 트랜잭션 지연."""
+        stats: Dict[str, Any] = {
+            "connected": cls.driver is not None,
+            "database": settings.NEO4J_DATABASE,
+            "max_pool_size": settings.NEO4J_MAX_POOL_SIZE,
+            "acquisition_timeout": settings.NEO4J_ACQUISITION_TIMEOUT,
+            "fetch_size": settings.NEO4J_FETCH_SIZE,
+        }
+        for mode, values in cls._stats.items():
+            transactions = values["transactions"]
+            stats[mode] = {
+                "transactions": transactions,
+                "errors": values["errors"],
+                "active": values["active"],
+                "avg_ms": round(values["total_ms"] / transactions, 2) if transactions else 0.0,
+                "max_ms": round(values["max_ms"], 2),
+            }
+        # 주소별 연결 수는 드라이버 내부 풀 상태 (공개 API가 없어 버전에 따라 없을 수 있음)
+        pool = getattr(cls.driver, "_pool", None)
+        try:
+            stats["connections"] = {
+                str(address): {"open": len(connections), "in_use": pool.in_use_connection_count(address)}
+                for address, connections in list(pool.connections.items())
+            }
+        except Exception:
+            stats["connections"] = None
+        return stats
+
     @classmethod
     async def execute_cypher(cls, query: str):
         """
@@ -59,12 +153,121 @@ class Neo4jDB:
             print("Empty query provided.")
             return
 
-        async with cls.driver.session() as session:
-            try:
-                await session.run(query)
-                print(f"Executed Cypher query successfully.")
-            except Exception as e:
-                print(f"Failed to execute Cypher: {e}")
+        async def _write(tx):
+            await (await tx.run(query)).consume()
+
+        try:
+            await cls.execute_write(_write)
+            print(f"Executed Cypher query successfully.")
+        except Exception as e:
+            print(f"Failed to execute Cypher: {e}")
+
+    # hop별로 따라가는 관계 (스키마: LLMServiceInterface._get_schema_description)
+    # 1: 기록의 사건/감정, 2: 사건의 인물/행동/결과,
+    # 3: 같은 인물/행동/결과를 가진 다른 사건, 4: 그 사건의 기록
+    HOP_PATTERNS = (
+        "-[rel:HAS_EVENT|HAS_EMOTION]->",
+        "-[rel:INVOLVES|HAS_ACTION|LEADS_TO]->",
+        "<-[rel:INVOLVES|HAS_ACTION|LEADS_TO]-",
+        "<-[rel:HAS_EVENT]-",
+    )
+
+    @classmethod
+    def fragments_query(cls, hop: int) -> str:
+        """
+        hop 수만큼 타입이 정해진 관계를 한 단계씩 확장한 서브그래프를 기록마다 따로 조회.
+        기록별 조각(recordId, nodes, edges)을 반환하고 질문의 서브그래프는 merge_fragments로 합침
+        (GraphContextCache에 기록 단위로 저장하기 위함, 캐시 miss 기록만 한 번에 조회).
+
+        - 각 hop은 이전 hop의 노드(frontier)에서만 출발하고, 이미 방문한 노드는 제외
+        - 출발 노드당 $perNode개, hop 전체 $perHop개까지만 확장
+        - 관계 수가 $maxDegree를 넘는 노드(자주 나오는 인물 등 슈퍼노드)는 결과에 넣되 더 확장하지 않음
+        - 노드(_hop)와 엣지(hop)에는 처음 도달한 hop이 붙음
+        hop 수마다 쿼리 문자열이 고정되므로 실행 계획이 재사용됨.
+        """
+        lines = [
+            "UNWIND $recordIds AS recordId",
+            "CALL {",
+            "  WITH recordId",
+            "  MATCH (r:Record)",
+            "  WHERE r.userId = $userId AND r.recordId = recordId",
+            "  WITH collect(DISTINCT r) AS frontier0",
+            *("  " + line for line in cls._expansion_lines(hop)),
+            "}",
+            "RETURN recordId, nodes, edges",
+        ]
+        return "\n".join(lines)
+
+    @classmethod
+    def _expansion_lines(cls, hop: int) -> List[str]:
+        """frontier0(시작 Record 목록)에서 hop 단계 확장 후 nodes/edges를 반환하는 절."""
+        hop = max(0, min(hop, len(cls.HOP_PATTERNS)))
+        lines = ["WITH frontier0, frontier0 AS visited"]
+        for i, pattern in enumerate(cls.HOP_PATTERNS[:hop], start=1):
+            carried = "".join(f"rels{j}, frontier{j}, " for j in range(1, i))
+            lines += [
+                "CALL {",
+                f"  WITH frontier{i - 1}, visited",
+                f"  UNWIND frontier{i - 1} AS src",
+                "  WITH src, visited WHERE COUNT { (src)--() } <= $maxDegree",
+                "  CALL {",
+                "    WITH src, visited",
+                f"    MATCH (src){pattern}(dst)",
+                "    WHERE dst.userId = $userId AND NOT dst IN visited",
+                "    RETURN rel, dst",
+                "    LIMIT $perNode",
+                "  }",
+                "  WITH rel, dst LIMIT $perHop",
+                f"  RETURN collect(DISTINCT dst) AS frontier{i}, collect(DISTINCT rel) AS rels{i}",
+                "}",
+                f"WITH frontier0, {carried}rels{i}, frontier{i}, visited + frontier{i} AS visited",
+            ]
+
+        nodes = [
+            f"[n IN frontier{i} | n {{.*, _id: elementId(n), _labels: labels(n), _hop: {i}}}]"
+            for i in range(hop + 1)
+        ]
+        edges = [
+            f"[rel IN rels{i} | {{source: elementId(startNode(rel)), target: elementId(endNode(rel)),"
+            f" type: type(rel), properties: properties(rel), hop: {i}}}]"
+            for i in range(1, hop + 1)
+        ] or ["[]"]
+        for column, terms in (("nodes", nodes), ("edges", edges)):
+            for k, term in enumerate(terms):
+                start = "RETURN " if column == "nodes" and k == 0 else "       "
+                end = " +" if k < len(terms) - 1 else f" AS {column}" + ("," if column == "nodes" else "")
+                lines.append(start + term + end)
+        return lines
+
+    @staticmethod
+    def _expansion_params(user_id: str, record_ids: List[str]) -> Dict[str, Any]:
+        return {
+            "userId": user_id,
+            "recordIds": record_ids,
+            "perNode": settings.GRAPH_NODE_FANOUT,
+            "perHop": settings.GRAPH_HOP_FANOUT,
+            "maxDegree": settings.GRAPH_MAX_DEGREE,
+        }
+
+    @classmethod
+    async def get_record_fragments(
+        cls, user_id: str, record_ids: List[str], hop: int = 2
+    ) -> Dict[str, Dict[str, Any]]:
+        """기록별 서브그래프 조각 {recordId: {nodes, edges}}을 한 번의 읽기 트랜잭션으로 조회."""
+        query = cls.fragments_query(hop)
+        params = cls._expansion_params(user_id, record_ids)
+
+        async def _read(tx):
+            result = await tx.run(query, params)
+            return {
+                record.get("recordId"): {
+                    "nodes": record.get("nodes") or [],
+                    "edges": record.get("edges") or [],
+                }
+                async for record in result
+            }
+
+        return await cls.execute_read(_read)
 
     @classmethod
     async def get_context_subgraph(
@@ -72,60 +275,30 @@ class Neo4jDB:
     ) -> Dict[str, Any]:
         """
         주어진 record_ids와 연관된 서브그래프(컨텍스트)를 조회합니다.
-        탐색 경로: Record -> (Event/Emotion) -> [Relationships*hop] -> Neighbors
+        탐색 경로: Record -> (Event/Emotion) -> (Person/Action/Outcome) -> ... (hop 단계까지)
         추론(Reasoning)에 적합한 형태의 노드와 엣지 리스트를 반환합니다.
-        """
-        if cls.driver is None:
-            return {"nodes": [], "edges": []}
 
-        # 관련 기록들에 대한 1-hop 이웃을 간단하게 추출
-        query = """
-        MATCH (r:Record)
-        WHERE r.recordId IN $recordIds AND r.userId = $userId
-        
-        // 직접 연결된 노드들 (Events, Emotions) 찾기
-        OPTIONAL MATCH path = (r)-[*1..2]-(n)
-        WHERE NOT n:User // User 노드는 슈퍼노드가 될 수 있으므로 제외
-        
-        RETURN path
-        LIMIT 50
+        기록별 조각을 캐시(GRAPH_CACHE_ENABLED)에서 가져오고 없는 기록만 한 번에 조회한 뒤,
+        merge_fragments로 hop마다 질문 전체 GRAPH_HOP_FANOUT개까지 합칩니다.
+        (캐시 사용 여부와 관계없이 같은 서브그래프를 반환)
         """
+        if cls.driver is None or not record_ids:
+            return {"nodes": [], "edges": []}
 
-        params = {"userId": user_id, "recordIds": record_ids}
-
-        nodes_map = {}
-        edges_list = []
-
-        async with cls.driver.session() as session:
+        record_ids = list(dict.fromkeys(record_ids))
+        fragments = graph_cache.get_many(user_id, record_ids, hop)
+        misses = [record_id for record_id in record_ids if record_id not in fragments]
+        if misses:
+            generation = graph_cache.generation(user_id)
+            # 읽기 경로: 클러스터에서는 follower/read replica가 처리
             try:
-                result = await session.run(query, params)
-
-                # AsyncResult를 리스트로 변환
-                async for record in result:
-                    path = record.get("path")
-                    if path:
-                        for node in path.nodes:
-                            # 노드 직렬화
-                            n_props = dict(node)
-                            n_props["_labels"] = list(node.labels)
-                            # 중복 제거를 위해 element_id를 키로 사용
-                            nodes_map[node.element_id] = n_props
-
-                        for rel in path.relationships:
-                            edges_list.append(
-                                {
-                                    "source": rel.start_node.element_id,
-                                    "target": rel.end_node.element_id,
-                                    "type": rel.type,
-                                    "properties": dict(rel),
-                                }
-                            )
-
-                return {"nodes": list(nodes_map.values()), "edges": edges_list}
-
+                fetched = await cls.get_record_fragments(user_id, misses, hop)
+                graph_cache.put_many(user_id, fetched, hop, generation)
+                fragments.update(fetched)
             except Exception as e:
                 print(f"Error fetching subgraph: {e}")
-                return {"nodes": [], "edges": []}
-
+        return merge_fragments(
+            (fragments[r] for r in record_ids if r in fragments), per_hop=settings.GRAPH_HOP_FANOUT
+        )
 
 neo4j_db = Neo4jDB()
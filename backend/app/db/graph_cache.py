@@ -0,0 +1,193 @@
+import json
+import time
+from collections import OrderedDict
+from itertools import zip_longest
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import get_settings
+from app.db.graph_schema import SCHEMA_VERSION
+
+settings = get_settings()
+
+# (userId, recordId, 그래프 스키마 버전, hop)
+CacheKey = Tuple[str, str, int, int]
+Fragment = Dict[str, List[dict]]
+
+
+def merge_fragments(fragments: Iterable[Fragment], per_hop: Optional[int] = None) -> Fragment:
+    """
+    기록별 서브그래프 조각을 합침. 노드는 _id, 엣지는 (source, target, type)로 중복 제거 (먼저 나온 순서 유지).
+
+    per_hop이 주어지면 hop마다 질문 전체에서 per_hop개 엣지까지만 남김:
+    - 조각들의 같은 hop 엣지를 질문의 기록 순서대로 번갈아 하나씩 선택 (한 기록이 예산을 독차지하지 않도록)
+    - 이전 hop까지 남은 노드(시작은 _hop 0인 Record)에 닿는 엣지만 선택
+    - 남은 엣지에 닿는 노드만 반환
+    """
+    fragments = list(fragments)
+    nodes: Dict[str, dict] = {}
+    for fragment in fragments:
+        for node in fragment.get("nodes", []):
+            nodes.setdefault(node.get("_id"), node)
+
+    edges: Dict[Tuple[str, str, str], dict] = {}
+    if per_hop is None:
+        for fragment in fragments:
+            for edge in fragment.get("edges", []):
+                edges.setdefault((edge.get("source"), edge.get("target"), edge.get("type")), edge)
+        return {"nodes": list(nodes.values()), "edges": list(edges.values())}
+
+    reached = {
+        node.get("_id")
+        for fragment in fragments
+        for node in fragment.get("nodes", [])
+        if node.get("_hop", 0) == 0
+    }
+    hops = sorted({edge.get("hop", 1) for fragment in fragments for edge in fragment.get("edges", [])})
+    for hop in hops:
+        queues = [
+            [edge for edge in fragment.get("edges", []) if edge.get("hop", 1) == hop]
+            for fragment in fragments
+        ]
+        added: Set[str] = set()
+        taken = 0
+        for edge in (e for row in zip_longest(*queues) for e in row if e is not None):
+            if taken >= per_hop:
+                break
+            key = (edge.get("source"), edge.get("target"), edge.get("type"))
+            if key in edges or (key[0] not in reached and key[1] not in reached):
+                continue
+            edges[key] = edge
+            added.update(key[:2])
+            taken += 1
+        reached |= added
+    return {
+        "nodes": [node for node_id, node in nodes.items() if node_id in reached],
+        "edges": list(edges.values()),
+    }
+
+
+class GraphContextCache:
+    """
+    기록별 로컬 서브그래프(Neo4jDB.get_record_fragments 결과) 캐시 (in-memory LRU + TTL).
+
+    - 키: (userId, recordId, 스키마 버전, hop). 스키마 버전이 바뀌면 이전 항목은 더 이상 조회되지 않음
+    - 항목 수(max_entries)와 직렬화 크기 합(max_bytes)을 넘으면 오래 안 쓴 항목부터 제거
+    - 기록의 그래프가 저장되면 invalidate_record로 제거 (GraphWriteQueue/GraphWriter가 커밋 후 호출)
+      hop 3 이상의 조각은 같은 사용자의 다른 기록 저장으로도 바뀌므로 그 사용자의 항목 전체를 제거
+    - 조회 중에 그래프 저장이 커밋되면 그 결과는 캐시하지 않음 (사용자별 generation 비교)
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        enabled: Optional[bool] = None,
+    ):
+        self.max_entries = settings.GRAPH_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.max_bytes = settings.GRAPH_CACHE_MAX_MB * 1024 * 1024 if max_bytes is None else max_bytes
+        self.ttl_seconds = settings.GRAPH_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.enabled = settings.GRAPH_CACHE_ENABLED if enabled is None else enabled
+
+        # key -> (fragment, 크기, 저장 시각)
+        self._entries: "OrderedDict[CacheKey, Tuple[Fragment, int, float]]" = OrderedDict()
+        self._keys_by_user: Dict[str, Set[CacheKey]] = {}
+        self._generations: Dict[str, int] = {}
+        self._total_bytes = 0
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expired": 0,
+            "invalidated": 0,
+            "stale_skipped": 0,
+        }
+
+    def generation(self, user_id: str) -> int:
+        return self._generations.get(user_id, 0)
+
+    def get_many(self, user_id: str, record_ids: List[str], hop: int) -> Dict[str, Fragment]:
+        """캐시된 조각을 {recordId: fragment}로 반환."""
+        if not self.enabled:
+            return {}
+
+        now = time.monotonic()
+        found: Dict[str, Fragment] = {}
+        for record_id in record_ids:
+            key = (user_id, record_id, SCHEMA_VERSION, hop)
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[2] > self.ttl_seconds:
+                self._remove(key)
+                self._stats["expired"] += 1
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                continue
+            self._entries.move_to_end(key)
+            found[record_id] = entry[0]
+            self._stats["hits"] += 1
+        return found
+
+    def put_many(
+        self, user_id: str, fragments: Dict[str, Fragment], hop: int, generation: Optional[int] = None
+    ):
+        """
+        조회한 조각 저장. generation은 조회 시작 전에 읽은 값 (그 사이 저장이 있었으면 버림).
+        """
+        if not self.enabled:
+            return
+        if generation is not None and generation != self.generation(user_id):
+            self._stats["stale_skipped"] += len(fragments)
+            return
+
+        now = time.monotonic()
+        for record_id, fragment in fragments.items():
+            key = (user_id, record_id, SCHEMA_VERSION, hop)
+            self._remove(key)
+            size = len(json.dumps(fragment, ensure_ascii=False, default=str).encode("utf-8"))
+            self._entries[key] = (fragment, size, now)
+            self._keys_by_user.setdefault(user_id, set()).add(key)
+            self._total_bytes += size
+
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+        ):
+            self._remove(next(iter(self._entries)))
+            self._stats["evictions"] += 1
+
+    def invalidate_record(self, user_id: str, record_id: str):
+        """기록의 그래프가 저장/변경되면 호출."""
+        self._generations[user_id] = self.generation(user_id) + 1
+        for key in list(self._keys_by_user.get(user_id, ())):
+            # hop 1~2 조각은 그 기록의 사건/감정과 사건의 인물/행동/결과뿐이라 다른 기록 저장과 무관
+            if key[1] == record_id or key[3] > 2:
+                self._remove(key)
+                self._stats["invalidated"] += 1
+
+    def _remove(self, key: CacheKey):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._total_bytes -= entry[1]
+        keys = self._keys_by_user.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[key[0]]
+
+    def clear(self):
+        self._entries.clear()
+        self._keys_by_user.clear()
+        self._total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "bytes": self._total_bytes,
+            "hit_ratio": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+
+graph_cache = GraphContextCache()
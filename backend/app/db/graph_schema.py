@@ -0,0 +1,203 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# GraphWriter.WRITE_RECORDS_QUERY(와 LLM Cypher 스키마)의 MERGE 키: (label, 속성)
+# MERGE는 키 속성이 모두 같은 노드를 찾으므로 같은 속성 조합의 uniqueness 제약이 있어야
+# 라벨 전체 스캔 대신 인덱스 seek으로 찾고, 동시 저장에서도 중복 노드가 생기지 않음
+MERGE_KEYS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("User", ("userId",)),
+    ("Record", ("userId", "recordId")),
+    ("Event", ("id",)),
+    ("Person", ("name", "userId")),
+    ("Emotion", ("label", "userId")),
+    ("Action", ("description", "userId")),
+    ("Outcome", ("description", "userId")),
+)
+
+
+def constraint_name(label: str) -> str:
+    return f"{label.lower()}_merge_key"
+
+
+def constraint_statement(label: str, keys: Tuple[str, ...]) -> str:
+    # NODE KEY는 Enterprise 전용이라 Community에서도 되는 복합 UNIQUE 제약 사용
+    properties = ", ".join(f"n.{key}" for key in keys)
+    return (
+        f"CREATE CONSTRAINT {constraint_name(label)} IF NOT EXISTS "
+        f"FOR (n:{label}) REQUIRE ({properties}) IS UNIQUE"
+    )
+
+
+# (version, 설명, 스키마 명령). 적용된 버전은 (:GraphSchema {name: "log"}).version에 기록.
+# 새 스키마 변경은 항상 끝에 다음 버전으로 추가 (이미 적용된 단계는 수정하지 않음)
+MIGRATIONS: Tuple[Tuple[int, str, Tuple[str, ...]], ...] = (
+    (
+        1,
+        "record/event/user lookup indexes",
+        (
+            "CREATE INDEX user_record_idx IF NOT EXISTS FOR (r:Record) ON (r.userId, r.recordId)",
+            "CREATE INDEX user_entity_idx IF NOT EXISTS FOR (e:Event) ON (e.userId)",
+            "CREATE INDEX user_idx IF NOT EXISTS FOR (u:User) ON (u.userId)",
+        ),
+    ),
+    (
+        2,
+        "uniqueness constraints for every MERGE key",
+        (
+            # 같은 라벨/속성의 일반 인덱스가 있으면 제약을 만들 수 없음 (제약이 자체 인덱스를 가짐)
+            "DROP INDEX user_record_idx IF EXISTS",
+            "DROP INDEX user_idx IF EXISTS",
+            *(constraint_statement(label, keys) for label, keys in MERGE_KEYS),
+        ),
+    ),
+)
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+# 실행 계획에 나오면 안 되는 연산자 (라벨/전체 스캔)
+SCAN_OPERATORS = {"NodeByLabelScan", "AllNodesScan"}
+
+
+def duplicate_query(label: str, keys: Tuple[str, ...]) -> str:
+    """제약 생성을 막는 중복 노드 그룹 수 (키 속성이 모두 있는 노드만)."""
+    present = " AND ".join(f"n.{key} IS NOT NULL" for key in keys)
+    grouped = ", ".join(f"n.{key} AS {key}" for key in keys)
+    return (
+        f"MATCH (n:{label}) WHERE {present} "
+        f"WITH {grouped}, count(*) AS copies WHERE copies > 1 "
+        "RETURN count(*) AS groups"
+    )
+
+
+def probe_query(label: str, keys: Tuple[str, ...]) -> str:
+    """MERGE 키 조회 계획 확인용 쿼리 (EXPLAIN으로만 실행)."""
+    properties = ", ".join(f"{key}: $p{i}" for i, key in enumerate(keys))
+    return f"MERGE (n:{label} {{{properties}}}) RETURN n"
+
+
+def plan_operators(plan: Optional[Dict[str, Any]]) -> List[str]:
+    """EXPLAIN 계획 트리의 연산자 이름 목록 ("NodeUniqueIndexSeek@neo4j" -> "NodeUniqueIndexSeek")."""
+    if not plan:
+        return []
+    operators = [str(plan.get("operatorType", "")).split("@")[0]]
+    for child in plan.get("children", []):
+        operators += plan_operators(child)
+    return operators
+
+
+class GraphSchema:
+    """
+    Neo4j 스키마(인덱스/제약) 버전 관리.
+
+    - migrate: 그래프에 기록된 버전 이후의 MIGRATIONS 단계만 순서대로 적용
+    - verify: MERGE 키 조회와 기록 조회 계획이 라벨 스캔 없이 인덱스 seek을 쓰는지 EXPLAIN으로 확인
+    스키마 명령은 데이터 쓰기와 같은 트랜잭션에서 실행할 수 없으므로 auto-commit으로 하나씩 실행.
+    """
+
+    @staticmethod
+    async def current_version(session) -> int:
+        result = await session.run(
+            "MATCH (s:GraphSchema {name: $name}) RETURN s.version AS version", name="log"
+        )
+        record = await result.single()
+        return (record["version"] if record else None) or 0
+
+    @classmethod
+    async def migrate(cls, driver, target: int = SCHEMA_VERSION) -> Dict[str, Any]:
+        """
+        적용 안 된 단계를 적용하고 {from, to, applied, error} 반환.
+        한 단계가 실패하면 (기존 중복 노드 등) 그 단계부터는 버전을 올리지 않고 중단.
+        제약을 만드는 단계는 먼저 중복 노드를 확인하고, 있으면 아무것도 바꾸지 않고 중단
+        (인덱스 DROP 후 제약 생성이 실패하면 조회가 라벨 스캔으로 떨어지므로).
+        """
+        async with driver.session(database=settings.NEO4J_DATABASE) as session:
+            version = await cls.current_version(session)
+            report: Dict[str, Any] = {"from": version, "to": version, "applied": [], "error": None}
+            for step, description, statements in MIGRATIONS:
+                if step <= version or step > target:
+                    continue
+                labels = [
+                    label for label, keys in MERGE_KEYS if constraint_statement(label, keys) in statements
+                ]
+                duplicates = {
+                    label: groups
+                    for label, groups in (await cls._duplicate_groups(session, labels)).items()
+                    if groups
+                }
+                if duplicates:
+                    report["error"] = (
+                        f"migration {step} ({description}) aborted without changes: "
+                        f"duplicate nodes {duplicates}"
+                    )
+                    print(f"[GraphSchema] {report['error']}")
+                    break
+                try:
+                    for statement in statements:
+                        await (await session.run(statement)).consume()
+                except Exception as e:
+                    report["error"] = f"migration {step} ({description}) failed: {e}"
+                    print(f"[GraphSchema] {report['error']}")
+                    break
+                await (
+                    await session.run(
+                        "MERGE (s:GraphSchema {name: $name}) "
+                        "SET s.version = $version, s.description = $description, s.appliedAt = datetime()",
+                        name="log",
+                        version=step,
+                        description=description,
+                    )
+                ).consume()
+                report["applied"].append(step)
+                report["to"] = step
+                print(f"[GraphSchema] Applied migration {step}: {description}")
+        return report
+
+    @staticmethod
+    async def _duplicate_groups(session, labels: List[str]) -> Dict[str, int]:
+        counts = {}
+        for label, keys in MERGE_KEYS:
+            if label in labels:
+                record = await (await session.run(duplicate_query(label, keys))).single()
+                counts[label] = record["groups"] if record else 0
+        return counts
+
+    @classmethod
+    async def duplicates(cls, driver) -> Dict[str, int]:
+        """MERGE 키별 중복 노드 그룹 수 (0이 아니면 해당 제약 생성이 실패함)."""
+        async with driver.session(database=settings.NEO4J_DATABASE) as session:
+            return await cls._duplicate_groups(session, [label for label, _ in MERGE_KEYS])
+
+    @staticmethod
+    def probes() -> Dict[str, Tuple[str, Dict[str, Any]]]:
+        queries = {
+            label: (probe_query(label, keys), {f"p{i}": "" for i in range(len(keys))})
+            for label, keys in MERGE_KEYS
+        }
+        # 질문 컨텍스트 서브그래프의 시작점 (get_context_subgraph의 첫 MATCH)
+        queries["Record lookup"] = (
+            "MATCH (r:Record) WHERE r.userId = $userId AND r.recordId IN $recordIds RETURN r",
+            {"userId": "", "recordIds": []},
+        )
+        return queries
+
+    @classmethod
+    async def verify(cls, driver) -> Dict[str, List[str]]:
+        """
+        각 조회의 EXPLAIN 계획에서 라벨/전체 스캔을 쓰는 것만 {이름: 연산자 목록}으로 반환 (정상이면 빈 dict).
+        """
+        problems = {}
+        async with driver.session(database=settings.NEO4J_DATABASE) as session:
+            for name, (query, params) in cls.probes().items():
+                summary = await (await session.run("EXPLAIN " + query, params)).consume()
+                operators = plan_operators(getattr(summary, "plan", None))
+                if SCAN_OPERATORS & set(operators):
+                    problems[name] = operators
+        for name, operators in problems.items():
+            print(f"[GraphSchema] {name} does not use an index seek: {' > '.join(operators)}")
+        return problems
+
+
+graph_schema = GraphSchema()
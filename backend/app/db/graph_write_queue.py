@@ -0,0 +1,197 @@
+import asyncio
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from app.core.config import get_settings
+from app.db.graph import neo4j_db
+from app.db.graph_cache import graph_cache
+from app.db.graph_writer import GraphWriter
+
+settings = get_settings()
+
+# 큐 항목: {"userId", "recordId", "record": build_record_params 결과 | None, "cypher": str | None}
+Mutation = Dict[str, Any]
+
+
+class GraphWriteQueue:
+    """
+    기록별 그래프 저장을 짧은 윈도우 동안 모아 하나의 write 트랜잭션으로 커밋하는 Micro-batcher.
+
+    - window_ms 동안 또는 max_records개가 모이면 커밋
+    - 구조화 저장(GraphWriter) 기록은 UNWIND 한 번, LLM Cypher(GRAPH_WRITE_MODE=cypher)는 같은 트랜잭션에서 차례로 실행
+    - Neo4jDB.execute_write(managed transaction)가 일시적 오류(deadlock, leader 변경 등)를 재시도
+    - 재시도할 수 없는 오류는 배치를 반으로 나눠 다시 커밋 -> 문제 기록만 실패 처리
+    - 실패한 기록은 replay용으로 보관 (최대 max_failed개)
+    - 각 호출자는 자신의 기록이 커밋되었는지(bool)를 돌려받음
+    """
+
+    def __init__(
+        self,
+        window_ms: Optional[float] = None,
+        max_records: Optional[int] = None,
+        max_failed: Optional[int] = None,
+        enabled: Optional[bool] = None,
+    ):
+        self.window_ms = settings.GRAPH_WRITE_BATCH_WINDOW_MS if window_ms is None else window_ms
+        self.max_records = (
+            settings.GRAPH_WRITE_BATCH_MAX_RECORDS if max_records is None else max_records
+        )
+        self.enabled = settings.GRAPH_WRITE_BATCH_ENABLED if enabled is None else enabled
+
+        self._pending: List[Tuple[Mutation, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight: Set[asyncio.Task] = set()
+        self._failed: Deque[Dict[str, Any]] = deque(
+            maxlen=settings.GRAPH_WRITE_FAILED_MAX if max_failed is None else max_failed
+        )
+
+        self._stats = {
+            "submitted": 0,
+            "committed": 0,
+            "failed": 0,
+            "batches": 0,
+            "max_batch_size": 0,
+            "commit_ms_total": 0.0,
+            "commit_ms_max": 0.0,
+        }
+
+    async def submit_record(self, record: Dict[str, Any]) -> bool:
+        """GraphWriter.build_record_params 결과 하나를 저장 큐에 넣고 커밋 결과를 기다림."""
+        return await self._submit(
+            {"userId": record["userId"], "recordId": record["recordId"], "record": record, "cypher": None}
+        )
+
+    async def submit_cypher(self, user_id: str, record_id: str, query: str) -> bool:
+        """LLM이 생성한 기록 하나의 Cypher 문자열을 저장 큐에 넣고 커밋 결과를 기다림."""
+        if not query.strip():
+            return False
+        return await self._submit(
+            {"userId": user_id, "recordId": record_id, "record": None, "cypher": query}
+        )
+
+    async def _submit(self, mutation: Mutation) -> bool:
+        self._stats["submitted"] += 1
+
+        if not self.enabled:
+            return (await self._run_batch([(mutation, None)]))[0]
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((mutation, future))
+
+        if len(self._pending) >= self.max_records:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_ms / 1000.0, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch = self._pending
+        self._pending = []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def flush(self):
+        """대기 중인 기록을 바로 커밋하고 진행 중인 커밋이 끝날 때까지 기다림 (lifespan 종료 시)."""
+        self._flush()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    async def _run_batch(self, batch: List[Tuple[Mutation, Optional[asyncio.Future]]]) -> List[bool]:
+        mutations = [mutation for mutation, _ in batch]
+        failed = await self._commit(mutations)
+
+        results = []
+        for mutation, future in batch:
+            ok = id(mutation) not in failed
+            results.append(ok)
+            if future is not None and not future.done():
+                future.set_result(ok)
+        return results
+
+    async def _commit(self, mutations: List[Mutation]) -> Dict[int, str]:
+        """mutations를 한 트랜잭션으로 커밋. 실패한 항목 {id(mutation): 오류}를 반환."""
+        if neo4j_db.driver is None:
+            error = "Neo4j driver is not connected"
+            print(f"[GraphWriteQueue] {error}")
+            return self._record_failures(mutations, error)
+
+        records = [m["record"] for m in mutations if m["record"] is not None]
+        statements = [m["cypher"] for m in mutations if m["cypher"] is not None]
+
+        async def _write(tx):
+            if records:
+                await GraphWriter.run(tx, records)
+            for statement in statements:
+                await (await tx.run(statement)).consume()
+
+        started = time.perf_counter()
+        try:
+            await neo4j_db.execute_write(_write)
+        except Exception as e:
+            retryable = getattr(e, "is_retryable", lambda: False)()
+            if len(mutations) > 1 and not retryable:
+                # 잘못된 기록(예: LLM Cypher 문법 오류) 하나가 배치 전체를 실패시키지 않도록 분할
+                middle = len(mutations) // 2
+                return {**await self._commit(mutations[:middle]), **await self._commit(mutations[middle:])}
+            print(f"[GraphWriteQueue] Failed to write records {[m['recordId'] for m in mutations]}: {e}")
+            return self._record_failures(mutations, str(e))
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        for mutation in mutations:
+            graph_cache.invalidate_record(mutation["userId"], mutation["recordId"])
+        self._stats["batches"] += 1
+        self._stats["committed"] += len(mutations)
+        self._stats["max_batch_size"] = max(self._stats["max_batch_size"], len(mutations))
+        self._stats["commit_ms_total"] += elapsed_ms
+        self._stats["commit_ms_max"] = max(self._stats["commit_ms_max"], elapsed_ms)
+        return {}
+
+    def _record_failures(self, mutations: List[Mutation], error: str) -> Dict[int, str]:
+        now = datetime.now().isoformat()
+        for mutation in mutations:
+            self._failed.append({**mutation, "error": error, "failedAt": now})
+        self._stats["failed"] += len(mutations)
+        return {id(mutation): error for mutation in mutations}
+
+    def failed(self) -> List[Dict[str, Any]]:
+        """replay 대상 (저장 내용 없이 식별자와 오류만)."""
+        return [
+            {"userId": f["userId"], "recordId": f["recordId"], "error": f["error"], "failedAt": f["failedAt"]}
+            for f in self._failed
+        ]
+
+    async def replay(self) -> Dict[str, int]:
+        """보관 중인 실패 기록을 다시 큐에 넣음. 다시 실패한 기록은 다시 보관됨."""
+        failed = list(self._failed)
+        self._failed.clear()
+        results = await asyncio.gather(
+            *(
+                self._submit({key: f[key] for key in ("userId", "recordId", "record", "cypher")})
+                for f in failed
+            )
+        )
+        return {"replayed": len(failed), "committed": sum(results)}
+
+    def stats(self) -> Dict[str, Any]:
+        batches = self._stats["batches"]
+        return {
+            **{key: value for key, value in self._stats.items() if key != "commit_ms_total"},
+            "commit_ms_max": round(self._stats["commit_ms_max"], 2),
+            "avg_batch_size": round(self._stats["committed"] / batches, 2) if batches else 0.0,
+            "avg_commit_ms": round(self._stats["commit_ms_total"] / batches, 2) if batches else 0.0,
+            "pending": len(self._pending),
+            "failed_records": [f["recordId"] for f in self._failed],
+        }
+
+
+graph_write_queue = GraphWriteQueue()
@@ -0,0 +1,140 @@
+from typing import Any, Dict, List
+
+from app.core.config import get_settings
+from app.db.graph import neo4j_db
+from app.db.graph_cache import graph_cache
+from app.models.domain.graph import GraphData
+
+settings = get_settings()
+
+
+class GraphWriter:
+    """
+    GraphData(extract_entities 결과)를 고정된 파라미터화 Cypher로 저장.
+
+    - 쿼리 문자열이 항상 같으므로 Neo4j가 실행 계획을 재사용
+    - 값은 모두 파라미터로 전달 (escape/injection 문제 없음)
+    - 여러 기록을 UNWIND로 묶어 하나의 트랜잭션에서 저장 가능
+    """
+
+    # 스키마: LLMServiceInterface._get_schema_description 참고
+    WRITE_RECORDS_QUERY = """
+    UNWIND $records AS rec
+    MERGE (u:User {userId: rec.userId})
+    MERGE (r:Record {userId: rec.userId, recordId: rec.recordId})
+    ON CREATE SET r.createdAt = datetime()
+    SET r.date = rec.date
+    MERGE (u)-[:OWNS]->(r)
+    FOREACH (label IN rec.emotions |
+        MERGE (em:Emotion {label: label, userId: rec.userId})
+        MERGE (r)-[:HAS_EMOTION]->(em)
+    )
+    FOREACH (ev IN rec.events |
+        MERGE (e:Event {id: ev.id})
+        SET e.summary = ev.summary, e.userId = rec.userId
+        MERGE (r)-[:HAS_EVENT]->(e)
+        FOREACH (name IN ev.people |
+            MERGE (p:Person {name: name, userId: rec.userId})
+            MERGE (e)-[:INVOLVES]->(p)
+        )
+        FOREACH (description IN ev.actions |
+            MERGE (a:Action {description: description, userId: rec.userId})
+            MERGE (e)-[:HAS_ACTION]->(a)
+        )
+        FOREACH (description IN ev.outcomes |
+            MERGE (o:Outcome {description: description, userId: rec.userId})
+            MERGE (e)-[:LEADS_TO]->(o)
+        )
+    )
+    """
+
+    @staticmethod
+    def _clean(values: List[str]) -> List[str]:
+        # 공백 정리 + 빈 값/중복 제거 (순서 유지)
+        seen = {}
+        for value in values:
+            value = " ".join(str(value).split())
+            if value:
+                seen.setdefault(value, None)
+        return list(seen)
+
+    @classmethod
+    def build_record_params(
+        cls, user_id: str, record_id: str, date: str, graph_data: GraphData
+    ) -> Dict[str, Any]:
+        """GraphData를 WRITE_RECORDS_QUERY의 $records 원소 하나로 변환."""
+        events = []
+        for i, event in enumerate(graph_data.events):
+            summary = " ".join(event.summary.split())
+            if not summary:
+                continue
+            events.append(
+                {
+                    # 같은 기록을 다시 저장해도 Event가 중복 생성되지 않도록 결정적 id 사용
+                    "id": f"{record_id}-e{i}",
+                    "summary": summary,
+                    "people": cls._clean(event.people),
+                    "actions": cls._clean(event.actions),
+                    "outcomes": cls._clean(event.outcomes),
+                }
+            )
+
+        return {
+            "userId": user_id,
+            "recordId": record_id,
+            "date": date,
+            "emotions": cls._clean(graph_data.emotions),
+            "events": events,
+        }
+
+    @classmethod
+    async def run(cls, tx, records: List[Dict[str, Any]]):
+        """열린 write 트랜잭션에서 records 저장 (GraphWriteQueue가 다른 변경과 함께 커밋할 때 사용)."""
+        result = await tx.run(cls.WRITE_RECORDS_QUERY, records=records)
+        return await result.consume()
+
+    @classmethod
+    async def write_record(
+        cls, user_id: str, record_id: str, date: str, graph_data: GraphData
+    ) -> bool:
+        return await cls.write_records(
+            [cls.build_record_params(user_id, record_id, date, graph_data)]
+        )
+
+    @classmethod
+    async def write_records(cls, records: List[Dict[str, Any]]) -> bool:
+        """
+        여러 기록의 그래프를 하나의 write 트랜잭션으로 저장.
+        records: build_record_params 결과 리스트
+        """
+        if not records:
+            return True
+
+        if neo4j_db.driver is None:
+            print("[GraphWriter] Neo4j driver is not connected.")
+            return False
+
+        async def _write(tx):
+            return await cls.run(tx, records)
+
+        record_ids = [r["recordId"] for r in records]
+        try:
+            summary = await neo4j_db.execute_write(_write)
+            for record in records:
+                graph_cache.invalidate_record(record["userId"], record["recordId"])
+            counters = getattr(summary, "counters", None)
+            print(
+                f"[GraphWriter] Wrote {len(records)} record(s)"
+                + (
+                    f" (nodes +{counters.nodes_created}, rels +{counters.relationships_created})"
+                    if counters is not None
+                    else ""
+                )
+            )
+            return True
+        except Exception as e:
+            print(f"[GraphWriter] Failed to write records {record_ids}: {e}")
+            return False
+
+
+graph_writer = GraphWriter()
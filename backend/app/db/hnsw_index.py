@@ -0,0 +1,391 @@
+import hashlib
+import heapq
+import math
+import os
+import random
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Collection, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.db.vector_store import ExactVectorStore, _UserMatrix
+
+settings = get_settings()
+
+
+class HNSWGraph:
+    """
+    NumPy 기반 HNSW (Hierarchical Navigable Small World) 그래프.
+
+    - 노드 번호 = 벡터 행렬의 행 번호 (벡터는 외부 행렬에 두고 참조만 함)
+    - 벡터는 L2 정규화되어 있다고 가정하고 거리 = 1 - 내적(cosine)
+    - 이웃 선택은 논문의 heuristic(다양성 우선) + 부족분은 가까운 순으로 채움
+    - 삭제는 외부 alive 마스크로 처리 (탐색에는 쓰되 결과에서 제외)
+    """
+
+    def __init__(self, M: int = 16, ef_construction: int = 100, seed: int = 42):
+        self.M = M
+        self.M0 = 2 * M
+        self.ef_construction = ef_construction
+        self.ml = 1 / math.log(M)
+        self.levels: List[int] = []
+        self.links: List[List[List[int]]] = []  # links[node][layer] -> 이웃 노드 목록
+        self.entry = -1
+        self.max_level = -1
+        self._rng = random.Random(seed)
+
+    @property
+    def size(self) -> int:
+        return len(self.levels)
+
+    # --- Search ---
+    def _search_layer(
+        self, query: np.ndarray, vectors: np.ndarray, entry_points: List[int], ef: int, layer: int
+    ) -> List[Tuple[float, int]]:
+        """한 층에서 ef개의 가까운 노드를 탐색. (거리, 노드) 오름차순."""
+        visited = set(entry_points)
+        dists = (1 - vectors[entry_points] @ query).tolist()
+        candidates = list(zip(dists, entry_points))
+        heapq.heapify(candidates)
+        results = [(-d, n) for d, n in candidates]
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            dist, node = heapq.heappop(candidates)
+            if dist > -results[0][0] and len(results) >= ef:
+                break
+            neighbors = [n for n in self.links[node][layer] if n not in visited]
+            if not neighbors:
+                continue
+            visited.update(neighbors)
+            for d, n in zip((1 - vectors[neighbors] @ query).tolist(), neighbors):
+                if len(results) < ef or d < -results[0][0]:
+                    heapq.heappush(candidates, (d, n))
+                    heapq.heappush(results, (-d, n))
+                    if len(results) > ef:
+                        heapq.heappop(results)
+
+        return sorted((-d, n) for d, n in results)
+
+    def _select_neighbors(
+        self, candidates: List[Tuple[float, int]], count: int, vectors: np.ndarray
+    ) -> List[int]:
+        """가까우면서도 서로 다른 방향의 이웃을 우선 선택 (HNSW heuristic)."""
+        if len(candidates) <= count:
+            return [n for _, n in candidates]
+
+        nodes = [n for _, n in candidates]
+        # 후보 간 거리를 한 번의 행렬 곱으로 계산해 두고 Python 루프에서는 조회만
+        pairwise = (1 - vectors[nodes] @ vectors[nodes].T).tolist()
+        selected: List[int] = []
+        pruned: List[int] = []
+        for i, (dist, _) in enumerate(candidates):
+            if len(selected) >= count:
+                break
+            row = pairwise[i]
+            if any(row[j] < dist for j in selected):
+                pruned.append(i)
+                continue
+            selected.append(i)
+        # 남는 자리는 가까운 순으로 채움 (keepPrunedConnections)
+        for i in pruned:
+            if len(selected) >= count:
+                break
+            selected.append(i)
+        return [nodes[i] for i in selected]
+
+    def insert(self, node: int, vectors: np.ndarray):
+        """vectors[node]를 그래프에 추가. node는 항상 다음 행 번호여야 함."""
+        if node != self.size:
+            raise ValueError(f"HNSW nodes must be inserted in row order (expected {self.size}, got {node})")
+
+        level = int(-math.log(1.0 - self._rng.random()) * self.ml)
+        self.levels.append(level)
+        self.links.append([[] for _ in range(level + 1)])
+
+        if self.entry < 0:
+            self.entry, self.max_level = node, level
+            return
+
+        query = vectors[node]
+        entry_points = [self.entry]
+        for layer in range(self.max_level, level, -1):
+            entry_points = [self._search_layer(query, vectors, entry_points, 1, layer)[0][1]]
+
+        for layer in range(min(level, self.max_level), -1, -1):
+            found = self._search_layer(query, vectors, entry_points, self.ef_construction, layer)
+            max_links = self.M0 if layer == 0 else self.M
+            neighbors = self._select_neighbors(found, self.M, vectors)
+            self.links[node][layer] = neighbors
+
+            for neighbor in neighbors:
+                links = self.links[neighbor][layer]
+                links.append(node)
+                if len(links) > max_links:
+                    dists = (1 - vectors[links] @ vectors[neighbor]).tolist()
+                    self.links[neighbor][layer] = self._select_neighbors(
+                        sorted(zip(dists, links)), max_links, vectors
+                    )
+            entry_points = [n for _, n in found]
+
+        if level > self.max_level:
+            self.entry, self.max_level = node, level
+
+    def search(
+        self,
+        query: np.ndarray,
+        vectors: np.ndarray,
+        k: int,
+        ef: int,
+        alive: Optional[np.ndarray] = None,
+    ) -> List[Tuple[float, int]]:
+        """살아 있는 노드 중 가까운 k개 (거리, 노드)."""
+        if self.entry < 0 or k <= 0:
+            return []
+
+        entry_points = [self.entry]
+        for layer in range(self.max_level, 0, -1):
+            entry_points = [self._search_layer(query, vectors, entry_points, 1, layer)[0][1]]
+
+        ef = max(ef, k)
+        while True:
+            found = self._search_layer(query, vectors, entry_points, ef, 0)
+            if alive is not None:
+                found = [(d, n) for d, n in found if alive[n]]
+            # 삭제된 노드가 많아 k개를 못 채우면 ef를 늘려 다시 탐색
+            if len(found) >= k or ef >= self.size:
+                return found[:k]
+            ef = min(self.size, ef * 2)
+
+    # --- Persistence ---
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        arrays = {
+            "params": np.array([self.M, self.ef_construction, self.entry, self.max_level], dtype=np.int64),
+            "levels": np.array(self.levels, dtype=np.int32),
+        }
+        for layer in range(self.max_level + 1):
+            degrees = [len(l[layer]) if len(l) > layer else 0 for l in self.links]
+            flat = [n for l in self.links if len(l) > layer for n in l[layer]]
+            arrays[f"deg{layer}"] = np.array(degrees, dtype=np.int32)
+            arrays[f"nbr{layer}"] = np.array(flat, dtype=np.int32)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "HNSWGraph":
+        M, ef_construction, entry, max_level = (int(x) for x in arrays["params"])
+        graph = cls(M=M, ef_construction=ef_construction)
+        graph.levels = arrays["levels"].tolist()
+        graph.entry, graph.max_level = entry, max_level
+        graph.links = [[[] for _ in range(level + 1)] for level in graph.levels]
+        for layer in range(max_level + 1):
+            degrees = arrays[f"deg{layer}"]
+            split = np.split(arrays[f"nbr{layer}"], np.cumsum(degrees)[:-1])
+            for node in np.flatnonzero(np.asarray(graph.levels) >= layer):
+                graph.links[node][layer] = split[node].tolist()
+        # 이후 삽입의 레벨 분포가 재시작마다 같도록 노드 수로 시드
+        graph._rng = random.Random(len(graph.levels))
+        return graph
+
+
+class HNSWVectorStore(ExactVectorStore):
+    """
+    HNSW 근사 최근접 이웃 엔진 (VECTOR_BACKEND=hnsw).
+
+    - 벡터 저장/삭제(tombstone)는 ExactVectorStore의 memory-mapped 행렬을 그대로 사용
+    - 행렬 위에 사용자별 HNSW 그래프를 두고, 새 행은 점진적으로 삽입
+    - 그래프는 {base}.hnsw.npz 스냅샷으로 저장 -> 재시작 시 스냅샷 로드 후 이후 행만 삽입
+    - 기록 수가 HNSW_MIN_ROWS 미만인 사용자는 exact 검색이 더 빠르므로 exact 사용
+    - 처음 구축(스냅샷 로드 + 전체 삽입)은 별도 스레드에서 하고 끝나면 교체.
+      구축 중에는 exact 검색으로 응답 (이벤트 루프를 수십 초 막지 않도록)
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        M: Optional[int] = None,
+        ef_construction: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        min_rows: Optional[int] = None,
+        snapshot_every: Optional[int] = None,
+    ):
+        super().__init__(path)
+        self.M = settings.HNSW_M if M is None else M
+        self.ef_construction = (
+            settings.HNSW_EF_CONSTRUCTION if ef_construction is None else ef_construction
+        )
+        self.ef_search = settings.HNSW_EF_SEARCH if ef_search is None else ef_search
+        self.min_rows = settings.HNSW_MIN_ROWS if min_rows is None else min_rows
+        self.snapshot_every = (
+            settings.HNSW_SNAPSHOT_EVERY if snapshot_every is None else snapshot_every
+        )
+        self._graphs: Dict[str, HNSWGraph] = {}
+        self._unsaved: Dict[str, int] = {}
+        # 구축 스레드와 compaction(행 번호 변경) 사이의 교체 순서를 맞추기 위한 lock/epoch
+        self._lock = threading.Lock()
+        self._epochs: Dict[str, int] = {}
+        self._builds: Dict[str, Future] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hnsw-build")
+
+    @staticmethod
+    def _snapshot_path(matrix: _UserMatrix) -> str:
+        return matrix.base + ".hnsw.npz"
+
+    @staticmethod
+    def _rows_digest(ids: List[str], rows: int) -> np.ndarray:
+        # 스냅샷이 현재 행렬의 같은 행들로 만들어졌는지 확인하기 위한 체크섬
+        digest = hashlib.sha1("\n".join(ids[:rows]).encode("utf-8")).digest()
+        return np.frombuffer(digest, dtype=np.uint8)
+
+    def _load_snapshot(self, matrix: _UserMatrix, ids: Optional[List[str]] = None) -> Optional[HNSWGraph]:
+        ids = matrix.ids if ids is None else ids
+        path = self._snapshot_path(matrix)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                arrays = dict(data)
+            graph = HNSWGraph.from_arrays(arrays)
+        except Exception as e:
+            print(f"[HNSW] Failed to load snapshot {path}: {e}")
+            return None
+        # 파라미터가 바뀌었거나 compaction으로 행 번호가 달라졌으면 다시 구축
+        if (
+            graph.M != self.M
+            or graph.size > len(ids)
+            or not np.array_equal(arrays.get("rows_digest"), self._rows_digest(ids, graph.size))
+        ):
+            return None
+        return graph
+
+    def _write_snapshot(self, matrix: _UserMatrix, graph: HNSWGraph, ids: List[str]):
+        path = self._snapshot_path(matrix)
+        with open(path + ".tmp", "wb") as f:
+            np.savez(f, rows_digest=self._rows_digest(ids, graph.size), **graph.to_arrays())
+        os.replace(path + ".tmp", path)
+
+    def _save_snapshot(self, user_id: str):
+        graph = self._graphs.get(user_id)
+        if graph is None:
+            return
+        matrix = self._user(user_id)
+        self._write_snapshot(matrix, graph, matrix.ids)
+        self._unsaved[user_id] = 0
+
+    def _schedule_build(self, user_id: str):
+        """그래프가 없으면 구축 스레드에 맡김 (이미 구축 중이면 무시)."""
+        if user_id in self._graphs or user_id in self._builds:
+            return
+        matrix = self._user(user_id)
+        # 시작 시점의 행까지만 구축 (이후 추가된 행은 교체 후 _graph에서 이어서 삽입)
+        ids, vectors = list(matrix.ids), matrix.matrix
+        epoch = self._epochs.get(user_id, 0)
+        self._builds[user_id] = self._executor.submit(self._build, user_id, matrix, ids, vectors, epoch)
+
+    def _build(self, user_id: str, matrix: _UserMatrix, ids: List[str], vectors: np.ndarray, epoch: int):
+        try:
+            graph = self._load_snapshot(matrix, ids) or HNSWGraph(self.M, self.ef_construction)
+            inserted = len(ids) - graph.size
+            for row in range(graph.size, len(ids)):
+                graph.insert(row, vectors)
+            with self._lock:
+                if self._epochs.get(user_id, 0) != epoch:
+                    return  # 구축 중 compaction으로 행 번호가 바뀜 -> 다음 검색 때 다시 구축
+                if inserted >= self.snapshot_every:
+                    self._write_snapshot(matrix, graph, ids)
+                    inserted = 0
+                self._unsaved[user_id] = inserted
+                self._graphs[user_id] = graph
+            print(f"[HNSW] Built graph for user {user_id} ({graph.size} nodes)")
+        except Exception as e:
+            print(f"[HNSW] Failed to build graph for user {user_id}: {e}")
+        finally:
+            self._builds.pop(user_id, None)
+
+    def wait_for_builds(self, timeout: Optional[float] = None):
+        """진행 중인 구축이 끝날 때까지 대기 (벤치마크/테스트용)."""
+        wait(list(self._builds.values()), timeout=timeout)
+
+    def _graph(self, user_id: str) -> Optional[HNSWGraph]:
+        """구축된 그래프를 행렬의 마지막 행까지 맞춰서 반환. 아직 없으면 구축을 시작하고 None."""
+        graph = self._graphs.get(user_id)
+        if graph is None:
+            self._schedule_build(user_id)
+            return None
+
+        matrix = self._user(user_id)
+        if graph.size < len(matrix.ids):
+            vectors = matrix.matrix
+            for row in range(graph.size, len(matrix.ids)):
+                graph.insert(row, vectors)
+                self._unsaved[user_id] = self._unsaved.get(user_id, 0) + 1
+            if self._unsaved.get(user_id, 0) >= self.snapshot_every:
+                self._save_snapshot(user_id)
+        return graph
+
+    def add(self, user_id: str, record_id: str, vector: Sequence[float]):
+        super().add(user_id, record_id, vector)
+        if user_id in self._graphs:
+            self._graph(user_id)
+
+    def remove(self, user_id: str, record_id: str):
+        rows = len(self._user(user_id).ids)
+        super().remove(user_id, record_id)
+        if len(self._user(user_id).ids) < rows:
+            # compaction으로 행 번호가 바뀜 -> 다음 검색 때 다시 구축
+            with self._lock:
+                self._epochs[user_id] = self._epochs.get(user_id, 0) + 1
+                self._graphs.pop(user_id, None)
+                self._unsaved.pop(user_id, None)
+                snapshot = self._snapshot_path(self._user(user_id))
+                if os.path.exists(snapshot):
+                    os.remove(snapshot)
+
+    def search(
+        self,
+        user_id: str,
+        query_vector: Sequence[float],
+        top_k: int,
+        record_ids: Optional[Collection[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        matrix = self._user(user_id)
+        # 기록이 적거나 사전 필터로 후보가 적으면 exact가 더 빠르고 정확
+        candidates = int(matrix.alive.sum()) if record_ids is None else len(record_ids)
+        if candidates < self.min_rows:
+            return super().search(user_id, query_vector, top_k, record_ids)
+
+        query = self._normalize(query_vector)
+        if query is None or matrix.dim is None or len(query) != matrix.dim:
+            return []
+        graph = self._graph(user_id)
+        if graph is None:
+            return super().search(user_id, query_vector, top_k, record_ids)
+        found = graph.search(query, matrix.matrix, top_k, self.ef_search, matrix.row_mask(record_ids))
+        return [(matrix.ids[node], (1 + (1 - dist)) / 2) for dist, node in found]
+
+    def warm_up(self):
+        super().warm_up()
+        for user_id in list(self._users):
+            if int(self._users[user_id].alive.sum()) >= self.min_rows:
+                self._schedule_build(user_id)
+
+    def close(self):
+        # 진행 중인 구축은 기다리지 않음 (다음 시작 때 스냅샷부터 다시 구축)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for user_id, unsaved in list(self._unsaved.items()):
+            if unsaved:
+                self._save_snapshot(user_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **super().stats(),
+            "backend": "hnsw",
+            "graphs": len(self._graphs),
+            "building": len(self._builds),
+            "graph_nodes": sum(g.size for g in self._graphs.values()),
+            "M": self.M,
+            "ef_search": self.ef_search,
+        }
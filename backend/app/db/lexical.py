@@ -0,0 +1,294 @@
+import hashlib
+import json
+import math
+import os
+from array import array
+from collections import Counter
+from typing import Any, Collection, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.core.tokenizer import tokenize
+
+settings = get_settings()
+
+# BM25 파라미터 (rerank_service의 후보 집합 BM25와 같은 값)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+class _UserPostings:
+    """
+    사용자 한 명의 역색인.
+
+    - 문서 = 행 번호 (recordId, 문서 길이, alive 마스크)
+    - postings[term] = (행 번호 array('i'), tf array('H')) -> 추가는 append, 조회는 np.frombuffer(복사 없음)
+    - 수정/삭제는 기존 행을 tombstone 처리 (df/평균 길이는 살아 있는 행만 계산)
+    - {base}.lex.npz 로 저장: 용어/오프셋/행/tf를 평탄화한 배열
+    """
+
+    def __init__(self, base: str, user_id: Optional[str] = None):
+        self.base = base
+        self.user_id = user_id
+        self.ids: List[str] = []
+        self.row_of: Dict[str, int] = {}
+        self.doc_len = array("i")
+        self.alive = array("b")
+        self.postings: Dict[str, Tuple[array, array]] = {}
+        self.live_docs = 0
+        self.live_len = 0
+        self.dirty = 0
+        self._load()
+
+    @property
+    def path(self) -> str:
+        return self.base + ".lex.npz"
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def _load(self):
+        if not self.exists():
+            return
+        try:
+            with np.load(self.path) as data:
+                meta = json.loads(str(data["meta"]))
+                terms = data["terms"].tolist()
+                offsets = data["offsets"]
+                rows = data["rows"]
+                tfs = data["tfs"]
+                self.doc_len = array("i", data["doc_len"].tolist())
+                self.alive = array("b", data["alive"].tolist())
+        except Exception as e:
+            print(f"[Lexical] Failed to load index {self.path}: {e}")
+            return
+        self.user_id = self.user_id or meta.get("userId")
+        self.ids = meta.get("ids", [])
+        for i, term in enumerate(terms):
+            start, end = offsets[i], offsets[i + 1]
+            self.postings[term] = (array("i", rows[start:end].tolist()), array("H", tfs[start:end].tolist()))
+        for row, record_id in enumerate(self.ids):
+            if self.alive[row]:
+                self.row_of[record_id] = row
+                self.live_docs += 1
+                self.live_len += self.doc_len[row]
+
+    def save(self):
+        terms = list(self.postings)
+        lengths = [len(self.postings[t][0]) for t in terms]
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        rows = np.concatenate(
+            [np.frombuffer(self.postings[t][0], dtype=np.int32) for t in terms]
+        ) if terms else np.zeros(0, dtype=np.int32)
+        tfs = np.concatenate(
+            [np.frombuffer(self.postings[t][1], dtype=np.uint16) for t in terms]
+        ) if terms else np.zeros(0, dtype=np.uint16)
+        with open(self.path + ".tmp", "wb") as f:
+            np.savez(
+                f,
+                meta=np.array(json.dumps({"userId": self.user_id, "ids": self.ids})),
+                terms=np.array(terms, dtype=str),
+                offsets=offsets,
+                rows=rows,
+                tfs=tfs,
+                doc_len=np.frombuffer(self.doc_len, dtype=np.int32),
+                alive=np.frombuffer(self.alive, dtype=np.int8),
+            )
+        os.replace(self.path + ".tmp", self.path)
+        self.dirty = 0
+
+    def add(self, record_id: str, text: str):
+        self.remove(record_id)
+        counts = Counter(tokenize(text))
+        if not counts:
+            return
+        row = len(self.ids)
+        for term, tf in counts.items():
+            entry = self.postings.get(term)
+            if entry is None:
+                entry = self.postings[term] = (array("i"), array("H"))
+            entry[0].append(row)
+            entry[1].append(min(tf, 65535))
+        length = sum(counts.values())
+        self.ids.append(record_id)
+        self.row_of[record_id] = row
+        self.doc_len.append(length)
+        self.alive.append(1)
+        self.live_docs += 1
+        self.live_len += length
+        self.dirty += 1
+
+    def remove(self, record_id: str) -> bool:
+        row = self.row_of.pop(record_id, None)
+        if row is None:
+            return False
+        self.alive[row] = 0
+        self.live_docs -= 1
+        self.live_len -= self.doc_len[row]
+        self.dirty += 1
+        return True
+
+    def compact(self):
+        """tombstone 행을 postings에서 제거하고 행 번호를 다시 매김."""
+        alive = np.frombuffer(self.alive, dtype=np.int8).astype(bool)
+        new_row = np.cumsum(alive) - 1
+        postings = {}
+        for term, (rows, tfs) in self.postings.items():
+            rows_np = np.frombuffer(rows, dtype=np.int32)
+            keep = alive[rows_np]
+            if keep.any():
+                postings[term] = (
+                    array("i", new_row[rows_np[keep]].astype(np.int32).tobytes()),
+                    array("H", np.frombuffer(tfs, dtype=np.uint16)[keep].tobytes()),
+                )
+        self.postings = postings
+        self.ids = [record_id for record_id, a in zip(self.ids, alive) if a]
+        self.doc_len = array("i", np.frombuffer(self.doc_len, dtype=np.int32)[alive].tobytes())
+        self.alive = array("b", [1] * len(self.ids))
+        self.row_of = {record_id: row for row, record_id in enumerate(self.ids)}
+        self.dirty += 1
+
+    def search(
+        self, query: str, top_k: int, record_ids: Optional[Collection[str]] = None
+    ) -> List[Tuple[str, float]]:
+        if self.live_docs == 0 or top_k <= 0:
+            return []
+        alive = np.frombuffer(self.alive, dtype=np.int8).astype(bool)
+        if record_ids is not None:
+            allowed = np.zeros(len(self.ids), dtype=bool)
+            allowed[[self.row_of[r] for r in record_ids if r in self.row_of]] = True
+            alive &= allowed
+        doc_len = np.frombuffer(self.doc_len, dtype=np.int32)
+        avg_len = self.live_len / self.live_docs
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_len / avg_len)
+
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        for term in set(tokenize(query)):
+            entry = self.postings.get(term)
+            if entry is None:
+                continue
+            rows = np.frombuffer(entry[0], dtype=np.int32)
+            live = alive[rows]
+            rows = rows[live]
+            if len(rows) == 0:
+                continue
+            tf = np.frombuffer(entry[1], dtype=np.uint16)[live].astype(np.float32)
+            df = len(rows)
+            idf = math.log(1 + (self.live_docs - df + 0.5) / (df + 0.5))
+            # 한 용어의 posting에는 행이 한 번씩만 있으므로 fancy-index 누적이 안전
+            scores[rows] += idf * tf * (BM25_K1 + 1) / (tf + norm[rows])
+
+        matched = int(np.count_nonzero(scores))
+        if matched == 0:
+            return []
+        k = min(top_k, matched)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.ids[i], float(scores[i])) for i in top]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "docs": self.live_docs,
+            "rows": len(self.ids),
+            "terms": len(self.postings),
+            "postings": sum(len(rows) for rows, _ in self.postings.values()),
+        }
+
+
+class LexicalIndex:
+    """
+    Atlas Search 없이 동작하는 프로세스 내 BM25 텍스트 검색 (TEXT_SEARCH_BACKEND=local).
+
+    - title + content를 한국어 토크나이저(공백 토큰 + 조사 제거 + 음절 bigram)로 색인
+    - 기록 생성/수정/삭제 시 점진 반영, tombstone 비율이 높으면 compaction
+    - 변경 LEXICAL_SAVE_EVERY건마다, 그리고 종료 시 디스크에 저장
+    """
+
+    COMPACT_RATIO = 0.3
+
+    def __init__(self, path: Optional[str] = None, save_every: Optional[int] = None):
+        self.path = path or settings.LEXICAL_INDEX_PATH
+        self.save_every = settings.LEXICAL_SAVE_EVERY if save_every is None else save_every
+        self._users: Dict[str, _UserPostings] = {}
+
+    def _user(self, user_id: str) -> _UserPostings:
+        index = self._users.get(user_id)
+        if index is None:
+            os.makedirs(self.path, exist_ok=True)
+            name = hashlib.sha1(user_id.encode("utf-8")).hexdigest()
+            index = _UserPostings(os.path.join(self.path, name), user_id)
+            self._users[user_id] = index
+        return index
+
+    def _maybe_save(self, index: _UserPostings):
+        if index.dirty >= self.save_every:
+            index.save()
+
+    def warm_up(self):
+        """저장된 모든 사용자 색인을 미리 로드 (서버 시작 시)."""
+        if not os.path.isdir(self.path):
+            return
+        for name in os.listdir(self.path):
+            if name.endswith(".lex.npz"):
+                index = _UserPostings(os.path.join(self.path, name[: -len(".lex.npz")]))
+                if index.user_id and index.user_id not in self._users:
+                    self._users[index.user_id] = index
+        print(f"[Lexical] Loaded {len(self._users)} user index(es) from {self.path}")
+
+    def close(self):
+        for index in self._users.values():
+            if index.dirty:
+                index.save()
+
+    def has_user(self, user_id: str) -> bool:
+        """이 사용자의 색인이 만들어진 적이 있는지 (없으면 Mongo에서 bootstrap 필요)."""
+        return self._user(user_id).exists()
+
+    def init_user(self, user_id: str):
+        index = self._user(user_id)
+        if not index.exists():
+            index.save()
+
+    def add(self, user_id: str, record_id: str, title: str, content: str):
+        index = self._user(user_id)
+        index.add(record_id, f"{title or ''} {content or ''}")
+        self._maybe_save(index)
+
+    def remove(self, user_id: str, record_id: str):
+        index = self._user(user_id)
+        if index.remove(record_id):
+            dead = len(index.ids) - index.live_docs
+            if dead > 100 and dead / len(index.ids) > self.COMPACT_RATIO:
+                index.compact()
+            self._maybe_save(index)
+
+    def search(
+        self, user_id: str, query: str, top_k: int, record_ids: Optional[Collection[str]] = None
+    ) -> List[Tuple[str, float]]:
+        """record_ids가 주어지면 그 기록들 안에서만 검색 (BM25 통계는 전체 기준)."""
+        return self._user(user_id).search(query, top_k, record_ids)
+
+    def stats(self) -> Dict[str, Any]:
+        per_user = [index.stats() for index in self._users.values()]
+        return {
+            "backend": "local",
+            "users": len(per_user),
+            "docs": sum(s["docs"] for s in per_user),
+            "terms": sum(s["terms"] for s in per_user),
+            "postings": sum(s["postings"] for s in per_user),
+        }
+
+
+_engine = None
+
+
+def get_lexical_engine() -> Optional[LexicalIndex]:
+    """TEXT_SEARCH_BACKEND=local이면 프로세스 내 BM25 색인, Atlas Search를 쓰면 None."""
+    global _engine
+    if settings.TEXT_SEARCH_BACKEND != "local":
+        return None
+    if _engine is None:
+        _engine = LexicalIndex()
+    return _engine
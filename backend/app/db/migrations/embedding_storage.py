@@ -0,0 +1,169 @@
+"""
+기존 문서의 embedding 필드를 EMBEDDING_STORAGE 형식으로 변환하는 마이그레이션.
+
+사용법 (backend 디렉토리에서):
+    python -m app.db.migrations.embedding_storage --mode int8
+    python -m app.db.migrations.embedding_storage --mode bit --dry-run
+
+- batch 단위로 읽어 bulk_write로 갱신 (이미 목표 형식인 문서는 건너뜀)
+- 변환 전/후 embedding 크기와, 표본에 대한 recall@k(원본 float 대비)를 출력
+- 변환 후 Atlas vector_index를 출력된 정의로 다시 만들어야 함
+"""
+
+import argparse
+import asyncio
+import json
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from bson.binary import Binary, BinaryVectorDtype
+from pymongo import UpdateOne
+
+from app.core.config import get_settings
+from app.db.mongo import mongo_db
+from app.db.vector_codec import vector_codec
+
+settings = get_settings()
+
+_DTYPE_BY_MODE = {
+    "float32": BinaryVectorDtype.FLOAT32,
+    "int8": BinaryVectorDtype.INT8,
+    "bit": BinaryVectorDtype.PACKED_BIT,
+}
+
+
+def is_encoded_as(value: Any, mode: str) -> bool:
+    if mode == "array":
+        return isinstance(value, list)
+    return (
+        isinstance(value, Binary)
+        and value.subtype == 9
+        and value.as_vector().dtype == _DTYPE_BY_MODE[mode]
+    )
+
+
+def recall_at_k(vectors: np.ndarray, mode: str, k: int = 10, num_queries: int = 50) -> float:
+    """
+    표본 벡터들 중 일부를 질의로 사용해, 원본 float cosine top-k 대비
+    mode로 인코딩한 벡터의 top-k가 얼마나 겹치는지 계산.
+    """
+    n = len(vectors)
+    if n < 2:
+        return 1.0
+    k = min(k, n - 1)
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    exact = vectors / np.where(norms == 0, 1, norms)
+    encoded = np.asarray(
+        [vector_codec.decode(vector_codec.encode(v, mode)) for v in vectors], dtype=np.float32
+    )
+    if mode == "bit":
+        # Atlas는 bit 벡터를 hamming(euclidean) 거리로 비교 -> 내적이 클수록 가까움
+        approx = encoded
+    else:
+        enc_norms = np.linalg.norm(encoded, axis=1, keepdims=True)
+        approx = encoded / np.where(enc_norms == 0, 1, enc_norms)
+
+    rng = np.random.default_rng(0)
+    queries = rng.choice(n, size=min(num_queries, n), replace=False)
+    hits = 0
+    for q in queries:
+        exact_scores = exact @ exact[q]
+        approx_scores = approx @ approx[q]
+        exact_scores[q] = approx_scores[q] = -np.inf  # 자기 자신 제외
+        truth = set(np.argpartition(-exact_scores, k)[:k])
+        found = set(np.argpartition(-approx_scores, k)[:k])
+        hits += len(truth & found)
+    return hits / (len(queries) * k)
+
+
+async def migrate(
+    mode: str,
+    batch_size: int = 500,
+    dry_run: bool = False,
+    sample_size: int = 2000,
+    user_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    mode = vector_codec.mode(mode)
+    await mongo_db.connect()
+    collection = mongo_db.db[settings.COLLECTION_NAME]
+
+    query: Dict[str, Any] = {"embedding": {"$ne": None}}
+    if user_id:
+        query["userId"] = user_id
+
+    report = {
+        "mode": mode,
+        "scanned": 0,
+        "converted": 0,
+        "skipped": 0,
+        "bytes_before": 0,
+        "bytes_after": 0,
+    }
+    sample: List[List[float]] = []
+    ops: List[UpdateOne] = []
+    dims = 0
+
+    async def flush():
+        if ops and not dry_run:
+            await collection.bulk_write(ops, ordered=False)
+        ops.clear()
+
+    cursor = collection.find(query, {"_id": 1, "embedding": 1}).batch_size(batch_size)
+    async for doc in cursor:
+        report["scanned"] += 1
+        value = doc["embedding"]
+        vector = vector_codec.decode(value)
+        if not vector:
+            continue
+        dims = dims or len(vector)
+        if len(sample) < sample_size:
+            sample.append(vector)
+
+        report["bytes_before"] += vector_codec.storage_bytes(value)
+        if is_encoded_as(value, mode):
+            report["skipped"] += 1
+            report["bytes_after"] += vector_codec.storage_bytes(value)
+            continue
+
+        encoded = vector_codec.encode(vector, mode)
+        report["bytes_after"] += vector_codec.storage_bytes(encoded)
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"embedding": encoded}}))
+        report["converted"] += 1
+        if len(ops) >= batch_size:
+            await flush()
+    await flush()
+
+    if sample:
+        report["recall_at_10"] = round(
+            recall_at_k(np.asarray(sample, dtype=np.float32), mode, k=10), 4
+        )
+    report["index_definition"] = vector_codec.index_definition(dims, mode) if dims else None
+    report["dry_run"] = dry_run
+    await mongo_db.close()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert stored embeddings to a compact format")
+    parser.add_argument("--mode", default=settings.EMBEDDING_STORAGE, choices=list(_DTYPE_BY_MODE) + ["array"])
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--sample-size", type=int, default=2000)
+    parser.add_argument("--user-id", default=None)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    report = asyncio.run(
+        migrate(
+            args.mode,
+            batch_size=args.batch_size,
+            dry_run=args.dry_run,
+            sample_size=args.sample_size,
+            user_id=args.user_id,
+        )
+    )
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
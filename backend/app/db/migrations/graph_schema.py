@@ -0,0 +1,69 @@
+"""
+Neo4j 스키마(MERGE 키 uniqueness 제약/인덱스) 마이그레이션.
+
+사용법 (backend 디렉토리에서):
+    python -m app.db.migrations.graph_schema --dry-run
+    python -m app.db.migrations.graph_schema
+    python -m app.db.migrations.graph_schema --verify
+
+- 그래프에 기록된 버전((:GraphSchema {name: "log"}).version) 이후의 단계만 적용
+  (GRAPH_SCHEMA_AUTO_MIGRATE=true면 서버 시작 시에도 같은 단계가 적용됨)
+- --dry-run: 적용할 단계와 명령, 제약 생성을 막는 중복 노드 그룹 수만 출력
+  (중복이 있으면 해당 노드를 합친 뒤 다시 실행)
+- --verify: MERGE 키 조회 계획이 라벨 스캔 없이 인덱스 seek을 쓰는지 EXPLAIN으로 확인
+"""
+
+import argparse
+import asyncio
+import json
+from typing import Any, Dict, Optional
+
+from neo4j import AsyncGraphDatabase
+
+from app.core.config import get_settings
+from app.db.graph_schema import MIGRATIONS, SCHEMA_VERSION, graph_schema
+
+settings = get_settings()
+
+
+async def migrate(dry_run: bool = False, target: Optional[int] = None, verify: bool = False) -> Dict[str, Any]:
+    target = target or SCHEMA_VERSION
+    driver = AsyncGraphDatabase.driver(
+        settings.NEO4J_URI, auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD)
+    )
+    try:
+        async with driver.session(database=settings.NEO4J_DATABASE) as session:
+            version = await graph_schema.current_version(session)
+        report: Dict[str, Any] = {
+            "version": version,
+            "target": target,
+            "pending": [
+                {"version": step, "description": description, "statements": list(statements)}
+                for step, description, statements in MIGRATIONS
+                if version < step <= target
+            ],
+            "duplicates": await graph_schema.duplicates(driver),
+            "dry_run": dry_run,
+        }
+        if not dry_run:
+            report["result"] = await graph_schema.migrate(driver, target)
+        if verify:
+            report["scans"] = await graph_schema.verify(driver)
+    finally:
+        await driver.close()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply versioned Neo4j schema migrations")
+    parser.add_argument("--target", type=int, default=None, help=f"schema version (default {SCHEMA_VERSION})")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--verify", action="store_true", help="check that MERGE lookups use index seeks")
+    args = parser.parse_args()
+
+    report = asyncio.run(migrate(dry_run=args.dry_run, target=args.target, verify=args.verify))
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+기존 기록을 passage로 나눠 passages 컬렉션에 임베딩을 채우는 backfill 마이그레이션 (PASSAGE_RETRIEVAL).
+
+사용법 (backend 디렉토리에서):
+    python -m app.db.migrations.passages --dry-run
+    python -m app.db.migrations.passages
+
+- passage가 아직 없는 기록만 처리
+- passage가 하나뿐인 짧은 기록은 저장된 기록 임베딩을 재사용 (임베딩 요청 없음)
+- 긴 기록의 passage 텍스트는 여러 기록을 모아 batch 단위로 한 번에 임베딩
+- 이후 Atlas에서 passages 컬렉션에 출력된 정의로 passage_vector_index를 만들어야 함
+"""
+
+import argparse
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import ASCENDING
+
+from app.core.config import get_settings
+from app.db.mongo import mongo_db
+from app.db.passages import passage_store
+from app.db.vector_codec import vector_codec
+from app.services.llm_service import llm_service
+
+settings = get_settings()
+
+
+async def migrate(batch_size: int = 64, dry_run: bool = False, user_id: Optional[str] = None) -> Dict[str, Any]:
+    await mongo_db.connect()
+    records = mongo_db.db[settings.COLLECTION_NAME]
+    passages = mongo_db.db[settings.PASSAGE_COLLECTION_NAME]
+
+    query: Dict[str, Any] = {"deletedAt": None}
+    if user_id:
+        query["userId"] = user_id
+    done = set(await passages.distinct("recordId", {"userId": user_id} if user_id else {}))
+
+    report = {"records": 0, "skipped": 0, "passages": 0, "embedded_texts": 0, "dimensions": None}
+    pending: List[Tuple[Dict[str, Any], List[Dict[str, Any]]]] = []
+
+    async def flush():
+        texts = [p["text"] for _, record_passages in pending for p in record_passages if "embedding" not in p]
+        report["embedded_texts"] += len(texts)
+        if texts and not dry_run:
+            vectors = iter(await llm_service.get_embeddings(texts))
+            for _, record_passages in pending:
+                for passage in record_passages:
+                    if "embedding" not in passage:  # 짧은 기록은 저장된 기록 임베딩을 이미 가짐
+                        passage["embedding"] = next(vectors)
+        for doc, record_passages in pending:
+            report["passages"] += len(record_passages)
+            if not dry_run:
+                await passage_store.replace(
+                    doc["userId"],
+                    doc["recordId"],
+                    record_passages,
+                    {"dateEpochDay": doc.get("dateEpochDay"), "feel": doc.get("feel") or []},
+                )
+        pending.clear()
+
+    cursor = records.find(
+        query,
+        {"userId": 1, "recordId": 1, "title": 1, "content": 1, "dateEpochDay": 1, "feel": 1, "embedding": 1},
+    )
+    async for doc in cursor:
+        if not doc.get("recordId") or doc["recordId"] in done:
+            report["skipped"] += 1
+            continue
+        record_passages = passage_store.split(doc.get("title", ""), doc.get("content", ""))
+        if not record_passages:
+            report["skipped"] += 1
+            continue
+        report["records"] += 1
+        if len(record_passages) == 1:
+            vector = vector_codec.decode(doc.get("embedding"))
+            if not vector:
+                report["skipped"] += 1
+                continue
+            record_passages[0]["embedding"] = vector
+            report["dimensions"] = report["dimensions"] or len(vector)
+        pending.append((doc, record_passages))
+        if sum(len(p) for _, p in pending) >= batch_size:
+            await flush()
+    await flush()
+
+    if not dry_run:
+        await passages.create_index([("recordId", ASCENDING)], name="recordId")
+        await passages.create_index(
+            [("userId", ASCENDING), ("dateEpochDay", ASCENDING)], name="userId_dateEpochDay"
+        )
+    report["dry_run"] = dry_run
+    report["passage_vector_index"] = vector_codec.index_definition(
+        report["dimensions"] or 1536
+    )
+    await mongo_db.close()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill passage embeddings for long records")
+    parser.add_argument("--batch-size", type=int, default=64, help="embedding texts per request")
+    parser.add_argument("--user-id", default=None)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    report = asyncio.run(migrate(batch_size=args.batch_size, dry_run=args.dry_run, user_id=args.user_id))
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
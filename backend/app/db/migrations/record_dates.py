@@ -0,0 +1,87 @@
+"""
+기존 기록에 dateValue(Date) / dateEpochDay(int) 필드를 채우는 backfill 마이그레이션.
+
+사용법 (backend 디렉토리에서):
+    python -m app.db.migrations.record_dates --dry-run
+    python -m app.db.migrations.record_dates
+
+- dateEpochDay가 없는 문서만 batch 단위로 읽어 bulk_write로 갱신
+- date 문자열을 해석할 수 없으면 createdAt 날짜를 사용
+- 날짜 범위/감정 태그 필터용 {userId, dateEpochDay}, {userId, feel, dateEpochDay} 인덱스를 생성
+- 이후 Atlas vector_index/text_index 정의에도 dateEpochDay/feel 필드를 추가해야 함 (README 참고)
+"""
+
+import argparse
+import asyncio
+import json
+from typing import Any, Dict, List, Optional
+
+from pymongo import ASCENDING, UpdateOne
+
+from app.core.config import get_settings
+from app.core.dates import date_fields
+from app.db.mongo import mongo_db
+
+settings = get_settings()
+
+
+def backfill_update(doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """문서 하나에 대한 $set 내용. 날짜를 알 수 없으면 None."""
+    return date_fields(doc.get("date")) or date_fields(doc.get("createdAt")) or None
+
+
+async def migrate(batch_size: int = 500, dry_run: bool = False, user_id: Optional[str] = None) -> Dict[str, Any]:
+    await mongo_db.connect()
+    collection = mongo_db.db[settings.COLLECTION_NAME]
+
+    query: Dict[str, Any] = {"dateEpochDay": {"$exists": False}}
+    if user_id:
+        query["userId"] = user_id
+
+    report = {"scanned": 0, "updated": 0, "unparseable": 0}
+    ops: List[UpdateOne] = []
+
+    async def flush():
+        if ops and not dry_run:
+            await collection.bulk_write(ops, ordered=False)
+        ops.clear()
+
+    cursor = collection.find(query, {"_id": 1, "date": 1, "createdAt": 1}).batch_size(batch_size)
+    async for doc in cursor:
+        report["scanned"] += 1
+        update = backfill_update(doc)
+        if update is None:
+            report["unparseable"] += 1
+            continue
+        ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": update}))
+        report["updated"] += 1
+        if len(ops) >= batch_size:
+            await flush()
+    await flush()
+
+    if not dry_run:
+        await collection.create_index(
+            [("userId", ASCENDING), ("dateEpochDay", ASCENDING)], name="userId_dateEpochDay"
+        )
+        await collection.create_index(
+            [("userId", ASCENDING), ("feel", ASCENDING), ("dateEpochDay", ASCENDING)],
+            name="userId_feel_dateEpochDay",
+        )
+    report["dry_run"] = dry_run
+    await mongo_db.close()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill dateValue/dateEpochDay on stored records")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--user-id", default=None)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    report = asyncio.run(migrate(batch_size=args.batch_size, dry_run=args.dry_run, user_id=args.user_id))
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.core.chunking import split_passages
+from app.core.config import get_settings
+from app.db.mongo import mongo_db
+from app.db.vector_codec import vector_codec
+
+settings = get_settings()
+
+
+class PassageStore:
+    """
+    긴 기록의 passage 벡터 저장소 (PASSAGE_RETRIEVAL=true).
+
+    passages 컬렉션 문서:
+        {userId, recordId, start, end, embedding, dateEpochDay, feel, deletedAt}
+    - start/end는 부모 기록 content의 offset (본문은 복사하지 않음)
+    - dateEpochDay/feel은 부모 기록과 같은 값 -> passage_vector_index의 사전 필터에 사용
+    - 짧은 기록도 passage 하나로 저장되어 passage 검색 대상에 포함됨
+    """
+
+    @staticmethod
+    def _collection():
+        if mongo_db.db is None:
+            raise Exception("Database not connected")
+        return mongo_db.db[settings.PASSAGE_COLLECTION_NAME]
+
+    @staticmethod
+    def split(title: str, content: str) -> List[Dict[str, Any]]:
+        """
+        content를 passage로 나누고 각 passage의 임베딩 입력 텍스트를 만든다.
+        (제목을 앞에 붙여 passage만으로는 잃는 문맥을 보완)
+        """
+        spans = split_passages(
+            content or "", settings.PASSAGE_MAX_CHARS, settings.PASSAGE_OVERLAP_CHARS
+        )
+        return [
+            {"start": start, "end": end, "text": f"{title} {content[start:end].strip()}"}
+            for start, end in spans
+        ]
+
+    @staticmethod
+    async def replace(
+        user_id: str,
+        record_id: str,
+        passages: List[Dict[str, Any]],
+        fields: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        """
+        기록의 passage를 새 목록({start, end, embedding})으로 교체.
+        임베딩이 없는(0 벡터) passage는 저장하지 않음.
+        """
+        collection = PassageStore._collection()
+        await collection.delete_many({"recordId": record_id})
+        now = datetime.now()
+        documents = [
+            {
+                "userId": user_id,
+                "recordId": record_id,
+                "start": passage["start"],
+                "end": passage["end"],
+                "embedding": vector_codec.encode(passage["embedding"]),
+                "deletedAt": None,
+                "createdAt": now,
+                **(fields or {}),
+            }
+            for passage in passages
+            if passage.get("embedding") and any(passage["embedding"])
+        ]
+        if documents:
+            await collection.insert_many(documents, ordered=False)
+        return len(documents)
+
+    @staticmethod
+    async def set_fields(record_id: str, fields: Dict[str, Any]):
+        """부모 기록의 필터 필드(dateEpochDay, feel)가 바뀌면 passage에도 반영."""
+        if fields:
+            await PassageStore._collection().update_many({"recordId": record_id}, {"$set": fields})
+
+    @staticmethod
+    async def remove(record_id: str):
+        await PassageStore._collection().delete_many({"recordId": record_id})
+
+
+passage_store = PassageStore()
@@ -1,7 +1,15 @@
-from typing import List, Dict, Any
+from typing import Awaitable, List, Dict, Any, Optional, Union
 from datetime import datetime, timedelta
+import asyncio
+import inspect
 import math
+import time
+import numpy as np
+from app.core.dates import EPOCH_ORDINAL, epoch_day, today_epoch_day
+from app.db.lexical import get_lexical_engine
 from app.db.mongo import mongo_db
+from app.db.vector_codec import vector_codec
+from app.db.vector_store import get_vector_engine
 from app.core.config import get_settings
 
 settings = get_settings()
@@ -9,6 +17,20 @@ settings = get_settings()
 # RRF 상수: 순위 기반 융합에서 사용되는 smoothing 파라미터
 RRF_K = 60
 
+# 검색 결과로 돌려주는 필드
+VECTOR_RESULT_PROJECTION = {
+    "_id": 1,
+    "recordId": 1,
+    "content": 1,
+    "title": 1,
+    "date": 1,
+    "dateEpochDay": 1,
+    "createdAt": 1,
+}
+
+# Passage 검색: 기록 top_k를 얻기 위해 가져오는 passage 수 배수 (한 기록의 여러 passage가 걸릴 수 있음)
+PASSAGE_FANOUT = 3
+
 # Time Decay 상수
 TIME_DECAY_HALF_LIFE_DAYS = 30  # 30일이 지나면 가중치가 절반으로 감소
 
@@ -24,7 +46,7 @@ class VectorDB:
     """
 
     @staticmethod
-    async def insert_vector(record_id: str, vector: list):
+    async def insert_vector(record_id: str, vector: list, user_id: str = None):
         """
         In Atlas Vector Search, you typically store the vector directly in the document.
         So this method might just update the existing record with the vector field.
@@ -33,28 +55,290 @@ class VectorDB:
             raise Exception("Database not connected")
 
         collection = mongo_db.db[settings.COLLECTION_NAME]
+        # EMBEDDING_STORAGE 형식(array/float32/int8/bit)으로 변환하여 저장
         await collection.update_one(
-            {"recordId": record_id}, {"$set": {"embedding": vector}}
+            {"recordId": record_id},
+            {"$set": {"embedding": vector_codec.encode(vector)}},
+        )
+        if user_id:
+            VectorDB.index_record(user_id, record_id, vector)
+
+    @staticmethod
+    def index_record(user_id: str, record_id: str, vector: list = None):
+        """
+        프로세스 내 벡터 엔진(VECTOR_BACKEND != atlas)에 기록 벡터를 반영.
+        vector가 None이면 인덱스에서 제거.
+        """
+        engine = get_vector_engine()
+        if engine is None or not record_id:
+            return
+        try:
+            if vector is None:
+                engine.remove(user_id, record_id)
+            else:
+                engine.add(user_id, record_id, vector)
+        except Exception as e:
+            print(f"[VectorStore] Failed to index record {record_id}: {e}")
+
+    @staticmethod
+    def index_text(user_id: str, record_id: str, title: str, content: str):
+        """프로세스 내 텍스트 색인(TEXT_SEARCH_BACKEND=local)에 제목/내용을 반영."""
+        engine = get_lexical_engine()
+        if engine is None or not record_id:
+            return
+        try:
+            engine.add(user_id, record_id, title, content)
+        except Exception as e:
+            print(f"[Lexical] Failed to index record {record_id}: {e}")
+
+    @staticmethod
+    def remove_record(user_id: str, record_id: str):
+        VectorDB.index_record(user_id, record_id, None)
+        engine = get_lexical_engine()
+        if engine is not None and record_id:
+            try:
+                engine.remove(user_id, record_id)
+            except Exception as e:
+                print(f"[Lexical] Failed to remove record {record_id}: {e}")
+
+    @staticmethod
+    async def _bootstrap_local_index(collection, engine, user_id: str):
+        """사용자 인덱스가 아직 없으면 MongoDB에 저장된 임베딩으로 한 번 구축."""
+        if engine.has_user(user_id):
+            return
+        engine.init_user(user_id)
+        count = 0
+        cursor = collection.find(
+            {"userId": user_id, "deletedAt": None, "embedding": {"$ne": None}},
+            {"recordId": 1, "embedding": 1},
+        )
+        async for doc in cursor:
+            vector = vector_codec.decode(doc.get("embedding"))
+            if doc.get("recordId") and vector:
+                engine.add(user_id, doc["recordId"], vector)
+                count += 1
+        print(f"[VectorStore] Bootstrapped index for user {user_id} ({count} vectors)")
+
+    @staticmethod
+    def _date_range(date_from: Any = None, date_to: Any = None) -> Optional[Dict[str, int]]:
+        """dateFrom/dateTo(date 또는 YYYY-MM-DD) -> dateEpochDay 범위 조건. 둘 다 없으면 None."""
+        condition = {}
+        if epoch_day(date_from) is not None:
+            condition["$gte"] = epoch_day(date_from)
+        if epoch_day(date_to) is not None:
+            condition["$lte"] = epoch_day(date_to)
+        return condition or None
+
+    @staticmethod
+    def _slice_query(
+        user_id: str, date_range: Optional[Dict[str, int]] = None, feel: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """날짜 범위/감정 태그 필터에 해당하는 기록 slice의 MongoDB 조건."""
+        query: Dict[str, Any] = {"userId": user_id, "deletedAt": None}
+        if date_range:
+            query["dateEpochDay"] = date_range
+        if feel:
+            query["feel"] = {"$in": feel}
+        return query
+
+    @staticmethod
+    async def _filtered_record_ids(
+        collection,
+        user_id: str,
+        date_range: Optional[Dict[str, int]] = None,
+        feel: Optional[List[str]] = None,
+    ) -> Optional[set]:
+        """
+        프로세스 내 엔진의 사전 필터용 recordId 집합 ({userId, dateEpochDay} 인덱스 사용).
+        필터가 없으면 None (전체 검색).
+        """
+        if not date_range and not feel:
+            return None
+        cursor = collection.find(
+            VectorDB._slice_query(user_id, date_range, feel), {"_id": 0, "recordId": 1}
+        )
+        return {doc["recordId"] async for doc in cursor if doc.get("recordId")}
+
+    @staticmethod
+    async def _slice_size(
+        collection,
+        user_id: str,
+        top_k: int,
+        date_range: Optional[Dict[str, int]] = None,
+        feel: Optional[List[str]] = None,
+    ) -> Optional[int]:
+        """필터된 slice의 기록 수 (numCandidates 상한까지만 셈). 필터가 없으면 None."""
+        if not date_range and not feel:
+            return None
+        return await collection.count_documents(
+            VectorDB._slice_query(user_id, date_range, feel),
+            limit=top_k * settings.RETRIEVAL_NUM_CANDIDATES_FACTOR,
         )
 
+    @staticmethod
+    def _num_candidates(top_k: int, slice_size: Optional[int] = None) -> int:
+        """
+        ANN 후보 수 (top_k * RETRIEVAL_NUM_CANDIDATES_FACTOR). 사전 필터로 slice가 그보다 작으면
+        slice 전체가 후보이므로 그 크기까지만 탐색 ($vectorSearch는 numCandidates >= limit 필요).
+        """
+        num_candidates = top_k * settings.RETRIEVAL_NUM_CANDIDATES_FACTOR
+        if slice_size is not None:
+            num_candidates = min(num_candidates, slice_size)
+        return max(num_candidates, top_k)
+
+    @staticmethod
+    async def _local_vector_search(
+        collection,
+        engine,
+        query_vector: list,
+        user_id: str,
+        top_k: int,
+        date_range: Optional[Dict[str, int]] = None,
+        feel: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        프로세스 내 엔진으로 top-k recordId를 찾고, MongoDB에서 필요한 필드만 가져와
+        $vectorSearch 결과와 같은 형태(score 포함)로 반환.
+        """
+        await VectorDB._bootstrap_local_index(collection, engine, user_id)
+        record_ids = await VectorDB._filtered_record_ids(collection, user_id, date_range, feel)
+        hits = engine.search(user_id, query_vector, top_k, record_ids)
+        return await VectorDB._hydrate(collection, user_id, hits)
+
+    @staticmethod
+    async def get_embeddings(user_id: str, record_ids: List[str]) -> Dict[str, List[float]]:
+        """
+        기록들의 저장된 임베딩을 {recordId: float 리스트}로 반환.
+        (검색 결과 projection에는 임베딩이 없으므로 텍스트 검색으로만 찾은 후보의 cosine 계산용)
+        """
+        if not record_ids or mongo_db.db is None:
+            return {}
+        collection = mongo_db.db[settings.COLLECTION_NAME]
+        cursor = collection.find(
+            {"recordId": {"$in": list(record_ids)}, "userId": user_id, "deletedAt": None},
+            {"_id": 0, "recordId": 1, "embedding": 1},
+        )
+        embeddings = {}
+        async for doc in cursor:
+            vector = vector_codec.decode(doc.get("embedding"))
+            if vector:
+                embeddings[doc["recordId"]] = vector
+        return embeddings
+
+    @staticmethod
+    async def _hydrate(collection, user_id: str, hits: List[tuple]) -> List[Dict[str, Any]]:
+        """(recordId, score) 목록을 MongoDB 문서(VECTOR_RESULT_PROJECTION + score)로 변환."""
+        if not hits:
+            return []
+
+        scores = dict(hits)
+        cursor = collection.find(
+            {"recordId": {"$in": list(scores)}, "userId": user_id, "deletedAt": None},
+            VECTOR_RESULT_PROJECTION,
+        )
+        docs = {doc["recordId"]: doc async for doc in cursor}
+
+        results = []
+        for record_id, score in hits:
+            doc = docs.get(record_id)
+            if doc is not None:
+                doc["score"] = score
+                results.append(doc)
+        return results
+
+    @staticmethod
+    def _vector_search_stage(
+        query_vector: list,
+        user_id: str,
+        top_k: int,
+        date_range: Optional[Dict[str, int]] = None,
+        feel: Optional[List[str]] = None,
+        num_candidates: Optional[int] = None,
+        index: str = "vector_index",
+    ) -> Dict[str, Any]:
+        # vector_index의 filter 필드 (userId, dateEpochDay, feel) -> ANN 탐색 전에 적용
+        search_filter: Dict[str, Any] = {"userId": {"$eq": user_id}}
+        if date_range:
+            search_filter["dateEpochDay"] = date_range
+        if feel:
+            search_filter["feel"] = {"$in": feel}
+        return {
+            "$vectorSearch": {
+                "index": index,
+                "path": "embedding",
+                "filter": search_filter,
+                "queryVector": vector_codec.encode_query(query_vector),
+                "numCandidates": num_candidates or VectorDB._num_candidates(top_k),
+                "limit": top_k,
+            }
+        }
+
+    @staticmethod
+    def _text_search_stage(
+        query_text: str,
+        user_id: str,
+        date_range: Optional[Dict[str, int]] = None,
+        feel: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        search_filter: List[Dict[str, Any]] = [{"equals": {"path": "userId", "value": user_id}}]
+        if date_range:
+            search_filter.append(
+                {"range": {"path": "dateEpochDay", **{op[1:]: v for op, v in date_range.items()}}}
+            )
+        if feel:
+            search_filter.append({"in": {"path": "feel", "value": feel}})
+        return {
+            "$search": {
+                "index": "text_index",
+                "compound": {
+                    "must": [
+                        {
+                            "text": {
+                                "query": query_text,
+                                "path": ["title", "content"],
+                                "fuzzy": {"maxEdits": 1},
+                            }
+                        }
+                    ],
+                    "filter": search_filter,
+                },
+            }
+        }
+
     @staticmethod
     async def _vector_search(
-        collection, query_vector: list, user_id: str, top_k: int
+        collection,
+        query_vector: list,
+        user_id: str,
+        top_k: int,
+        date_range: Optional[Dict[str, int]] = None,
+        feel: Optional[List[str]] = None,
     ) -> List[Dict[str, Any]]:
         """
         벡터 유사도 기반 검색 (Semantic Search)
         """
+        engine = get_vector_engine()
+        if engine is not None:
+            return await VectorDB._local_vector_search(
+                collection, engine, query_vector, user_id, top_k, date_range, feel
+            )
+        if settings.PASSAGE_RETRIEVAL:
+            return await VectorDB._passage_vector_search(
+                collection, query_vector, user_id, top_k, date_range, feel
+            )
+
+        slice_size = await VectorDB._slice_size(collection, user_id, top_k, date_range, feel)
+        if slice_size == 0:
+            return []  # 필터에 해당하는 기록이 없으면 $vectorSearch 생략
         pipeline = [
-            {
-                "$vectorSearch": {
-                    "index": "vector_index",
-                    "path": "embedding",
-                    "filter": {"userId": {"$eq": user_id}},
-                    "queryVector": query_vector,
-                    "numCandidates": top_k * 10,
-                    "limit": top_k,
-                }
-            },
+            VectorDB._vector_search_stage(
+                query_vector,
+                user_id,
+                top_k,
+                date_range,
+                feel,
+                num_candidates=VectorDB._num_candidates(top_k, slice_size),
+            ),
             {
                 "$project": {
                     "_id": 1,
@@ -62,6 +346,7 @@ class VectorDB:
                     "content": 1,
                     "title": 1,
                     "date": 1,
+                    "dateEpochDay": 1,
                     "createdAt": 1,
                     "score": {"$meta": "vectorSearchScore"},
                 }
@@ -70,30 +355,116 @@ class VectorDB:
         return await collection.aggregate(pipeline).to_list(length=top_k)
 
     @staticmethod
-    async def _text_search(
-        collection, query_text: str, user_id: str, top_k: int
+    def _aggregate_passages(
+        hits: List[Dict[str, Any]], mode: str = "max"
+    ) -> List[tuple]:
+        """
+        passage 검색 결과를 기록 단위로 합침.
+
+        Returns:
+            [(recordId, 기록 점수, [(start, end), ...] 점수 내림차순)] 기록 점수 내림차순
+            기록 점수 = passage 점수의 최댓값(max) 또는 합(sum)
+        """
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for hit in hits:
+            if hit.get("recordId"):
+                grouped.setdefault(hit["recordId"], []).append(hit)
+
+        records = []
+        for record_id, passages in grouped.items():
+            passages.sort(key=lambda p: p.get("score", 0.0), reverse=True)
+            scores = [p.get("score", 0.0) for p in passages]
+            score = sum(scores) if mode == "sum" else scores[0]
+            records.append((record_id, score, [(p["start"], p["end"]) for p in passages]))
+        records.sort(key=lambda r: r[1], reverse=True)  # stable -> 동점이면 먼저 걸린 기록
+        return records
+
+    @staticmethod
+    async def _passage_vector_search(
+        collection,
+        query_vector: list,
+        user_id: str,
+        top_k: int,
+        date_range: Optional[Dict[str, int]] = None,
+        feel: Optional[List[str]] = None,
     ) -> List[Dict[str, Any]]:
         """
-        키워드 기반 텍스트 검색 (BM25-like via Atlas Search)
+        passage 단위 벡터 검색 (PASSAGE_RETRIEVAL=true, passage_vector_index).
+        passage 점수를 기록 단위로 합치고, 기록 문서에 가장 관련 있는 passage offset(passages)을 붙여 반환.
         """
+        passages = mongo_db.db[settings.PASSAGE_COLLECTION_NAME]
+        limit = top_k * PASSAGE_FANOUT
+        slice_size = await VectorDB._slice_size(passages, user_id, limit, date_range, feel)
+        if slice_size == 0:
+            return []
         pipeline = [
+            VectorDB._vector_search_stage(
+                query_vector,
+                user_id,
+                limit,
+                date_range,
+                feel,
+                num_candidates=VectorDB._num_candidates(limit, slice_size),
+                index="passage_vector_index",
+            ),
             {
-                "$search": {
-                    "index": "text_index",
-                    "compound": {
-                        "must": [
-                            {
-                                "text": {
-                                    "query": query_text,
-                                    "path": ["title", "content"],
-                                    "fuzzy": {"maxEdits": 1},
-                                }
-                            }
-                        ],
-                        "filter": [{"equals": {"path": "userId", "value": user_id}}],
-                    },
+                "$project": {
+                    "_id": 0,
+                    "recordId": 1,
+                    "start": 1,
+                    "end": 1,
+                    "score": {"$meta": "vectorSearchScore"},
                 }
             },
+        ]
+        hits = await passages.aggregate(pipeline).to_list(length=limit)
+        records = VectorDB._aggregate_passages(hits, settings.PASSAGE_AGGREGATION)[:top_k]
+        spans = {record_id: record_spans for record_id, _, record_spans in records}
+        results = await VectorDB._hydrate(
+            collection, user_id, [(record_id, score) for record_id, score, _ in records]
+        )
+        for doc in results:
+            doc["passages"] = spans[doc["recordId"]]
+        return results
+
+    @staticmethod
+    async def _bootstrap_lexical_index(collection, engine, user_id: str):
+        """사용자 텍스트 색인이 아직 없으면 MongoDB에 저장된 기록으로 한 번 구축."""
+        if engine.has_user(user_id):
+            return
+        engine.init_user(user_id)
+        count = 0
+        cursor = collection.find(
+            {"userId": user_id, "deletedAt": None},
+            {"recordId": 1, "title": 1, "content": 1},
+        )
+        async for doc in cursor:
+            if doc.get("recordId"):
+                engine.add(user_id, doc["recordId"], doc.get("title", ""), doc.get("content", ""))
+                count += 1
+        print(f"[Lexical] Bootstrapped index for user {user_id} ({count} records)")
+
+    @staticmethod
+    async def _text_search(
+        collection,
+        query_text: str,
+        user_id: str,
+        top_k: int,
+        date_range: Optional[Dict[str, int]] = None,
+        feel: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        키워드 기반 텍스트 검색 (BM25-like via Atlas Search, 또는 프로세스 내 BM25 색인)
+        """
+        engine = get_lexical_engine()
+        if engine is not None:
+            await VectorDB._bootstrap_lexical_index(collection, engine, user_id)
+            record_ids = await VectorDB._filtered_record_ids(collection, user_id, date_range, feel)
+            hits = engine.search(user_id, query_text, top_k, record_ids)
+            return await VectorDB._hydrate(collection, user_id, hits)
+
+        pipeline = [
+            VectorDB._text_search_stage(query_text, user_id, date_range, feel),
             {
                 "$project": {
                     "_id": 1,
@@ -101,6 +472,7 @@ class VectorDB:
                     "content": 1,
                     "title": 1,
                     "date": 1,
+                    "dateEpochDay": 1,
                     "createdAt": 1,
                     "score": {"$meta": "searchScore"},
                 }
@@ -207,6 +579,30 @@ class VectorDB:
             print(f"[Time Decay] Error calculating decay: {e}")
             return 0.5
 
+    @staticmethod
+    def _time_decays(
+        documents: List[Dict[str, Any]], half_life_days: int = TIME_DECAY_HALF_LIFE_DAYS
+    ) -> List[float]:
+        """
+        문서별 시간 감쇠 가중치.
+        dateEpochDay가 있는 문서는 문자열 파싱 없이 배열 연산 한 번으로 계산하고,
+        아직 backfill되지 않은 문서만 _calculate_time_decay로 계산.
+        """
+        epoch_days = [doc.get("dateEpochDay") for doc in documents]
+        known = [i for i, d in enumerate(epoch_days) if type(d) is int]
+        decays: List[float] = [0.5] * len(documents)
+        if known:
+            days = np.fromiter((epoch_days[i] for i in known), dtype=np.int64, count=len(known))
+            days_ago = np.maximum(0, today_epoch_day() - days)
+            values = np.maximum(0.1, np.power(2.0, -days_ago / half_life_days))
+            for i, value in zip(known, values.tolist()):
+                decays[i] = value
+        known_set = set(known)
+        for i, doc in enumerate(documents):
+            if i not in known_set:
+                decays[i] = VectorDB._calculate_time_decay(doc.get("date") or doc.get("createdAt"))
+        return decays
+
     @staticmethod
     def _apply_time_decay(
         documents: List[Dict[str, Any]],
@@ -227,10 +623,8 @@ class VectorDB:
         if not documents:
             return []
 
-        for doc in documents:
+        for doc, time_decay in zip(documents, VectorDB._time_decays(documents)):
             original_score = doc.get("score", 0.0)
-            doc_date = doc.get("date") or doc.get("createdAt")
-            time_decay = VectorDB._calculate_time_decay(doc_date)
 
             # 최종 점수 계산: 원래 점수와 시간 가중치의 가중 평균
             final_score = (1 - time_weight) * original_score + time_weight * time_decay
@@ -244,9 +638,232 @@ class VectorDB:
 
         return documents
 
+    # --- Server-side scoring (SEARCH_PUSHDOWN) ---
     @staticmethod
-    async def search(
+    def _time_decay_expression(
+        now: datetime, half_life_days: int = TIME_DECAY_HALF_LIFE_DAYS
+    ) -> Dict[str, Any]:
+        """
+        _calculate_time_decay와 같은 계산을 하는 aggregation 식.
+        date(문자열) -> 없으면 createdAt, 파싱 실패/날짜 없음은 0.5, 최소 0.1.
+        """
+        raw = {"$cond": [{"$eq": [{"$ifNull": ["$date", ""]}, ""]}, "$createdAt", "$date"]}
+        parsed = {
+            "$switch": {
+                "branches": [
+                    {"case": {"$eq": [{"$type": "$$raw"}, "date"]}, "then": "$$raw"},
+                    {
+                        "case": {"$eq": [{"$type": "$$raw"}, "string"]},
+                        "then": {
+                            "$dateFromString": {
+                                "dateString": "$$raw",
+                                # ISO 형식이 아니면 앞 10자리(YYYY-MM-DD)로 다시 시도
+                                "onError": {
+                                    "$dateFromString": {
+                                        "dateString": {"$substrCP": ["$$raw", 0, 10]},
+                                        "format": "%Y-%m-%d",
+                                        "onError": None,
+                                    }
+                                },
+                            }
+                        },
+                    },
+                ],
+                "default": None,
+            }
+        }
+        def decay(days_ago: Dict[str, Any]) -> Dict[str, Any]:
+            return {
+                "$max": [
+                    0.1,
+                    {"$pow": [2, {"$divide": [{"$multiply": [-1, {"$max": [0, days_ago]}]}, half_life_days]}]},
+                ]
+            }
+
+        today = now.date().toordinal() - EPOCH_ORDINAL
+        # dateEpochDay가 있으면 정수 연산만, 없으면(backfill 전) 문자열/createdAt 파싱
+        from_epoch_day = decay({"$subtract": [today, "$dateEpochDay"]})
+        from_date = {
+            "$let": {
+                "vars": {"raw": raw},
+                "in": {
+                    "$let": {
+                        "vars": {"d": parsed},
+                        "in": {
+                            "$cond": [
+                                {"$eq": ["$$d", None]},
+                                0.5,
+                                decay(
+                                    {"$floor": {"$divide": [{"$subtract": [now, "$$d"]}, 86400000]}}
+                                ),
+                            ]
+                        },
+                    }
+                },
+            }
+        }
+        return {"$cond": [{"$isNumber": "$dateEpochDay"}, from_epoch_day, from_date]}
+
+    @staticmethod
+    def _fused_pipeline(
+        collection_name: str,
         query_vector: list,
+        query_text: str,
+        user_id: str,
+        top_k: int,
+        vector_weight: float = 0.5,
+        text_weight: float = 0.5,
+        use_time_decay: bool = True,
+        time_decay_weight: float = 0.3,
+        now: Optional[datetime] = None,
+        date_range: Optional[Dict[str, int]] = None,
+        feel: Optional[List[str]] = None,
+        num_candidates: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        벡터 검색 + 텍스트 검색 + RRF + Time Decay를 한 번의 aggregation으로 수행하는 pipeline.
+
+        search()의 Python 경로와 같은 순위를 만든다:
+        - 각 branch에서 top_k * 2개, 순위는 점수 내림차순 $documentNumber
+        - RRF 동점은 Python dict 삽입 순서와 같게 (벡터 순위, 그다음 텍스트 순위)
+        - 본문(title/content)은 최종 top_k 문서에 대해서만 $lookup
+        """
+        n = top_k * 2
+        scored_fields = {"_id": 1, "recordId": 1, "date": 1, "dateEpochDay": 1, "createdAt": 1}
+
+        def ranked(score_field: str, weight: float, seen_offset: int) -> List[Dict[str, Any]]:
+            return [
+                {"$setWindowFields": {"sortBy": {score_field: -1}, "output": {"_rank": {"$documentNumber": {}}}}},
+                {
+                    "$addFields": {
+                        "_rrf_part": {"$multiply": [weight, {"$divide": [1, {"$add": [RRF_K, "$_rank"]}]}]},
+                        "_seen": {"$add": ["$_rank", seen_offset]},
+                    }
+                },
+            ]
+
+        text_leg = [
+            VectorDB._text_search_stage(query_text, user_id, date_range, feel),
+            {"$limit": n},
+            {"$project": {**scored_fields, "_text_score": {"$meta": "searchScore"}}},
+            *ranked("_text_score", text_weight, n),
+        ]
+        pipeline: List[Dict[str, Any]] = [
+            VectorDB._vector_search_stage(query_vector, user_id, n, date_range, feel, num_candidates),
+            {"$project": {**scored_fields, "_vector_score": {"$meta": "vectorSearchScore"}}},
+            *ranked("_vector_score", vector_weight, 0),
+            {"$unionWith": {"coll": collection_name, "pipeline": text_leg}},
+            {
+                "$group": {
+                    "_id": "$_id",
+                    "recordId": {"$first": "$recordId"},
+                    "date": {"$first": "$date"},
+                    "dateEpochDay": {"$first": "$dateEpochDay"},
+                    "createdAt": {"$first": "$createdAt"},
+                    "_vector_score": {"$max": "$_vector_score"},
+                    "_text_score": {"$max": "$_text_score"},
+                    "_rrf_score": {"$sum": "$_rrf_part"},
+                    "_seen": {"$min": "$_seen"},
+                }
+            },
+            {"$sort": {"_rrf_score": -1, "_seen": 1}},
+            {"$limit": top_k},
+        ]
+
+        if use_time_decay:
+            pipeline += [
+                {"$addFields": {"_time_decay": VectorDB._time_decay_expression(now or datetime.now())}},
+                {
+                    "$addFields": {
+                        "_original_score": "$_rrf_score",
+                        "score": {
+                            "$add": [
+                                {"$multiply": [1 - time_decay_weight, "$_rrf_score"]},
+                                {"$multiply": [time_decay_weight, "$_time_decay"]},
+                            ]
+                        },
+                    }
+                },
+                # Python sort는 stable -> 동점이면 RRF 순서 유지
+                {"$sort": {"score": -1, "_rrf_score": -1, "_seen": 1}},
+            ]
+        else:
+            pipeline.append({"$addFields": {"score": "$_rrf_score"}})
+
+        pipeline += [
+            {
+                "$lookup": {
+                    "from": collection_name,
+                    "localField": "_id",
+                    "foreignField": "_id",
+                    "pipeline": [{"$project": {"_id": 0, "title": 1, "content": 1}}],
+                    "as": "_doc",
+                }
+            },
+            {"$replaceWith": {"$mergeObjects": [{"$arrayElemAt": ["$_doc", 0]}, "$$ROOT"]}},
+            {"$project": {"_doc": 0, "_seen": 0}},
+        ]
+        return pipeline
+
+    @staticmethod
+    async def _pushdown_search(
+        collection, query_vector: list, query_text: str, user_id: str, top_k: int, **kwargs
+    ) -> List[Dict[str, Any]]:
+        pipeline = VectorDB._fused_pipeline(
+            settings.COLLECTION_NAME, query_vector, query_text, user_id, top_k, **kwargs
+        )
+        return await collection.aggregate(pipeline).to_list(length=top_k)
+
+    @staticmethod
+    async def _timed(name: str, coro: Awaitable, timeout: float, timings: Dict[str, float]):
+        """branch 하나를 자체 timeout으로 실행하고 소요 시간(ms)을 timings에 기록."""
+        start = time.perf_counter()
+        try:
+            return await asyncio.wait_for(coro, timeout=timeout if timeout > 0 else None)
+        finally:
+            timings[f"{name}_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+    @staticmethod
+    async def _vector_branch(
+        collection,
+        query_vector,
+        user_id: str,
+        top_k: int,
+        timings: Dict[str, float],
+        date_range: Optional[Dict[str, int]] = None,
+        feel: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        # 임베딩이 아직 계산 중이면(awaitable) 여기서 기다림 -> 텍스트 검색과 겹쳐서 진행
+        if inspect.isawaitable(query_vector):
+            start = time.perf_counter()
+            query_vector = await query_vector
+            timings["embedding_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        results = await VectorDB._vector_search(
+            collection, query_vector, user_id, top_k, date_range=date_range, feel=feel
+        )
+        for doc in results:
+            doc["_vector_score"] = doc.get("score")  # Reranking 특성으로 사용
+        return results
+
+    @staticmethod
+    async def _text_branch(
+        collection,
+        query_text: str,
+        user_id: str,
+        top_k: int,
+        date_range: Optional[Dict[str, int]] = None,
+        feel: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        results = await VectorDB._text_search(
+            collection, query_text, user_id, top_k, date_range=date_range, feel=feel
+        )
+        for doc in results:
+            doc["_text_score"] = doc.get("score")
+        return results
+
+    @staticmethod
+    async def search(
+        query_vector: Union[List[float], Awaitable[List[float]]],
         user_id: str,
         top_k: int = 5,
         query_text: str = None,
@@ -255,12 +872,20 @@ class VectorDB:
         text_weight: float = 0.5,
         use_time_decay: bool = True,
         time_decay_weight: float = 0.3,
+        timings: Optional[Dict[str, float]] = None,
+        date_from: Any = None,
+        date_to: Any = None,
+        feel: Optional[List[str]] = None,
     ) -> List[Dict[str, Any]]:
         """
         하이브리드 검색: 벡터 검색과 텍스트 검색을 결합하고 시간 가중치 적용.
 
+        벡터/텍스트 검색은 동시에 실행(fan-out)되고, 각 branch는 자체 timeout을 가짐.
+        한쪽이 실패하거나 timeout이면 나머지 한쪽 결과만으로 응답 (둘 다 실패하면 예외).
+
         Args:
-            query_vector: 쿼리 임베딩 벡터
+            query_vector: 쿼리 임베딩 벡터, 또는 임베딩을 돌려줄 awaitable(Task)
+                          (awaitable이면 임베딩 계산 중에 텍스트 검색이 먼저 시작됨)
             user_id: 사용자 ID
             top_k: 반환할 결과 수
             query_text: 텍스트 검색용 쿼리 (하이브리드 검색 시 필요)
@@ -269,6 +894,12 @@ class VectorDB:
             text_weight: 텍스트 검색 가중치 (기본 0.5)
             use_time_decay: 시간 감쇠 적용 여부 (기본 True)
             time_decay_weight: 시간 가중치의 영향력 (0.0~1.0, 기본 0.3)
+            timings: 전달하면 branch별 소요 시간(ms)을 채움
+                     (embedding_ms, vector_ms, text_ms, total_ms)
+            date_from, date_to: 기록 날짜 범위 (포함, date 또는 YYYY-MM-DD).
+                     dateEpochDay로 변환되어 두 검색의 filter 단계에서 적용됨
+            feel: 감정 태그 중 하나 이상을 가진 기록만 검색 (두 검색의 filter 단계에서 적용).
+                     필터가 있으면 slice 크기에 맞춰 numCandidates를 줄임
 
         Returns:
             검색 결과 리스트 (최종 점수로 정렬됨)
@@ -277,32 +908,117 @@ class VectorDB:
             raise Exception("Database not connected")
 
         collection = mongo_db.db[settings.COLLECTION_NAME]
+        timings = {} if timings is None else timings
+        start = time.perf_counter()
+        date_range = VectorDB._date_range(date_from, date_to)
+        feel = [tag for tag in feel or [] if tag] or None
+        embedding_wait = 0.0
+
+        if (
+            settings.SEARCH_PUSHDOWN
+            and use_hybrid
+            and query_text
+            and get_vector_engine() is None
+            and get_lexical_engine() is None
+            and not settings.PASSAGE_RETRIEVAL
+        ):
+            # 한 번의 aggregation으로 검색+RRF+Time Decay (임베딩이 먼저 필요하므로 fan-out 대신 순차)
+            # 실패하면 (예: $unionWith 안의 $search 미지원) 아래 fan-out 경로로 다시 검색
+            # 임베딩 대기도 벡터 branch 예산(RETRIEVAL_VECTOR_TIMEOUT) 안에서만 -> 넘으면 fan-out으로
+            if inspect.isawaitable(query_vector):
+                query_vector = asyncio.ensure_future(query_vector)  # 실패 시 재사용할 수 있도록 Task로
+                embed_start = time.perf_counter()
+                try:
+                    resolved = await asyncio.wait_for(
+                        asyncio.shield(query_vector),
+                        timeout=settings.RETRIEVAL_VECTOR_TIMEOUT if settings.RETRIEVAL_VECTOR_TIMEOUT > 0 else None,
+                    )
+                except asyncio.TimeoutError:
+                    print("[Hybrid Search] Embedding timed out before pushdown, falling back to fan-out")
+                    resolved = None
+                except Exception:
+                    resolved = None
+                embedding_wait = time.perf_counter() - embed_start
+                timings["embedding_ms"] = round(embedding_wait * 1000, 1)
+            else:
+                resolved = query_vector
+            if resolved is not None:
+                try:
+                    slice_size = await VectorDB._slice_size(
+                        collection, user_id, top_k * 2, date_range, feel
+                    )
+                    results = await VectorDB._timed(
+                        "pushdown",
+                        VectorDB._pushdown_search(
+                            collection,
+                            resolved,
+                            query_text,
+                            user_id,
+                            top_k,
+                            vector_weight=vector_weight,
+                            text_weight=text_weight,
+                            use_time_decay=use_time_decay,
+                            time_decay_weight=time_decay_weight,
+                            date_range=date_range,
+                            feel=feel,
+                            num_candidates=VectorDB._num_candidates(top_k * 2, slice_size),
+                        ),
+                        settings.RETRIEVAL_VECTOR_TIMEOUT,
+                        timings,
+                    )
+                    timings["total_ms"] = round((time.perf_counter() - start) * 1000, 1)
+                    print(f"[Hybrid Search] Pushdown: {len(results)} results, timings: {timings}")
+                    return results
+                except Exception as e:
+                    print(f"[Hybrid Search] Pushdown failed ({e!r}), falling back to fan-out")
 
-        # 벡터 검색 실행
-        vector_results = await VectorDB._vector_search(
-            collection, query_vector, user_id, top_k * 2  # 융합을 위해 더 많이 가져옴
+        # 벡터 branch (임베딩 대기 포함) - 융합을 위해 더 많이 가져옴
+        # pushdown에서 이미 임베딩을 기다렸다면 남은 예산만 사용 (0은 timeout 없음이므로 최소 1ms)
+        vector_timeout = settings.RETRIEVAL_VECTOR_TIMEOUT
+        if vector_timeout > 0 and embedding_wait:
+            vector_timeout = max(vector_timeout - embedding_wait, 0.001)
+        vector_branch = VectorDB._timed(
+            "vector",
+            VectorDB._vector_branch(
+                collection, query_vector, user_id, top_k * 2, timings, date_range, feel
+            ),
+            vector_timeout,
+            timings,
         )
 
         # 하이브리드 검색이 비활성화되었거나 텍스트 쿼리가 없으면 벡터 검색만 반환
         if not use_hybrid or not query_text:
+            vector_results = await vector_branch
             print(f"[Hybrid Search] Vector-only mode, found {len(vector_results)} results")
             results = vector_results[:top_k]
         else:
-            # 텍스트 검색 실행
-            try:
-                text_results = await VectorDB._text_search(
-                    collection, query_text, user_id, top_k * 2
-                )
+            # 텍스트 branch는 임베딩을 기다리지 않고 바로 시작
+            text_branch = VectorDB._timed(
+                "text",
+                VectorDB._text_branch(
+                    collection, query_text, user_id, top_k * 2, date_range, feel
+                ),
+                settings.RETRIEVAL_TEXT_TIMEOUT,
+                timings,
+            )
+            vector_results, text_results = await asyncio.gather(
+                vector_branch, text_branch, return_exceptions=True
+            )
+
+            if isinstance(vector_results, BaseException) and isinstance(text_results, BaseException):
+                raise vector_results
+            if isinstance(vector_results, BaseException):
+                # 임베딩/벡터 검색이 느리거나 실패하면 텍스트 결과만 사용
+                print(f"[Hybrid Search] Vector search failed ({vector_results!r}), falling back to text-only")
+                results = text_results[:top_k]
+            elif isinstance(text_results, BaseException):
+                # 텍스트 인덱스가 없거나 느리면 벡터 검색만 사용
+                print(f"[Hybrid Search] Text search failed ({text_results!r}), falling back to vector-only")
+                results = vector_results[:top_k]
+            else:
                 print(
                     f"[Hybrid Search] Vector: {len(vector_results)}, Text: {len(text_results)} results"
                 )
-            except Exception as e:
-                # 텍스트 인덱스가 없으면 벡터 검색만 사용
-                print(f"[Hybrid Search] Text search failed ({e}), falling back to vector-only")
-                results = vector_results[:top_k]
-                text_results = None
-
-            if text_results is not None:
                 # RRF로 결과 융합
                 fused_results = VectorDB._reciprocal_rank_fusion(
                     vector_results, text_results, vector_weight, text_weight
@@ -315,6 +1031,8 @@ class VectorDB:
             results = VectorDB._apply_time_decay(results, time_decay_weight)
             print(f"[Time Decay] Applied with weight {time_decay_weight}")
 
+        timings["total_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        print(f"[Hybrid Search] Timings: {timings}")
         return results
 
 
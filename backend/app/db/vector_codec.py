@@ -0,0 +1,114 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from bson.binary import Binary, BinaryVectorDtype
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# EMBEDDING_STORAGE 값
+STORAGE_MODES = ("array", "float32", "int8", "bit")
+
+
+class VectorCodec:
+    """
+    임베딩을 MongoDB에 저장하는 형식 변환.
+
+    - array:   기존 방식 (BSON double 배열, 차원당 약 9~10 bytes)
+    - float32: BSON binary vector float32 (차원당 4 bytes, 손실 없음)
+    - int8:    벡터별 max-abs 스케일로 int8 스칼라 양자화 (차원당 1 byte)
+               cosine 유사도는 스케일에 무관하므로 스케일 값은 저장하지 않음
+    - bit:     부호만 남긴 1-bit packed 벡터 (8차원당 1 byte, Atlas에서는 euclidean=hamming)
+    """
+
+    @staticmethod
+    def mode(mode: Optional[str] = None) -> str:
+        mode = mode or settings.EMBEDDING_STORAGE
+        if mode not in STORAGE_MODES:
+            raise ValueError(f"Unknown embedding storage mode: {mode}")
+        return mode
+
+    @classmethod
+    def encode(cls, vector: Optional[Sequence[float]], mode: Optional[str] = None) -> Any:
+        """저장용 값으로 변환. 빈 벡터/0 벡터는 None (검색 대상에서 제외)."""
+        if vector is None or len(vector) == 0:
+            return None
+        array = np.asarray(vector, dtype=np.float32)
+        if not np.any(array):
+            return None
+
+        mode = cls.mode(mode)
+        if mode == "array":
+            return [float(x) for x in vector]
+        if mode == "float32":
+            return Binary.from_vector(array.tolist(), BinaryVectorDtype.FLOAT32)
+        if mode == "int8":
+            return Binary.from_vector(cls.quantize_int8(array).tolist(), BinaryVectorDtype.INT8)
+        packed = np.packbits(array > 0)
+        padding = (-len(array)) % 8
+        return Binary.from_vector(packed.tolist(), BinaryVectorDtype.PACKED_BIT, padding)
+
+    @classmethod
+    def encode_query(cls, vector: Sequence[float], mode: Optional[str] = None) -> Any:
+        """$vectorSearch queryVector는 저장 형식과 같은 타입으로 전달."""
+        mode = cls.mode(mode)
+        if mode == "array":
+            return list(vector)
+        return cls.encode(vector, mode)
+
+    @staticmethod
+    def quantize_int8(array: np.ndarray) -> np.ndarray:
+        scale = float(np.max(np.abs(array)))
+        if scale == 0:
+            return np.zeros(len(array), dtype=np.int8)
+        return np.clip(np.round(array / scale * 127), -127, 127).astype(np.int8)
+
+    @staticmethod
+    def decode(value: Any) -> Optional[List[float]]:
+        """
+        저장된 값을 float 리스트로 복원 (int8은 스케일 제외, bit는 ±1).
+        cosine 유사도 계산에는 그대로 사용할 수 있다.
+        """
+        if value is None:
+            return None
+        if isinstance(value, Binary) and value.subtype == 9:
+            vec = value.as_vector()
+            if vec.dtype == BinaryVectorDtype.PACKED_BIT:
+                bits = np.unpackbits(np.asarray(vec.data, dtype=np.uint8))
+                if vec.padding:
+                    bits = bits[: len(bits) - vec.padding]
+                return (bits.astype(np.float32) * 2 - 1).tolist()
+            return [float(x) for x in vec.data]
+        return [float(x) for x in value]
+
+    @staticmethod
+    def storage_bytes(value: Any) -> int:
+        """저장 값의 대략적인 BSON 크기 (마이그레이션 리포트용)."""
+        if value is None:
+            return 0
+        if isinstance(value, (bytes, Binary)):
+            return len(value) + 5
+        # BSON 배열: 원소마다 type(1) + index 키 문자열 + NUL + double(8)
+        return 5 + sum(1 + len(str(i)) + 1 + 8 for i in range(len(value)))
+
+    @classmethod
+    def index_definition(cls, num_dimensions: int, mode: Optional[str] = None) -> Dict[str, Any]:
+        """저장 형식에 맞는 Atlas Vector Search 인덱스(vector_index) 정의."""
+        mode = cls.mode(mode)
+        return {
+            "fields": [
+                {
+                    "type": "vector",
+                    "path": "embedding",
+                    "numDimensions": num_dimensions,
+                    "similarity": "euclidean" if mode == "bit" else "cosine",
+                },
+                {"type": "filter", "path": "userId"},
+                {"type": "filter", "path": "dateEpochDay"},
+                {"type": "filter", "path": "feel"},
+            ]
+        }
+
+
+vector_codec = VectorCodec()
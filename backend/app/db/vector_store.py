@@ -0,0 +1,290 @@
+import hashlib
+import json
+import os
+from typing import Any, Collection, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+class _UserMatrix:
+    """
+    사용자 한 명의 임베딩 행렬.
+
+    파일 구성 (base 경로 기준):
+    - {base}.f32   : 정규화된 float32 벡터를 행 단위로 이어 붙인 파일 (np.memmap으로 읽음)
+    - {base}.ids   : 각 행의 recordId (줄 단위, 행 순서와 동일)
+    - {base}.tomb  : 삭제/교체된 행 번호 (int32, append-only)
+    - {base}.json  : 차원 등 메타데이터
+    """
+
+    def __init__(self, base: str, user_id: Optional[str] = None):
+        self.base = base
+        self.user_id = user_id
+        self.dim: Optional[int] = None
+        self.ids: List[str] = []
+        self.row_of: Dict[str, int] = {}
+        self.alive = np.zeros(0, dtype=bool)
+        self._matrix: Optional[np.ndarray] = None
+        self._load()
+
+    @property
+    def vec_path(self) -> str:
+        return self.base + ".f32"
+
+    @property
+    def ids_path(self) -> str:
+        return self.base + ".ids"
+
+    @property
+    def tomb_path(self) -> str:
+        return self.base + ".tomb"
+
+    @property
+    def meta_path(self) -> str:
+        return self.base + ".json"
+
+    def exists(self) -> bool:
+        return os.path.exists(self.meta_path)
+
+    def _load(self):
+        if not self.exists():
+            return
+        with open(self.meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.dim = meta.get("dim")
+        self.user_id = self.user_id or meta.get("userId")
+        if os.path.exists(self.ids_path):
+            with open(self.ids_path, "r", encoding="utf-8") as f:
+                self.ids = [line.rstrip("\n") for line in f if line.strip()]
+        if self.dim:
+            # 비정상 종료로 벡터 파일과 id 파일 길이가 어긋난 경우 짧은 쪽에 맞춤
+            # (두 파일 모두 잘라야 이후 add의 행 번호와 id 줄이 다시 일치함)
+            rows = os.path.getsize(self.vec_path) // (4 * self.dim) if os.path.exists(self.vec_path) else 0
+            if len(self.ids) > rows:
+                self.ids = self.ids[:rows]
+                with open(self.ids_path, "w", encoding="utf-8") as f:
+                    f.writelines(record_id + "\n" for record_id in self.ids)
+            if os.path.exists(self.vec_path) and os.path.getsize(self.vec_path) != len(self.ids) * 4 * self.dim:
+                with open(self.vec_path, "r+b") as f:
+                    f.truncate(len(self.ids) * 4 * self.dim)
+        self.alive = np.ones(len(self.ids), dtype=bool)
+        if os.path.exists(self.tomb_path):
+            tombs = np.fromfile(self.tomb_path, dtype=np.int32)
+            self.alive[tombs[tombs < len(self.ids)]] = False
+        for row, record_id in enumerate(self.ids):
+            if self.alive[row]:
+                self.row_of[record_id] = row
+
+    def _write_meta(self):
+        with open(self.meta_path, "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "userId": self.user_id}, f)
+
+    def init_empty(self):
+        if not self.exists():
+            self._write_meta()
+
+    @property
+    def matrix(self) -> np.ndarray:
+        if self._matrix is None or len(self._matrix) != len(self.ids):
+            if not self.ids:
+                self._matrix = np.zeros((0, self.dim or 0), dtype=np.float32)
+            else:
+                self._matrix = np.memmap(
+                    self.vec_path, dtype=np.float32, mode="r", shape=(len(self.ids), self.dim)
+                )
+        return self._matrix
+
+    def add(self, record_id: str, vector: np.ndarray):
+        if self.dim is None:
+            self.dim = len(vector)
+            self._write_meta()
+        elif len(vector) != self.dim:
+            raise ValueError(f"Vector dimension mismatch: expected {self.dim}, got {len(vector)}")
+
+        # 같은 recordId의 이전 벡터는 tombstone 처리 후 새 행으로 추가
+        self.remove(record_id)
+        with open(self.vec_path, "ab") as f:
+            f.write(vector.astype(np.float32).tobytes())
+        with open(self.ids_path, "a", encoding="utf-8") as f:
+            f.write(record_id + "\n")
+        self.row_of[record_id] = len(self.ids)
+        self.ids.append(record_id)
+        self.alive = np.append(self.alive, True)
+
+    def remove(self, record_id: str) -> bool:
+        row = self.row_of.pop(record_id, None)
+        if row is None:
+            return False
+        self.alive[row] = False
+        with open(self.tomb_path, "ab") as f:
+            f.write(np.int32(row).tobytes())
+        return True
+
+    def row_mask(self, record_ids: Optional[Collection[str]]) -> np.ndarray:
+        """검색 대상 행 마스크 (record_ids가 주어지면 그 기록의 살아 있는 행만)."""
+        if record_ids is None:
+            return self.alive
+        mask = np.zeros(len(self.ids), dtype=bool)
+        rows = [self.row_of[r] for r in record_ids if r in self.row_of]
+        mask[rows] = True
+        return mask
+
+    def search(
+        self, query: np.ndarray, top_k: int, record_ids: Optional[Collection[str]] = None
+    ) -> List[Tuple[str, float]]:
+        alive = self.row_mask(record_ids)
+        live = int(alive.sum())
+        if live == 0 or top_k <= 0:
+            return []
+        scores = self.matrix @ query
+        scores = np.where(alive, scores, -np.inf)
+        k = min(top_k, live)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        # Atlas vectorSearchScore(cosine)와 같은 범위: (1 + cos) / 2
+        return [(self.ids[i], float((1 + scores[i]) / 2)) for i in top]
+
+    def compact(self):
+        """tombstone 행을 제거하고 파일을 다시 씀."""
+        keep = np.flatnonzero(self.alive)
+        vectors = np.array(self.matrix[keep]) if len(keep) else np.zeros((0, self.dim or 0), np.float32)
+        ids = [self.ids[i] for i in keep]
+        self._matrix = None
+
+        vectors.astype(np.float32).tofile(self.vec_path + ".tmp")
+        with open(self.ids_path + ".tmp", "w", encoding="utf-8") as f:
+            f.writelines(record_id + "\n" for record_id in ids)
+        os.replace(self.vec_path + ".tmp", self.vec_path)
+        os.replace(self.ids_path + ".tmp", self.ids_path)
+        if os.path.exists(self.tomb_path):
+            os.remove(self.tomb_path)
+
+        self.ids = ids
+        self.alive = np.ones(len(ids), dtype=bool)
+        self.row_of = {record_id: row for row, record_id in enumerate(ids)}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rows": len(self.ids),
+            "live": int(self.alive.sum()),
+            "dim": self.dim,
+            "bytes": os.path.getsize(self.vec_path) if os.path.exists(self.vec_path) else 0,
+        }
+
+
+class ExactVectorStore:
+    """
+    Atlas 없이 동작하는 프로세스 내 exact vector search (VECTOR_BACKEND=exact).
+
+    - 사용자별로 연속된 float32 행렬을 memory-mapped 파일로 유지
+    - 검색은 행렬-벡터 곱 한 번 + argpartition으로 정확한 top-k
+    - 추가/삭제는 append + tombstone으로 점진 반영, tombstone 비율이 높으면 compaction
+    """
+
+    COMPACT_RATIO = 0.3
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.VECTOR_STORE_PATH
+        self._users: Dict[str, _UserMatrix] = {}
+
+    def _user(self, user_id: str) -> _UserMatrix:
+        matrix = self._users.get(user_id)
+        if matrix is None:
+            os.makedirs(self.path, exist_ok=True)
+            name = hashlib.sha1(user_id.encode("utf-8")).hexdigest()
+            matrix = self._open_user(os.path.join(self.path, name), user_id)
+            self._users[user_id] = matrix
+        return matrix
+
+    def _open_user(self, base: str, user_id: str) -> _UserMatrix:
+        return _UserMatrix(base, user_id)
+
+    def warm_up(self):
+        """저장된 모든 사용자 인덱스를 미리 로드 (서버 시작 시)."""
+        if not os.path.isdir(self.path):
+            return
+        for name in os.listdir(self.path):
+            if not name.endswith(".json"):
+                continue
+            with open(os.path.join(self.path, name), "r", encoding="utf-8") as f:
+                user_id = json.load(f).get("userId")
+            if user_id and user_id not in self._users:
+                self._user(user_id)
+        print(f"[VectorStore] Loaded {len(self._users)} user index(es) from {self.path}")
+
+    def close(self):
+        """종료 시 호출. (exact 엔진은 매 변경이 파일에 바로 반영되므로 할 일 없음)"""
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> Optional[np.ndarray]:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        if norm == 0:
+            return None
+        return array / norm
+
+    def has_user(self, user_id: str) -> bool:
+        """이 사용자의 인덱스가 만들어진 적이 있는지 (없으면 Mongo에서 bootstrap 필요)."""
+        return self._user(user_id).exists()
+
+    def init_user(self, user_id: str):
+        self._user(user_id).init_empty()
+
+    def add(self, user_id: str, record_id: str, vector: Sequence[float]):
+        array = self._normalize(vector)
+        matrix = self._user(user_id)
+        if array is None:
+            matrix.remove(record_id)
+            return
+        matrix.add(record_id, array)
+
+    def remove(self, user_id: str, record_id: str):
+        matrix = self._user(user_id)
+        if matrix.remove(record_id):
+            dead = len(matrix.ids) - int(matrix.alive.sum())
+            if dead > 100 and dead / len(matrix.ids) > self.COMPACT_RATIO:
+                matrix.compact()
+
+    def search(
+        self,
+        user_id: str,
+        query_vector: Sequence[float],
+        top_k: int,
+        record_ids: Optional[Collection[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        """record_ids가 주어지면 그 기록들 안에서만 검색 (날짜 범위 등 사전 필터)."""
+        query = self._normalize(query_vector)
+        matrix = self._user(user_id)
+        if query is None or matrix.dim is None or len(query) != matrix.dim:
+            return []
+        return matrix.search(query, top_k, record_ids)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "exact",
+            "users": len(self._users),
+            "rows": sum(len(m.ids) for m in self._users.values()),
+            "live": sum(int(m.alive.sum()) for m in self._users.values()),
+        }
+
+
+_engine = None
+
+
+def get_vector_engine():
+    """VECTOR_BACKEND에 맞는 프로세스 내 엔진. Atlas를 쓰는 경우 None."""
+    global _engine
+    if settings.VECTOR_BACKEND == "atlas":
+        return None
+    if _engine is None:
+        if settings.VECTOR_BACKEND == "hnsw":
+            from app.db.hnsw_index import HNSWVectorStore
+
+            _engine = HNSWVectorStore()
+        else:
+            _engine = ExactVectorStore()
+    return _engine
@@ -10,6 +10,11 @@ settings = get_settings()
 from contextlib import asynccontextmanager
 from app.db.mongo import mongo_db
 from app.db.graph import neo4j_db
+from app.db.graph_write_queue import graph_write_queue
+from app.core.http_client import http_client_pool
+from app.services.embedding_cache import embedding_cache
+from app.db.lexical import get_lexical_engine
+from app.db.vector_store import get_vector_engine
 
 
 @asynccontextmanager
@@ -17,10 +22,19 @@ async def lifespan(app: FastAPI):
     # Startup
     await mongo_db.connect()
     await neo4j_db.connect()
+    await http_client_pool.connect()
+    local_engines = [e for e in (get_vector_engine(), get_lexical_engine()) if e is not None]
+    for engine in local_engines:
+        engine.warm_up()
     yield
     # Shutdown
+    await graph_write_queue.flush()  # 대기 중인 그래프 저장을 커밋한 뒤 연결 종료
+    for engine in local_engines:
+        engine.close()
     await mongo_db.close()
     await neo4j_db.close()
+    await http_client_pool.close()
+    embedding_cache.close()  # 모아 둔 접근 시각을 반영하고 SQLite 연결 종료
 
 
 app = FastAPI(
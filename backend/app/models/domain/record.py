@@ -11,6 +11,9 @@ class Record(BaseModel):
     content: str
     feel: List[str]
     date: str  # YYYY-MM-DD
+    # date에서 파생: 범위 필터/Time Decay용 (app.core.dates.date_fields)
+    dateValue: Optional[datetime] = None
+    dateEpochDay: Optional[int] = None
 
     # Metadata
     createdAt: datetime = Field(default_factory=datetime.now)
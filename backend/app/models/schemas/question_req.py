@@ -1,11 +1,21 @@
 from pydantic import BaseModel, Field
 from typing import List, Dict, Optional, Any
+from datetime import date
 
 
 class QuestionRequest(BaseModel):
     userId: str
     text: str
     searchSessionId: Optional[str] = None
+    dateFrom: Optional[date] = Field(
+        default=None, description="Only search records on or after this date"
+    )
+    dateTo: Optional[date] = Field(
+        default=None, description="Only search records on or before this date"
+    )
+    feel: Optional[List[str]] = Field(
+        default=None, description="Only search records tagged with any of these feelings"
+    )
 
 
 class QuestionResponse(BaseModel):
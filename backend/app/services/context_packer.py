@@ -0,0 +1,215 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import get_settings
+from app.core.tokenizer import estimate_tokens, tokenize
+
+settings = get_settings()
+
+# 문장 분리 (마침표/물음표/느낌표/줄바꿈 기준)
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?。])\s+|\n+")
+
+# 노드 표시 이름으로 사용할 속성 (우선순위 순)
+NODE_TEXT_PROPS = ("summary", "name", "label", "description", "title", "date")
+
+# 그래프 컨텍스트에 할당할 예산 비율
+GRAPH_BUDGET_RATIO = 0.25
+
+# 모든 기록이 최소한 포함되도록 보장하는 기록당 최소 토큰
+MIN_RECORD_TOKENS = 60
+
+
+class ContextPacker:
+    """
+    답변 생성 프롬프트용 컨텍스트를 토큰 예산 안에서 압축하여 직렬화.
+
+    - 기록: 짧은 로컬 ID(R1, R2...) + 날짜/제목 + 질문과 관련도가 높은 문장만 발췌
+    - 그래프: 짧은 로컬 ID(N1, N2...)의 노드 목록 + "R1 HAS_EVENT N1" 형태의 triple
+    - 예산이 부족하면 순위가 낮은 기록/노드에 속한 내용부터 제외
+    - Reranker가 고른 기록은 최소한 헤더와 가장 관련 있는 문장 하나는 항상 포함
+    """
+
+    def budget_for_model(self, model: Optional[str]) -> int:
+        return settings.CONTEXT_TOKEN_BUDGETS.get(model or "", settings.CONTEXT_TOKEN_BUDGET)
+
+    def pack(
+        self,
+        question: str,
+        context_records: List[dict],
+        context_graph: Dict[str, Any],
+        budget_tokens: int,
+    ) -> Tuple[str, str]:
+        record_ids = {
+            str(r.get("recordId")): f"R{i + 1}"
+            for i, r in enumerate(context_records)
+            if r.get("recordId")
+        }
+        graph_budget = int(budget_tokens * GRAPH_BUDGET_RATIO)
+        graph_text = self._pack_graph(context_graph or {}, record_ids, graph_budget)
+        records_budget = budget_tokens - estimate_tokens(graph_text)
+        records_text = self._pack_records(question, context_records, records_budget)
+        return records_text, graph_text
+
+    # --- Records ---
+    @staticmethod
+    def _split_sentences(content: str) -> List[str]:
+        return [s.strip() for s in _SENTENCE_SPLIT.split(content or "") if s.strip()]
+
+    def _pack_records(self, question: str, records: List[dict], budget: int) -> str:
+        if not records:
+            return ""
+
+        query_terms = set(tokenize(question))
+        headers = []
+        sentences: List[List[str]] = []
+        selected: List[set] = []
+        best_of: List[Optional[int]] = []
+        candidates = []  # (priority, record index, sentence index)
+
+        used = 0
+        for rank, record in enumerate(records):
+            header = f"[R{rank + 1}] {record.get('date', '')} {record.get('title', '')}".strip()
+            headers.append(header)
+            used += estimate_tokens(header)
+
+            parts = self._split_sentences(record.get("content", ""))
+            sentences.append(parts)
+
+            scores = [
+                len(query_terms & set(tokenize(part))) / (1 + len(part) / 200)
+                for part in parts
+            ]
+            chosen = set()
+            best = None
+            if parts:
+                # 최소 보장: 가장 관련 있는 문장 하나 (길면 잘라서)
+                best = max(range(len(parts)), key=lambda i: scores[i])
+                chosen.add(best)
+                used += min(estimate_tokens(parts[best]), MIN_RECORD_TOKENS)
+            selected.append(chosen)
+            best_of.append(best)
+
+            rank_weight = 1.0 / (1.0 + 0.5 * rank)
+            for i, score in enumerate(scores):
+                if i not in chosen:
+                    candidates.append(((score + 0.01) * rank_weight, rank, i))
+
+        # 최소 보장 문장은 남은 예산에 들어가면 (순위 순으로) 자르지 않고 전체 포함
+        whole = set()
+        for rank, best in enumerate(best_of):
+            if best is None:
+                continue
+            cost = estimate_tokens(sentences[rank][best]) - MIN_RECORD_TOKENS
+            if cost <= 0 or cost <= budget - used:
+                whole.add(rank)
+                used += max(cost, 0)
+
+        # 남은 예산을 (관련도 x 순위 가중치) 순으로 채움 -> 낮은 순위 내용부터 탈락
+        candidates.sort(key=lambda c: c[0], reverse=True)
+        for _, rank, i in candidates:
+            cost = estimate_tokens(sentences[rank][i])
+            if used + cost > budget:
+                continue
+            selected[rank].add(i)
+            used += cost
+
+        lines = []
+        for rank, header in enumerate(headers):
+            parts = sentences[rank]
+            chosen = sorted(selected[rank])
+            excerpt = []
+            for i in chosen:
+                text = parts[i]
+                if i == best_of[rank] and rank not in whole:
+                    text = self._truncate(text, MIN_RECORD_TOKENS)
+                excerpt.append(text)
+            if len(chosen) < len(parts):
+                body = " … ".join(excerpt)
+            else:
+                body = " ".join(excerpt)
+            lines.append(f"{header}: {body}" if body else header)
+        return "\n".join(lines)
+
+    @staticmethod
+    def _truncate(text: str, max_tokens: int) -> str:
+        end = len(text)
+        while end > 0 and estimate_tokens(text[:end]) > max_tokens:
+            end = int(end * 0.8)
+        return text[:end].rstrip() + "…"
+
+    # --- Graph ---
+    def _pack_graph(
+        self, graph: Dict[str, Any], record_ids: Dict[str, str], budget: int
+    ) -> str:
+        nodes = graph.get("nodes", [])
+        edges = graph.get("edges", [])
+        if not nodes:
+            return ""
+
+        node_by_id = {n.get("_id"): n for n in nodes if n.get("_id")}
+        short_ids: Dict[str, str] = {}
+        node_rank: Dict[str, int] = {}
+        for node_id, node in node_by_id.items():
+            record_id = node.get("recordId")
+            if "Record" in node.get("_labels", []) and str(record_id) in record_ids:
+                short_ids[node_id] = record_ids[str(record_id)]
+                node_rank[node_id] = int(short_ids[node_id][1:]) - 1
+
+        # 기록에서 가까운 노드일수록 그 기록의 순위를 상속 (2-hop까지 전파)
+        unique_edges = list(
+            {(e.get("source"), e.get("type"), e.get("target")) for e in edges}
+        )
+        for _ in range(2):
+            for source, _, target in unique_edges:
+                for a, b in ((source, target), (target, source)):
+                    if a in node_rank:
+                        rank = node_rank[a]
+                        if node_rank.get(b, rank + 1) > rank:
+                            node_rank[b] = rank
+
+        fallback_rank = len(record_ids) + 1
+        unique_edges.sort(
+            key=lambda e: max(
+                node_rank.get(e[0], fallback_rank), node_rank.get(e[2], fallback_rank)
+            )
+        )
+
+        def short_id(node_id: str) -> str:
+            if node_id not in short_ids:
+                short_ids[node_id] = f"N{sum(1 for s in short_ids.values() if s[0] == 'N') + 1}"
+            return short_ids[node_id]
+
+        node_lines: List[str] = []
+        edge_lines: List[str] = []
+        described = set()
+        used = 0
+        for source, rel_type, target in unique_edges:
+            if source not in node_by_id or target not in node_by_id:
+                continue
+            new_lines = []
+            for node_id in (source, target):
+                sid = short_id(node_id)
+                if sid.startswith("N") and node_id not in described:
+                    new_lines.append(self._describe_node(sid, node_by_id[node_id]))
+            edge_line = f"{short_id(source)} {rel_type} {short_id(target)}"
+            cost = sum(estimate_tokens(line) for line in new_lines + [edge_line])
+            if used + cost > budget:
+                break
+            used += cost
+            node_lines.extend(new_lines)
+            described.update((source, target))
+            edge_lines.append(edge_line)
+
+        if not edge_lines:
+            return ""
+        return "nodes:\n" + "\n".join(node_lines) + "\nedges:\n" + "\n".join(edge_lines)
+
+    @staticmethod
+    def _describe_node(short_id: str, node: Dict[str, Any]) -> str:
+        labels = [l for l in node.get("_labels", []) if l != "Record"]
+        label = labels[0] if labels else "Node"
+        text = next((node[p] for p in NODE_TEXT_PROPS if node.get(p)), "")
+        return f'{short_id} {label} "{text}"'
+
+
+context_packer = ContextPacker()
@@ -0,0 +1,185 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Any, Dict, List, Optional
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+class EmbeddingCache:
+    """
+    Content-addressed 임베딩 영구 캐시 (SQLite 파일 기반, LRU eviction).
+
+    - 키: (provider, model, dimension, sha256(text))
+    - 값: float32 바이트로 저장된 벡터
+    - 전체 크기가 max_bytes를 넘으면 마지막 접근 시각이 오래된 항목부터 삭제
+    - API 실패 시의 zero-vector fallback은 절대 저장하지 않음 (put에서 거부)
+    - 조회 시 접근 시각은 메모리에 모아 두었다가 다음 쓰기(put/eviction), TOUCH_FLUSH_SIZE건 누적,
+      close 때 한 번에 반영 (cache hit마다 UPDATE + commit을 하지 않도록)
+    - 모든 메서드는 blocking이며 thread-safe (LLM 서비스는 asyncio.to_thread로 호출해 이벤트 루프를 막지 않음)
+    """
+
+    TOUCH_FLUSH_SIZE = 256
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        enabled: Optional[bool] = None,
+    ):
+        self.path = path or settings.EMBEDDING_CACHE_PATH
+        self.max_bytes = (
+            settings.EMBEDDING_CACHE_MAX_MB * 1024 * 1024 if max_bytes is None else max_bytes
+        )
+        self.enabled = settings.EMBEDDING_CACHE_ENABLED if enabled is None else enabled
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self._touched: Dict[str, float] = {}  # 아직 반영하지 않은 key -> 마지막 접근 시각
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "rejected": 0}
+
+    # --- Storage ---
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    vector BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS embeddings_lru_idx ON embeddings(last_access)"
+            )
+            row = conn.execute("SELECT COALESCE(SUM(size), 0) FROM embeddings").fetchone()
+            self._total_bytes = row[0]
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._flush_touched_locked(self._conn)
+                self._conn.commit()
+                self._conn.close()
+                self._conn = None
+
+    def _flush_touched_locked(self, conn: sqlite3.Connection):
+        if not self._touched:
+            return
+        conn.executemany(
+            "UPDATE embeddings SET last_access = ? WHERE key = ?",
+            [(ts, key) for key, ts in self._touched.items()],
+        )
+        self._touched.clear()
+
+    @staticmethod
+    def make_key(provider: str, model: str, dimension: int, text: str) -> str:
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{provider}:{model}:{dimension}:{text_hash}"
+
+    # --- Public API ---
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        if not self.enabled or not keys:
+            return {}
+
+        with self._lock:
+            conn = self._connect()
+            placeholders = ",".join("?" * len(keys))
+            rows = conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                keys,
+            ).fetchall()
+            found = {key: array("f", blob).tolist() for key, blob in rows}
+            if found:
+                now = time.time()
+                self._touched.update((key, now) for key in found)
+                if len(self._touched) >= self.TOUCH_FLUSH_SIZE:
+                    self._flush_touched_locked(conn)
+                    conn.commit()
+            self._stats["hits"] += len(found)
+            self._stats["misses"] += len(keys) - len(found)
+        return found
+
+    def get(self, key: str) -> Optional[List[float]]:
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items: Dict[str, List[float]]):
+        if not self.enabled or not items:
+            return
+
+        rows = []
+        now = time.time()
+        for key, vector in items.items():
+            # zero-vector(mock/fallback)는 캐시를 오염시키므로 저장하지 않음
+            if not vector or not any(vector):
+                continue
+            blob = array("f", vector).tobytes()
+            rows.append((key, blob, len(blob), now))
+
+        with self._lock:
+            self._stats["rejected"] += len(items) - len(rows)
+            if not rows:
+                return
+            conn = self._connect()
+            # eviction이 최근 조회를 반영한 순서로 고르도록 먼저 접근 시각을 기록
+            self._flush_touched_locked(conn)
+            for key, blob, size, ts in rows:
+                previous = conn.execute(
+                    "SELECT size FROM embeddings WHERE key = ?", (key,)
+                ).fetchone()
+                conn.execute(
+                    "INSERT OR REPLACE INTO embeddings (key, vector, size, last_access) VALUES (?, ?, ?, ?)",
+                    (key, blob, size, ts),
+                )
+                self._total_bytes += size - (previous[0] if previous else 0)
+            self._stats["writes"] += len(rows)
+            self._evict_locked(conn)
+            conn.commit()
+
+    def put(self, key: str, vector: List[float]):
+        self.put_many({key: vector})
+
+    def _evict_locked(self, conn: sqlite3.Connection):
+        if self._total_bytes <= self.max_bytes:
+            return
+
+        # 여유를 두고 90%까지 줄여서 매 쓰기마다 eviction이 일어나지 않게 함
+        target = int(self.max_bytes * 0.9)
+        cursor = conn.execute("SELECT key, size FROM embeddings ORDER BY last_access ASC")
+        victims = []
+        for key, size in cursor:
+            if self._total_bytes <= target:
+                break
+            victims.append((key,))
+            self._total_bytes -= size
+        conn.executemany("DELETE FROM embeddings WHERE key = ?", victims)
+        self._stats["evictions"] += len(victims)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "enabled": self.enabled,
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "hit_ratio": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+
+embedding_cache = EmbeddingCache()
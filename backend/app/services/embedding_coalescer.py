@@ -0,0 +1,127 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import get_settings
+from app.core.tokenizer import estimate_tokens
+
+settings = get_settings()
+
+BatchEmbedFn = Callable[[List[str]], Awaitable[List[List[float]]]]
+
+
+class EmbeddingCoalescer:
+    """
+    동시에 들어오는 get_embedding 호출을 짧은 윈도우 동안 모아
+    한 번의 배치 임베딩 요청으로 보내는 Micro-batcher.
+
+    - window_ms 동안 모인 텍스트를 하나의 요청으로 전송
+    - max_batch_size 또는 max_batch_tokens에 도달하면 즉시 전송
+    - 같은 배치 안의 중복 텍스트는 한 번만 전송
+    - 각 호출자는 자신의 텍스트에 해당하는 벡터를 돌려받음
+    """
+
+    def __init__(
+        self,
+        batch_fn: BatchEmbedFn,
+        window_ms: Optional[float] = None,
+        max_batch_size: Optional[int] = None,
+        max_batch_tokens: Optional[int] = None,
+        enabled: Optional[bool] = None,
+    ):
+        self._batch_fn = batch_fn
+        self.window_ms = (
+            settings.EMBEDDING_BATCH_WINDOW_MS if window_ms is None else window_ms
+        )
+        self.max_batch_size = (
+            settings.EMBEDDING_BATCH_MAX_SIZE if max_batch_size is None else max_batch_size
+        )
+        self.max_batch_tokens = (
+            settings.EMBEDDING_BATCH_MAX_TOKENS
+            if max_batch_tokens is None
+            else max_batch_tokens
+        )
+        self.enabled = settings.EMBEDDING_BATCH_ENABLED if enabled is None else enabled
+
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._pending_tokens = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+        self._stats = {"requests": 0, "batches": 0, "texts": 0, "max_batch_size": 0}
+
+    async def submit(self, text: str) -> List[float]:
+        self._stats["requests"] += 1
+
+        if not self.enabled:
+            self._record_batch(1)
+            vectors = await self._batch_fn([text])
+            return vectors[0]
+
+        tokens = estimate_tokens(text)
+        # 현재 배치에 넣으면 토큰 한도를 넘는 경우 먼저 비움
+        if self._pending and self._pending_tokens + tokens > self.max_batch_tokens:
+            self._flush()
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        self._pending_tokens += tokens
+
+        if len(self._pending) >= self.max_batch_size or (
+            self._pending_tokens >= self.max_batch_tokens
+        ):
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_ms / 1000.0, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch = self._pending
+        self._pending = []
+        self._pending_tokens = 0
+        if batch:
+            asyncio.get_running_loop().create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]):
+        # 동일 텍스트는 한 번만 요청
+        unique_texts: List[str] = []
+        index_of: Dict[str, int] = {}
+        for text, _ in batch:
+            if text not in index_of:
+                index_of[text] = len(unique_texts)
+                unique_texts.append(text)
+
+        self._record_batch(len(unique_texts))
+
+        try:
+            vectors = await self._batch_fn(unique_texts)
+            if len(vectors) != len(unique_texts):
+                raise ValueError(
+                    f"Embedding batch size mismatch: sent {len(unique_texts)}, got {len(vectors)}"
+                )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for text, future in batch:
+            if not future.done():
+                future.set_result(vectors[index_of[text]])
+
+    def _record_batch(self, size: int):
+        self._stats["batches"] += 1
+        self._stats["texts"] += size
+        self._stats["max_batch_size"] = max(self._stats["max_batch_size"], size)
+
+    def stats(self) -> Dict[str, Any]:
+        batches = self._stats["batches"]
+        return {
+            **self._stats,
+            "avg_batch_size": round(self._stats["texts"] / batches, 2) if batches else 0.0,
+            "pending": len(self._pending),
+        }
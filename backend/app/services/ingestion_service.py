@@ -1,25 +1,59 @@
 from datetime import datetime
-from typing import List
+from typing import Any, Dict, List, Optional, Tuple
 
 from app.models.schemas.record_req import CreateRecordRequest, CreateRecordResponse
 from app.models.domain.record import Record
 from app.core.config import get_settings
+from app.core.dates import date_fields
 from app.db.mongo import mongo_db
+from app.db.passages import passage_store
+from app.db.vector import vector_db
+from app.db.vector_codec import vector_codec
 
 settings = get_settings()
-from app.db.graph import neo4j_db
+from app.db.graph_write_queue import graph_write_queue
+from app.db.graph_writer import graph_writer
 from app.services.llm_service import llm_service
 
 
 class IngestionService:
 
+    @staticmethod
+    async def embed_record(
+        title: str, content: str
+    ) -> Tuple[Optional[List[float]], List[Dict[str, Any]]]:
+        """
+        기록 임베딩과 (PASSAGE_RETRIEVAL이면) passage 임베딩을 한 번의 배치 요청으로 생성.
+
+        Returns:
+            (기록 임베딩 또는 None, [{start, end, text, embedding}, ...])
+            passage가 하나뿐인 짧은 기록은 기록 임베딩을 그대로 passage 벡터로 사용
+        """
+        combined_text = f"{title} {content}"
+        if not settings.PASSAGE_RETRIEVAL:
+            embedding = await llm_service.get_embedding(combined_text)
+            passages: List[Dict[str, Any]] = []
+        else:
+            passages = passage_store.split(title, content)
+            texts = [combined_text] + ([p["text"] for p in passages] if len(passages) > 1 else [])
+            vectors = await llm_service.get_embeddings(texts)
+            embedding = vectors[0]
+            for passage, vector in zip(passages, vectors[1:] or [embedding] * len(passages)):
+                passage["embedding"] = vector
+
+        if embedding is not None and not any(embedding):
+            # Provider 실패 시의 0 벡터는 저장하지 않음 (검색에서 제외되고 나중에 재임베딩 가능)
+            print("[Ingestion] Embedding unavailable, storing record without vector")
+            embedding = None
+        return embedding, passages
+
     @staticmethod
     async def create_record(request: CreateRecordRequest) -> CreateRecordResponse:
         # 1. 임베딩을 위한 컨텐츠 준비 (제목 + 내용 + 기분)
         combined_text = f"{request.title} {request.content}"
 
-        # 2. 임베딩 생성
-        embedding = await llm_service.get_embedding(combined_text)
+        # 2. 임베딩 생성 (긴 기록은 passage 임베딩도 같은 배치로)
+        embedding, passages = await IngestionService.embed_record(request.title, request.content)
 
         # 3. 도메인 모델 생성 (UUID recordId 자동 생성)
         record = Record(
@@ -28,6 +62,7 @@ class IngestionService:
             content=request.content,
             feel=request.feel,
             date=request.date.isoformat(),
+            **date_fields(request.date),
             createdAt=datetime.now(),
             embedding=embedding,
         )
@@ -37,20 +72,46 @@ class IngestionService:
             raise Exception("Database connection not established")
 
         collection = mongo_db.db[settings.COLLECTION_NAME]
-        result = await collection.insert_one(record.model_dump(by_alias=True))
-
-        # 5. Graph DB를 위한 Cypher 쿼리 생성
-        # 실제 운영 환경에서는 백그라운드 비동기 작업으로 처리 가능
-        cypher_query = await llm_service.generate_graph_cypher(
-            text=combined_text,
-            user_id=request.userId,
-            record_id=record.recordId,  # UUID recordId 사용
-            date=request.date.isoformat(),
-        )
+        document = record.model_dump(by_alias=True)
+        # EMBEDDING_STORAGE 설정에 따라 BSON binary vector(float32/int8/bit)로 저장
+        document["embedding"] = vector_codec.encode(embedding)
+        result = await collection.insert_one(document)
+        # 프로세스 내 벡터 엔진 사용 시 인덱스에 바로 반영 (Atlas는 자동 반영)
+        vector_db.index_record(request.userId, record.recordId, embedding)
+        vector_db.index_text(request.userId, record.recordId, request.title, request.content)
+        if passages:
+            await passage_store.replace(
+                request.userId,
+                record.recordId,
+                passages,
+                {"dateEpochDay": record.dateEpochDay, "feel": request.feel},
+            )
 
-        # 6. Cypher 쿼리 실행
-        if cypher_query:
-            await neo4j_db.execute_cypher(cypher_query)
+        # 5. Graph DB 저장
+        # 동시에 들어온 기록들과 함께 하나의 write 트랜잭션으로 커밋 (GraphWriteQueue)
+        if settings.GRAPH_WRITE_MODE == "cypher":
+            # Legacy: LLM이 생성한 Cypher 문자열을 그대로 실행
+            cypher_query = await llm_service.generate_graph_cypher(
+                text=combined_text,
+                user_id=request.userId,
+                record_id=record.recordId,  # UUID recordId 사용
+                date=request.date.isoformat(),
+            )
+            if cypher_query:
+                await graph_write_queue.submit_cypher(
+                    request.userId, record.recordId, cypher_query
+                )
+        else:
+            # LLM은 JSON(GraphData)만 추출하고, 저장은 고정된 파라미터화 쿼리로 수행
+            graph_data = await llm_service.extract_entities(combined_text)
+            await graph_write_queue.submit_record(
+                graph_writer.build_record_params(
+                    user_id=request.userId,
+                    record_id=record.recordId,
+                    date=request.date.isoformat(),
+                    graph_data=graph_data,
+                )
+            )
 
         # 7. UUID recordId 반환 (MongoDB ObjectId가 아님)
         return CreateRecordResponse(recordId=record.recordId)
@@ -1,19 +1,90 @@
-import httpx
+import asyncio
 import json
-from typing import List, Optional, Protocol, runtime_checkable
+import re
+from typing import AsyncIterator, List, Optional, Protocol, runtime_checkable
 from abc import ABC, abstractmethod
 
+import httpx
+
 from app.models.domain.graph import GraphData, GraphEvent
 from app.core.config import get_settings
+from app.core.http_client import http_client_pool
+from app.core.tokenizer import estimate_tokens
+from app.services.context_packer import context_packer
+from app.services.embedding_coalescer import EmbeddingCoalescer
+from app.services.embedding_cache import embedding_cache
+from app.services.rate_limiter import ProviderScheduler, llm_scheduler
+from app.services.rerank_cache import rerank_cache
 
 settings = get_settings()
 
 
+class AnswerStreamExtractor:
+    """
+    스트리밍 중인 JSON 응답 {"answer": "...", ...}에서 answer 문자열 값만
+    점진적으로 디코딩하여 반환하는 헬퍼. (escape 시퀀스가 청크 경계에 걸쳐도 처리)
+    """
+
+    ANSWER_KEY = re.compile(r'"answer"\s*:\s*"')
+    ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f"}
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = -1  # answer 값 시작 전이면 -1
+        self.done = False
+
+    def feed(self, chunk: str) -> str:
+        self._buffer += chunk
+        if self.done:
+            return ""
+
+        if self._pos < 0:
+            match = self.ANSWER_KEY.search(self._buffer)
+            if not match:
+                return ""
+            self._pos = match.end()
+
+        out = []
+        buffer = self._buffer
+        pos = self._pos
+        while pos < len(buffer):
+            ch = buffer[pos]
+            if ch == "\\":
+                if pos + 1 >= len(buffer):
+                    break
+                escape = buffer[pos + 1]
+                if escape == "u":
+                    if pos + 6 > len(buffer):
+                        break
+                    out.append(chr(int(buffer[pos + 2 : pos + 6], 16)))
+                    pos += 6
+                else:
+                    out.append(self.ESCAPES.get(escape, escape))
+                    pos += 2
+            elif ch == '"':
+                self.done = True
+                pos += 1
+                break
+            else:
+                out.append(ch)
+                pos += 1
+
+        self._pos = pos
+        return "".join(out)
+
+
 class LLMServiceInterface(ABC):
     @abstractmethod
     async def get_embedding(self, text: str) -> List[float]:
         pass
 
+    @abstractmethod
+    async def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        여러 텍스트를 한 번의 요청으로 임베딩. 입력 순서대로 벡터를 반환.
+        """
+        pass
+
     @abstractmethod
     async def generate_graph_cypher(
         self, text: str, user_id: str, record_id: str, date: str
@@ -26,6 +97,22 @@ class LLMServiceInterface(ABC):
     ) -> dict:
         pass
 
+    async def stream_answer_with_reasoning(
+        self, question: str, context_records: List[dict], context_graph: dict
+    ) -> AsyncIterator[dict]:
+        """
+        답변을 토큰 단위로 스트리밍.
+
+        Yields:
+            {"type": "token", "text": "..."} 답변 조각 (여러 번)
+            {"type": "result", "data": {...}} generate_answer_with_reasoning과 같은 결과 (마지막 1번)
+        """
+        result = await self.generate_answer_with_reasoning(
+            question, context_records, context_graph
+        )
+        yield {"type": "token", "text": result.get("answer", "")}
+        yield {"type": "result", "data": result}
+
     @abstractmethod
     async def extract_entities(self, text: str) -> GraphData:
         pass
@@ -47,45 +134,127 @@ class LLMServiceInterface(ABC):
         """
         pass
 
+    def stats(self) -> dict:
+        """Provider 런타임 통계 (metrics 엔드포인트용)."""
+        return {}
+
 
 class NvidiaLLMService(LLMServiceInterface):
     """
     NVIDIA NeMo / NVIDIA NIM API Service
     """
 
+    PROVIDER = "nvidia"
     EMBEDDING_URL = "https://integrate.api.nvidia.com/v1/embeddings"
     CHAT_URL = "https://integrate.api.nvidia.com/v1/chat/completions"
 
-    async def get_embedding(self, text: str) -> List[float]:
-        if not settings.NVIDIA_API_KEY:
-            print("WARNING: NVIDIA_API_KEY not set. Returning mock embedding.")
-            return [0.0] * 1024
+    EMBEDDING_DIM = 1024
+    API_KEY_NAME = "NVIDIA_API_KEY"
+
+    def __init__(self):
+        # 동시에 들어오는 get_embedding 호출을 모아 배치 요청으로 전송
+        self._embedding_coalescer = EmbeddingCoalescer(self._fetch_embeddings)
 
+    def _api_key(self) -> str:
+        return settings.NVIDIA_API_KEY
+
+    def stats(self) -> dict:
+        return {
+            "embedding_batching": self._embedding_coalescer.stats(),
+            "embedding_cache": embedding_cache.stats(),
+            "rerank_cache": rerank_cache.stats(),
+        }
+
+    def _embedding_request(self, texts: List[str]):
         headers = {
             "Authorization": f"Bearer {settings.NVIDIA_API_KEY}",
             "Content-Type": "application/json",
             "Accept": "application/json",
         }
-
         payload = {
-            "input": text,
-            "model": "nvidia/nv-embed-v1",
+            "input": texts,
+            "model": self._embedding_model(),
         }
+        return headers, payload
+
+    def _embedding_model(self) -> str:
+        return "nvidia/nv-embed-v1"
+
+    def _embedding_cache_key(self, text: str) -> str:
+        return embedding_cache.make_key(
+            self.PROVIDER, self._embedding_model(), self.EMBEDDING_DIM, text
+        )
+
+    async def get_embedding(self, text: str) -> List[float]:
+        if not self._api_key():
+            print(f"WARNING: {self.API_KEY_NAME} not set. Returning mock embedding.")
+            return [0.0] * self.EMBEDDING_DIM
 
-        async with httpx.AsyncClient() as client:
+        cache_key = self._embedding_cache_key(text)
+        # SQLite 조회/저장은 worker thread에서 실행 (이벤트 루프를 막지 않도록)
+        cached = await asyncio.to_thread(embedding_cache.get, cache_key)
+        if cached is not None:
+            return cached
+
+        try:
+            vector = await self._embedding_coalescer.submit(text)
+        except Exception as e:
+            # fallback 벡터는 캐시에 저장하지 않음
+            print(f"Error calling {self.PROVIDER} embeddings: {e}")
+            return [0.0] * self.EMBEDDING_DIM
+
+        await asyncio.to_thread(embedding_cache.put, cache_key, vector)
+        return vector
+
+    async def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+
+        if not self._api_key():
+            print(f"WARNING: {self.API_KEY_NAME} not set. Returning mock embeddings.")
+            return [[0.0] * self.EMBEDDING_DIM for _ in texts]
+
+        keys = [self._embedding_cache_key(text) for text in texts]
+        cached = await asyncio.to_thread(embedding_cache.get_many, keys)
+        missing = list(dict.fromkeys(t for t, k in zip(texts, keys) if k not in cached))
+
+        if missing:
             try:
-                response = await client.post(
-                    self.EMBEDDING_URL,
-                    json=payload,
-                    headers=headers,
-                    timeout=10.0,
-                )
-                response.raise_for_status()
-                data = response.json()
-                return data["data"][0]["embedding"]
+                vectors = await self._fetch_embeddings(missing)
             except Exception as e:
-                print(f"Error calling NVIDIA API: {e}")
-                return [0.0] * 1024
+                print(f"Error calling {self.PROVIDER} embeddings: {e}")
+                return [
+                    cached.get(key) or [0.0] * self.EMBEDDING_DIM for key in keys
+                ]
+            fetched = {
+                self._embedding_cache_key(text): vector
+                for text, vector in zip(missing, vectors)
+            }
+            await asyncio.to_thread(embedding_cache.put_many, fetched)
+            cached.update(fetched)
+
+        return [cached[key] for key in keys]
+
+    async def _fetch_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        임베딩 API 배치 호출 (input에 리스트 전달). 실패 시 예외를 그대로 올린다.
+        """
+        headers, payload = self._embedding_request(texts)
+        # 임베딩은 멱등이므로 p95 지연을 넘기면 hedged 요청 허용
+        response = await self._post(
+            self.EMBEDDING_URL,
+            payload,
+            headers,
+            settings.HTTP_EMBEDDING_TIMEOUT,
+            kind="embedding",
+            hedge=settings.LLM_HEDGE_EMBEDDINGS,
+        )
+        data = response.json()["data"]
+        # 응답 순서가 보장되지 않으므로 index 기준으로 정렬
+        data = sorted(data, key=lambda item: item.get("index", 0))
+        if len(data) != len(texts):
+            raise ValueError(f"Expected {len(texts)} embeddings, got {len(data)}")
+        return [item["embedding"] for item in data]
 
     async def generate_graph_cypher(
         self, text: str, user_id: str, record_id: str, date: str
@@ -143,7 +312,7 @@ class NvidiaLLMService(LLMServiceInterface):
             "Accept": "application/json",
         }
 
-        records_text, graph_text = self._format_context(context_records, context_graph)
+        records_text, graph_text = self._format_context(question, context_records, context_graph)
         prompt = self._get_reasoning_prompt(question, records_text, graph_text)
 
         payload = {
@@ -166,6 +335,35 @@ class NvidiaLLMService(LLMServiceInterface):
                 "reasoning_summary": str(e),
             }
 
+    async def stream_answer_with_reasoning(
+        self, question: str, context_records: List[dict], context_graph: dict
+    ) -> AsyncIterator[dict]:
+        if not settings.NVIDIA_API_KEY:
+            result = self._mock_reasoning_response()
+            yield {"type": "token", "text": result["answer"]}
+            yield {"type": "result", "data": result}
+            return
+
+        headers = {
+            "Authorization": f"Bearer {settings.NVIDIA_API_KEY}",
+            "Content-Type": "application/json",
+            "Accept": "text/event-stream",
+        }
+
+        records_text, graph_text = self._format_context(question, context_records, context_graph)
+        prompt = self._get_reasoning_prompt(question, records_text, graph_text)
+
+        payload = {
+            "model": "meta/llama-3.1-70b-instruct",
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0.3,
+            "max_tokens": 1024,
+            "stream": True,
+        }
+
+        async for event in self._stream_reasoning(headers, payload):
+            yield event
+
     async def extract_entities(self, text: str) -> GraphData:
         if not settings.NVIDIA_API_KEY:
             return self._mock_graph_data()
@@ -196,14 +394,134 @@ class NvidiaLLMService(LLMServiceInterface):
             return GraphData(events=[], emotions=[])
 
     # --- Helpers ---
-    async def _call_chat_api(self, headers: dict, payload: dict) -> str:
-        async with httpx.AsyncClient() as client:
+    def _scheduler(self) -> ProviderScheduler:
+        return llm_scheduler.get_scheduler(self.PROVIDER)
+
+    @staticmethod
+    def _estimate_request_tokens(payload: dict) -> int:
+        """TPM 한도 계산용 요청 토큰 수 추정 (입력 + 최대 출력)."""
+        inputs = payload.get("input")
+        if inputs is not None:
+            texts = inputs if isinstance(inputs, list) else [inputs]
+        else:
+            texts = [m.get("content", "") for m in payload.get("messages", [])]
+        return sum(estimate_tokens(str(t)) for t in texts) + payload.get("max_tokens", 0)
+
+    async def _post(
+        self,
+        url: str,
+        payload: dict,
+        headers: dict,
+        timeout: float,
+        kind: str = "chat",
+        hedge: bool = False,
+    ):
+        """
+        Provider 공유 커넥션 풀(keep-alive/HTTP2)을 통해 POST 요청.
+        Provider 스케줄러가 동시성/RPM/TPM 한도와 429/5xx 재시도를 처리한다.
+        """
+        client = http_client_pool.get_client(self.PROVIDER)
+
+        async def send():
             response = await client.post(
-                self.CHAT_URL, json=payload, headers=headers, timeout=30.0
+                url,
+                json=payload,
+                headers=headers,
+                timeout=http_client_pool.timeout(timeout),
+                extensions=http_client_pool.trace_extension(self.PROVIDER),
             )
             response.raise_for_status()
-            data = response.json()
-            return data["choices"][0]["message"]["content"]
+            return response
+
+        return await self._scheduler().run(
+            send,
+            tokens=self._estimate_request_tokens(payload),
+            kind=kind,
+            hedge=hedge,
+        )
+
+    def _prepare_chat_request(self, headers: dict, payload: dict):
+        """Provider별 헤더/모델 보정 훅."""
+        return headers, payload
+
+    async def _call_chat_api(self, headers: dict, payload: dict) -> str:
+        headers, payload = self._prepare_chat_request(headers, payload)
+        response = await self._post(
+            self.CHAT_URL, payload, headers, settings.HTTP_CHAT_TIMEOUT
+        )
+        data = response.json()
+        return data["choices"][0]["message"]["content"]
+
+    async def _stream_chat_api(self, headers: dict, payload: dict) -> AsyncIterator[str]:
+        """
+        Chat Completions 스트리밍 호출 (SSE). content delta 문자열을 순서대로 yield.
+        """
+        headers, payload = self._prepare_chat_request(headers, payload)
+        client = http_client_pool.get_client(self.PROVIDER)
+        scheduler = self._scheduler()
+        tokens = self._estimate_request_tokens(payload)
+
+        attempt = 0
+        while True:
+            # 첫 바이트를 받기 전(상태 코드 단계)의 429/5xx만 재시도
+            retry_delay = None
+            async with scheduler.slot(tokens):
+                async with client.stream(
+                    "POST",
+                    self.CHAT_URL,
+                    json=payload,
+                    headers=headers,
+                    timeout=http_client_pool.timeout(settings.HTTP_CHAT_TIMEOUT),
+                    extensions=http_client_pool.trace_extension(self.PROVIDER),
+                ) as response:
+                    try:
+                        response.raise_for_status()
+                    except httpx.HTTPStatusError as e:
+                        retry_delay = scheduler.retry_delay(e, attempt)
+                        if retry_delay is None:
+                            raise
+
+                    if retry_delay is None:
+                        async for line in response.aiter_lines():
+                            if not line.startswith("data:"):
+                                continue
+                            data = line[len("data:"):].strip()
+                            if data == "[DONE]":
+                                break
+                            choices = json.loads(data).get("choices") or []
+                            if choices:
+                                delta = (choices[0].get("delta") or {}).get("content")
+                                if delta:
+                                    yield delta
+                        return
+            attempt += 1
+            await asyncio.sleep(retry_delay)
+
+    async def _stream_reasoning(self, headers: dict, payload: dict) -> AsyncIterator[dict]:
+        """
+        스트리밍 응답에서 "answer" 필드 문자열만 토큰 이벤트로 내보내고,
+        완료 후 전체 JSON을 파싱해 result 이벤트로 반환.
+        """
+        extractor = AnswerStreamExtractor()
+        chunks = []
+        try:
+            async for delta in self._stream_chat_api(headers, payload):
+                chunks.append(delta)
+                text = extractor.feed(delta)
+                if text:
+                    yield {"type": "token", "text": text}
+
+            content = "".join(chunks)
+            clean_content = content.replace("```json", "").replace("```", "").strip()
+            result = json.loads(clean_content)
+        except Exception as e:
+            print(f"Error streaming answer: {e}")
+            result = {
+                "answer": "Error generating answer",
+                "confidence": 0.0,
+                "reasoning_summary": str(e),
+            }
+        yield {"type": "result", "data": result}
 
     def _get_schema_description(self):
         return """
@@ -226,11 +544,16 @@ class NvidiaLLMService(LLMServiceInterface):
           - (:Event)-[:LEADS_TO]->(:Outcome)
         """
 
-    def _format_context(self, context_records, context_graph):
-        records_text = "\n".join(
-            [f"- [{r.get('recordId')}] {r.get('content')}" for r in context_records]
+    def _format_context(self, question, context_records, context_graph):
+        # 모델별 토큰 예산 안에서 기록(R1..)/그래프(N1..)를 압축 직렬화
+        budget = context_packer.budget_for_model(self._chat_model())
+        records_text, graph_text = context_packer.pack(
+            question, context_records, context_graph, budget
+        )
+        print(
+            f"[Context] ~{estimate_tokens(records_text) + estimate_tokens(graph_text)} "
+            f"tokens (budget {budget})"
         )
-        graph_text = str(context_graph)
         return records_text, graph_text
 
     def _get_reasoning_prompt(self, question, records_text, graph_text):
@@ -300,19 +623,56 @@ class NvidiaLLMService(LLMServiceInterface):
             emotions=["Neutral"],
         )
 
+    def _chat_model(self) -> str:
+        return "meta/llama-3.1-70b-instruct"
+
     async def rerank(
         self, query: str, documents: List[dict], top_k: int = 5
     ) -> List[dict]:
         """
         LLM 기반 Reranking: 질문과 각 문서의 관련성을 평가하여 재순위화.
+        (질문, recordId, 내용 해시, 모델) 단위로 점수를 캐시하여 캐시에 없는 문서만 LLM에 전송.
         """
         if not documents:
             return []
 
-        if not settings.NVIDIA_API_KEY:
-            print("WARNING: NVIDIA_API_KEY not set. Returning original order.")
+        if not self._api_key():
+            print(f"WARNING: {self.API_KEY_NAME} not set. Returning original order.")
+            return documents[:top_k]
+
+        model = self._chat_model()
+        scores = rerank_cache.get_scores(query, documents, model)
+        uncached = [doc for i, doc in enumerate(documents) if i not in scores]
+
+        try:
+            new_scores = await self._score_documents(query, uncached) if uncached else []
+        except Exception as e:
+            print(f"[Rerank] Error during reranking: {e}, returning original order")
             return documents[:top_k]
 
+        # LLM이 실제로 돌려준 점수만 캐시
+        rerank_cache.put_scores(query, uncached[: len(new_scores)], new_scores, model)
+
+        uncached_iter = iter(new_scores)
+        scored_docs = []
+        for i, doc in enumerate(documents):
+            doc_copy = doc.copy()
+            if i in scores:
+                doc_copy["relevance_score"] = scores[i]
+            else:
+                doc_copy["relevance_score"] = next(uncached_iter, 0.0)
+            scored_docs.append(doc_copy)
+
+        # 관련성 점수로 내림차순 정렬
+        scored_docs.sort(key=lambda x: x.get("relevance_score", 0), reverse=True)
+        print(
+            f"[Rerank] Reranked {len(documents)} documents "
+            f"({len(documents) - len(uncached)} cached)"
+        )
+        return scored_docs[:top_k]
+
+    async def _score_documents(self, query: str, documents: List[dict]) -> List[float]:
+        """문서 목록을 LLM에 보내 관련성 점수(0.0~1.0) 리스트를 받음."""
         headers = {
             "Authorization": f"Bearer {settings.NVIDIA_API_KEY}",
             "Content-Type": "application/json",
@@ -347,34 +707,17 @@ class NvidiaLLMService(LLMServiceInterface):
         """
 
         payload = {
-            "model": "meta/llama-3.1-70b-instruct",
+            "model": self._chat_model(),
             "messages": [{"role": "user", "content": prompt}],
             "temperature": 0.1,
             "max_tokens": 256,
             "stream": False,
         }
 
-        try:
-            content = await self._call_chat_api(headers, payload)
-            clean_content = content.replace("```json", "").replace("```", "").strip()
-            result = json.loads(clean_content)
-            scores = result.get("scores", [])
-
-            # 점수를 문서에 추가하고 정렬
-            scored_docs = []
-            for i, doc in enumerate(documents):
-                doc_copy = doc.copy()
-                doc_copy["relevance_score"] = scores[i] if i < len(scores) else 0.0
-                scored_docs.append(doc_copy)
-
-            # 관련성 점수로 내림차순 정렬
-            scored_docs.sort(key=lambda x: x.get("relevance_score", 0), reverse=True)
-            print(f"[Rerank] Reranked {len(documents)} documents")
-            return scored_docs[:top_k]
-
-        except Exception as e:
-            print(f"[Rerank] Error during reranking: {e}, returning original order")
-            return documents[:top_k]
+        content = await self._call_chat_api(headers, payload)
+        clean_content = content.replace("```json", "").replace("```", "").strip()
+        result = json.loads(clean_content)
+        return [float(score) for score in result.get("scores", [])][: len(documents)]
 
 
 class OpenAILLMService(NvidiaLLMService):
@@ -383,41 +726,34 @@ class OpenAILLMService(NvidiaLLMService):
     Inherits helpers from NvidiaLLMService since prompts and logic are largely compatible.
     """
 
+    PROVIDER = "openai"
     EMBEDDING_URL = "https://api.openai.com/v1/embeddings"
     CHAT_URL = "https://api.openai.com/v1/chat/completions"
 
-    async def get_embedding(self, text: str) -> List[float]:
-        if not settings.OPENAI_API_KEY:
-            print("WARNING: OPENAI_API_KEY not set. Returning mock embedding.")
-            return [0.0] * 1536  # OpenAI embeddings are usually 1536 dims
+    EMBEDDING_DIM = 1536  # OpenAI embeddings are usually 1536 dims
+    API_KEY_NAME = "OPENAI_API_KEY"
+
+    def _api_key(self) -> str:
+        return settings.OPENAI_API_KEY
+
+    def _chat_model(self) -> str:
+        return settings.OPENAI_MODEL_NAME
 
+    def _embedding_model(self) -> str:
+        return settings.OPENAI_EMBEDDING_MODEL
+
+    def _embedding_request(self, texts: List[str]):
         headers = {
             "Authorization": f"Bearer {settings.OPENAI_API_KEY}",
             "Content-Type": "application/json",
         }
-
         payload = {
-            "input": text,
+            "input": texts,
             "model": settings.OPENAI_EMBEDDING_MODEL,
         }
+        return headers, payload
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(
-                    self.EMBEDDING_URL,
-                    json=payload,
-                    headers=headers,
-                    timeout=10.0,
-                )
-                response.raise_for_status()
-                data = response.json()
-                return data["data"][0]["embedding"]
-            except Exception as e:
-                print(f"Error calling OpenAI Embeddings: {e}")
-                return [0.0] * 1536
-
-    async def _call_chat_api(self, headers: dict, payload: dict) -> str:
-        # Override to use OpenAI URL and potentially adjust payload if needed
+    def _prepare_chat_request(self, headers: dict, payload: dict):
         # OpenAI payload is compatible with what we constructed in base class,
         # but we need to ensure the headers use the OpenAI Key.
 
@@ -429,14 +765,7 @@ class OpenAILLMService(NvidiaLLMService):
             "Authorization": f"Bearer {settings.OPENAI_API_KEY}",
             "Content-Type": "application/json",
         }
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.CHAT_URL, json=payload, headers=openai_headers, timeout=30.0
-            )
-            response.raise_for_status()
-            data = response.json()
-            return data["choices"][0]["message"]["content"]
+        return openai_headers, payload
 
     async def generate_answer_with_reasoning(
         self, question: str, context_records: List[dict], context_graph: dict
@@ -444,7 +773,7 @@ class OpenAILLMService(NvidiaLLMService):
         if not settings.OPENAI_API_KEY:
             return self._mock_reasoning_response()
 
-        records_text, graph_text = self._format_context(context_records, context_graph)
+        records_text, graph_text = self._format_context(question, context_records, context_graph)
         prompt = self._get_reasoning_prompt(question, records_text, graph_text)
 
         payload = {
@@ -467,103 +796,61 @@ class OpenAILLMService(NvidiaLLMService):
                 "reasoning_summary": str(e),
             }
 
-    async def extract_entities(self, text: str) -> GraphData:
+    async def stream_answer_with_reasoning(
+        self, question: str, context_records: List[dict], context_graph: dict
+    ) -> AsyncIterator[dict]:
         if not settings.OPENAI_API_KEY:
-            return self._mock_graph_data()
+            result = self._mock_reasoning_response()
+            yield {"type": "token", "text": result["answer"]}
+            yield {"type": "result", "data": result}
+            return
 
-        prompt = self._get_extraction_prompt(text)
+        records_text, graph_text = self._format_context(question, context_records, context_graph)
+        prompt = self._get_reasoning_prompt(question, records_text, graph_text)
 
         payload = {
             "model": settings.OPENAI_MODEL_NAME,
             "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.2,
+            "temperature": 0.3,
             "max_tokens": 1024,
-            "stream": False,
+            "stream": True,
         }
 
-        try:
-            content = await self._call_chat_api({}, payload)
-            clean_content = content.replace("```json", "").replace("```", "").strip()
-            parsed = json.loads(clean_content)
-            return GraphData(**parsed)
-        except Exception as e:
-            print(f"Entities extraction error: {e}")
-            return GraphData(events=[], emotions=[])
-
-    async def rerank(
-        self, query: str, documents: List[dict], top_k: int = 5
-    ) -> List[dict]:
-        """
-        OpenAI 기반 Reranking: 질문과 각 문서의 관련성을 평가하여 재순위화.
-        """
-        if not documents:
-            return []
+        async for event in self._stream_reasoning({}, payload):
+            yield event
 
+    async def extract_entities(self, text: str) -> GraphData:
         if not settings.OPENAI_API_KEY:
-            print("WARNING: OPENAI_API_KEY not set. Returning original order.")
-            return documents[:top_k]
-
-        # 문서들을 번호와 함께 포맷팅
-        docs_text = "\n".join(
-            [
-                f"[문서 {i+1}] {doc.get('title', '제목 없음')}: {doc.get('content', '')[:500]}"
-                for i, doc in enumerate(documents)
-            ]
-        )
-
-        prompt = f"""
-        당신은 검색 결과의 관련성을 평가하는 전문가입니다.
-
-        사용자 질문: "{query}"
-
-        다음 문서들의 질문에 대한 관련성을 0.0~1.0 점수로 평가하세요.
-
-        문서 목록:
-        {docs_text}
-
-        각 문서에 대해 관련성 점수를 매기고, JSON 형식으로만 응답하세요.
-        관련성이 높을수록 1.0에 가깝고, 관련 없으면 0.0에 가깝습니다.
+            return self._mock_graph_data()
 
-        출력 형식 (JSON만, 다른 텍스트 없이):
-        {{
-            "scores": [0.9, 0.7, 0.3, ...]
-        }}
-        """
+        prompt = self._get_extraction_prompt(text)
 
         payload = {
             "model": settings.OPENAI_MODEL_NAME,
             "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.1,
-            "max_tokens": 256,
+            "temperature": 0.2,
+            "max_tokens": 1024,
             "stream": False,
         }
 
         try:
             content = await self._call_chat_api({}, payload)
             clean_content = content.replace("```json", "").replace("```", "").strip()
-            result = json.loads(clean_content)
-            scores = result.get("scores", [])
-
-            # 점수를 문서에 추가하고 정렬
-            scored_docs = []
-            for i, doc in enumerate(documents):
-                doc_copy = doc.copy()
-                doc_copy["relevance_score"] = scores[i] if i < len(scores) else 0.0
-                scored_docs.append(doc_copy)
-
-            # 관련성 점수로 내림차순 정렬
-            scored_docs.sort(key=lambda x: x.get("relevance_score", 0), reverse=True)
-            print(f"[Rerank] Reranked {len(documents)} documents")
-            return scored_docs[:top_k]
-
+            parsed = json.loads(clean_content)
+            return GraphData(**parsed)
         except Exception as e:
-            print(f"[Rerank] Error during reranking: {e}, returning original order")
-            return documents[:top_k]
+            print(f"Entities extraction error: {e}")
+            return GraphData(events=[], emotions=[])
 
 
 def get_llm_service() -> LLMServiceInterface:
     if settings.LLM_PROVIDER == "openai":
         return OpenAILLMService()
+    elif settings.LLM_PROVIDER == "local":
+        # 네트워크 없는 결정적 Provider (부하 테스트/오프라인 개발용)
+        from app.services.local_llm_service import LocalLLMService
+
+        return LocalLLMService()
     else:
         return NvidiaLLMService()
 
@@ -0,0 +1,226 @@
+import asyncio
+import hashlib
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import AsyncIterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.core.tokenizer import strip_particle, tokenize
+from app.models.domain.graph import GraphData, GraphEvent
+from app.services.llm_service import LLMServiceInterface
+
+settings = get_settings()
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?。])\s+|\n+")
+
+# extract_entities용 간단한 감정 사전
+EMOTION_LEXICON = {
+    "행복": "행복",
+    "기쁘": "기쁨",
+    "기뻤": "기쁨",
+    "즐거": "즐거움",
+    "설레": "설렘",
+    "뿌듯": "뿌듯함",
+    "감사": "감사",
+    "슬프": "슬픔",
+    "슬펐": "슬픔",
+    "우울": "우울",
+    "외로": "외로움",
+    "화가": "분노",
+    "짜증": "짜증",
+    "불안": "불안",
+    "걱정": "걱정",
+    "긴장": "긴장",
+    "피곤": "피곤",
+    "지쳤": "피곤",
+    "happy": "happy",
+    "sad": "sad",
+    "angry": "angry",
+    "tired": "tired",
+}
+
+# 사람을 가리키는 접미사 (예: "민수씨", "팀장님")
+PERSON_SUFFIXES = ("씨", "님")
+# 행동으로 볼 어미 (예: "운동했다" -> "운동")
+ACTION_SUFFIXES = ("했다", "했어", "했고", "하고", "해서")
+
+
+@lru_cache(maxsize=262144)
+def _feature_slot(feature: str, dim: int) -> Tuple[int, float]:
+    """feature 문자열 -> (벡터 인덱스, 부호). 프로세스/실행과 무관하게 결정적."""
+    digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+    value = int.from_bytes(digest, "little")
+    return value % dim, 1.0 if (value >> 63) & 1 else -1.0
+
+
+class LocalLLMService(LLMServiceInterface):
+    """
+    네트워크 없이 동작하는 결정적(deterministic) Provider. (LLM_PROVIDER=local)
+
+    - 임베딩: 문자 n-gram(2~3) + 단어 토큰을 해싱한 벡터 (NumPy, L2 정규화)
+      -> 같은 텍스트는 항상 같은 벡터, 비슷한 텍스트는 높은 cosine 유사도
+    - 엔티티 추출/답변/Rerank: 규칙 기반으로 스키마에 맞는 결과를 빠르게 생성
+    - LOCAL_LLM_LATENCY_MS로 인위적인 지연을 넣어 부하 테스트에 사용 가능
+    """
+
+    PROVIDER = "local"
+
+    def __init__(self, dim: Optional[int] = None, latency_ms: Optional[float] = None):
+        self.dim = settings.LOCAL_EMBEDDING_DIM if dim is None else dim
+        self.latency_ms = settings.LOCAL_LLM_LATENCY_MS if latency_ms is None else latency_ms
+        self._stats = {"embeddings": 0, "chat_calls": 0}
+
+    async def _simulate_latency(self):
+        if self.latency_ms > 0:
+            await asyncio.sleep(self.latency_ms / 1000.0)
+
+    # --- Embeddings ---
+    def _features(self, text: str) -> Counter:
+        features: Counter = Counter()
+        for token in tokenize(text, bigrams=False):
+            features[f"w:{token}"] += 1
+            padded = f"<{token}>"
+            for n in (2, 3):
+                for i in range(len(padded) - n + 1):
+                    features[f"c{n}:{padded[i:i + n]}"] += 1
+        return features
+
+    def embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        features = self._features(text)
+        if features:
+            slots = [_feature_slot(f, self.dim) for f in features]
+            index = np.fromiter((s[0] for s in slots), dtype=np.int64, count=len(slots))
+            weight = np.fromiter(
+                (sign * (1.0 + np.log(count)) for (_, sign), count in zip(slots, features.values())),
+                dtype=np.float32,
+                count=len(slots),
+            )
+            np.add.at(vector, index, weight)
+            norm = np.linalg.norm(vector)
+            if norm > 0:
+                vector /= norm
+        self._stats["embeddings"] += 1
+        return vector.tolist()
+
+    async def get_embedding(self, text: str) -> List[float]:
+        return self.embed(text)
+
+    async def get_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed(text) for text in texts]
+
+    # --- Graph ---
+    async def generate_graph_cypher(
+        self, text: str, user_id: str, record_id: str, date: str
+    ) -> str:
+        # Local Provider는 GraphWriter(GRAPH_WRITE_MODE=structured) 경로만 지원
+        print("[Local] generate_graph_cypher is not supported; use GRAPH_WRITE_MODE=structured")
+        return ""
+
+    async def extract_entities(self, text: str) -> GraphData:
+        await self._simulate_latency()
+        self._stats["chat_calls"] += 1
+
+        events = []
+        emotions: List[str] = []
+        for sentence in self._split_sentences(text)[:5]:
+            words = [w for w in re.split(r"\s+", sentence) if w]
+            people, actions = [], []
+            for word in words:
+                word = re.sub(r"[^\w]", "", word)
+                stem = strip_particle(word)
+                if len(stem) > 1 and stem.endswith(PERSON_SUFFIXES):
+                    people.append(stem)
+                for suffix in ACTION_SUFFIXES:
+                    if word.endswith(suffix) and len(word) > len(suffix):
+                        actions.append(word[: -len(suffix)])
+                        break
+                for key, label in EMOTION_LEXICON.items():
+                    if key in word.lower() and label not in emotions:
+                        emotions.append(label)
+            events.append(
+                GraphEvent(
+                    summary=sentence[:50],
+                    people=list(dict.fromkeys(people)),
+                    actions=list(dict.fromkeys(actions)),
+                    outcomes=[],
+                )
+            )
+        return GraphData(events=events, emotions=emotions)
+
+    # --- Answer ---
+    @staticmethod
+    def _split_sentences(text: str) -> List[str]:
+        return [s.strip() for s in _SENTENCE_SPLIT.split(text or "") if s.strip()]
+
+    def _best_evidence(self, question: str, context_records: List[dict]):
+        """질문 토큰과 가장 많이 겹치는 (기록, 문장, 겹친 토큰 수)."""
+        query_terms = set(tokenize(question))
+        best = (None, "", 0)
+        for record in context_records:
+            for sentence in self._split_sentences(record.get("content", "")):
+                overlap = len(query_terms & set(tokenize(sentence)))
+                if overlap > best[2]:
+                    best = (record, sentence, overlap)
+        return best, len(query_terms)
+
+    async def generate_answer_with_reasoning(
+        self, question: str, context_records: List[dict], context_graph: dict
+    ) -> dict:
+        await self._simulate_latency()
+        self._stats["chat_calls"] += 1
+
+        (record, sentence, overlap), query_size = self._best_evidence(question, context_records)
+        if record is None:
+            return {
+                "answer": "음, 그건 기억에 없는 것 같아.",
+                "confidence": 0.0,
+                "reasoning_summary": f"{len(context_records)}개 기록 중 질문과 겹치는 문장이 없음",
+            }
+
+        return {
+            "answer": f"{record.get('date', '')}에 이렇게 적었어: {sentence}".strip(),
+            "confidence": round(min(1.0, overlap / max(query_size, 1)), 2),
+            "reasoning_summary": (
+                f"{len(context_records)}개 기록 중 '{record.get('title', '')}' 기록의 문장이 "
+                f"질문과 {overlap}개 토큰이 겹침"
+            ),
+        }
+
+    async def stream_answer_with_reasoning(
+        self, question: str, context_records: List[dict], context_graph: dict
+    ) -> AsyncIterator[dict]:
+        result = await self.generate_answer_with_reasoning(
+            question, context_records, context_graph
+        )
+        for token in re.findall(r"\S+\s*", result["answer"]):
+            yield {"type": "token", "text": token}
+        yield {"type": "result", "data": result}
+
+    # --- Rerank ---
+    async def rerank(
+        self, query: str, documents: List[dict], top_k: int = 5
+    ) -> List[dict]:
+        if not documents:
+            return []
+
+        query_vector = np.asarray(self.embed(query), dtype=np.float32)
+        doc_vectors = np.asarray(
+            [self.embed(f"{d.get('title', '')} {d.get('content', '')}") for d in documents],
+            dtype=np.float32,
+        )
+        scores = doc_vectors @ query_vector
+
+        scored_docs = []
+        for doc, score in zip(documents, scores):
+            doc_copy = doc.copy()
+            doc_copy["relevance_score"] = float(max(0.0, score))
+            scored_docs.append(doc_copy)
+        scored_docs.sort(key=lambda x: x["relevance_score"], reverse=True)
+        return scored_docs[:top_k]
+
+    def stats(self) -> dict:
+        return {"local": dict(self._stats)}
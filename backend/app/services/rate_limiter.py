@@ -0,0 +1,323 @@
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+import httpx
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    분당 허용량(rate_per_minute)만큼 채워지는 토큰 버킷.
+    rate_per_minute <= 0 이면 제한 없음.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate <= 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0):
+        if self.unlimited:
+            return
+        # 버킷 용량보다 큰 요청은 용량만큼만 소비 (영원히 대기하지 않도록)
+        amount = min(amount, self.capacity)
+        # Lock으로 FIFO 순서 보장: 앞 요청이 채워질 때까지 뒤 요청은 대기
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+
+
+class LatencyWindow:
+    """최근 N개 지연시간(초)의 분위수 계산용 슬라이딩 윈도우."""
+
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def add(self, value: float):
+        self._samples.append(value)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def percentile(self, q: float) -> float:
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class ProviderScheduler:
+    """
+    Provider 하나에 대한 요청 스케줄러.
+
+    - 동시 요청 수 제한 (Semaphore)
+    - 분당 요청 수(RPM) / 분당 토큰 수(TPM) 토큰 버킷
+    - 429/5xx/네트워크 오류 시 jitter가 들어간 지수 백오프 재시도 (Retry-After 우선,
+      retry_after_max보다 긴 Retry-After는 기다리지 않고 실패)
+    - 선택적으로 p95 지연 이후 같은 요청을 한 번 더 보내는 hedging (멱등 요청 전용)
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_concurrency: int = 8,
+        max_retries: Optional[int] = None,
+        retry_base_delay: Optional[float] = None,
+        retry_max_delay: Optional[float] = None,
+        retry_after_max: Optional[float] = None,
+    ):
+        self.provider = provider
+        self.max_concurrency = max_concurrency
+        self.max_retries = settings.LLM_MAX_RETRIES if max_retries is None else max_retries
+        self.retry_base_delay = (
+            settings.LLM_RETRY_BASE_DELAY if retry_base_delay is None else retry_base_delay
+        )
+        self.retry_max_delay = (
+            settings.LLM_RETRY_MAX_DELAY if retry_max_delay is None else retry_max_delay
+        )
+        self.retry_after_max = (
+            settings.LLM_RETRY_AFTER_MAX if retry_after_max is None else retry_after_max
+        )
+
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._request_bucket = TokenBucket(requests_per_minute)
+        self._token_bucket = TokenBucket(tokens_per_minute)
+
+        self._waiting = 0
+        self._in_flight = 0
+        self._wait_times = LatencyWindow()
+        self._latencies: Dict[str, LatencyWindow] = {}
+        self._stats = {
+            "requests": 0,
+            "retries": 0,
+            "throttled": 0,
+            "failures": 0,
+            "hedged": 0,
+            "hedge_wins": 0,
+        }
+
+    # --- Admission ---
+    @asynccontextmanager
+    async def slot(self, tokens: float = 0):
+        """동시성/RPM/TPM 한도 안에서 요청 하나를 실행할 자리를 확보."""
+        self._waiting += 1
+        started = time.monotonic()
+        try:
+            await self._semaphore.acquire()
+            try:
+                await self._request_bucket.acquire(1)
+                if tokens:
+                    await self._token_bucket.acquire(tokens)
+            except BaseException:
+                self._semaphore.release()
+                raise
+        finally:
+            self._waiting -= 1
+        self._wait_times.add(time.monotonic() - started)
+
+        self._in_flight += 1
+        self._stats["requests"] += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self._semaphore.release()
+
+    # --- Retry ---
+    @staticmethod
+    def is_retryable(error: Exception) -> bool:
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in RETRYABLE_STATUS
+        return isinstance(error, httpx.TransportError)
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        response = getattr(error, "response", None)
+        value = response.headers.get("Retry-After") if response is not None else None
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def backoff_delay(self, attempt: int, error: Optional[Exception] = None) -> float:
+        """
+        Retry-After가 있으면 그 값을 그대로 (서버가 요청한 대기보다 일찍 재시도하면 다시 429),
+        없으면 retry_max_delay로 제한한 full-jitter 지수 백오프.
+        (retry_after_max를 넘는 Retry-After는 retry_delay에서 재시도하지 않음)
+        """
+        retry_after = self._retry_after(error) if error is not None else None
+        if retry_after is not None:
+            return retry_after
+        ceiling = min(self.retry_max_delay, self.retry_base_delay * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """
+        재시도할 오류면 대기 시간(초)을, 아니면 None을 반환하고 통계를 갱신.
+        attempt: 지금까지 재시도한 횟수
+        """
+        if isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 429:
+            self._stats["throttled"] += 1
+        if attempt >= self.max_retries or not self.is_retryable(error):
+            self._stats["failures"] += 1
+            return None
+
+        retry_after = self._retry_after(error)
+        if retry_after is not None and retry_after > self.retry_after_max:
+            # 요청을 몇 분씩 붙잡아 두지 않도록 바로 실패
+            self._stats["failures"] += 1
+            print(
+                f"[RateLimit] {self.provider} asked to retry after {retry_after:.0f}s "
+                f"(> {self.retry_after_max:.0f}s), giving up"
+            )
+            return None
+
+        delay = self.backoff_delay(attempt, error)
+        self._stats["retries"] += 1
+        print(
+            f"[RateLimit] {self.provider} request failed ({error.__class__.__name__}), "
+            f"retry {attempt + 1}/{self.max_retries} in {delay:.2f}s"
+        )
+        return delay
+
+    async def run(
+        self,
+        fn: Callable[[], Awaitable[T]],
+        tokens: float = 0,
+        kind: str = "chat",
+        hedge: bool = False,
+    ) -> T:
+        """
+        fn을 한도 안에서 실행하고 일시적 오류는 재시도.
+        hedge=True면 p95 지연이 지나도 응답이 없을 때 같은 요청을 하나 더 보냄.
+        """
+        attempt = 0
+        while True:
+            try:
+                if hedge:
+                    return await self._run_hedged(fn, tokens, kind)
+                return await self._run_once(fn, tokens, kind)
+            except Exception as e:
+                delay = self.retry_delay(e, attempt)
+                if delay is None:
+                    raise
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def _run_once(self, fn: Callable[[], Awaitable[T]], tokens: float, kind: str) -> T:
+        async with self.slot(tokens):
+            started = time.monotonic()
+            result = await fn()
+            self._latencies.setdefault(kind, LatencyWindow()).add(time.monotonic() - started)
+            return result
+
+    def hedge_delay(self, kind: str) -> Optional[float]:
+        """충분한 표본이 쌓였을 때만 p95 지연을 hedge 기준으로 사용."""
+        window = self._latencies.get(kind)
+        if window is None or len(window) < settings.LLM_HEDGE_MIN_SAMPLES:
+            return None
+        return window.percentile(0.95)
+
+    async def _run_hedged(self, fn: Callable[[], Awaitable[T]], tokens: float, kind: str) -> T:
+        delay = self.hedge_delay(kind)
+        if delay is None:
+            return await self._run_once(fn, tokens, kind)
+
+        primary = asyncio.ensure_future(self._run_once(fn, tokens, kind))
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        self._stats["hedged"] += 1
+        backup = asyncio.ensure_future(self._run_once(fn, tokens, kind))
+        pending = {primary, backup}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            self._stats["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "queue_depth": self._waiting,
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            "wait_ms_p50": round(self._wait_times.percentile(0.5) * 1000, 2),
+            "wait_ms_p95": round(self._wait_times.percentile(0.95) * 1000, 2),
+            "latency_ms_p95": {
+                kind: round(window.percentile(0.95) * 1000, 2)
+                for kind, window in self._latencies.items()
+            },
+        }
+
+
+class LLMScheduler:
+    """Provider별 ProviderScheduler 레지스트리 (설정: LLM_RATE_LIMITS)."""
+
+    schedulers: Dict[str, ProviderScheduler] = {}
+
+    @classmethod
+    def get_scheduler(cls, provider: str) -> ProviderScheduler:
+        scheduler = cls.schedulers.get(provider)
+        if scheduler is None:
+            limits = settings.LLM_RATE_LIMITS.get(provider, {})
+            scheduler = ProviderScheduler(
+                provider,
+                requests_per_minute=limits.get("rpm", 0),
+                tokens_per_minute=limits.get("tpm", 0),
+                max_concurrency=int(limits.get("concurrency", 8)),
+            )
+            cls.schedulers[provider] = scheduler
+        return scheduler
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        return {provider: s.stats() for provider, s in cls.schedulers.items()}
+
+
+llm_scheduler = LLMScheduler()
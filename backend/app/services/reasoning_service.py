@@ -1,9 +1,16 @@
-from typing import List, Optional
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from app.core.chunking import passage_context
+from app.core.config import get_settings
+from app.core.temporal import parse_date_range
 from app.db.vector import vector_db
 from app.db.graph import neo4j_db
 from app.services.llm_service import llm_service
+from app.services.rerank_service import LocalReranker, reranker
 from app.models.schemas.question_req import QuestionRequest, QuestionResponse
 
+settings = get_settings()
+
 
 class ReasoningService:
 
@@ -13,48 +20,199 @@ class ReasoningService:
         Orchestrate the RAG process:
         1. Embed question
         2. Hybrid Search (Vector + Text with RRF) + Time Decay
-        3. Reranking (LLM-based relevance scoring)
+        3. Reranking (LLM or local CPU relevance scoring)
         4. Graph Traversal (Context Expansion around records)
         5. LLM Reasoning (Synthesize answer)
         """
+        query_embedding = ReasoningService._embed(request)
+        initial_results = await ReasoningService._search(request, query_embedding=query_embedding)
+        reranked_results = await ReasoningService._rerank(request, initial_results, query_embedding)
+        graph_context = await ReasoningService._expand_graph(request, reranked_results)
+
+        # 5. LLM Reasoning
+        llm_response = await llm_service.generate_answer_with_reasoning(
+            question=request.text,
+            context_records=reranked_results,  # Reranked 결과 사용
+            context_graph=graph_context,
+        )
+
+        # 6. Construct Response
+        return ReasoningService._build_response(
+            llm_response, reranked_results, graph_context
+        )
+
+    @staticmethod
+    async def stream_answer(
+        request: QuestionRequest,
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        answer_question의 스트리밍 버전. (event, data) 튜플을 순서대로 yield:
+        - candidates: 하이브리드 검색 후보 수, 적용된 필터, 검색 branch별 소요 시간
+        - reranked: 재순위화된 recordId 목록
+        - graph: 서브그래프 크기
+        - token: 답변 토큰 (Provider 스트리밍)
+        - final: QuestionResponse와 동일한 payload
+        """
+        timings: Dict[str, float] = {}
+        filters = ReasoningService._filters(request)
+        query_embedding = ReasoningService._embed(request)
+        initial_results = await ReasoningService._search(request, timings, filters, query_embedding)
+        yield "candidates", {
+            "count": len(initial_results),
+            "recordIds": [r.get("recordId") for r in initial_results],
+            "filters": filters,
+            "timings": timings,
+        }
+
+        reranked_results = await ReasoningService._rerank(request, initial_results, query_embedding)
+        yield "reranked", {
+            "recordIds": [r.get("recordId") for r in reranked_results],
+            "scores": [r.get("relevance_score") for r in reranked_results],
+        }
+
+        graph_context = await ReasoningService._expand_graph(request, reranked_results)
+        yield "graph", {
+            "node_count": len(graph_context.get("nodes", [])),
+            "edge_count": len(graph_context.get("edges", [])),
+        }
+
+        llm_response: Optional[dict] = None
+        async for event in llm_service.stream_answer_with_reasoning(
+            question=request.text,
+            context_records=reranked_results,
+            context_graph=graph_context,
+        ):
+            if event["type"] == "token":
+                yield "token", {"text": event["text"]}
+            elif event["type"] == "result":
+                llm_response = event["data"]
+
+        response = ReasoningService._build_response(
+            llm_response or {}, reranked_results, graph_context
+        )
+        yield "final", response.model_dump()
+
+    @staticmethod
+    def _filters(request: QuestionRequest) -> Dict[str, Any]:
+        """
+        검색 사전 필터 (dateFrom/dateTo/feel).
+        요청에 날짜 범위가 없으면 질문 속 시간 표현("지난주", "작년 겨울", "3월에" 등)에서 추론.
+        """
+        date_from, date_to, inferred = request.dateFrom, request.dateTo, False
+        if date_from is None and date_to is None:
+            parsed = parse_date_range(request.text)
+            if parsed:
+                (date_from, date_to), inferred = parsed, True
+        return {
+            "dateFrom": date_from.isoformat() if date_from else None,
+            "dateTo": date_to.isoformat() if date_to else None,
+            "feel": request.feel or None,
+            "inferred": inferred,
+        }
 
-        # 1. Embed Question
-        query_embedding = await llm_service.get_embedding(request.text)
+    @staticmethod
+    def _embed(request: QuestionRequest) -> asyncio.Future:
+        """질문 임베딩 Task (검색의 벡터 branch와 로컬 Reranker의 cosine이 함께 사용)."""
+        return asyncio.ensure_future(llm_service.get_embedding(request.text))
+
+    @staticmethod
+    def _resolved_embedding(query_embedding: Optional[asyncio.Future]) -> Optional[List[float]]:
+        """검색이 끝난 시점에 이미 계산된 임베딩만 반환 (rerank에서 임베딩을 기다리지 않음)."""
+        if query_embedding is None or not query_embedding.done() or query_embedding.cancelled():
+            return None
+        if query_embedding.exception() is not None:
+            return None
+        return query_embedding.result()
+
+    @staticmethod
+    async def _search(
+        request: QuestionRequest,
+        timings: Optional[Dict[str, float]] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        query_embedding: Optional[asyncio.Future] = None,
+    ) -> List[Dict[str, Any]]:
+        filters = filters or ReasoningService._filters(request)
+
+        # 1. Embed Question (Task로 시작만 하고 기다리지 않음)
+        # - 텍스트 검색은 임베딩이 필요 없으므로 임베딩 계산과 동시에 진행됨
+        query_embedding = query_embedding or ReasoningService._embed(request)
 
         # 2. Hybrid Search (Vector + Text) with Time Decay
-        # - 벡터 검색(의미 기반)과 텍스트 검색(키워드 기반)을 RRF로 결합
+        # - 벡터 검색(의미 기반)과 텍스트 검색(키워드 기반)을 동시에 실행하고 RRF로 결합
+        # - 날짜 범위/감정 태그는 두 검색의 사전 필터로 적용 (해당 slice에서만 후보 생성)
         # - 시간 감쇠(Time Decay)로 최신 기록에 가중치 부여
         # - Reranking을 위해 더 많은 후보를 가져옴
-        initial_results = await vector_db.search(
-            query_vector=query_embedding,
-            user_id=request.userId,
-            top_k=10,  # Reranking을 위해 더 많이 가져옴
-            query_text=request.text,
-            use_hybrid=True,
-            vector_weight=0.5,
-            text_weight=0.5,
-            use_time_decay=True,  # 최신 기록 우선
-            time_decay_weight=0.3,  # 시간 가중치 30%
-        )
+        async def search(date_from, date_to):
+            return await vector_db.search(
+                query_vector=query_embedding,
+                user_id=request.userId,
+                top_k=settings.RETRIEVAL_TOP_K,  # Reranking을 위해 더 많이 가져옴
+                query_text=request.text,
+                use_hybrid=True,
+                vector_weight=settings.RETRIEVAL_VECTOR_WEIGHT,
+                text_weight=settings.RETRIEVAL_TEXT_WEIGHT,
+                use_time_decay=True,  # 최신 기록 우선
+                time_decay_weight=settings.RETRIEVAL_TIME_DECAY_WEIGHT,  # 기본 30%
+                timings=timings,
+                date_from=date_from,
+                date_to=date_to,
+                feel=filters["feel"],
+            )
+
+        initial_results = await search(filters["dateFrom"], filters["dateTo"])
+        if not initial_results and filters["inferred"]:
+            # 질문에서 추론한 날짜 범위가 틀렸을 수 있음 -> 날짜 필터 없이 다시 검색
+            print(f"[DEBUG] No records in inferred range {filters['dateFrom']}~{filters['dateTo']}, retrying")
+            filters.update(dateFrom=None, dateTo=None, inferred=False)
+            initial_results = await search(None, None)
 
         print(f"[DEBUG] Hybrid search (with time decay) found {len(initial_results)} candidates")
+        if settings.PASSAGE_RETRIEVAL:
+            # 긴 기록은 가장 관련 있는 passage만 rerank/답변 프롬프트로 전달
+            initial_results = [
+                passage_context(
+                    doc,
+                    request.text,
+                    settings.PASSAGE_MAX_CHARS,
+                    settings.PASSAGE_OVERLAP_CHARS,
+                    settings.PASSAGES_PER_RECORD,
+                    doc.get("passages"),
+                )
+                for doc in initial_results
+            ]
+        return initial_results
 
-        # 3. Reranking (LLM-based)
+    @staticmethod
+    async def _rerank(
+        request: QuestionRequest,
+        initial_results: List[Dict[str, Any]],
+        query_embedding: Optional[asyncio.Future] = None,
+    ) -> List[Dict[str, Any]]:
+        # 3. Reranking (RERANK_PROVIDER: LLM 또는 로컬 CPU Reranker)
         # 초기 검색 결과를 질문과의 관련성에 따라 재순위화
-        reranked_results = await llm_service.rerank(
+        extra = {}
+        if isinstance(reranker, LocalReranker):
+            # 텍스트 검색으로만 찾은 후보도 질문 임베딩과 저장된 임베딩의 cosine으로 평가
+            extra = {
+                "query_vector": ReasoningService._resolved_embedding(query_embedding),
+                "user_id": request.userId,
+            }
+        reranked_results = await reranker.rerank(
             query=request.text,
             documents=initial_results,
             top_k=5,  # 최종 사용할 문서 수
+            **extra,
         )
 
         print(f"[DEBUG] After reranking: {len(reranked_results)} documents selected")
+        return reranked_results
 
-        # MongoDB _id: 프론트엔드 호환용
-        mongo_ids = [str(res["_id"]) for res in reranked_results if "_id" in res]
+    @staticmethod
+    async def _expand_graph(
+        request: QuestionRequest, reranked_results: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
         # recordId: Neo4j 그래프 조회용 (UUID)
         record_ids = [res["recordId"] for res in reranked_results if "recordId" in res]
-
-        print(f"[DEBUG] MongoDB IDs: {mongo_ids}")
         print(f"[DEBUG] Record IDs (for Neo4j): {record_ids}")
 
         # 4. Graph Retrieval (Context Subgraph)
@@ -62,21 +220,23 @@ class ReasoningService:
         graph_context = await neo4j_db.get_context_subgraph(
             user_id=request.userId,
             record_ids=record_ids,  # recordId 사용
-            hop=1,  # Start with 1-hop for speed
+            hop=settings.GRAPH_CONTEXT_HOPS,  # 타입이 정해진 관계만 hop 단계별로 확장
         )
 
         print(
             f"[DEBUG] Graph context - Nodes: {len(graph_context.get('nodes', []))}, Edges: {len(graph_context.get('edges', []))}"
         )
+        return graph_context
 
-        # 5. LLM Reasoning
-        llm_response = await llm_service.generate_answer_with_reasoning(
-            question=request.text,
-            context_records=reranked_results,  # Reranked 결과 사용
-            context_graph=graph_context,
-        )
+    @staticmethod
+    def _build_response(
+        llm_response: dict,
+        reranked_results: List[Dict[str, Any]],
+        graph_context: Dict[str, Any],
+    ) -> QuestionResponse:
+        # MongoDB _id: 프론트엔드 호환용
+        mongo_ids = [str(res["_id"]) for res in reranked_results if "_id" in res]
 
-        # 6. Construct Response
         return QuestionResponse(
             answer=llm_response.get("answer", "I couldn't generate an answer."),
             confidence=llm_response.get("confidence", 0.0),
@@ -4,7 +4,13 @@ from typing import List, Optional
 from bson import ObjectId
 from app.models.schemas.record_req import RecordResponse, UpdateRecordRequest
 from app.db.mongo import mongo_db
+from app.db.passages import passage_store
+from app.db.vector import vector_db
+from app.db.vector_codec import vector_codec
 from app.core.config import get_settings
+from app.core.dates import date_fields
+from app.services.ingestion_service import IngestionService
+from app.services.rerank_cache import rerank_cache
 
 settings = get_settings()
 
@@ -66,6 +72,7 @@ class RecordService:
         if not doc:
             return None
         update: dict = {"updatedAt": datetime.now()}
+        passages: list = []
         if request.title is not None:
             update["title"] = request.title
         if request.content is not None:
@@ -74,6 +81,13 @@ class RecordService:
             update["feel"] = request.feel
         if request.date is not None:
             update["date"] = request.date.isoformat()
+            update.update(date_fields(request.date))
+        if request.title is not None or request.content is not None:
+            # 제목/내용이 다시 저장되면 임베딩 갱신 (내용이 같으면 임베딩 캐시 적중)
+            title = update.get("title", doc.get("title", ""))
+            content = update.get("content", doc.get("content", ""))
+            embedding, passages = await IngestionService.embed_record(title, content)
+            update["embedding"] = vector_codec.encode(embedding)
         result = await collection.find_one_and_update(
             {"_id": ObjectId(record_id), "deletedAt": None},
             {"$set": update},
@@ -81,6 +95,25 @@ class RecordService:
         )
         if not result:
             return None
+        passage_fields = {k: result.get(k) for k in ("dateEpochDay", "feel") if k in update}
+        if "embedding" in update and passages and result.get("recordId"):
+            await passage_store.replace(
+                result.get("userId", "default"),
+                result["recordId"],
+                passages,
+                {"dateEpochDay": result.get("dateEpochDay"), "feel": result.get("feel")},
+            )
+        elif settings.PASSAGE_RETRIEVAL and passage_fields and result.get("recordId"):
+            await passage_store.set_fields(result["recordId"], passage_fields)
+        if "embedding" in update and result.get("recordId"):
+            rerank_cache.invalidate_record(result["recordId"])
+            vector_db.index_record(result.get("userId", "default"), result["recordId"], embedding)
+            vector_db.index_text(
+                result.get("userId", "default"),
+                result["recordId"],
+                result.get("title", ""),
+                result.get("content", ""),
+            )
         return RecordService._doc_to_response(result)
 
     @staticmethod
@@ -94,7 +127,14 @@ class RecordService:
             {"_id": ObjectId(record_id), "deletedAt": None},
             {"$set": {"deletedAt": datetime.now()}},
         )
-        return result is not None
+        if result is None:
+            return False
+        if result.get("recordId"):
+            rerank_cache.invalidate_record(result["recordId"])
+            vector_db.remove_record(result.get("userId", "default"), result["recordId"])
+            if settings.PASSAGE_RETRIEVAL:
+                await passage_store.remove(result["recordId"])
+        return True
 
 
 record_service = RecordService()
@@ -0,0 +1,135 @@
+import hashlib
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+CacheKey = Tuple[str, str, str, str]
+
+
+def normalize_query(query: str) -> str:
+    """대소문자/공백/문장부호 차이만 있는 질문을 같은 키로 취급하기 위한 정규화."""
+    text = unicodedata.normalize("NFC", query).lower()
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+
+def content_hash(doc: dict) -> str:
+    text = f"{doc.get('title', '')}\x00{doc.get('content', '')}"
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+class RerankScoreCache:
+    """
+    Rerank 점수 캐시 (in-memory LRU + TTL).
+
+    - 키: (정규화된 질문 해시, recordId, 내용 해시, rerank 모델)
+    - 기록 내용이 바뀌면 내용 해시가 달라지므로 이전 점수는 자동으로 무효화됨
+    - recordId가 없는 문서는 캐시하지 않음
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        enabled: Optional[bool] = None,
+    ):
+        self.max_entries = (
+            settings.RERANK_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        )
+        self.ttl_seconds = (
+            settings.RERANK_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        )
+        self.enabled = settings.RERANK_CACHE_ENABLED if enabled is None else enabled
+
+        self._entries: "OrderedDict[CacheKey, Tuple[float, float]]" = OrderedDict()
+        self._keys_by_record: Dict[str, Set[CacheKey]] = {}
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0, "invalidated": 0}
+
+    @staticmethod
+    def _query_hash(query: str) -> str:
+        return hashlib.sha256(normalize_query(query).encode("utf-8")).hexdigest()[:32]
+
+    def _key(self, query_hash: str, doc: dict, model: str) -> Optional[CacheKey]:
+        record_id = doc.get("recordId")
+        if not record_id:
+            return None
+        return (query_hash, str(record_id), content_hash(doc), model)
+
+    def get_scores(self, query: str, documents: List[dict], model: str) -> Dict[int, float]:
+        """캐시된 점수를 {문서 인덱스: 점수}로 반환."""
+        if not self.enabled:
+            return {}
+
+        query_hash = self._query_hash(query)
+        now = time.monotonic()
+        found: Dict[int, float] = {}
+        for i, doc in enumerate(documents):
+            key = self._key(query_hash, doc, model)
+            if key is None:
+                continue
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[1] > self.ttl_seconds:
+                self._remove(key)
+                self._stats["expired"] += 1
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+                continue
+            self._entries.move_to_end(key)
+            found[i] = entry[0]
+            self._stats["hits"] += 1
+        return found
+
+    def put_scores(self, query: str, documents: List[dict], scores: List[float], model: str):
+        if not self.enabled:
+            return
+
+        query_hash = self._query_hash(query)
+        now = time.monotonic()
+        for doc, score in zip(documents, scores):
+            key = self._key(query_hash, doc, model)
+            if key is None:
+                continue
+            self._entries[key] = (float(score), now)
+            self._entries.move_to_end(key)
+            self._keys_by_record.setdefault(key[1], set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._stats["evictions"] += 1
+
+    def invalidate_record(self, record_id: str):
+        """기록 수정/삭제 시 해당 기록의 점수를 모두 제거."""
+        for key in self._keys_by_record.pop(str(record_id), set()):
+            if self._entries.pop(key, None) is not None:
+                self._stats["invalidated"] += 1
+
+    def _remove(self, key: CacheKey):
+        self._entries.pop(key, None)
+        keys = self._keys_by_record.get(key[1])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_record[key[1]]
+
+    def clear(self):
+        self._entries.clear()
+        self._keys_by_record.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "hit_ratio": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+
+rerank_cache = RerankScoreCache()
@@ -0,0 +1,205 @@
+import math
+from collections import Counter
+from typing import Dict, List, Optional, Sequence
+
+from app.core.config import get_settings
+from app.core.tokenizer import tokenize
+from app.db.vector import VectorDB
+from app.db.vector_codec import vector_codec
+from app.services.llm_service import llm_service
+
+settings = get_settings()
+
+# BM25 파라미터
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+class LocalReranker:
+    """
+    LLM 호출 없이 프로세스 내에서 후보 문서를 재순위화하는 CPU Reranker.
+
+    이미 가지고 있는 신호들을 가중합하여 점수를 계산:
+    - cosine: 벡터 유사도 (vectorSearchScore, 없으면 질문 임베딩과 저장된 embedding의 cosine.
+      텍스트 검색으로만 찾은 후보는 user_id가 주어지면 저장된 임베딩을 한 번에 조회)
+    - bm25: 후보 집합 안에서 계산한 BM25 (한국어 토크나이저, title + content)
+    - time_decay: VectorDB에서 계산된 시간 감쇠 가중치
+    - rrf: 하이브리드 검색의 RRF 점수
+
+    LLMServiceInterface.rerank와 같은 시그니처(+ 선택 인자 query_vector, user_id)이므로 그대로 교체 가능.
+    """
+
+    FEATURES = ("cosine", "bm25", "time_decay", "rrf")
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None):
+        self.weights = dict(weights or settings.LOCAL_RERANK_WEIGHTS)
+
+    async def rerank(
+        self,
+        query: str,
+        documents: List[dict],
+        top_k: int = 5,
+        query_vector: Optional[List[float]] = None,
+        user_id: Optional[str] = None,
+    ) -> List[dict]:
+        if not documents:
+            return []
+
+        embeddings = None
+        if query_vector and user_id:
+            missing = [
+                doc["recordId"]
+                for doc in documents
+                if doc.get("_vector_score") is None and not doc.get("embedding") and doc.get("recordId")
+            ]
+            embeddings = await VectorDB.get_embeddings(user_id, missing)
+
+        features = self.extract_features(query, documents, query_vector, embeddings)
+        scored_docs = []
+        for doc, row in zip(documents, features):
+            doc_copy = doc.copy()
+            doc_copy["relevance_score"] = sum(
+                self.weights.get(name, 0.0) * value for name, value in zip(self.FEATURES, row)
+            )
+            scored_docs.append(doc_copy)
+
+        scored_docs.sort(key=lambda x: x["relevance_score"], reverse=True)
+        print(f"[Rerank] Locally reranked {len(documents)} documents")
+        return scored_docs[:top_k]
+
+    def extract_features(
+        self,
+        query: str,
+        documents: List[dict],
+        query_vector: Optional[List[float]] = None,
+        embeddings: Optional[Dict[str, List[float]]] = None,
+    ) -> List[List[float]]:
+        """
+        문서별 특성 벡터 [cosine, bm25, time_decay, rrf]. bm25와 rrf는 후보 집합 내 최대값으로 정규화.
+        embeddings: 문서에 embedding 필드가 없을 때 쓸 {recordId: 임베딩}
+        """
+        embeddings = embeddings or {}
+        bm25_scores = self._bm25_scores(query, documents)
+        max_bm25 = max(bm25_scores) or 1.0
+
+        rrf_scores = [
+            float(doc.get("_rrf_score", doc.get("_original_score", doc.get("score", 0.0))) or 0.0)
+            for doc in documents
+        ]
+        max_rrf = max(rrf_scores) or 1.0
+
+        decays = VectorDB._time_decays(documents)
+
+        rows = []
+        for doc, bm25, rrf, decay in zip(documents, bm25_scores, rrf_scores, decays):
+            time_decay = doc.get("_time_decay")
+            if time_decay is None:
+                time_decay = decay
+            rows.append(
+                [
+                    self._cosine_feature(doc, query_vector, embeddings.get(doc.get("recordId"))),
+                    bm25 / max_bm25,
+                    float(time_decay),
+                    rrf / max_rrf,
+                ]
+            )
+        return rows
+
+    @staticmethod
+    def _cosine_feature(
+        doc: dict, query_vector: Optional[Sequence[float]], stored: Optional[Sequence[float]] = None
+    ) -> float:
+        # 벡터 검색 점수가 있으면 그대로 사용 (Atlas cosine score = (1 + cos) / 2)
+        if doc.get("_vector_score") is not None:
+            return float(doc["_vector_score"])
+
+        # 저장 형식(배열/binary vector)과 관계없이 float 리스트로 복원
+        embedding = vector_codec.decode(doc.get("embedding")) or stored
+        if not query_vector or not embedding or len(embedding) != len(query_vector):
+            return 0.0
+
+        dot = sum(a * b for a, b in zip(query_vector, embedding))
+        norm = math.sqrt(sum(a * a for a in query_vector)) * math.sqrt(
+            sum(b * b for b in embedding)
+        )
+        if norm == 0:
+            return 0.0
+        return (1 + dot / norm) / 2
+
+    @staticmethod
+    def _bm25_scores(query: str, documents: List[dict]) -> List[float]:
+        query_terms = set(tokenize(query))
+        if not query_terms:
+            return [0.0] * len(documents)
+
+        max_chars = settings.LOCAL_RERANK_MAX_CHARS
+        doc_terms = [
+            Counter(
+                tokenize(f"{doc.get('title', '')} {(doc.get('content') or '')[:max_chars]}")
+            )
+            for doc in documents
+        ]
+        n_docs = len(documents)
+        avg_len = sum(sum(c.values()) for c in doc_terms) / n_docs or 1.0
+
+        idf = {}
+        for term in query_terms:
+            df = sum(1 for counts in doc_terms if term in counts)
+            idf[term] = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+
+        scores = []
+        for counts in doc_terms:
+            doc_len = sum(counts.values())
+            score = 0.0
+            for term in query_terms:
+                tf = counts.get(term, 0)
+                if tf:
+                    score += idf[term] * (tf * (BM25_K1 + 1)) / (
+                        tf + BM25_K1 * (1 - BM25_B + BM25_B * doc_len / avg_len)
+                    )
+            scores.append(score)
+        return scores
+
+    @classmethod
+    def learn_weights(
+        cls,
+        feature_rows: List[List[float]],
+        labels: List[float],
+        epochs: int = 300,
+        learning_rate: float = 0.5,
+    ) -> Dict[str, float]:
+        """
+        관련성 라벨(0/1)이 있는 (특성, 라벨) 샘플로 로지스틱 회귀 가중치를 학습.
+        결과는 음수를 0으로 자른 뒤 합이 1이 되도록 정규화하여 LOCAL_RERANK_WEIGHTS에 그대로 사용 가능.
+        """
+        n_features = len(cls.FEATURES)
+        weights = [0.0] * n_features
+        bias = 0.0
+        n = len(feature_rows) or 1
+
+        for _ in range(epochs):
+            grad_w = [0.0] * n_features
+            grad_b = 0.0
+            for row, label in zip(feature_rows, labels):
+                z = bias + sum(w * x for w, x in zip(weights, row))
+                pred = 1 / (1 + math.exp(-z))
+                error = pred - label
+                for i in range(n_features):
+                    grad_w[i] += error * row[i]
+                grad_b += error
+            weights = [w - learning_rate * g / n for w, g in zip(weights, grad_w)]
+            bias -= learning_rate * grad_b / n
+
+        clipped = [max(0.0, w) for w in weights]
+        total = sum(clipped) or 1.0
+        return {name: round(w / total, 4) for name, w in zip(cls.FEATURES, clipped)}
+
+
+def get_reranker():
+    if settings.RERANK_PROVIDER == "local":
+        return LocalReranker()
+    return llm_service
+
+
+# Singleton Instance
+reranker = get_reranker()
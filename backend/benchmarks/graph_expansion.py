@@ -0,0 +1,200 @@
+"""
+질문 컨텍스트 서브그래프 확장 쿼리의 db hits / 지연 비교 리포트 (실행 중인 Neo4j 필요).
+
+사용법 (backend 디렉토리에서):
+    python -m benchmarks.graph_expansion
+    python -m benchmarks.graph_expansion --copies 20 --queries 100 --hops 1 2 3
+
+- data/data2.json + data/data3.json 기록을 LocalLLMService.extract_entities로 추출해
+  --copies 배 복제 저장 (같은 인물/감정이 여러 기록에 연결되어 슈퍼노드가 생기도록)
+- 질의마다 기록 --records 개(질문 검색 top-k에 해당)를 골라
+  기존 쿼리((r)-[*1..2]-(n) LIMIT 50 + Python 경로 직렬화)와
+  Neo4jDB.fragments_query(hop) + merge_fragments(get_context_subgraph와 같은 hop별 제한)를 실행
+- PROFILE의 db hits 합계, p50/p95 지연(결과 직렬화 포함), 반환 노드/엣지 수(중복 포함)를 JSON으로 출력
+- 벤치마크 사용자(--user-id)의 그래프는 시작 전에 지우고 다시 만든다
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from typing import Any, Dict, List
+
+from app.core.config import get_settings
+from app.db.graph import Neo4jDB, neo4j_db
+from app.db.graph_cache import merge_fragments
+from app.db.graph_writer import graph_writer
+from app.services.local_llm_service import LocalLLMService
+
+settings = get_settings()
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data")
+DATA_FILES = ("data2.json", "data3.json")
+USER_ID = "bench-graph"
+
+# 변경 전 get_context_subgraph 쿼리 (비교 기준)
+LEGACY_QUERY = """
+MATCH (r:Record)
+WHERE r.recordId IN $recordIds AND r.userId = $userId
+OPTIONAL MATCH path = (r)-[*1..2]-(n)
+WHERE NOT n:User
+RETURN path
+LIMIT 50
+"""
+
+
+def load_records() -> List[dict]:
+    records = []
+    for name in DATA_FILES:
+        with open(os.path.join(DATA_DIR, name), "r", encoding="utf-8") as f:
+            records.extend(json.load(f))
+    return records
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def db_hits(profile: Dict[str, Any]) -> int:
+    if not profile:
+        return 0
+    return profile.get("dbHits", 0) + sum(db_hits(child) for child in profile.get("children", []))
+
+
+async def seed(user_id: str, copies: int, batch: int) -> List[str]:
+    llm = LocalLLMService(latency_ms=0)
+    source = load_records()
+    graphs = [await llm.extract_entities(f"{r['title']}\n{r['content']}") for r in source]
+
+    async with neo4j_db.get_session() as session:
+        await session.run(
+            "MATCH (n) WHERE n.userId = $userId DETACH DELETE n", userId=user_id
+        )
+
+    record_ids, pending = [], []
+    for copy in range(copies):
+        for i, (record, graph) in enumerate(zip(source, graphs)):
+            record_id = f"{user_id}-{copy}-{i}"
+            record_ids.append(record_id)
+            pending.append(
+                graph_writer.build_record_params(user_id, record_id, record["date"], graph)
+            )
+            if len(pending) >= batch:
+                await graph_writer.write_records(pending)
+                pending = []
+    await graph_writer.write_records(pending)
+    return record_ids
+
+
+async def run_legacy(session, params: Dict[str, Any], prefix: str = ""):
+    # 변경 전 코드와 같이 경로마다 노드/엣지를 Python에서 직렬화
+    result = await session.run(prefix + LEGACY_QUERY, params)
+    nodes, edges = {}, []
+    async for record in result:
+        path = record.get("path")
+        if path:
+            for node in path.nodes:
+                nodes[node.element_id] = {**dict(node), "_labels": list(node.labels)}
+            for rel in path.relationships:
+                edges.append({"source": rel.start_node.element_id, "type": rel.type})
+    return nodes, edges, result
+
+
+async def run_expansion(session, query: str, params: Dict[str, Any], prefix: str = ""):
+    result = await session.run(prefix + query, params)
+    fragments = {record["recordId"]: record async for record in result}
+    graph = merge_fragments(
+        (fragments[r] for r in params["recordIds"] if r in fragments), per_hop=settings.GRAPH_HOP_FANOUT
+    )
+    return graph["nodes"], graph["edges"], result
+
+
+async def measure(name: str, run, samples: List[List[str]], user_id: str) -> Dict[str, Any]:
+    latencies, hits, nodes_out, edges_out = [], [], [], []
+    params = {
+        "userId": user_id,
+        "perNode": settings.GRAPH_NODE_FANOUT,
+        "perHop": settings.GRAPH_HOP_FANOUT,
+        "maxDegree": settings.GRAPH_MAX_DEGREE,
+    }
+    async with neo4j_db.get_session() as session:
+        for record_ids in samples:
+            started = time.perf_counter()
+            nodes, edges, _ = await run(session, {**params, "recordIds": record_ids})
+            latencies.append((time.perf_counter() - started) * 1000)
+            nodes_out.append(len(nodes))
+            edges_out.append(len(edges))
+
+        # db hits는 PROFILE로 별도 측정 (지연에는 포함하지 않음)
+        for record_ids in samples:
+            _, _, result = await run(session, {**params, "recordIds": record_ids}, "PROFILE ")
+            summary = await result.consume()
+            hits.append(db_hits(summary.profile))
+
+    return {
+        "query": name,
+        "db_hits_mean": round(sum(hits) / len(hits), 1),
+        "db_hits_p95": percentile(hits, 0.95),
+        "latency_ms_p50": round(percentile(latencies, 0.5), 2),
+        "latency_ms_p95": round(percentile(latencies, 0.95), 2),
+        "nodes_mean": round(sum(nodes_out) / len(nodes_out), 1),
+        "edges_mean": round(sum(edges_out) / len(edges_out), 1),
+    }
+
+
+async def main_async(args) -> Dict[str, Any]:
+    await neo4j_db.connect()
+    try:
+        record_ids = await seed(args.user_id, args.copies, args.batch)
+        rng = random.Random(args.seed)
+        samples = [rng.sample(record_ids, args.records) for _ in range(args.queries)]
+
+        results = [await measure("legacy", run_legacy, samples, args.user_id)]
+        for hop in args.hops:
+            query = Neo4jDB.fragments_query(hop)
+
+            async def run(session, params, prefix="", query=query):
+                return await run_expansion(session, query, params, prefix)
+
+            results.append(await measure(f"hop={hop}", run, samples, args.user_id))
+    finally:
+        await neo4j_db.close()
+
+    return {
+        "config": {
+            "records": len(record_ids),
+            "records_per_query": args.records,
+            "queries": args.queries,
+            "node_fanout": settings.GRAPH_NODE_FANOUT,
+            "hop_fanout": settings.GRAPH_HOP_FANOUT,
+            "max_degree": settings.GRAPH_MAX_DEGREE,
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare context subgraph expansion queries")
+    parser.add_argument("--copies", type=int, default=10, help="copies of the source records")
+    parser.add_argument("--records", type=int, default=5, help="record ids per query")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--hops", type=int, nargs="+", default=[1, 2, 3])
+    parser.add_argument("--batch", type=int, default=100, help="records per graph write")
+    parser.add_argument("--user-id", default=USER_ID)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
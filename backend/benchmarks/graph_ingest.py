@@ -0,0 +1,134 @@
+"""
+그래프 저장(GraphWriter) 부하 테스트: 노드 수가 늘어도 기록당 저장 시간이 일정한지 확인 (실행 중인 Neo4j 필요).
+
+사용법 (backend 디렉토리에서):
+    python -m benchmarks.graph_ingest
+    python -m benchmarks.graph_ingest --records 20000 --batch 50 --windows 10
+
+- data/data2.json + data/data3.json 기록을 LocalLLMService.extract_entities로 추출하고,
+  복제본마다 인물/행동 이름에 번호를 붙여 사용자 그래프의 노드 수가 계속 늘어나도록 저장
+- 시작 전에 스키마 마이그레이션을 적용하고 MERGE 키 조회 계획(EXPLAIN)을 확인
+- 저장 구간(--windows)마다 그 시점 노드 수, 기록당 저장 시간 p50/p95를 JSON으로 출력
+  flat_ratio = 마지막 구간 p50 / 첫 구간 p50 (인덱스 seek이면 1 근처, 라벨 스캔이면 노드 수에 비례해 증가)
+- 벤치마크 사용자(--user-id)의 그래프는 시작 전에 지운다
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, List
+
+from app.db.graph import neo4j_db
+from app.db.graph_schema import SCHEMA_VERSION, graph_schema
+from app.db.graph_writer import graph_writer
+from app.services.local_llm_service import LocalLLMService
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data")
+DATA_FILES = ("data2.json", "data3.json")
+USER_ID = "bench-ingest"
+
+
+def load_records() -> List[dict]:
+    records = []
+    for name in DATA_FILES:
+        with open(os.path.join(DATA_DIR, name), "r", encoding="utf-8") as f:
+            records.extend(json.load(f))
+    return records
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+async def build_params(user_id: str, total: int) -> List[Dict[str, Any]]:
+    llm = LocalLLMService(latency_ms=0)
+    source = load_records()
+    graphs = [await llm.extract_entities(f"{r['title']}\n{r['content']}") for r in source]
+
+    params = []
+    for n in range(total):
+        record, graph = source[n % len(source)], graphs[n % len(source)]
+        copy = n // len(source)
+        rec = graph_writer.build_record_params(user_id, f"{user_id}-{n}", record["date"], graph)
+        for event in rec["events"]:
+            # 복제본마다 새 인물/행동 노드가 생기도록 (사용 기간이 길어진 사용자 그래프)
+            event["people"] = [f"{name}{copy}" for name in event["people"]]
+            event["actions"] = [f"{action}{copy}" for action in event["actions"]]
+        params.append(rec)
+    return params
+
+
+async def count_nodes(user_id: str) -> int:
+    async with neo4j_db.get_session() as session:
+        record = await (
+            await session.run("MATCH (n) WHERE n.userId = $userId RETURN count(n) AS n", userId=user_id)
+        ).single()
+    return record["n"]
+
+
+async def main_async(args) -> Dict[str, Any]:
+    await neo4j_db.connect()  # 스키마 마이그레이션 적용 (GRAPH_SCHEMA_AUTO_MIGRATE)
+    try:
+        async with neo4j_db.get_session() as session:
+            version = await graph_schema.current_version(session)
+            await session.run("MATCH (n) WHERE n.userId = $userId DETACH DELETE n", userId=args.user_id)
+        scans = await graph_schema.verify(neo4j_db.driver)
+
+        params = await build_params(args.user_id, args.records)
+        batches = [params[i : i + args.batch] for i in range(0, len(params), args.batch)]
+        per_window = max(1, len(batches) // args.windows)
+
+        windows, timings = [], []
+        for index, batch in enumerate(batches, start=1):
+            started = time.perf_counter()
+            if not await graph_writer.write_records(batch):
+                raise RuntimeError("graph write failed")
+            timings.append((time.perf_counter() - started) * 1000 / len(batch))
+            if index % per_window == 0 or index == len(batches):
+                windows.append(
+                    {
+                        "records": min(index * args.batch, len(params)),
+                        "nodes": await count_nodes(args.user_id),
+                        "ms_per_record_p50": round(percentile(timings, 0.5), 3),
+                        "ms_per_record_p95": round(percentile(timings, 0.95), 3),
+                    }
+                )
+                timings = []
+    finally:
+        await neo4j_db.close()
+
+    return {
+        "config": {
+            "records": args.records,
+            "batch": args.batch,
+            "schema_version": version,
+            "expected_schema_version": SCHEMA_VERSION,
+            "index_scans": scans,
+        },
+        "windows": windows,
+        "flat_ratio": round(windows[-1]["ms_per_record_p50"] / max(windows[0]["ms_per_record_p50"], 1e-9), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Graph ingest load test (per-record write time vs node count)")
+    parser.add_argument("--records", type=int, default=5000)
+    parser.add_argument("--batch", type=int, default=50, help="records per write transaction")
+    parser.add_argument("--windows", type=int, default=10, help="report buckets")
+    parser.add_argument("--user-id", default=USER_ID)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
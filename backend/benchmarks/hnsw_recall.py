@@ -0,0 +1,136 @@
+"""
+HNSW 엔진의 recall / latency를 exact 검색과 비교하는 리포트.
+
+사용법 (backend 디렉토리에서):
+    python -m benchmarks.hnsw_recall
+    python -m benchmarks.hnsw_recall --rows 50000 --m 16 32 --ef 32 64 128
+
+- data/data2.json + data/data3.json 기록을 LocalLLMService로 임베딩한 뒤,
+  기록 벡터에 작은 노이즈를 더해 --rows 개까지 합성 데이터로 확장
+- 질의는 기록 제목 임베딩(+노이즈), 정답은 ExactVectorStore의 top-k
+- M x ef 조합마다 recall@k, 평균/p95 검색 지연, 구축 시간, 스냅샷 reload 시간을 JSON으로 출력
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from app.db.hnsw_index import HNSWVectorStore
+from app.db.vector_store import ExactVectorStore
+from app.services.local_llm_service import LocalLLMService
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data")
+DATA_FILES = ("data2.json", "data3.json")
+USER_ID = "bench"
+
+
+def load_records() -> List[dict]:
+    records = []
+    for name in DATA_FILES:
+        with open(os.path.join(DATA_DIR, name), "r", encoding="utf-8") as f:
+            records.extend(json.load(f))
+    return records
+
+
+def build_dataset(rows: int, num_queries: int, noise: float, seed: int = 0):
+    """(기록 벡터 rows개, 질의 벡터 num_queries개)."""
+    llm = LocalLLMService(latency_ms=0)
+    records = load_records()
+    base = np.asarray(
+        [llm.embed(f"{r.get('title', '')} {r.get('content', '')}") for r in records], dtype=np.float32
+    )
+    titles = np.asarray([llm.embed(r.get("title", "")) for r in records], dtype=np.float32)
+
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(base), size=rows)
+    vectors = base[picks] + rng.normal(scale=noise, size=(rows, base.shape[1])).astype(np.float32)
+    vectors[: len(base)] = base[: min(rows, len(base))]
+
+    q_picks = rng.integers(0, len(titles), size=num_queries)
+    queries = titles[q_picks] + rng.normal(scale=noise, size=(num_queries, base.shape[1])).astype(np.float32)
+    return vectors, queries
+
+
+def timed_search(store, queries: np.ndarray, k: int):
+    results, latencies = [], []
+    for q in queries:
+        start = time.perf_counter()
+        results.append([record_id for record_id, _ in store.search(USER_ID, q.tolist(), k)])
+        latencies.append((time.perf_counter() - start) * 1000)
+    return results, latencies
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, float]:
+    return {
+        "mean_ms": round(float(np.mean(latencies)), 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+    }
+
+
+def run(rows: int, num_queries: int, k: int, ms: List[int], efs: List[int], noise: float) -> Dict[str, Any]:
+    vectors, queries = build_dataset(rows, num_queries, noise)
+    report: Dict[str, Any] = {"rows": rows, "dim": int(vectors.shape[1]), "queries": num_queries, "k": k}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        exact = ExactVectorStore(path=os.path.join(tmp, "exact"))
+        for i, v in enumerate(vectors):
+            exact.add(USER_ID, f"r{i}", v)
+        truth, latencies = timed_search(exact, queries, k)
+        report["exact"] = latency_summary(latencies)
+
+        report["hnsw"] = []
+        for M in ms:
+            path = os.path.join(tmp, f"hnsw-m{M}")
+            store = HNSWVectorStore(path=path, M=M, min_rows=0, snapshot_every=rows + 1)
+            start = time.perf_counter()
+            for i, v in enumerate(vectors):
+                store.add(USER_ID, f"r{i}", v)
+            store._graph(USER_ID)
+            store.wait_for_builds()
+            build_s = time.perf_counter() - start
+            store.close()
+
+            start = time.perf_counter()
+            reloaded = HNSWVectorStore(path=path, M=M, min_rows=0)
+            reloaded.warm_up()
+            reloaded.wait_for_builds()
+            reload_s = time.perf_counter() - start
+
+            for ef in efs:
+                reloaded.ef_search = ef
+                found, latencies = timed_search(reloaded, queries, k)
+                hits = sum(len(set(t) & set(f)) for t, f in zip(truth, found))
+                report["hnsw"].append(
+                    {
+                        "M": M,
+                        "ef": ef,
+                        f"recall_at_{k}": round(hits / (num_queries * k), 4),
+                        **latency_summary(latencies),
+                        "build_s": round(build_s, 2),
+                        "reload_s": round(reload_s, 3),
+                    }
+                )
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HNSW recall vs latency against exact search")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--m", type=int, nargs="+", default=[16])
+    parser.add_argument("--ef", type=int, nargs="+", default=[16, 32, 64, 128])
+    parser.add_argument("--noise", type=float, default=0.02)
+    args = parser.parse_args()
+
+    report = run(args.rows, args.queries, args.k, args.m, args.ef, args.noise)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+"""
+하이브리드 검색 품질/지연 벤치마크: 검색 파라미터 sweep 리포트 (릴리스 간 비교용 JSON).
+
+사용법 (backend 디렉토리에서):
+    python -m benchmarks.retrieval_sweep
+    python -m benchmarks.retrieval_sweep --rows 10000 --queries 300 --output retrieval.json
+
+- data/data2.json + data/data3.json 기록을 --rows 개까지 복제 (본문 토큰 일부 삭제, 날짜 이동으로 변형)
+  날짜는 가장 최근 기록이 오늘이 되도록 평행 이동 (Time Decay가 실제 사용처럼 작동하도록)
+- MongoDB 대신 메모리 stand-in 컬렉션 + 프로세스 내 엔진(HNSW 벡터, BM25 텍스트)으로
+  실제 VectorDB.search 경로(fan-out, RRF, Time Decay, hydrate)를 그대로 실행
+- numCandidates는 HNSW ef_search로 대응 (Atlas $vectorSearch의 numCandidates도 HNSW 탐색 후보 수)
+- 질의: 원본 기록의 제목 / 본문 문장 일부(토큰 삭제), 정답: 같은 원본에서 복제된 모든 기록
+- 기준 설정(settings의 RETRIEVAL_*)에서 파라미터를 하나씩 바꿔가며 recall@k, nDCG@k,
+  p50/p95 지연, 질의당 전송 바이트(stand-in 컬렉션이 돌려준 문서의 BSON 크기)를 측정
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+# stand-in 컬렉션만 사용 (MongoDB에 연결하지 않음)
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+
+import bson
+import numpy as np
+
+from app.core.config import get_settings
+from app.core.dates import date_fields
+from app.db import lexical, vector_store
+from app.db.hnsw_index import HNSWVectorStore
+from app.db.lexical import LexicalIndex
+from app.db.mongo import mongo_db
+from app.db.vector import VectorDB
+from app.services.local_llm_service import LocalLLMService
+
+settings = get_settings()
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "data")
+DATA_FILES = ("data2.json", "data3.json")
+USER_ID = "bench"
+
+SWEEPS = {
+    "top_k": [5, 10, 20],
+    "num_candidates_factor": [1, 2, 5, 10, 20],
+    "vector_weight": [0.2, 0.35, 0.5, 0.65, 0.8],  # text_weight = 1 - vector_weight
+    "time_decay_weight": [0.0, 0.15, 0.3, 0.5],
+}
+
+
+# --- Stand-in store ---
+class _Cursor:
+    def __init__(self, docs: List[dict]):
+        self._docs = docs
+
+    def batch_size(self, _n: int) -> "_Cursor":
+        return self
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for doc in self._docs:
+            yield doc
+
+    async def to_list(self, length: Optional[int] = None) -> List[dict]:
+        return self._docs[:length]
+
+
+class StandInCollection:
+    """
+    VectorDB가 프로세스 내 엔진 경로에서 쓰는 find/count_documents만 구현한 메모리 컬렉션.
+    돌려준 문서의 BSON 크기를 bytes_sent에 누적 (MongoDB가 네트워크로 보냈을 양).
+    """
+
+    def __init__(self, docs: List[dict]):
+        self.docs = docs
+        self.by_record = {doc["recordId"]: doc for doc in docs}
+        self.bytes_sent = 0
+
+    @staticmethod
+    def _match_value(value: Any, condition: Any) -> bool:
+        if not isinstance(condition, dict):
+            if isinstance(value, list) and not isinstance(condition, list):
+                return condition in value
+            return value == condition
+        for op, operand in condition.items():
+            if op == "$in":
+                values = value if isinstance(value, list) else [value]
+                if not any(v in operand for v in values):
+                    return False
+            elif op == "$ne" and value == operand:
+                return False
+            elif op == "$gte" and (value is None or value < operand):
+                return False
+            elif op == "$lte" and (value is None or value > operand):
+                return False
+            elif op == "$exists" and (value is not None) != operand:
+                return False
+        return True
+
+    def _candidates(self, query: dict) -> List[dict]:
+        record_ids = query.get("recordId")
+        if isinstance(record_ids, dict) and "$in" in record_ids:
+            return [self.by_record[r] for r in record_ids["$in"] if r in self.by_record]
+        return self.docs
+
+    def _matches(self, doc: dict, query: dict) -> bool:
+        return all(self._match_value(doc.get(key), cond) for key, cond in query.items())
+
+    @staticmethod
+    def _project(doc: dict, projection: Optional[dict]) -> dict:
+        if not projection:
+            return dict(doc)
+        fields = [key for key, value in projection.items() if value and key != "_id"]
+        projected = {key: doc[key] for key in fields if key in doc}
+        if projection.get("_id", 1):
+            projected["_id"] = doc["_id"]
+        return projected
+
+    def find(self, query: dict, projection: Optional[dict] = None) -> _Cursor:
+        results = [
+            self._project(doc, projection)
+            for doc in self._candidates(query)
+            if self._matches(doc, query)
+        ]
+        self.bytes_sent += sum(len(bson.encode(doc)) for doc in results)
+        return _Cursor(results)
+
+    async def count_documents(self, query: dict, limit: int = 0) -> int:
+        count = sum(1 for doc in self._candidates(query) if self._matches(doc, query))
+        return min(count, limit) if limit else count
+
+
+# --- Dataset ---
+def load_records() -> List[dict]:
+    records = []
+    for name in DATA_FILES:
+        with open(os.path.join(DATA_DIR, name), "r", encoding="utf-8") as f:
+            records.extend(json.load(f))
+    return records
+
+
+def perturb(text: str, rng: random.Random, drop: float) -> str:
+    tokens = text.split()
+    kept = [t for t in tokens if rng.random() >= drop]
+    return " ".join(kept or tokens[:1])
+
+
+def build_corpus(records: List[dict], rows: int, drop: float, seed: int) -> List[dict]:
+    """원본 기록 + 변형 복제본 rows개. source 필드에 원본 번호를 남김 (정답 라벨)."""
+    rng = random.Random(seed)
+    llm = LocalLLMService(latency_ms=0)
+    dates = [date.fromisoformat(r.get("date", "")[:10] or date.today().isoformat()) for r in records]
+    anchor = date.today() - max(dates)
+    docs = []
+    for i in range(max(rows, len(records))):
+        source = i % len(records)
+        record = records[source]
+        content = record["content"] if i < len(records) else perturb(record["content"], rng, drop)
+        jitter = timedelta(days=rng.randint(-30, 0)) if i >= len(records) else timedelta(0)
+        record_date = (dates[source] + anchor + jitter).isoformat()
+        docs.append(
+            {
+                "_id": bson.ObjectId(),
+                "recordId": f"r{i}",
+                "userId": USER_ID,
+                "title": record["title"],
+                "content": content,
+                "feel": record.get("feel", []),
+                "date": record_date,
+                **date_fields(record_date),
+                "embedding": llm.embed(f"{record['title']} {content}"),
+                "deletedAt": None,
+                "source": source,
+            }
+        )
+    return docs
+
+
+def build_queries(records: List[dict], num_queries: int, drop: float, seed: int) -> List[dict]:
+    """제목 질의와 본문 문장 질의를 번갈아 생성."""
+    rng = random.Random(seed + 1)
+    llm = LocalLLMService(latency_ms=0)
+    queries = []
+    for n in range(num_queries):
+        source = rng.randrange(len(records))
+        record = records[source]
+        if n % 2 == 0:
+            kind, text = "title", record["title"]
+        else:
+            sentences = [s for s in record["content"].replace("\n", " ").split(". ") if len(s) > 10]
+            kind, text = "passage", perturb(rng.choice(sentences or [record["content"]]), rng, drop)
+        queries.append({"kind": kind, "text": text, "source": source, "vector": llm.embed(text)})
+    return queries
+
+
+# --- Metrics ---
+def recall_at_k(found: List[str], relevant: set, k: int) -> float:
+    if not relevant:
+        return 0.0
+    return len(set(found[:k]) & relevant) / min(len(relevant), k)
+
+
+def ndcg_at_k(found: List[str], relevant: set, k: int) -> float:
+    dcg = sum(1 / math.log2(rank + 2) for rank, r in enumerate(found[:k]) if r in relevant)
+    ideal = sum(1 / math.log2(rank + 2) for rank in range(min(len(relevant), k)))
+    return dcg / ideal if ideal else 0.0
+
+
+def percentile(values: List[float], q: float) -> float:
+    return round(float(np.percentile(values, q)), 3) if values else 0.0
+
+
+# --- Runner ---
+def baseline_params() -> Dict[str, Any]:
+    return {
+        "top_k": settings.RETRIEVAL_TOP_K,
+        "num_candidates_factor": settings.RETRIEVAL_NUM_CANDIDATES_FACTOR,
+        "vector_weight": settings.RETRIEVAL_VECTOR_WEIGHT,
+        "time_decay_weight": settings.RETRIEVAL_TIME_DECAY_WEIGHT,
+    }
+
+
+async def evaluate(
+    store: StandInCollection,
+    engine: HNSWVectorStore,
+    queries: List[dict],
+    relevant_by_source: Dict[int, set],
+    params: Dict[str, Any],
+    k: int,
+) -> Dict[str, Any]:
+    settings.RETRIEVAL_NUM_CANDIDATES_FACTOR = params["num_candidates_factor"]
+    # 벡터 branch는 top_k * 2개를 가져옴 -> 그 limit에 대한 numCandidates를 ef로 사용
+    engine.ef_search = VectorDB._num_candidates(params["top_k"] * 2)
+
+    recalls, ndcgs, latencies, sizes = [], [], [], []
+    for query in queries:
+        before = store.bytes_sent
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = await VectorDB.search(
+                query["vector"],
+                USER_ID,
+                top_k=params["top_k"],
+                query_text=query["text"],
+                vector_weight=params["vector_weight"],
+                text_weight=1 - params["vector_weight"],
+                use_time_decay=params["time_decay_weight"] > 0,
+                time_decay_weight=params["time_decay_weight"],
+            )
+        latencies.append((time.perf_counter() - start) * 1000)
+        sizes.append(store.bytes_sent - before)
+        found = [doc["recordId"] for doc in results]
+        relevant = relevant_by_source[query["source"]]
+        recalls.append(recall_at_k(found, relevant, k))
+        ndcgs.append(ndcg_at_k(found, relevant, k))
+
+    return {
+        **params,
+        f"recall_at_{k}": round(float(np.mean(recalls)), 4),
+        f"ndcg_at_{k}": round(float(np.mean(ndcgs)), 4),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "bytes_per_query": int(np.mean(sizes)),
+    }
+
+
+async def run(rows: int, num_queries: int, k: int, drop: float, seed: int) -> Dict[str, Any]:
+    records = load_records()
+    docs = build_corpus(records, rows, drop, seed)
+    queries = build_queries(records, num_queries, drop, seed)
+    relevant_by_source: Dict[int, set] = {}
+    for doc in docs:
+        relevant_by_source.setdefault(doc["source"], set()).add(doc["recordId"])
+
+    store = StandInCollection(docs)
+    saved = {
+        name: getattr(settings, name)
+        for name in (
+            "VECTOR_BACKEND",
+            "TEXT_SEARCH_BACKEND",
+            "SEARCH_PUSHDOWN",
+            "PASSAGE_RETRIEVAL",
+            "RETRIEVAL_VECTOR_TIMEOUT",
+            "RETRIEVAL_TEXT_TIMEOUT",
+            "RETRIEVAL_NUM_CANDIDATES_FACTOR",
+        )
+    }
+    baseline = baseline_params()
+    report: Dict[str, Any] = {
+        "dataset": {
+            "files": list(DATA_FILES),
+            "source_records": len(records),
+            "rows": len(docs),
+            "queries": len(queries),
+            "k": k,
+            "drop": drop,
+            "seed": seed,
+        },
+        "engines": {"vector": "hnsw (ef = numCandidates)", "text": "local bm25"},
+        "baseline": baseline,
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = HNSWVectorStore(path=os.path.join(tmp, "vectors"), min_rows=0, snapshot_every=len(docs) + 1)
+        lexical_engine = LexicalIndex(path=os.path.join(tmp, "lexical"), save_every=len(docs) + 1)
+        settings.VECTOR_BACKEND, settings.TEXT_SEARCH_BACKEND = "hnsw", "local"
+        settings.SEARCH_PUSHDOWN = settings.PASSAGE_RETRIEVAL = False
+        settings.RETRIEVAL_VECTOR_TIMEOUT = settings.RETRIEVAL_TEXT_TIMEOUT = 0
+        vector_store._engine, lexical._engine = engine, lexical_engine
+        mongo_db.db = {settings.COLLECTION_NAME: store}
+        try:
+            # 첫 검색에서 두 엔진이 stand-in 컬렉션으로부터 bootstrap (측정에서 제외)
+            start = time.perf_counter()
+            await evaluate(store, engine, queries[:1], relevant_by_source, baseline, k)
+            report["dataset"]["index_build_s"] = round(time.perf_counter() - start, 2)
+
+            report["baseline"] = await evaluate(store, engine, queries, relevant_by_source, baseline, k)
+            report["sweeps"] = {}
+            for name, values in SWEEPS.items():
+                report["sweeps"][name] = [
+                    await evaluate(
+                        store, engine, queries, relevant_by_source, {**baseline, name: value}, k
+                    )
+                    for value in values
+                ]
+        finally:
+            for name, value in saved.items():
+                setattr(settings, name, value)
+            vector_store._engine = lexical._engine = None
+            mongo_db.db = None
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retrieval quality/latency sweep over search parameters")
+    parser.add_argument("--rows", type=int, default=2000, help="corpus size after replication")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--drop", type=float, default=0.2, help="token drop rate for replicas/queries")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.rows, args.queries, args.k, args.drop, args.seed))
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import pytest
+from unittest.mock import AsyncMock
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+from app.api.v1.endpoints import metrics
+
+
+@pytest.mark.asyncio
+async def test_replay_graph_writes(monkeypatch):
+    replay = AsyncMock(return_value={"replayed": 2, "committed": 1})
+    monkeypatch.setattr(metrics.graph_write_queue, "replay", replay)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        response = await ac.post("/api/v1/metrics/graph-writes/replay")
+
+    assert response.status_code == 200
+    assert response.json() == {"replayed": 2, "committed": 1}
+    replay.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_failed_graph_writes_lists_identifiers(monkeypatch):
+    failed = [{"userId": "u1", "recordId": "r1", "error": "Invalid input", "failedAt": "2024-05-01T00:00:00"}]
+    monkeypatch.setattr(metrics.graph_write_queue, "failed", lambda: failed)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        response = await ac.get("/api/v1/metrics/graph-writes/failed")
+
+    assert response.status_code == 200
+    assert response.json() == failed
@@ -46,3 +46,44 @@ async def test_ask_question_failure(monkeypatch):
 
     assert response.status_code == 500
     assert "Service Error" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_ask_question_stream(monkeypatch):
+    async def mock_stream_answer(request):
+        yield "candidates", {"count": 1, "recordIds": ["r1"]}
+        yield "token", {"text": "안녕"}
+        yield "final", {"answer": "안녕", "confidence": 0.8, "reasoningPath": {}}
+
+    monkeypatch.setattr(question.reasoning_service, "stream_answer", mock_stream_answer)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        payload = {"text": "What?", "userId": "u1"}
+        response = await ac.post("/api/v1/question/stream", json=payload)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    body = response.text
+    assert body.index("event: candidates") < body.index("event: token")
+    assert body.index("event: token") < body.index("event: final")
+    assert '"answer": "안녕"' in body
+
+
+@pytest.mark.asyncio
+async def test_ask_question_stream_error_event(monkeypatch):
+    async def mock_fail(request):
+        raise Exception("Service Error")
+        yield  # pragma: no cover
+
+    monkeypatch.setattr(question.reasoning_service, "stream_answer", mock_fail)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as ac:
+        payload = {"text": "What?", "userId": "u1"}
+        response = await ac.post("/api/v1/question/stream", json=payload)
+
+    assert "event: error" in response.text
+    assert "Service Error" in response.text
@@ -0,0 +1,30 @@
+import pytest
+
+from app.services import llm_service as llm_service_module
+from app.services.embedding_cache import EmbeddingCache
+from app.services.rate_limiter import LLMScheduler
+from app.services.rerank_cache import rerank_cache
+
+
+@pytest.fixture(autouse=True)
+def isolated_embedding_cache(tmp_path, monkeypatch):
+    """테스트마다 임시 디렉토리의 임베딩 캐시를 사용 (테스트 간 캐시 공유 방지)."""
+    cache = EmbeddingCache(path=str(tmp_path / "embeddings.sqlite3"), enabled=True)
+    monkeypatch.setattr(llm_service_module, "embedding_cache", cache)
+    yield cache
+    cache.close()
+
+
+@pytest.fixture(autouse=True)
+def clear_rerank_cache():
+    rerank_cache.clear()
+    yield
+    rerank_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_llm_schedulers():
+    """Semaphore/Lock이 이전 테스트의 이벤트 루프에 묶이지 않도록 초기화."""
+    LLMScheduler.schedulers = {}
+    yield
+    LLMScheduler.schedulers = {}
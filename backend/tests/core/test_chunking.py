@@ -0,0 +1,50 @@
+from app.core.chunking import excerpt, passage_context, sentence_spans, split_passages
+
+TEXT = "".join(f"{i}번째 문장은 조금 길게 씁니다. " for i in range(30)).strip()
+
+
+def test_split_passages_respects_max_and_sentence_boundaries():
+    spans = split_passages(TEXT, 120, 40)
+    assert len(spans) > 1
+    assert spans[0][0] == 0 and spans[-1][1] == len(TEXT)
+    starts = {start for start, _ in sentence_spans(TEXT)}
+    for start, end in spans:
+        assert end - start <= 120
+        assert start in starts  # 문장 중간에서 시작하지 않음
+
+
+def test_split_passages_overlap_and_coverage():
+    spans = split_passages(TEXT, 120, 40)
+    for (s1, e1), (s2, e2) in zip(spans, spans[1:]):
+        assert s1 < s2 <= e1  # 이웃 passage가 겹치거나 맞닿고, 항상 앞으로 진행
+        assert e1 - s2 <= 40
+    assert split_passages(TEXT, 120, 0)[1][0] >= split_passages(TEXT, 120, 0)[0][1]
+
+
+def test_split_passages_short_and_long_sentence():
+    assert split_passages("짧은 기록", 100) == [(0, 5)]
+    assert split_passages("   ", 100) == []
+    long_sentence = "가" * 250
+    assert split_passages(long_sentence, 100) == [(0, 100), (100, 200), (200, 250)]
+
+
+def test_passage_context_keeps_only_winning_passages():
+    record = {"recordId": "r1", "content": TEXT}
+    spans = split_passages(TEXT, 120, 40)
+
+    given = passage_context(record, "질문", 120, 40, 1, spans=[spans[2], spans[0]])
+    assert given["content"] == TEXT[spans[2][0]:spans[2][1]].strip()
+    assert given["contentLength"] == len(TEXT)
+    assert record["content"] == TEXT  # 원본은 그대로
+
+    # passage 정보가 없으면 질문과 겹치는 passage를 고름
+    picked = passage_context(record, "25번째 문장", 120, 40, 1)
+    assert "25번째" in picked["content"]
+    assert len(picked["content"]) <= 120
+
+    short = {"content": "짧은 기록"}
+    assert passage_context(short, "q", 120, 40, 1) is short
+
+
+def test_excerpt_merges_overlapping_spans_in_order():
+    assert excerpt("abcdefghij", [(6, 8), (0, 3), (2, 5)]) == "abcde … gh"
@@ -0,0 +1,33 @@
+from datetime import date, datetime, timedelta
+from app.core.dates import date_fields, epoch_day, to_date
+from app.db.migrations.record_dates import backfill_update
+from app.db.vector import VectorDB
+
+
+def test_epoch_day_from_supported_types():
+    assert epoch_day("1970-01-02") == 1
+    assert epoch_day(date(2024, 1, 1)) == epoch_day("2024-01-01T23:59:00") == 19723
+    assert epoch_day(datetime(2024, 1, 1, 12)) == 19723
+    assert epoch_day("not a date") is None
+    assert to_date(None) is None
+
+
+def test_date_fields_and_backfill_fallback():
+    assert date_fields("2024-03-05") == {"dateValue": datetime(2024, 3, 5), "dateEpochDay": 19787}
+    assert date_fields("") == {}
+    # date가 없거나 잘못되면 createdAt 날짜 사용
+    assert backfill_update({"date": "??", "createdAt": datetime(2024, 3, 5, 9)})["dateEpochDay"] == 19787
+    assert backfill_update({"date": None}) is None
+
+
+def test_time_decays_from_epoch_day_match_string_path():
+    docs = []
+    for days in (0, 1, 30, 45, 400):
+        day = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+        docs.append({"date": day, "dateEpochDay": epoch_day(day)})
+    docs.append({"date": "2024-01-01 잘못된"})  # backfill 전 문서는 문자열 경로
+
+    decays = VectorDB._time_decays(docs)
+
+    for doc, decay in zip(docs, decays):
+        assert abs(decay - VectorDB._calculate_time_decay(doc["date"])) < 1e-12
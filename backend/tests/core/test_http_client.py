@@ -0,0 +1,78 @@
+import pytest
+from unittest.mock import AsyncMock, patch, MagicMock
+from app.core.http_client import HTTPClientPool
+from app.services.llm_service import NvidiaLLMService
+
+
+@pytest.fixture(autouse=True)
+def reset_pool():
+    HTTPClientPool.clients = {}
+    HTTPClientPool.counters = {}
+    yield
+    HTTPClientPool.clients = {}
+    HTTPClientPool.counters = {}
+
+
+@pytest.mark.asyncio
+async def test_get_client_reuses_client_per_provider():
+    pool = HTTPClientPool()
+
+    first = pool.get_client("openai")
+    second = pool.get_client("openai")
+    other = pool.get_client("nvidia")
+
+    assert first is second
+    assert first is not other
+    await pool.close()
+    assert HTTPClientPool.clients == {}
+
+
+@pytest.mark.asyncio
+async def test_trace_extension_counts_handshakes():
+    pool = HTTPClientPool()
+    pool.get_client("openai")
+
+    trace = pool.trace_extension("openai")["trace"]
+    await trace("connection.connect_tcp.complete", {})
+    await trace("connection.start_tls.complete", {})
+    pool.trace_extension("openai")
+
+    stats = pool.stats()["openai"]
+    assert stats["requests"] == 2
+    assert stats["connections_opened"] == 1
+    assert stats["tls_handshakes"] == 1
+    assert stats["in_use"] == 0
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_llm_calls_share_pooled_client():
+    service = NvidiaLLMService()
+    mock_response = {"choices": [{"message": {"content": "ok"}}]}
+
+    with patch("app.services.llm_service.settings") as mock_settings, patch(
+        "httpx.AsyncClient.post", new_callable=AsyncMock
+    ) as mock_post:
+        mock_settings.NVIDIA_API_KEY = "test_key"
+        mock_post.return_value.json = MagicMock(return_value=mock_response)
+
+        await service._call_chat_api({}, {"messages": []})
+        await service._call_chat_api({}, {"messages": []})
+
+        assert len(HTTPClientPool.clients) == 1
+        assert HTTPClientPool.counters["nvidia"]["requests"] == 2
+        _, kwargs = mock_post.call_args
+        assert "trace" in kwargs["extensions"]
+
+
+def test_per_call_timeout_keeps_pool_connect_and_pool_limits():
+    with patch("app.core.http_client.settings") as mock_settings:
+        mock_settings.HTTP_CONNECT_TIMEOUT = 2.0
+        mock_settings.HTTP_POOL_TIMEOUT = 3.0
+
+        timeout = HTTPClientPool.timeout(10.0)
+
+    assert timeout.read == 10.0
+    assert timeout.write == 10.0
+    assert timeout.connect == 2.0
+    assert timeout.pool == 3.0
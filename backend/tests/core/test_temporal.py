@@ -0,0 +1,42 @@
+from datetime import date
+from app.core.temporal import parse_date_range
+
+TODAY = date(2026, 10, 17)  # 토요일
+
+
+def test_relative_week_and_month():
+    assert parse_date_range("지난주에 뭐 했지?", TODAY) == (date(2026, 10, 5), date(2026, 10, 11))
+    assert parse_date_range("이번 주 기분", TODAY) == (date(2026, 10, 12), date(2026, 10, 18))
+    assert parse_date_range("지난달 여행", TODAY) == (date(2026, 9, 1), date(2026, 9, 30))
+    assert parse_date_range("지난달", date(2026, 1, 3)) == (date(2025, 12, 1), date(2025, 12, 31))
+    assert parse_date_range("어제 누구 만났어?", TODAY) == (date(2026, 10, 16), date(2026, 10, 16))
+
+
+def test_seasons():
+    # 작년 겨울 = 작년 12월 ~ 올해 2월
+    assert parse_date_range("작년 겨울에 누구 만났어?", TODAY) == (date(2025, 12, 1), date(2026, 2, 28))
+    assert parse_date_range("여름에 간 바다", TODAY) == (date(2026, 6, 1), date(2026, 8, 31))
+    # 지금이 가을이면 "지난 가을"은 작년 가을
+    assert parse_date_range("지난 가을", TODAY) == (date(2025, 9, 1), date(2025, 11, 30))
+    assert parse_date_range("이번 겨울", date(2026, 1, 10)) == (date(2025, 12, 1), date(2026, 2, 28))
+    assert parse_date_range("아이 돌봄 일정", TODAY) is None
+
+
+def test_months_and_years():
+    assert parse_date_range("3월에 읽은 책", TODAY) == (date(2026, 3, 1), date(2026, 3, 31))
+    # 아직 오지 않은 달은 작년
+    assert parse_date_range("11월에", TODAY) == (date(2025, 11, 1), date(2025, 11, 30))
+    assert parse_date_range("작년 3월", TODAY) == (date(2025, 3, 1), date(2025, 3, 31))
+    assert parse_date_range("2024년 2월", TODAY) == (date(2024, 2, 1), date(2024, 2, 29))
+    assert parse_date_range("재작년", TODAY) == (date(2024, 1, 1), date(2024, 12, 31))
+
+
+def test_spans_ago_and_recent():
+    assert parse_date_range("3일 전", TODAY) == (date(2026, 10, 14), date(2026, 10, 14))
+    assert parse_date_range("2주 전 회의", TODAY) == (date(2026, 9, 28), date(2026, 10, 4))
+    assert parse_date_range("최근 한 달 동안", TODAY) == (date(2026, 9, 17), TODAY)
+
+
+def test_no_temporal_expression():
+    assert parse_date_range("퇴사를 고민한 적은?", TODAY) is None
+    assert parse_date_range("", TODAY) is None
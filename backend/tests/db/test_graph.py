@@ -1,31 +1,9 @@
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
+from neo4j import READ_ACCESS, WRITE_ACCESS
 from app.db.graph import Neo4jDB
-
-
-class MockNode(dict):
-    """Mocks a Neo4j Node which behaves like a dict but also has attributes."""
-
-    def __init__(self, element_id, labels, properties):
-        super().__init__(properties)
-        self.element_id = element_id
-        self.labels = labels
-
-
-class AsyncIterator:
-    """Helper class for async iteration in tests."""
-
-    def __init__(self, items):
-        self.items = iter(items)
-
-    def __aiter__(self):
-        return self
-
-    async def __anext__(self):
-        try:
-            return next(self.items)
-        except StopIteration:
-            raise StopAsyncIteration
+from app.db.graph_cache import GraphContextCache
+from app.db.graph_schema import SCHEMA_VERSION
 
 
 class MockRecord:
@@ -38,23 +16,39 @@ class MockRecord:
         return self._data.get(key, default)
 
 
+class AsyncRows:
+    """Mock Neo4j result that yields records with `async for`."""
+
+    def __init__(self, rows):
+        self._rows = rows
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for row in self._rows:
+            yield row
+
+
 @pytest.mark.asyncio
 async def test_connect_success():
     db = Neo4jDB()
     Neo4jDB.driver = None
 
-    with patch("neo4j.AsyncGraphDatabase.driver") as mock_driver_cls:
+    with patch("neo4j.AsyncGraphDatabase.driver") as mock_driver_cls, patch(
+        "app.db.graph.graph_schema"
+    ) as mock_schema:
         mock_driver = AsyncMock()
         mock_driver_cls.return_value = mock_driver
-
-        mock_session = AsyncMock()
-        mock_driver.session = MagicMock(return_value=mock_session)
-        mock_session.__aenter__.return_value = mock_session
+        mock_schema.migrate = AsyncMock(return_value={"to": SCHEMA_VERSION})
+        mock_schema.verify = AsyncMock(return_value={})
 
         await db.connect()
 
         assert Neo4jDB.driver is not None
-        mock_driver.session.assert_called()
+        # 스키마(제약/인덱스)는 버전 관리 마이그레이션으로 적용
+        mock_schema.migrate.assert_awaited_once_with(mock_driver)
+        mock_schema.verify.assert_awaited_once_with(mock_driver)
 
 
 @pytest.mark.asyncio
@@ -91,22 +85,241 @@ async def test_get_context_subgraph_success():
 
     Neo4jDB.driver = mock_driver
 
-    # Create a mock node that behaves like a Neo4j node
-    mock_node = MockNode("node1", {"Person"}, {"name": "Alice"})
+    # 서버에서 직렬화된 기록별 노드/엣지가 기록마다 한 행으로 반환됨
+    rows = [
+        MockRecord(
+            {
+                "recordId": "rec1",
+                "nodes": [
+                    {"recordId": "rec1", "_id": "r1", "_labels": ["Record"], "_hop": 0},
+                    {"_id": "e1", "_labels": ["Event"], "_hop": 1},
+                    {"name": "Alice", "_id": "p1", "_labels": ["Person"], "_hop": 2},
+                ],
+                "edges": [
+                    {"source": "r1", "target": "e1", "type": "HAS_EVENT", "properties": {}, "hop": 1},
+                    {"source": "e1", "target": "p1", "type": "INVOLVES", "properties": {}, "hop": 2},
+                ],
+            }
+        )
+    ]
+    mock_tx = AsyncMock()
+    mock_tx.run.return_value = AsyncRows(rows)
+
+    async def run_read(fn):
+        return await fn(mock_tx)
+
+    mock_session.execute_read.side_effect = run_read
+
+    with patch("app.db.graph.graph_cache.enabled", False):
+        graph = await db.get_context_subgraph("user1", ["rec1", "rec1"], hop=2)
+
+    # 읽기 managed transaction (클러스터에서는 follower/read replica로 라우팅)
+    assert mock_driver.session.call_args.kwargs["default_access_mode"] == READ_ACCESS
+    mock_session.execute_write.assert_not_called()
+
+    assert len(graph["nodes"]) == 3
+    assert graph["nodes"][2]["name"] == "Alice"
+    assert "_labels" in graph["nodes"][0]
+    assert [e["type"] for e in graph["edges"]] == ["HAS_EVENT", "INVOLVES"]
 
-    mock_path = MagicMock()
-    mock_path.nodes = [mock_node]
-    mock_path.relationships = []
+    query, params = mock_tx.run.call_args.args
+    assert query == Neo4jDB.fragments_query(2)
+    assert params["recordIds"] == ["rec1"]
+    assert {"perNode", "perHop", "maxDegree"} <= set(params)
 
-    # Create mock record using the MockRecord class
-    mock_record = MockRecord({"path": mock_path})
 
-    # Return an async iterator for the result
-    mock_result = AsyncIterator([mock_record])
-    mock_session.run.return_value = mock_result
+@pytest.mark.asyncio
+async def test_get_context_subgraph_skips_empty_record_ids():
+    mock_driver = AsyncMock()
+    Neo4jDB.driver = mock_driver
 
-    graph = await db.get_context_subgraph("user1", ["rec1"])
+    graph = await Neo4jDB.get_context_subgraph("user1", [])
 
-    assert len(graph["nodes"]) == 1
-    assert graph["nodes"][0]["name"] == "Alice"
-    assert "_labels" in graph["nodes"][0]
+    assert graph == {"nodes": [], "edges": []}
+    mock_driver.session.assert_not_called()
+
+
+def test_fragments_query_honors_hop():
+    one = Neo4jDB.fragments_query(1)
+    two = Neo4jDB.fragments_query(2)
+
+    # 가변 길이 패턴 없이 hop마다 타입이 정해진 관계만 따라감
+    assert "*" not in two.replace("n {.*", "")
+    assert one.count("CALL {") == 3
+    assert two.count("CALL {") == 5
+    assert "HAS_EVENT|HAS_EMOTION" in one
+    assert "INVOLVES|HAS_ACTION|LEADS_TO" not in one
+    assert "INVOLVES|HAS_ACTION|LEADS_TO" in two
+    assert "LIMIT $perNode" in two and "LIMIT $perHop" in two
+    assert "$maxDegree" in two
+    # 노드/엣지에 처음 도달한 hop을 붙여 merge_fragments가 hop별 예산을 적용
+    assert "_hop: 2}]" in two and "hop: 2}]" in two
+
+
+def test_fragments_query_clamps_hop():
+    assert Neo4jDB.fragments_query(10) == Neo4jDB.fragments_query(len(Neo4jDB.HOP_PATTERNS))
+    zero = Neo4jDB.fragments_query(0)
+    assert zero.count("CALL {") == 1
+    assert "[] AS edges" in zero
+
+
+@pytest.mark.asyncio
+async def test_execute_write_uses_write_session_and_tracks_stats():
+    mock_driver = MagicMock()
+    mock_session = AsyncMock()
+    mock_session.__aenter__.return_value = mock_session
+    mock_driver.session.return_value = mock_session
+    Neo4jDB.driver = mock_driver
+
+    async def run_write(fn, *args):
+        return await fn("tx", *args)
+
+    mock_session.execute_write.side_effect = run_write
+    before = Neo4jDB.pool_stats()["write"]["transactions"]
+
+    async def work(tx, value):
+        return (tx, value)
+
+    with patch("app.db.graph.settings.NEO4J_DATABASE", "diary"):
+        assert await Neo4jDB.execute_write(work, 1) == ("tx", 1)
+
+    kwargs = mock_driver.session.call_args.kwargs
+    assert kwargs["default_access_mode"] == WRITE_ACCESS
+    assert kwargs["database"] == "diary"
+    stats = Neo4jDB.pool_stats()
+    assert stats["write"]["transactions"] == before + 1
+    assert stats["write"]["active"] == 0
+
+
+@pytest.mark.asyncio
+async def test_execute_read_counts_errors():
+    mock_driver = MagicMock()
+    mock_session = AsyncMock()
+    mock_session.__aenter__.return_value = mock_session
+    mock_session.execute_read.side_effect = Exception("unavailable")
+    mock_driver.session.return_value = mock_session
+    Neo4jDB.driver = mock_driver
+    before = Neo4jDB.pool_stats()["read"]["errors"]
+
+    with pytest.raises(Exception):
+        await Neo4jDB.execute_read(AsyncMock())
+
+    assert Neo4jDB.pool_stats()["read"]["errors"] == before + 1
+
+
+def test_pool_stats_reports_connections_per_address():
+    pool = MagicMock()
+    pool.connections = {"localhost:7687": [object(), object()]}
+    pool.in_use_connection_count.return_value = 1
+    Neo4jDB.driver = MagicMock(_pool=pool)
+
+    stats = Neo4jDB.pool_stats()
+
+    assert stats["connections"] == {"localhost:7687": {"open": 2, "in_use": 1}}
+    assert {"max_pool_size", "acquisition_timeout", "fetch_size"} <= set(stats)
+
+
+@pytest.mark.asyncio
+async def test_get_context_subgraph_fetches_only_cache_misses():
+    cache = GraphContextCache(max_entries=10, max_bytes=1_000_000, ttl_seconds=60, enabled=True)
+    cache.put_many(
+        "user1",
+        {"rec1": {"nodes": [{"_id": "r1"}, {"_id": "p1"}], "edges": [{"source": "r1", "target": "p1", "type": "X"}]}},
+        hop=2,
+    )
+    Neo4jDB.driver = MagicMock()
+    fetched = {
+        "rec2": {"nodes": [{"_id": "r2"}, {"_id": "p1"}], "edges": [{"source": "r2", "target": "p1", "type": "X"}]}
+    }
+
+    with patch("app.db.graph.graph_cache", cache), patch.object(
+        Neo4jDB, "get_record_fragments", AsyncMock(return_value=fetched)
+    ) as mock_fetch:
+        graph = await Neo4jDB.get_context_subgraph("user1", ["rec1", "rec2"], hop=2)
+        again = await Neo4jDB.get_context_subgraph("user1", ["rec2", "rec1"], hop=2)
+
+    # rec1은 캐시, rec2만 한 번 조회 / 공유 노드(p1)는 한 번만
+    mock_fetch.assert_awaited_once_with("user1", ["rec2"], 2)
+    assert [n["_id"] for n in graph["nodes"]] == ["r1", "p1", "r2"]
+    assert len(graph["edges"]) == 2
+    assert [n["_id"] for n in again["nodes"]] == ["r2", "p1", "r1"]
+    assert cache.stats()["hits"] == 3
+
+
+@pytest.mark.asyncio
+async def test_get_record_fragments_reads_rows_per_record():
+    rows = [
+        MockRecord({"recordId": "rec1", "nodes": [{"_id": "r1"}], "edges": []}),
+        MockRecord({"recordId": "rec2", "nodes": [], "edges": []}),
+    ]
+    mock_tx = AsyncMock()
+    mock_tx.run.return_value = AsyncRows(rows)
+
+    async def run_read(fn):
+        return await fn(mock_tx)
+
+    with patch.object(Neo4jDB, "execute_read", AsyncMock(side_effect=run_read)):
+        fragments = await Neo4jDB.get_record_fragments("user1", ["rec1", "rec2"], hop=2)
+
+    assert fragments == {
+        "rec1": {"nodes": [{"_id": "r1"}], "edges": []},
+        "rec2": {"nodes": [], "edges": []},
+    }
+    query, params = mock_tx.run.call_args.args
+    assert query == Neo4jDB.fragments_query(2)
+    assert params["recordIds"] == ["rec1", "rec2"]
+
+
+def test_fragments_query_expands_each_record_separately():
+    query = Neo4jDB.fragments_query(2)
+
+    assert query.startswith("UNWIND $recordIds AS recordId")
+    assert "r.recordId = recordId" in query
+    assert query.rstrip().endswith("RETURN recordId, nodes, edges")
+    assert query.count("RETURN recordId, nodes, edges") == 1
+
+
+def question_fragments():
+    # rec1/rec2가 같은 사건 e1을 공유하고, 기록마다 hop 2 관계가 3개씩
+    def fragment(record_id, event, people):
+        nodes = [{"_id": record_id, "_labels": ["Record"], "_hop": 0}, {"_id": event, "_hop": 1}]
+        nodes += [{"_id": p, "_hop": 2} for p in people]
+        edges = [{"source": record_id, "target": event, "type": "HAS_EVENT", "hop": 1}]
+        edges += [{"source": event, "target": p, "type": "INVOLVES", "hop": 2} for p in people]
+        return {"nodes": nodes, "edges": edges}
+
+    return {
+        "rec1": fragment("r1", "e1", ["p1", "p2", "p3"]),
+        "rec2": fragment("r2", "e1", ["p1", "p2", "p3"]),
+        "rec3": fragment("r3", "e3", ["p4", "p5", "p6"]),
+    }
+
+
+@pytest.mark.asyncio
+async def test_cached_and_uncached_paths_return_same_graph():
+    fragments = question_fragments()
+    Neo4jDB.driver = MagicMock()
+
+    async def fetch(user_id, record_ids, hop):
+        return {r: fragments[r] for r in record_ids}
+
+    cache = GraphContextCache(max_entries=10, max_bytes=1_000_000, ttl_seconds=60, enabled=True)
+    # rec2만 미리 캐시 (질문마다 일부만 캐시에 있는 경우)
+    cache.put_many("user1", {"rec2": fragments["rec2"]}, hop=2)
+    record_ids = ["rec1", "rec2", "rec3"]
+    with patch("app.db.graph.settings.GRAPH_HOP_FANOUT", 4), patch.object(
+        Neo4jDB, "get_record_fragments", AsyncMock(side_effect=fetch)
+    ):
+        with patch("app.db.graph.graph_cache", cache):
+            cached = await Neo4jDB.get_context_subgraph("user1", record_ids, hop=2)
+        with patch("app.db.graph.graph_cache.enabled", False):
+            uncached = await Neo4jDB.get_context_subgraph("user1", record_ids, hop=2)
+
+    assert cached == uncached
+    # hop마다 질문 전체 GRAPH_HOP_FANOUT개까지 (기록별 조각을 합쳐도 넘지 않음)
+    assert [e["hop"] for e in cached["edges"]].count(1) == 3
+    assert [e["hop"] for e in cached["edges"]].count(2) == 4
+    # 기록 순서대로 번갈아 선택해 rec3의 이웃도 포함
+    assert {e["target"] for e in cached["edges"] if e["hop"] == 2} == {"p1", "p2", "p4", "p5"}
+    edge_ends = {n for e in cached["edges"] for n in (e["source"], e["target"])}
+    assert {n["_id"] for n in cached["nodes"]} == edge_ends
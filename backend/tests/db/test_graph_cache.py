@@ -0,0 +1,117 @@
+from unittest.mock import patch
+
+from app.db.graph_cache import GraphContextCache, merge_fragments
+
+
+def fragment(record_id, *people):
+    nodes = [{"_id": record_id}] + [{"_id": p} for p in people]
+    edges = [{"source": record_id, "target": p, "type": "INVOLVES"} for p in people]
+    return {"nodes": nodes, "edges": edges}
+
+
+def make_cache(**kwargs):
+    options = {"max_entries": 100, "max_bytes": 1_000_000, "ttl_seconds": 60, "enabled": True}
+    options.update(kwargs)
+    return GraphContextCache(**options)
+
+
+def test_get_many_returns_hits_and_counts_misses():
+    cache = make_cache()
+    cache.put_many("u1", {"r1": fragment("r1", "p1")}, hop=2)
+
+    found = cache.get_many("u1", ["r1", "r2"], hop=2)
+
+    assert found == {"r1": fragment("r1", "p1")}
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+    assert stats["hit_ratio"] == 0.5
+
+
+def test_key_includes_user_hop_and_schema_version():
+    cache = make_cache()
+    cache.put_many("u1", {"r1": fragment("r1")}, hop=2)
+
+    assert cache.get_many("u2", ["r1"], hop=2) == {}
+    assert cache.get_many("u1", ["r1"], hop=1) == {}
+    with patch("app.db.graph_cache.SCHEMA_VERSION", 999):
+        assert cache.get_many("u1", ["r1"], hop=2) == {}
+
+
+def test_invalidate_record_removes_only_that_record_for_short_hops():
+    cache = make_cache()
+    cache.put_many("u1", {"r1": fragment("r1"), "r2": fragment("r2")}, hop=2)
+    cache.put_many("u1", {"r3": fragment("r3")}, hop=3)
+
+    cache.invalidate_record("u1", "r1")
+
+    assert cache.get_many("u1", ["r1", "r2"], hop=2) == {"r2": fragment("r2")}
+    # hop 3 이상은 다른 기록 저장으로도 바뀔 수 있으므로 함께 제거
+    assert cache.get_many("u1", ["r3"], hop=3) == {}
+    assert cache.stats()["invalidated"] == 2
+
+
+def test_put_after_concurrent_write_is_skipped():
+    cache = make_cache()
+    generation = cache.generation("u1")
+    cache.invalidate_record("u1", "r1")  # 조회 중에 그래프 저장이 커밋됨
+
+    cache.put_many("u1", {"r1": fragment("r1")}, hop=2, generation=generation)
+
+    assert cache.get_many("u1", ["r1"], hop=2) == {}
+    assert cache.stats()["stale_skipped"] == 1
+
+
+def test_memory_bounds_evict_least_recently_used():
+    cache = make_cache(max_entries=2)
+    cache.put_many("u1", {"r1": fragment("r1"), "r2": fragment("r2")}, hop=2)
+    cache.get_many("u1", ["r1"], hop=2)
+    cache.put_many("u1", {"r3": fragment("r3")}, hop=2)
+
+    assert set(cache.get_many("u1", ["r1", "r2", "r3"], hop=2)) == {"r1", "r3"}
+    assert cache.stats()["evictions"] == 1
+
+    small = make_cache(max_bytes=200)
+    small.put_many("u1", {f"r{i}": fragment(f"r{i}", "p1", "p2") for i in range(5)}, hop=2)
+    stats = small.stats()
+    assert stats["bytes"] <= 200
+    assert stats["entries"] < 5
+
+
+def test_expired_entries_are_misses():
+    cache = make_cache(ttl_seconds=0)
+    cache.put_many("u1", {"r1": fragment("r1")}, hop=2)
+
+    with patch("app.db.graph_cache.time.monotonic", return_value=10**9):
+        assert cache.get_many("u1", ["r1"], hop=2) == {}
+    assert cache.stats()["expired"] == 1
+
+
+def test_disabled_cache_stores_nothing():
+    cache = make_cache(enabled=False)
+    cache.put_many("u1", {"r1": fragment("r1")}, hop=2)
+
+    assert cache.get_many("u1", ["r1"], hop=2) == {}
+    assert cache.stats()["entries"] == 0
+
+
+def test_merge_fragments_dedupes_nodes_and_edges():
+    merged = merge_fragments([fragment("r1", "p1"), fragment("r2", "p1"), fragment("r1", "p1")])
+
+    assert [n["_id"] for n in merged["nodes"]] == ["r1", "p1", "r2"]
+    assert len(merged["edges"]) == 2
+
+
+def test_merge_fragments_limits_edges_per_hop_across_records():
+    def hop_fragment(record_id, event, *people):
+        nodes = [{"_id": record_id, "_hop": 0}, {"_id": event, "_hop": 1}] + [{"_id": p, "_hop": 2} for p in people]
+        edges = [{"source": record_id, "target": event, "type": "HAS_EVENT", "hop": 1}]
+        edges += [{"source": event, "target": p, "type": "INVOLVES", "hop": 2} for p in people]
+        return {"nodes": nodes, "edges": edges}
+
+    merged = merge_fragments(
+        [hop_fragment("r1", "e1", "p1", "p2", "p3"), hop_fragment("r2", "e2", "p4", "p5")], per_hop=1
+    )
+
+    # hop 1은 r1의 사건만 남으므로 r2 쪽 hop 2 관계는 닿는 노드가 없어 제외
+    assert [(e["source"], e["target"]) for e in merged["edges"]] == [("r1", "e1"), ("e1", "p1")]
+    assert [n["_id"] for n in merged["nodes"]] == ["r1", "e1", "p1", "r2"]
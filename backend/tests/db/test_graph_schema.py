@@ -0,0 +1,148 @@
+import re
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.db.graph_schema import (
+    MERGE_KEYS,
+    MIGRATIONS,
+    SCHEMA_VERSION,
+    GraphSchema,
+    constraint_statement,
+    plan_operators,
+)
+from app.db.graph_writer import GraphWriter
+
+
+class MockResult:
+    def __init__(self, record=None, plan=None):
+        self._record = record
+        self.plan = plan
+
+    async def single(self):
+        return self._record
+
+    async def consume(self):
+        return self
+
+
+def make_driver(run):
+    session = AsyncMock()
+    session.__aenter__.return_value = session
+    session.run = AsyncMock(side_effect=run)
+    driver = MagicMock()
+    driver.session = MagicMock(return_value=session)
+    return driver, session
+
+
+def test_merge_keys_cover_graph_writer_merges():
+    # WRITE_RECORDS_QUERY의 모든 노드 MERGE 키에 같은 속성 조합의 제약이 있어야 함
+    merges = re.findall(r"MERGE \(\w+:(\w+) \{([^}]*)\}\)", GraphWriter.WRITE_RECORDS_QUERY)
+    used = {label: tuple(sorted(re.findall(r"(\w+):", body))) for label, body in merges}
+
+    assert used == {label: tuple(sorted(keys)) for label, keys in MERGE_KEYS}
+
+
+def test_constraint_statement():
+    statement = constraint_statement("Person", ("name", "userId"))
+
+    assert statement == (
+        "CREATE CONSTRAINT person_merge_key IF NOT EXISTS "
+        "FOR (n:Person) REQUIRE (n.name, n.userId) IS UNIQUE"
+    )
+
+
+def test_migration_versions_are_sequential():
+    assert [step for step, _, _ in MIGRATIONS] == list(range(1, SCHEMA_VERSION + 1))
+
+
+@pytest.mark.asyncio
+async def test_migrate_applies_only_pending_steps():
+    calls = []
+
+    async def run(query, **params):
+        calls.append((query, params))
+        if query.startswith("MATCH (s:GraphSchema"):
+            return MockResult({"version": 1})
+        return MockResult()
+
+    driver, _ = make_driver(run)
+
+    report = await GraphSchema.migrate(driver)
+
+    assert report == {"from": 1, "to": SCHEMA_VERSION, "applied": [2], "error": None}
+    statements = [query for query, _ in calls]
+    assert not any(s.startswith("CREATE INDEX") for s in statements)
+    assert sum(s.startswith("CREATE CONSTRAINT") for s in statements) == len(MERGE_KEYS)
+    assert calls[-1][1]["version"] == 2
+
+
+@pytest.mark.asyncio
+async def test_migrate_stops_without_recording_failed_step():
+    async def run(query, **params):
+        if query.startswith("MATCH (s:GraphSchema"):
+            return MockResult(None)
+        if "person_merge_key" in query:
+            raise Exception("duplicate nodes")
+        return MockResult()
+
+    driver, session = make_driver(run)
+
+    report = await GraphSchema.migrate(driver)
+
+    assert report["applied"] == [1]
+    assert report["to"] == 1
+    assert "migration 2" in report["error"]
+    versions = [call.kwargs.get("version") for call in session.run.call_args_list]
+    assert 2 not in versions
+
+
+@pytest.mark.asyncio
+async def test_migrate_aborts_before_dropping_indexes_when_duplicates_exist():
+    calls = []
+
+    async def run(query, **params):
+        calls.append(query)
+        if query.startswith("MATCH (s:GraphSchema"):
+            return MockResult({"version": 1})
+        if query.startswith("MATCH (n:Person)"):
+            return MockResult({"groups": 3})
+        if query.startswith("MATCH (n:"):
+            return MockResult({"groups": 0})
+        return MockResult()
+
+    driver, session = make_driver(run)
+
+    report = await GraphSchema.migrate(driver)
+
+    assert report["applied"] == []
+    assert report["to"] == 1
+    assert "'Person': 3" in report["error"]
+    assert not any(q.startswith(("DROP", "CREATE", "MERGE")) for q in calls)
+
+
+def test_plan_operators_flattens_tree():
+    plan = {
+        "operatorType": "ProduceResults@neo4j",
+        "children": [{"operatorType": "NodeByLabelScan@neo4j", "children": []}],
+    }
+
+    assert plan_operators(plan) == ["ProduceResults", "NodeByLabelScan"]
+    assert plan_operators(None) == []
+
+
+@pytest.mark.asyncio
+async def test_verify_reports_label_scans():
+    seek = {"operatorType": "Merge@neo4j", "children": [{"operatorType": "NodeUniqueIndexSeek(Locking)@neo4j"}]}
+    scan = {"operatorType": "Merge@neo4j", "children": [{"operatorType": "NodeByLabelScan@neo4j"}]}
+
+    async def run(query, params):
+        assert query.startswith("EXPLAIN ")
+        return MockResult(plan=scan if ":Person" in query else seek)
+
+    driver, _ = make_driver(run)
+
+    problems = await GraphSchema.verify(driver)
+
+    assert list(problems) == ["Person"]
+    assert "NodeByLabelScan" in problems["Person"]
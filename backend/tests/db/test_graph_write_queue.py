@@ -0,0 +1,190 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.db.graph_write_queue import GraphWriteQueue
+from app.db.graph_writer import GraphWriter
+
+
+def record(record_id):
+    return {"userId": "user1", "recordId": record_id, "date": "2024-01-01", "emotions": [], "events": []}
+
+
+def attach_db(mock_db, transactions, fail=lambda tx_calls: None):
+    """execute_write마다 트랜잭션에서 실행된 (query, params) 목록을 transactions에 기록."""
+
+    async def execute_write(fn):
+        calls = []
+        tx = MagicMock()
+
+        async def run(query, **params):
+            calls.append((query, params))
+            result = MagicMock()
+            result.consume = AsyncMock()
+            return result
+
+        tx.run = run
+        value = await fn(tx)
+        error = fail(calls)
+        if error is not None:
+            raise error
+        transactions.append(calls)
+        return value
+
+    mock_db.driver = MagicMock()
+    mock_db.execute_write = AsyncMock(side_effect=execute_write)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_records_commit_in_one_transaction():
+    transactions = []
+    queue = GraphWriteQueue(window_ms=5, max_records=10)
+
+    with patch("app.db.graph_write_queue.neo4j_db") as mock_db:
+        attach_db(mock_db, transactions)
+        results = await asyncio.gather(*[queue.submit_record(record(f"r{i}")) for i in range(3)])
+
+    assert results == [True, True, True]
+    assert len(transactions) == 1
+    query, params = transactions[0][0]
+    assert query == GraphWriter.WRITE_RECORDS_QUERY
+    assert [r["recordId"] for r in params["records"]] == ["r0", "r1", "r2"]
+    stats = queue.stats()
+    assert stats["batches"] == 1
+    assert stats["max_batch_size"] == 3
+    assert stats["failed_records"] == []
+
+
+@pytest.mark.asyncio
+async def test_max_records_splits_batches():
+    transactions = []
+    queue = GraphWriteQueue(window_ms=50, max_records=2)
+
+    with patch("app.db.graph_write_queue.neo4j_db") as mock_db:
+        attach_db(mock_db, transactions)
+        await asyncio.gather(*[queue.submit_record(record(f"r{i}")) for i in range(3)])
+
+    assert [len(tx[0][1]["records"]) for tx in transactions] == [2, 1]
+
+
+@pytest.mark.asyncio
+async def test_cypher_and_structured_writes_share_transaction():
+    transactions = []
+    queue = GraphWriteQueue(window_ms=5)
+
+    with patch("app.db.graph_write_queue.neo4j_db") as mock_db:
+        attach_db(mock_db, transactions)
+        await asyncio.gather(
+            queue.submit_record(record("r1")),
+            queue.submit_cypher("user1", "r2", "MERGE (n:Record {recordId: 'r2'})"),
+        )
+
+    assert len(transactions) == 1
+    assert [query for query, _ in transactions[0]] == [
+        GraphWriter.WRITE_RECORDS_QUERY,
+        "MERGE (n:Record {recordId: 'r2'})",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_bad_record_is_isolated_and_kept_for_replay():
+    transactions = []
+    queue = GraphWriteQueue(window_ms=5)
+
+    def fail(calls):
+        # 잘못된 Cypher가 포함된 트랜잭션만 실패
+        if any(query == "BROKEN" for query, _ in calls):
+            return Exception("Invalid input")
+
+    with patch("app.db.graph_write_queue.neo4j_db") as mock_db:
+        attach_db(mock_db, transactions, fail)
+        results = await asyncio.gather(
+            queue.submit_record(record("r1")),
+            queue.submit_record(record("r2")),
+            queue.submit_cypher("user1", "bad", "BROKEN"),
+        )
+
+    assert results == [True, True, False]
+    assert queue.stats()["failed_records"] == ["bad"]
+    assert queue.failed()[0]["error"] == "Invalid input"
+    committed = [r["recordId"] for tx in transactions for _, p in tx for r in p.get("records", [])]
+    assert sorted(committed) == ["r1", "r2"]
+
+
+@pytest.mark.asyncio
+async def test_retryable_error_fails_whole_batch_without_splitting():
+    class TransientError(Exception):
+        def is_retryable(self):
+            return True
+
+    attempts = []
+    queue = GraphWriteQueue(window_ms=5)
+
+    def fail(calls):
+        attempts.append(calls)
+        return TransientError("leader switch")
+
+    with patch("app.db.graph_write_queue.neo4j_db") as mock_db:
+        attach_db(mock_db, [], fail)
+        results = await asyncio.gather(*[queue.submit_record(record(f"r{i}")) for i in range(3)])
+
+    # 드라이버의 managed transaction 재시도 후에도 실패 -> 분할 재시도 없이 전부 replay 대상
+    assert results == [False, False, False]
+    assert len(attempts) == 1
+    assert queue.stats()["failed_records"] == ["r0", "r1", "r2"]
+
+
+@pytest.mark.asyncio
+async def test_replay_resubmits_failed_records():
+    transactions = []
+    queue = GraphWriteQueue(window_ms=5)
+
+    with patch("app.db.graph_write_queue.neo4j_db") as mock_db:
+        mock_db.driver = None
+        assert await queue.submit_record(record("r1")) is False
+
+        attach_db(mock_db, transactions)
+        report = await queue.replay()
+
+    assert report == {"replayed": 1, "committed": 1}
+    assert queue.failed() == []
+    assert transactions[0][0][1]["records"][0]["recordId"] == "r1"
+
+
+@pytest.mark.asyncio
+async def test_flush_commits_pending_records():
+    transactions = []
+    queue = GraphWriteQueue(window_ms=10_000)
+
+    with patch("app.db.graph_write_queue.neo4j_db") as mock_db:
+        attach_db(mock_db, transactions)
+        pending = asyncio.ensure_future(queue.submit_record(record("r1")))
+        await asyncio.sleep(0)
+        await queue.flush()
+
+        assert len(transactions) == 1
+        assert await pending is True
+
+
+@pytest.mark.asyncio
+async def test_disabled_commits_each_record():
+    transactions = []
+    queue = GraphWriteQueue(enabled=False)
+
+    with patch("app.db.graph_write_queue.neo4j_db") as mock_db:
+        attach_db(mock_db, transactions)
+        await asyncio.gather(queue.submit_record(record("r1")), queue.submit_record(record("r2")))
+
+    assert len(transactions) == 2
+
+
+@pytest.mark.asyncio
+async def test_commit_invalidates_graph_context_cache():
+    queue = GraphWriteQueue(window_ms=5)
+
+    with patch("app.db.graph_write_queue.neo4j_db") as mock_db, patch(
+        "app.db.graph_write_queue.graph_cache"
+    ) as mock_cache:
+        attach_db(mock_db, [])
+        await queue.submit_record(record("r1"))
+
+    mock_cache.invalidate_record.assert_called_once_with("user1", "r1")
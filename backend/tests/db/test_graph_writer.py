@@ -0,0 +1,78 @@
+import pytest
+from unittest.mock import AsyncMock, patch, MagicMock
+from app.db.graph_writer import GraphWriter
+from app.models.domain.graph import GraphData, GraphEvent
+
+
+def make_graph_data():
+    return GraphData(
+        events=[
+            GraphEvent(
+                summary="  친구와  저녁 ",
+                people=["민수", "민수", " "],
+                actions=["밥 먹기"],
+                outcomes=[],
+            ),
+            GraphEvent(summary=""),
+        ],
+        emotions=["행복", "행복"],
+    )
+
+
+def test_build_record_params_is_deterministic_and_clean():
+    params = GraphWriter.build_record_params("user1", "rec1", "2024-01-01", make_graph_data())
+
+    assert params == {
+        "userId": "user1",
+        "recordId": "rec1",
+        "date": "2024-01-01",
+        "emotions": ["행복"],
+        "events": [
+            {
+                "id": "rec1-e0",
+                "summary": "친구와 저녁",
+                "people": ["민수"],
+                "actions": ["밥 먹기"],
+                "outcomes": [],
+            }
+        ],
+    }
+
+
+@pytest.mark.asyncio
+async def test_write_records_runs_single_parameterized_transaction():
+    records = [
+        GraphWriter.build_record_params("user1", f"rec{i}", "2024-01-01", make_graph_data())
+        for i in range(3)
+    ]
+
+    mock_tx = AsyncMock()
+
+    async def run_tx(fn):
+        return await fn(mock_tx)
+
+    with patch("app.db.graph_writer.neo4j_db") as mock_db:
+        mock_db.execute_write = AsyncMock(side_effect=run_tx)
+        ok = await GraphWriter.write_records(records)
+
+    assert ok is True
+    mock_db.execute_write.assert_awaited_once()
+    mock_tx.run.assert_awaited_once_with(GraphWriter.WRITE_RECORDS_QUERY, records=records)
+
+
+@pytest.mark.asyncio
+async def test_write_records_reports_failure():
+    with patch("app.db.graph_writer.neo4j_db") as mock_db:
+        mock_db.execute_write = AsyncMock(side_effect=Exception("boom"))
+        ok = await GraphWriter.write_records(
+            [GraphWriter.build_record_params("u", "r", "2024-01-01", make_graph_data())]
+        )
+
+    assert ok is False
+
+
+@pytest.mark.asyncio
+async def test_write_records_without_driver():
+    with patch("app.db.graph_writer.neo4j_db") as mock_db:
+        mock_db.driver = None
+        assert await GraphWriter.write_records([{"recordId": "r"}]) is False
@@ -0,0 +1,114 @@
+import os
+
+import numpy as np
+from app.db.hnsw_index import HNSWGraph, HNSWVectorStore
+
+
+def clustered_vectors(n, dim=16, clusters=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    vectors = centers[rng.integers(0, clusters, size=n)] + 0.3 * rng.normal(size=(n, dim))
+    vectors = vectors.astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def exact_top_k(vectors, query, k):
+    return set(np.argsort(-(vectors @ query))[:k].tolist())
+
+
+def test_graph_recall_against_exact():
+    vectors = clustered_vectors(600)
+    graph = HNSWGraph(M=8, ef_construction=64)
+    for i in range(len(vectors)):
+        graph.insert(i, vectors)
+
+    hits = 0
+    for q in range(0, 600, 20):
+        found = {node for _, node in graph.search(vectors[q], vectors, k=10, ef=50)}
+        hits += len(found & exact_top_k(vectors, vectors[q], 10))
+    assert hits / (30 * 10) >= 0.95
+
+
+def test_graph_skips_deleted_nodes():
+    vectors = clustered_vectors(200)
+    graph = HNSWGraph(M=8, ef_construction=32)
+    for i in range(len(vectors)):
+        graph.insert(i, vectors)
+    alive = np.ones(200, dtype=bool)
+    alive[:150] = False
+
+    found = graph.search(vectors[0], vectors, k=10, ef=10, alive=alive)
+
+    assert len(found) == 10
+    assert all(node >= 150 for _, node in found)
+
+
+def test_store_uses_hnsw_above_min_rows_and_soft_deletes(tmp_path):
+    store = HNSWVectorStore(path=str(tmp_path), M=8, ef_construction=32, min_rows=50)
+    vectors = clustered_vectors(120)
+    for i, v in enumerate(vectors):
+        store.add("u1", f"r{i}", v.tolist())
+
+    # 첫 검색은 exact로 응답하고 그래프는 별도 스레드에서 구축
+    hits = store.search("u1", vectors[5].tolist(), top_k=3)
+    assert hits[0][0] == "r5"
+    store.wait_for_builds()
+    assert store.stats()["graph_nodes"] == 120
+
+    hits = store.search("u1", vectors[5].tolist(), top_k=3)
+    assert hits[0][0] == "r5"
+    assert hits[0][1] > 0.99
+
+    store.remove("u1", "r5")
+    assert "r5" not in [h[0] for h in store.search("u1", vectors[5].tolist(), top_k=3)]
+
+
+def test_snapshot_reload_and_incremental_insert(tmp_path):
+    vectors = clustered_vectors(150)
+    store = HNSWVectorStore(path=str(tmp_path), M=8, ef_construction=32, min_rows=50)
+    for i, v in enumerate(vectors[:100]):
+        store.add("u1", f"r{i}", v.tolist())
+    store.search("u1", vectors[0].tolist(), top_k=1)
+    store.wait_for_builds()
+    store.close()
+    assert os.path.exists(store._snapshot_path(store._user("u1")))
+
+    reloaded = HNSWVectorStore(path=str(tmp_path), M=8, ef_construction=32, min_rows=50)
+    reloaded.warm_up()
+    reloaded.wait_for_builds()
+    assert reloaded._graphs["u1"].size == 100
+
+    for i, v in enumerate(vectors[100:], start=100):
+        reloaded.add("u1", f"r{i}", v.tolist())
+    assert reloaded._graphs["u1"].size == 150
+    assert reloaded.search("u1", vectors[120].tolist(), top_k=1)[0][0] == "r120"
+
+
+def test_snapshot_ignored_when_rows_changed(tmp_path):
+    vectors = clustered_vectors(60)
+    store = HNSWVectorStore(path=str(tmp_path), M=8, min_rows=10)
+    for i, v in enumerate(vectors):
+        store.add("u1", f"r{i}", v.tolist())
+    store.search("u1", vectors[0].tolist(), top_k=1)
+    store.wait_for_builds()
+    store.close()
+
+    # 스냅샷과 다른 행 구성으로 다시 만든 인덱스
+    matrix = store._user("u1")
+    matrix.ids[0] = "other"
+    assert HNSWVectorStore(path=str(tmp_path), M=8)._load_snapshot(matrix) is None
+
+
+def test_rows_added_during_build_are_caught_up(tmp_path):
+    vectors = clustered_vectors(130)
+    store = HNSWVectorStore(path=str(tmp_path), M=8, ef_construction=32, min_rows=50)
+    for i, v in enumerate(vectors[:100]):
+        store.add("u1", f"r{i}", v.tolist())
+    store.search("u1", vectors[0].tolist(), top_k=1)
+    # 구축 중에 추가된 행은 그래프에 아직 없어도 exact 검색으로 찾힘
+    for i, v in enumerate(vectors[100:], start=100):
+        store.add("u1", f"r{i}", v.tolist())
+    store.wait_for_builds()
+
+    assert store.search("u1", vectors[125].tolist(), top_k=1)[0][0] == "r125"
+    assert store._graphs["u1"].size == 130
@@ -0,0 +1,101 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from app.db.lexical import LexicalIndex
+from app.db.vector import VectorDB
+
+
+class AsyncCursor:
+    def __init__(self, docs):
+        self.docs = iter(docs)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self.docs)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+def test_bm25_ranks_korean_matches_with_particles(tmp_path):
+    index = LexicalIndex(path=str(tmp_path))
+    index.add("u1", "r1", "카페 데이트", "여자친구와 카페에서 커피를 마셨다.")
+    index.add("u1", "r2", "운동", "헬스장에서 운동을 했다.")
+    index.add("u1", "r3", "회의", "팀 회의가 길어졌다. 카페는 못 갔다.")
+
+    hits = index.search("u1", "여자친구랑 카페", top_k=5)
+
+    assert [h[0] for h in hits] == ["r1", "r3"]
+    assert hits[0][1] > hits[1][1] > 0
+    assert index.search("u1", "없는단어", top_k=5) == []
+
+
+def test_update_and_delete_are_incremental(tmp_path):
+    index = LexicalIndex(path=str(tmp_path))
+    index.add("u1", "r1", "산책", "공원 산책")
+    index.add("u2", "r2", "산책", "공원 산책")
+    index.add("u1", "r1", "독서", "도서관에서 책을 읽었다")
+
+    assert index.search("u1", "산책", 5) == []
+    assert [h[0] for h in index.search("u1", "도서관", 5)] == ["r1"]
+    assert [h[0] for h in index.search("u2", "산책", 5)] == ["r2"]
+
+    index.remove("u2", "r2")
+    assert index.search("u2", "산책", 5) == []
+
+
+def test_persists_and_reloads(tmp_path):
+    index = LexicalIndex(path=str(tmp_path), save_every=1000)
+    index.add("u1", "r1", "여행", "부산 바다 여행")
+    index.add("u1", "r2", "여행", "제주 여행")
+    index.remove("u1", "r2")
+    index.close()
+
+    reloaded = LexicalIndex(path=str(tmp_path))
+    reloaded.warm_up()
+
+    assert reloaded.has_user("u1")
+    assert [h[0] for h in reloaded.search("u1", "여행", 5)] == ["r1"]
+
+
+def test_compaction_keeps_scores(tmp_path):
+    index = LexicalIndex(path=str(tmp_path))
+    for i in range(300):
+        index.add("u1", f"r{i}", "기록", f"메모 {i} 번째 " + ("카페" if i % 2 else "공원"))
+    before = dict(index.search("u1", "카페 메모", 300))
+    for i in range(0, 200, 2):
+        index.remove("u1", f"r{i}")
+    for i in range(1, 200, 2):
+        index.remove("u1", f"r{i}")
+
+    user = index._user("u1")
+    assert len(user.ids) < 300
+    assert user.live_docs == 100
+    after = index.search("u1", "카페 메모", 10)
+    assert {h[0] for h in after} <= {f"r{i}" for i in range(200, 300)}
+    assert len(after) == 10 and all(h[0] in before for h in after)
+
+
+@pytest.mark.asyncio
+async def test_text_search_uses_local_index_and_hydrates(tmp_path):
+    index = LexicalIndex(path=str(tmp_path))
+    collection = MagicMock()
+    collection.find.side_effect = [
+        # bootstrap: 저장된 기록
+        AsyncCursor(
+            [
+                {"recordId": "r1", "title": "카페", "content": "카페에서 공부"},
+                {"recordId": "r2", "title": "운동", "content": "달리기"},
+            ]
+        ),
+        # hydrate: 결과 문서
+        AsyncCursor([{"_id": "m1", "recordId": "r1", "title": "카페", "content": "카페에서 공부"}]),
+    ]
+
+    with patch("app.db.vector.get_lexical_engine", return_value=index):
+        results = await VectorDB._text_search(collection, "카페", "u1", top_k=5)
+
+    assert [r["recordId"] for r in results] == ["r1"]
+    assert results[0]["score"] > 0
+    collection.aggregate.assert_not_called()
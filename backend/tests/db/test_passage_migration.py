@@ -0,0 +1,57 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.db.migrations import passages as migration
+
+
+class AsyncCursor:
+    def __init__(self, docs):
+        self.docs = iter(docs)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self.docs)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+@pytest.mark.asyncio
+async def test_migrate_assigns_vectors_only_to_passages_without_embedding():
+    long_content = " ".join(f"{i}번째 문장은 긴 기록의 일부분이다." for i in range(150))
+    docs = [
+        {"userId": "u1", "recordId": "short", "title": "짧은", "content": "짧은 기록", "embedding": [9.0, 9.0]},
+        {"userId": "u1", "recordId": "long", "title": "긴", "content": long_content, "embedding": [8.0, 8.0]},
+    ]
+    records = MagicMock()
+    records.find.return_value = AsyncCursor(docs)
+    passages = MagicMock()
+    passages.distinct = AsyncMock(return_value=[])
+    passages.create_index = AsyncMock()
+    stored = {}
+
+    async def replace(user_id, record_id, record_passages, fields=None):
+        stored[record_id] = [p["embedding"] for p in record_passages]
+        return len(record_passages)
+
+    async def get_embeddings(texts):
+        return [[float(i), 0.0] for i in range(len(texts))]
+
+    with patch.object(migration, "mongo_db") as mock_mongo, patch.object(
+        migration.passage_store, "replace", side_effect=replace
+    ), patch.object(migration.llm_service, "get_embeddings", side_effect=get_embeddings):
+        mock_mongo.connect = AsyncMock()
+        mock_mongo.close = AsyncMock()
+        mock_mongo.db = {
+            migration.settings.COLLECTION_NAME: records,
+            migration.settings.PASSAGE_COLLECTION_NAME: passages,
+        }
+        report = await migration.migrate(batch_size=1000)
+
+    long_passages = len(migration.passage_store.split("긴", long_content))
+    assert long_passages > 1
+    assert stored["short"] == [[9.0, 9.0]]
+    assert stored["long"] == [[float(i), 0.0] for i in range(long_passages)]
+    assert report["embedded_texts"] == long_passages
+    assert report["passages"] == long_passages + 1
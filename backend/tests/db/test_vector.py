@@ -1,6 +1,7 @@
+import asyncio
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from bson import ObjectId
 from app.db.vector import VectorDB, RRF_K, TIME_DECAY_HALF_LIFE_DAYS
 
@@ -199,3 +200,219 @@ async def test_hybrid_search_with_time_decay():
         # Time decay로 인해 최신 문서가 상위로 올라갈 수 있음
         assert "_time_decay" in results[0]
         assert "_original_score" in results[0]
+
+
+# ============== 동시 검색 (fan-out) 테스트 ==============
+
+@pytest.mark.asyncio
+async def test_search_starts_text_branch_before_embedding_resolves():
+    """텍스트 검색은 임베딩을 기다리지 않고 벡터 branch와 동시에 실행"""
+    embedding = asyncio.get_running_loop().create_future()
+    text_started = asyncio.Event()
+
+    async def fake_text(collection, query_text, user_id, top_k, **kwargs):
+        text_started.set()
+        return [{"_id": ObjectId(), "recordId": "t1", "score": 3.0}]
+
+    async def fake_vector(collection, query_vector, user_id, top_k, **kwargs):
+        return [{"_id": ObjectId(), "recordId": "v1", "score": 0.9}]
+
+    async def resolve_after_text():
+        await text_started.wait()
+        embedding.set_result([0.1])
+
+    timings = {}
+    with patch("app.db.vector.mongo_db"), patch.object(
+        VectorDB, "_text_search", side_effect=fake_text
+    ), patch.object(VectorDB, "_vector_search", side_effect=fake_vector):
+        resolver = asyncio.ensure_future(resolve_after_text())
+        results = await VectorDB.search(
+            embedding, "user1", top_k=5, query_text="q", use_time_decay=False, timings=timings
+        )
+        await resolver
+
+    assert {r["recordId"] for r in results} == {"v1", "t1"}
+    assert {"embedding_ms", "vector_ms", "text_ms", "total_ms"} <= set(timings)
+
+
+@pytest.mark.asyncio
+async def test_search_degrades_to_text_only_when_vector_branch_times_out():
+    async def slow_vector(collection, query_vector, user_id, top_k, **kwargs):
+        await asyncio.sleep(1)
+        return [{"_id": ObjectId(), "recordId": "v1", "score": 0.9}]
+
+    async def fake_text(collection, query_text, user_id, top_k, **kwargs):
+        return [{"_id": ObjectId(), "recordId": "t1", "score": 3.0}]
+
+    with patch("app.db.vector.mongo_db"), patch(
+        "app.db.vector.settings.RETRIEVAL_VECTOR_TIMEOUT", 0.05
+    ), patch.object(VectorDB, "_vector_search", side_effect=slow_vector), patch.object(
+        VectorDB, "_text_search", side_effect=fake_text
+    ):
+        results = await VectorDB.search([0.1], "user1", query_text="q", use_time_decay=False)
+
+    assert [r["recordId"] for r in results] == ["t1"]
+    assert results[0]["_text_score"] == 3.0
+
+
+@pytest.mark.asyncio
+async def test_search_raises_when_both_branches_fail():
+    with patch("app.db.vector.mongo_db"), patch.object(
+        VectorDB, "_vector_search", side_effect=RuntimeError("vector down")
+    ), patch.object(VectorDB, "_text_search", side_effect=RuntimeError("text down")):
+        with pytest.raises(RuntimeError, match="vector down"):
+            await VectorDB.search([0.1], "user1", query_text="q")
+
+
+# ============== 날짜 범위 필터 테스트 ==============
+
+def test_date_range_is_pushed_into_both_search_filters():
+    date_range = VectorDB._date_range("2024-01-01", date(2024, 1, 31))
+    assert date_range == {"$gte": 19723, "$lte": 19753}
+
+    vector_stage = VectorDB._vector_search_stage([0.1], "u1", 10, date_range)
+    assert vector_stage["$vectorSearch"]["filter"] == {
+        "userId": {"$eq": "u1"},
+        "dateEpochDay": {"$gte": 19723, "$lte": 19753},
+    }
+    text_filter = VectorDB._text_search_stage("q", "u1", date_range)["$search"]["compound"]["filter"]
+    assert {"range": {"path": "dateEpochDay", "gte": 19723, "lte": 19753}} in text_filter
+
+    assert VectorDB._date_range(None, None) is None
+    assert VectorDB._date_range(None, "2024-01-31") == {"$lte": 19753}
+
+
+def test_feel_filter_is_pushed_into_both_search_filters():
+    vector_stage = VectorDB._vector_search_stage([0.1], "u1", 10, None, ["기쁨", "평온"])
+    assert vector_stage["$vectorSearch"]["filter"] == {
+        "userId": {"$eq": "u1"},
+        "feel": {"$in": ["기쁨", "평온"]},
+    }
+    text_filter = VectorDB._text_search_stage("q", "u1", None, ["기쁨"])["$search"]["compound"]["filter"]
+    assert {"in": {"path": "feel", "value": ["기쁨"]}} in text_filter
+
+
+def test_num_candidates_shrinks_to_filtered_slice():
+    assert VectorDB._num_candidates(10) == 100
+    assert VectorDB._num_candidates(10, None) == 100
+    assert VectorDB._num_candidates(10, 37) == 37
+    assert VectorDB._num_candidates(10, 3) == 10  # numCandidates >= limit
+    assert VectorDB._num_candidates(10, 500) == 100
+
+
+@pytest.mark.asyncio
+async def test_filtered_vector_search_uses_slice_size_for_num_candidates():
+    collection = MagicMock()
+    collection.count_documents = AsyncMock(return_value=25)
+    cursor = AsyncMock()
+    cursor.to_list.return_value = []
+    collection.aggregate.return_value = cursor
+
+    with patch("app.db.vector.get_vector_engine", return_value=None):
+        await VectorDB._vector_search(
+            collection, [0.1], "u1", 20, date_range={"$gte": 19723}, feel=["기쁨"]
+        )
+
+    query = collection.count_documents.call_args[0][0]
+    assert query == {
+        "userId": "u1",
+        "deletedAt": None,
+        "dateEpochDay": {"$gte": 19723},
+        "feel": {"$in": ["기쁨"]},
+    }
+    assert collection.count_documents.call_args[1]["limit"] == 200
+    stage = collection.aggregate.call_args[0][0][0]["$vectorSearch"]
+    assert stage["numCandidates"] == 25
+    assert stage["limit"] == 20
+
+
+@pytest.mark.asyncio
+async def test_filtered_vector_search_skips_empty_slice():
+    collection = MagicMock()
+    collection.count_documents = AsyncMock(return_value=0)
+
+    with patch("app.db.vector.get_vector_engine", return_value=None):
+        results = await VectorDB._vector_search(collection, [0.1], "u1", 10, feel=["분노"])
+
+    assert results == []
+    collection.aggregate.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_search_passes_filters_to_both_branches():
+    seen = {}
+
+    async def fake_vector(collection, query_vector, user_id, top_k, date_range=None, feel=None):
+        seen["vector"] = (date_range, feel)
+        return []
+
+    async def fake_text(collection, query_text, user_id, top_k, date_range=None, feel=None):
+        seen["text"] = (date_range, feel)
+        return []
+
+    with patch("app.db.vector.mongo_db"), patch.object(
+        VectorDB, "_vector_search", side_effect=fake_vector
+    ), patch.object(VectorDB, "_text_search", side_effect=fake_text):
+        await VectorDB.search(
+            [0.1], "u1", query_text="q", date_from="2024-01-01", feel=["기쁨", ""]
+        )
+
+    assert seen["vector"] == ({"$gte": 19723}, ["기쁨"])
+    assert seen["text"] == ({"$gte": 19723}, ["기쁨"])
+
+
+# ============== Passage 검색 테스트 ==============
+
+def test_aggregate_passages_max_and_sum():
+    hits = [
+        {"recordId": "a", "start": 0, "end": 10, "score": 0.9},
+        {"recordId": "b", "start": 0, "end": 10, "score": 0.8},
+        {"recordId": "b", "start": 8, "end": 20, "score": 0.7},
+        {"recordId": "a", "start": 30, "end": 40, "score": 0.1},
+    ]
+    by_max = VectorDB._aggregate_passages(hits, "max")
+    assert [(r, round(s, 2)) for r, s, _ in by_max] == [("a", 0.9), ("b", 0.8)]
+    assert by_max[0][2] == [(0, 10), (30, 40)]
+
+    by_sum = VectorDB._aggregate_passages(hits, "sum")
+    assert [(r, round(s, 2)) for r, s, _ in by_sum] == [("b", 1.5), ("a", 1.0)]
+
+
+@pytest.mark.asyncio
+async def test_passage_vector_search_returns_records_with_winning_spans():
+    passages = MagicMock()
+    passages.count_documents = AsyncMock(return_value=12)
+    cursor = AsyncMock()
+    cursor.to_list.return_value = [
+        {"recordId": "r2", "start": 600, "end": 1200, "score": 0.95},
+        {"recordId": "r1", "start": 0, "end": 80, "score": 0.9},
+        {"recordId": "r2", "start": 0, "end": 600, "score": 0.6},
+    ]
+    passages.aggregate.return_value = cursor
+    records = MagicMock()
+
+    async def fake_hydrate(collection, user_id, hits):
+        return [{"recordId": record_id, "score": score} for record_id, score in hits]
+
+    with patch("app.db.vector.mongo_db") as mock_mongo, patch(
+        "app.db.vector.get_vector_engine", return_value=None
+    ), patch("app.db.vector.settings.PASSAGE_RETRIEVAL", True), patch.object(
+        VectorDB, "_hydrate", side_effect=fake_hydrate
+    ):
+        mock_mongo.db.__getitem__.return_value = passages
+        results = await VectorDB._vector_search(records, [0.1], "u1", 2, feel=["기쁨"])
+
+    stage = passages.aggregate.call_args[0][0][0]["$vectorSearch"]
+    assert stage["index"] == "passage_vector_index"
+    assert stage["limit"] == 6
+    assert stage["numCandidates"] == 12  # 필터된 passage 수로 줄어듦
+    assert stage["filter"]["feel"] == {"$in": ["기쁨"]}
+    assert [r["recordId"] for r in results] == ["r2", "r1"]
+    assert results[0]["passages"] == [(600, 1200), (0, 600)]
+    records.aggregate.assert_not_called()
+
+
+def test_num_candidates_factor_comes_from_settings():
+    with patch("app.db.vector.settings.RETRIEVAL_NUM_CANDIDATES_FACTOR", 4):
+        assert VectorDB._num_candidates(10) == 40
+        assert VectorDB._vector_search_stage([0.1], "u1", 5)["$vectorSearch"]["numCandidates"] == 20
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from bson import BSON
+from bson.binary import Binary
+from app.db.vector_codec import VectorCodec
+from app.db.migrations.embedding_storage import is_encoded_as, recall_at_k
+
+
+def random_vectors(n=200, dim=64, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+def cosine(a, b):
+    a, b = np.asarray(a), np.asarray(b)
+    return float(a @ b / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+def test_float32_round_trip_is_lossless():
+    vector = random_vectors(1)[0].tolist()
+
+    encoded = VectorCodec.encode(vector, "float32")
+
+    assert isinstance(encoded, Binary)
+    assert VectorCodec.decode(encoded) == pytest.approx(vector, rel=1e-6)
+    assert is_encoded_as(encoded, "float32")
+
+
+def test_int8_preserves_cosine():
+    a, b = random_vectors(2)
+
+    decoded_a = VectorCodec.decode(VectorCodec.encode(a, "int8"))
+    decoded_b = VectorCodec.decode(VectorCodec.encode(b, "int8"))
+
+    assert cosine(decoded_a, decoded_b) == pytest.approx(cosine(a, b), abs=0.02)
+
+
+def test_bit_keeps_signs_and_dimension():
+    vector = [0.5, -0.1, 0.2, -0.3, 0.1, 0.1, -0.2, 0.4, 0.3, -0.5]
+
+    decoded = VectorCodec.decode(VectorCodec.encode(vector, "bit"))
+
+    assert decoded == [1.0 if x > 0 else -1.0 for x in vector]
+
+
+def test_zero_or_empty_vectors_are_not_stored():
+    assert VectorCodec.encode([0.0, 0.0], "int8") is None
+    assert VectorCodec.encode([], "array") is None
+    assert VectorCodec.encode(None) is None
+
+
+def test_compact_modes_shrink_documents():
+    vector = random_vectors(1, dim=1536)[0].tolist()
+
+    sizes = {
+        mode: len(BSON.encode({"embedding": VectorCodec.encode(vector, mode)}))
+        for mode in ("array", "float32", "int8", "bit")
+    }
+
+    assert sizes["float32"] < sizes["array"] / 2
+    assert sizes["int8"] < sizes["float32"] / 3
+    assert sizes["bit"] < sizes["int8"] / 6
+
+
+def test_index_definition_matches_mode():
+    assert VectorCodec.index_definition(1536, "int8")["fields"][0]["similarity"] == "cosine"
+    assert VectorCodec.index_definition(1536, "bit")["fields"][0]["similarity"] == "euclidean"
+    with pytest.raises(ValueError):
+        VectorCodec.mode("float16")
+
+
+def test_recall_is_measurable_per_mode():
+    vectors = random_vectors()
+
+    assert recall_at_k(vectors, "float32") == pytest.approx(1.0)
+    assert recall_at_k(vectors, "int8") > 0.8
+    assert 0.0 < recall_at_k(vectors, "bit") < recall_at_k(vectors, "int8")
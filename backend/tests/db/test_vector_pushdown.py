@@ -0,0 +1,355 @@
+import math
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.core.dates import epoch_day
+from app.db.vector import VectorDB
+
+COLLECTION = "diaries"
+
+
+# ============== 테스트용 미니 aggregation 실행기 ==============
+# _fused_pipeline이 쓰는 stage/연산자만 구현 ($vectorSearch/$search 결과는 미리 정한 순위 목록)
+
+class MiniAggregation:
+    def __init__(self, docs, vector_hits, text_hits):
+        self.docs = {d["_id"]: d for d in docs}
+        self.vector_hits = vector_hits
+        self.text_hits = text_hits
+
+    def run(self, pipeline, docs=None):
+        docs = list(docs or [])
+        for stage in pipeline:
+            (name, spec), = stage.items()
+            docs = getattr(self, "_" + name[1:])(spec, docs)
+        return docs
+
+    # --- stages ---
+    def _with_meta(self, hits, key, limit=None):
+        hits = hits[:limit] if limit else hits
+        return [{**self.docs[_id], "__meta": {key: score}} for _id, score in hits]
+
+    def _vectorSearch(self, spec, docs):
+        return self._with_meta(self.vector_hits, "vectorSearchScore", spec["limit"])
+
+    def _search(self, spec, docs):
+        return self._with_meta(self.text_hits, "searchScore")
+
+    def _limit(self, spec, docs):
+        return docs[:spec]
+
+    def _project(self, spec, docs):
+        if all(v == 0 for v in spec.values()):
+            return [{k: v for k, v in d.items() if k not in spec} for d in docs]
+        out = []
+        for d in docs:
+            row = {"_id": d["_id"]} if spec.get("_id", 1) else {}
+            for key, value in spec.items():
+                if value == 0:
+                    row.pop(key, None)
+                elif value == 1:
+                    if key in d:
+                        row[key] = d[key]
+                else:
+                    row[key] = self.eval(value, d)
+            out.append(row)
+        return out
+
+    def _addFields(self, spec, docs):
+        return [{**d, **{k: self.eval(v, d) for k, v in spec.items()}} for d in docs]
+
+    def _sort(self, spec, docs):
+        docs = list(docs)
+        for key, direction in reversed(list(spec.items())):
+            docs.sort(key=lambda d: (d.get(key) is not None, d.get(key) or 0), reverse=direction < 0)
+        return docs
+
+    def _setWindowFields(self, spec, docs):
+        docs = self._sort(spec["sortBy"], docs)
+        (field, _), = spec["output"].items()
+        return [{**d, field: i} for i, d in enumerate(docs, start=1)]
+
+    def _unionWith(self, spec, docs):
+        return docs + self.run(spec["pipeline"])
+
+    def _group(self, spec, docs):
+        groups = {}
+        for d in docs:
+            groups.setdefault(self.eval(spec["_id"], d), []).append(d)
+        out = []
+        for key, members in groups.items():
+            row = {"_id": key}
+            for field, acc in spec.items():
+                if field == "_id":
+                    continue
+                (op, expr), = acc.items()
+                values = [self.eval(expr, m) for m in members]
+                present = [v for v in values if v is not None]
+                if op == "$first":
+                    row[field] = values[0]
+                elif op == "$sum":
+                    total = 0
+                    for v in present:
+                        total += v
+                    row[field] = total
+                elif op == "$max":
+                    row[field] = max(present) if present else None
+                elif op == "$min":
+                    row[field] = min(present) if present else None
+            out.append(row)
+        return out
+
+    def _lookup(self, spec, docs):
+        out = []
+        for d in docs:
+            matched = [x for x in self.docs.values() if x.get(spec["foreignField"]) == d.get(spec["localField"])]
+            out.append({**d, spec["as"]: self.run(spec.get("pipeline", []), matched)})
+        return out
+
+    def _replaceWith(self, spec, docs):
+        return [self.eval(spec, d) for d in docs]
+
+    # --- expressions ---
+    def eval(self, expr, doc, env=None):
+        env = env or {}
+        if isinstance(expr, str) and expr.startswith("$$"):
+            return doc if expr == "$$ROOT" else env[expr[2:]]
+        if isinstance(expr, str) and expr.startswith("$"):
+            return doc.get(expr[1:])
+        if isinstance(expr, list):
+            return [self.eval(e, doc, env) for e in expr]
+        if isinstance(expr, dict) and len(expr) == 1 and next(iter(expr)).startswith("$"):
+            (op, arg), = expr.items()
+            return self._op(op, arg, doc, env)
+        if isinstance(expr, dict):
+            return {k: self.eval(v, doc, env) for k, v in expr.items()}
+        return expr
+
+    def _op(self, op, arg, doc, env):
+        ev = lambda e: self.eval(e, doc, env)  # noqa: E731
+        if op == "$meta":
+            return doc["__meta"][arg]
+        if op == "$let":
+            scope = {**env, **{k: ev(v) for k, v in arg["vars"].items()}}
+            return self.eval(arg["in"], doc, scope)
+        if op == "$cond":
+            return ev(arg[1]) if ev(arg[0]) else ev(arg[2])
+        if op == "$switch":
+            for branch in arg["branches"]:
+                if ev(branch["case"]):
+                    return ev(branch["then"])
+            return ev(arg["default"])
+        if op == "$dateFromString":
+            value = ev(arg["dateString"])
+            try:
+                if "format" in arg:
+                    return datetime.strptime(value, arg["format"])
+                parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+                return parsed.replace(tzinfo=None) if parsed.tzinfo is None else parsed
+            except (TypeError, ValueError):
+                return ev(arg.get("onError"))
+        values = ev(arg)
+        if op == "$ifNull":
+            return values[0] if values[0] is not None else values[1]
+        if op == "$eq":
+            return values[0] == values[1]
+        if op == "$isNumber":
+            return type(values) in (int, float)
+        if op == "$type":
+            return {datetime: "date", str: "string", type(None): "null"}.get(type(values), "other")
+        if op == "$substrCP":
+            return values[0][values[1]: values[1] + values[2]]
+        if op == "$add":
+            return values[0] + values[1]
+        if op == "$subtract":
+            diff = values[0] - values[1]
+            return diff / timedelta(milliseconds=1) if isinstance(diff, timedelta) else diff
+        if op == "$multiply":
+            return values[0] * values[1]
+        if op == "$divide":
+            return values[0] / values[1]
+        if op == "$floor":
+            return math.floor(values)
+        if op == "$pow":
+            return math.pow(values[0], values[1])
+        if op == "$max":
+            return max(v for v in values if v is not None)
+        if op == "$arrayElemAt":
+            return values[0][values[1]] if values[0] else None
+        if op == "$mergeObjects":
+            merged = {}
+            for v in values:
+                merged.update(v or {})
+            return merged
+        raise NotImplementedError(op)
+
+
+# ============== Python 경로와 순위 비교 ==============
+
+def make_corpus(n=30, seed=0):
+    rng = random.Random(seed)
+    now = datetime.now()
+    docs = []
+    for i in range(n):
+        doc = {
+            "_id": ObjectId(),
+            "recordId": f"r{i}",
+            "userId": "u1",
+            "title": f"title {i}",
+            "content": f"content {i}",
+            "createdAt": now - timedelta(days=rng.randint(0, 400), hours=rng.randint(0, 23)),
+        }
+        kind = i % 6
+        if kind == 5:
+            # backfill된 기록: 문자열 대신 dateEpochDay로 감쇠 계산
+            doc["date"] = (now - timedelta(days=rng.randint(0, 400))).strftime("%Y-%m-%d")
+            doc["dateEpochDay"] = epoch_day(doc["date"])
+        elif kind == 0:
+            doc["date"] = (now - timedelta(days=rng.randint(0, 400))).strftime("%Y-%m-%d")
+        elif kind == 1:
+            doc["date"] = (now - timedelta(days=rng.randint(0, 400), hours=5)).isoformat()
+        elif kind == 2:
+            doc["date"] = ""  # createdAt 사용
+        elif kind == 3:
+            doc["date"] = "2024-13-45 잘못된 날짜"  # 파싱 실패 -> 0.5
+        docs.append(doc)  # kind == 4: date 필드 없음
+    return docs
+
+
+def python_path(docs, vector_hits, text_hits, top_k, use_time_decay, **weights):
+    by_id = {d["_id"]: d for d in docs}
+
+    def leg(hits, limit):
+        return [{**by_id[_id], "score": score} for _id, score in hits[:limit]]
+
+    fused = VectorDB._reciprocal_rank_fusion(
+        leg(vector_hits, top_k * 2), leg(text_hits, top_k * 2),
+        weights.get("vector_weight", 0.5), weights.get("text_weight", 0.5),
+    )[:top_k]
+    if use_time_decay:
+        fused = VectorDB._apply_time_decay(fused, weights.get("time_decay_weight", 0.3))
+    return fused
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("use_time_decay", [True, False])
+def test_fused_pipeline_matches_python_ranking(seed, use_time_decay):
+    docs = make_corpus(seed=seed)
+    rng = random.Random(seed)
+    ids = [d["_id"] for d in docs]
+    vector_hits = [(i, round(1 - k * 0.01, 3)) for k, i in enumerate(rng.sample(ids, 20))]
+    text_hits = [(i, round(10 - k * 0.5, 3)) for k, i in enumerate(rng.sample(ids, 15))]
+    weights = {"vector_weight": 0.6, "text_weight": 0.4, "time_decay_weight": 0.3}
+
+    expected = python_path(docs, vector_hits, text_hits, 5, use_time_decay, **weights)
+    pipeline = VectorDB._fused_pipeline(
+        COLLECTION, [0.1, 0.2], "query", "u1", 5, use_time_decay=use_time_decay, now=datetime.now(), **weights
+    )
+    actual = MiniAggregation(docs, vector_hits, text_hits).run(pipeline)
+
+    assert [d["recordId"] for d in actual] == [d["recordId"] for d in expected]
+    for a, e in zip(actual, expected):
+        assert a["score"] == pytest.approx(e["score"], rel=1e-12)
+        assert a["_rrf_score"] == pytest.approx(e["_rrf_score"], rel=1e-12)
+        assert a["title"] == e["title"] and a["content"] == e["content"]
+        if use_time_decay:
+            assert a["_time_decay"] == pytest.approx(e["_time_decay"], rel=1e-12)
+
+
+def test_fused_pipeline_breaks_rrf_ties_like_python():
+    docs = make_corpus(n=6)
+    ids = [d["_id"] for d in docs]
+    # 벡터 2위와 텍스트 2위는 서로 다른 문서지만 RRF 점수가 같음
+    vector_hits = [(ids[0], 0.9), (ids[1], 0.8)]
+    text_hits = [(ids[0], 5.0), (ids[2], 4.0)]
+
+    expected = python_path(docs, vector_hits, text_hits, 3, use_time_decay=False)
+    pipeline = VectorDB._fused_pipeline(COLLECTION, [0.1], "q", "u1", 3, use_time_decay=False)
+    actual = MiniAggregation(docs, vector_hits, text_hits).run(pipeline)
+
+    assert [d["recordId"] for d in actual] == [d["recordId"] for d in expected] == ["r0", "r1", "r2"]
+
+
+def test_fused_pipeline_ships_content_only_after_limit():
+    pipeline = VectorDB._fused_pipeline(COLLECTION, [0.1], "q", "u1", 5)
+    stages = [next(iter(s)) for s in pipeline]
+
+    first_lookup = stages.index("$lookup")
+    assert stages.index("$limit") < first_lookup
+    union = pipeline[stages.index("$unionWith")]["$unionWith"]["pipeline"]
+    projections = [s["$project"] for s in pipeline[:first_lookup] + union if "$project" in s]
+    assert len(projections) == 2
+    assert all("content" not in p and "title" not in p for p in projections)
+    assert pipeline[0]["$vectorSearch"]["limit"] == 10
+
+
+@pytest.mark.asyncio
+async def test_search_with_pushdown_runs_a_single_aggregation():
+    collection = MagicMock()
+    cursor = AsyncMock()
+    cursor.to_list.return_value = [{"recordId": "r1", "score": 0.5}]
+    collection.aggregate.return_value = cursor
+
+    with patch("app.db.vector.mongo_db") as mock_mongo, patch(
+        "app.db.vector.settings.SEARCH_PUSHDOWN", True
+    ), patch("app.db.vector.get_vector_engine", return_value=None), patch(
+        "app.db.vector.get_lexical_engine", return_value=None
+    ):
+        mock_mongo.db.__getitem__.return_value = collection
+        timings = {}
+        results = await VectorDB.search([0.1], "u1", top_k=5, query_text="q", timings=timings)
+
+    assert results == [{"recordId": "r1", "score": 0.5}]
+    collection.aggregate.assert_called_once()
+    assert "$unionWith" in str(collection.aggregate.call_args[0][0])
+    assert "pushdown_ms" in timings
+
+
+@pytest.mark.asyncio
+async def test_search_pushdown_failure_falls_back_to_fan_out():
+    collection = MagicMock()
+    collection.aggregate.side_effect = RuntimeError("$search is not allowed in $unionWith")
+
+    with patch("app.db.vector.mongo_db") as mock_mongo, patch(
+        "app.db.vector.settings.SEARCH_PUSHDOWN", True
+    ), patch("app.db.vector.get_vector_engine", return_value=None), patch(
+        "app.db.vector.get_lexical_engine", return_value=None
+    ), patch.object(
+        VectorDB, "_vector_search", new_callable=AsyncMock, return_value=[{"_id": "a", "recordId": "r1", "score": 0.9}]
+    ), patch.object(VectorDB, "_text_search", new_callable=AsyncMock, return_value=[]):
+        mock_mongo.db.__getitem__.return_value = collection
+        results = await VectorDB.search([0.1], "u1", top_k=5, query_text="q", use_time_decay=False)
+
+    assert [r["recordId"] for r in results] == ["r1"]
+
+
+@pytest.mark.asyncio
+async def test_search_pushdown_embedding_timeout_falls_back_to_text():
+    import asyncio
+    import time
+
+    collection = MagicMock()
+
+    async def slow_embedding():
+        await asyncio.sleep(10)
+        return [0.1]
+
+    with patch("app.db.vector.mongo_db") as mock_mongo, patch(
+        "app.db.vector.settings.SEARCH_PUSHDOWN", True
+    ), patch("app.db.vector.settings.RETRIEVAL_VECTOR_TIMEOUT", 0.05), patch(
+        "app.db.vector.get_vector_engine", return_value=None
+    ), patch("app.db.vector.get_lexical_engine", return_value=None), patch.object(
+        VectorDB, "_text_search", new_callable=AsyncMock, return_value=[{"_id": "b", "recordId": "r2", "score": 3.0}]
+    ):
+        mock_mongo.db.__getitem__.return_value = collection
+        started = time.perf_counter()
+        results = await VectorDB.search(
+            slow_embedding(), "u1", top_k=5, query_text="q", use_time_decay=False
+        )
+
+    assert time.perf_counter() - started < 1.0
+    assert [r["recordId"] for r in results] == ["r2"]
+    collection.aggregate.assert_not_called()
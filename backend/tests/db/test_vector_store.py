@@ -0,0 +1,132 @@
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+from app.db.vector import VectorDB
+from app.db.vector_store import ExactVectorStore
+
+
+class AsyncCursor:
+    def __init__(self, docs):
+        self.docs = iter(docs)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self.docs)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+def random_vectors(n, dim=16, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+def test_exact_top_k_matches_brute_force(tmp_path):
+    store = ExactVectorStore(path=str(tmp_path))
+    vectors = random_vectors(50)
+    for i, v in enumerate(vectors):
+        store.add("u1", f"r{i}", v.tolist())
+
+    query = vectors[7] + 0.01
+    hits = store.search("u1", query.tolist(), top_k=5)
+
+    normed = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    expected = np.argsort(-(normed @ (query / np.linalg.norm(query))))[:5]
+    assert [h[0] for h in hits] == [f"r{i}" for i in expected]
+    assert hits[0][0] == "r7"
+    assert 0.99 < hits[0][1] <= 1.0
+
+
+def test_users_are_isolated_and_updates_replace(tmp_path):
+    store = ExactVectorStore(path=str(tmp_path))
+    store.add("u1", "a", [1.0, 0.0])
+    store.add("u2", "b", [1.0, 0.0])
+    store.add("u1", "a", [0.0, 1.0])
+
+    assert store.search("u1", [0.0, 1.0], 10) == [("a", pytest.approx(1.0))]
+    assert [h[0] for h in store.search("u2", [1.0, 0.0], 10)] == ["b"]
+
+
+def test_tombstones_persist_and_reload(tmp_path):
+    store = ExactVectorStore(path=str(tmp_path))
+    store.add("u1", "a", [1.0, 0.0])
+    store.add("u1", "b", [0.9, 0.1])
+    store.remove("u1", "a")
+
+    reloaded = ExactVectorStore(path=str(tmp_path))
+
+    assert reloaded.has_user("u1")
+    assert [h[0] for h in reloaded.search("u1", [1.0, 0.0], 10)] == ["b"]
+
+
+def test_half_written_append_is_truncated_on_reload(tmp_path):
+    store = ExactVectorStore(path=str(tmp_path))
+    store.add("u1", "a", [1.0, 0.0, 0.0])
+    store.add("u1", "b", [0.0, 1.0, 0.0])
+    matrix = store._user("u1")
+    # add() 도중 비정상 종료: 벡터 행은 쓰였지만 id 줄은 쓰이지 않음
+    with open(matrix.vec_path, "ab") as f:
+        f.write(np.array([1.0, 0.0, 0.0], dtype=np.float32).tobytes())
+
+    reloaded = ExactVectorStore(path=str(tmp_path))
+    reloaded.add("u1", "c", [0.0, 0.0, 1.0])
+
+    assert reloaded.search("u1", [0.0, 0.0, 1.0], 1) == [("c", pytest.approx(1.0))]
+    again = ExactVectorStore(path=str(tmp_path))
+    assert again.search("u1", [0.0, 0.0, 1.0], 1) == [("c", pytest.approx(1.0))]
+    assert [h[0] for h in again.search("u1", [1.0, 0.0, 0.0], 1)] == ["a"]
+
+
+def test_compaction_drops_dead_rows(tmp_path):
+    store = ExactVectorStore(path=str(tmp_path))
+    for i, v in enumerate(random_vectors(300)):
+        store.add("u1", f"r{i}", v.tolist())
+    for i in range(150):
+        store.remove("u1", f"r{i}")
+
+    matrix = store._user("u1")
+    assert len(matrix.ids) < 300
+    assert int(matrix.alive.sum()) == 150
+    assert all(h[0] not in {f"r{i}" for i in range(150)} for h in store.search("u1", [1.0] * 16, 20))
+
+
+@pytest.mark.asyncio
+async def test_vector_search_with_exact_backend_hydrates_docs(tmp_path):
+    store = ExactVectorStore(path=str(tmp_path))
+    collection = MagicMock()
+    collection.find.side_effect = [
+        # bootstrap: 저장된 임베딩
+        AsyncCursor(
+            [
+                {"recordId": "r1", "embedding": [1.0, 0.0]},
+                {"recordId": "r2", "embedding": [0.0, 1.0]},
+            ]
+        ),
+        # hydrate: 결과 문서
+        AsyncCursor(
+            [
+                {"_id": "m2", "recordId": "r2", "title": "B", "content": "b", "date": "2024-01-02"},
+                {"_id": "m1", "recordId": "r1", "title": "A", "content": "a", "date": "2024-01-01"},
+            ]
+        ),
+    ]
+
+    with patch("app.db.vector.get_vector_engine", return_value=store):
+        results = await VectorDB._vector_search(collection, [1.0, 0.1], "u1", top_k=2)
+
+    assert [r["recordId"] for r in results] == ["r1", "r2"]
+    assert results[0]["score"] > results[1]["score"]
+    assert results[0]["title"] == "A"
+    collection.aggregate.assert_not_called()
+
+
+def test_search_restricted_to_record_ids(tmp_path):
+    store = ExactVectorStore(path=str(tmp_path))
+    store.add("u1", "a", [1.0, 0.0])
+    store.add("u1", "b", [0.9, 0.1])
+    store.add("u1", "c", [0.0, 1.0])
+
+    assert [h[0] for h in store.search("u1", [1.0, 0.0], 2, record_ids={"b", "c", "x"})] == ["b", "c"]
+    assert store.search("u1", [1.0, 0.0], 2, record_ids=set()) == []
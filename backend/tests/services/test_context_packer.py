@@ -0,0 +1,92 @@
+from app.core.tokenizer import estimate_tokens
+from app.services.context_packer import ContextPacker
+
+
+def make_records():
+    return [
+        {
+            "recordId": "uuid-1",
+            "date": "2024-05-01",
+            "title": "회사",
+            "content": "오늘 회사에서 발표를 했다. 점심은 김밥이었다. 발표가 끝나고 팀장님이 칭찬해주셨다.",
+        },
+        {
+            "recordId": "uuid-2",
+            "date": "2024-05-02",
+            "title": "운동",
+            "content": "헬스장에 갔다. 스쿼트를 했다.",
+        },
+    ]
+
+
+def make_graph():
+    return {
+        "nodes": [
+            {"_id": "a", "_labels": ["Record"], "recordId": "uuid-1"},
+            {"_id": "b", "_labels": ["Event"], "summary": "발표"},
+            {"_id": "c", "_labels": ["Person"], "name": "팀장님"},
+        ],
+        "edges": [
+            {"source": "a", "target": "b", "type": "HAS_EVENT"},
+            {"source": "a", "target": "b", "type": "HAS_EVENT"},
+            {"source": "b", "target": "c", "type": "INVOLVES"},
+        ],
+    }
+
+
+def test_pack_uses_short_ids_and_triples():
+    records_text, graph_text = ContextPacker().pack(
+        "발표 어땠어?", make_records(), make_graph(), budget_tokens=1000
+    )
+
+    assert records_text.startswith("[R1] 2024-05-01 회사")
+    assert "[R2] 2024-05-02 운동" in records_text
+    assert "uuid-1" not in records_text
+    assert 'N1 Event "발표"' in graph_text
+    assert 'N2 Person "팀장님"' in graph_text
+    # 중복 엣지는 한 번만
+    assert graph_text.count("R1 HAS_EVENT N1") == 1
+    assert "N1 INVOLVES N2" in graph_text
+
+
+def test_tight_budget_keeps_every_record_and_most_relevant_sentence():
+    records_text, _ = ContextPacker().pack(
+        "발표 어땠어?", make_records(), {}, budget_tokens=10
+    )
+    lines = records_text.split("\n")
+
+    assert len(lines) == 2
+    assert "발표" in lines[0]
+    assert "김밥" not in lines[0]
+    assert lines[1].startswith("[R2]")
+
+
+def test_single_sentence_record_stays_whole_when_it_fits():
+    content = "오늘은 오랜만에 대학 친구를 만나서 저녁을 먹었는데 친구가 요즘 회사 일이 너무 힘들다고 해서 한참 동안 이야기를 들어주고 위로해줬다"
+    records = [{"recordId": "uuid-1", "date": "2024-05-01", "title": "친구", "content": content}]
+    assert estimate_tokens(content) > 60
+
+    records_text, _ = ContextPacker().pack("친구 만난 날", records, {}, budget_tokens=2000)
+
+    assert content in records_text
+    assert "…" not in records_text
+
+
+def test_budget_drops_lower_ranked_content_first():
+    filler = " ".join(f"그날 있었던 {i}번째 일을 적었다." for i in range(20))
+    records = [
+        {"recordId": f"uuid-{i}", "date": "2024-05-01", "title": f"기록{i}", "content": filler}
+        for i in range(5)
+    ]
+    budget = 300
+
+    records_text, _ = ContextPacker().pack("발표 어땠어?", records, {}, budget_tokens=budget)
+    lines = records_text.split("\n")
+
+    assert len(lines) == 5
+    assert estimate_tokens(records_text) <= budget
+    assert len(lines[0]) > len(lines[-1])
+
+
+def test_empty_context():
+    assert ContextPacker().pack("q", [], {}, budget_tokens=100) == ("", "")
@@ -0,0 +1,145 @@
+import threading
+
+import pytest
+from unittest.mock import AsyncMock, patch, MagicMock
+from app.services.embedding_cache import EmbeddingCache
+from app.services.llm_service import NvidiaLLMService
+
+
+def test_put_and_get_roundtrip(tmp_path):
+    cache = EmbeddingCache(path=str(tmp_path / "c.sqlite3"), enabled=True)
+    key = cache.make_key("openai", "m", 3, "hello")
+
+    assert cache.get(key) is None
+    cache.put(key, [0.5, 0.25, 1.0])
+
+    assert cache.get(key) == [0.5, 0.25, 1.0]
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_cache_persists_across_instances(tmp_path):
+    path = str(tmp_path / "c.sqlite3")
+    first = EmbeddingCache(path=path, enabled=True)
+    key = first.make_key("openai", "m", 1, "text")
+    first.put(key, [0.5])
+    first.close()
+
+    second = EmbeddingCache(path=path, enabled=True)
+    assert second.get(key) == [0.5]
+
+
+def test_key_includes_provider_model_and_dimension():
+    keys = {
+        EmbeddingCache.make_key("openai", "a", 1536, "x"),
+        EmbeddingCache.make_key("nvidia", "a", 1536, "x"),
+        EmbeddingCache.make_key("openai", "b", 1536, "x"),
+        EmbeddingCache.make_key("openai", "a", 1024, "x"),
+    }
+    assert len(keys) == 4
+
+
+def test_lru_eviction_drops_least_recently_used(tmp_path):
+    # 벡터 하나 = 4 bytes, 최대 10 bytes -> 2개까지 유지
+    cache = EmbeddingCache(path=str(tmp_path / "c.sqlite3"), max_bytes=10, enabled=True)
+    cache.put("a", [1.0])
+    cache.put("b", [2.0])
+    cache.get("a")  # a를 최근 사용으로 갱신
+    cache.put("c", [3.0])
+
+    assert cache.get("b") is None
+    assert cache.get("a") == [1.0]
+    assert cache.stats()["evictions"] >= 1
+
+
+def test_hits_batch_access_time_updates_until_close(tmp_path):
+    import sqlite3
+
+    path = str(tmp_path / "c.sqlite3")
+    cache = EmbeddingCache(path=path, enabled=True)
+    cache.put("a", [1.0])
+
+    def last_access():
+        conn = sqlite3.connect(path)
+        try:
+            return conn.execute("SELECT last_access FROM embeddings WHERE key = 'a'").fetchone()[0]
+        finally:
+            conn.close()
+
+    written = last_access()
+    cache.get("a")
+    assert last_access() == written  # hit마다 commit하지 않음
+
+    cache.close()
+    assert last_access() > written
+
+
+def test_zero_vector_is_never_cached(tmp_path):
+    cache = EmbeddingCache(path=str(tmp_path / "c.sqlite3"), enabled=True)
+    cache.put("zero", [0.0, 0.0])
+
+    assert cache.get("zero") is None
+    assert cache.stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_get_embedding_uses_cache(isolated_embedding_cache):
+    service = NvidiaLLMService()
+    mock_response = {"data": [{"embedding": [0.5, 0.25]}]}
+
+    with patch("app.services.llm_service.settings") as mock_settings, patch(
+        "httpx.AsyncClient.post", new_callable=AsyncMock
+    ) as mock_post:
+        mock_settings.NVIDIA_API_KEY = "test_key"
+        mock_post.return_value.json = MagicMock(return_value=mock_response)
+
+        first = await service.get_embedding("same text")
+        second = await service.get_embedding("same text")
+
+        assert first == second == [0.5, 0.25]
+        assert mock_post.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_api_error_fallback_does_not_poison_cache(isolated_embedding_cache):
+    service = NvidiaLLMService()
+
+    with patch("app.services.llm_service.settings") as mock_settings, patch(
+        "httpx.AsyncClient.post", new_callable=AsyncMock
+    ) as mock_post:
+        mock_settings.NVIDIA_API_KEY = "test_key"
+        mock_post.side_effect = Exception("API down")
+
+        embedding = await service.get_embedding("text")
+
+        assert embedding == [0.0] * 1024
+        assert isolated_embedding_cache.stats()["writes"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cache_lookups_and_writes_run_off_the_event_loop(isolated_embedding_cache):
+    service = NvidiaLLMService()
+    mock_response = {"data": [{"embedding": [0.5, 0.25]}, {"embedding": [0.125, 0.75]}]}
+    loop_thread = threading.get_ident()
+    threads = []
+    for name in ("get_many", "put_many"):
+        original = getattr(isolated_embedding_cache, name)
+
+        def record(*args, _original=original):
+            threads.append(threading.get_ident())
+            return _original(*args)
+
+        setattr(isolated_embedding_cache, name, record)
+
+    with patch("app.services.llm_service.settings") as mock_settings, patch(
+        "httpx.AsyncClient.post", new_callable=AsyncMock
+    ) as mock_post:
+        mock_settings.NVIDIA_API_KEY = "test_key"
+        mock_post.return_value.json = MagicMock(return_value=mock_response)
+
+        vectors = await service.get_embeddings(["a", "b"])
+
+    assert vectors == [[0.5, 0.25], [0.125, 0.75]]
+    assert len(threads) == 2 and loop_thread not in threads
+    assert isolated_embedding_cache.stats()["writes"] == 2
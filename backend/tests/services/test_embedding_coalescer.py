@@ -0,0 +1,85 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch, MagicMock
+from app.services.embedding_coalescer import EmbeddingCoalescer
+from app.services.llm_service import OpenAILLMService
+
+
+def make_batch_fn(calls):
+    async def batch_fn(texts):
+        calls.append(list(texts))
+        return [[float(len(t))] for t in texts]
+
+    return batch_fn
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_are_coalesced():
+    calls = []
+    coalescer = EmbeddingCoalescer(make_batch_fn(calls), window_ms=5, max_batch_size=10)
+
+    results = await asyncio.gather(
+        coalescer.submit("a"), coalescer.submit("bb"), coalescer.submit("ccc")
+    )
+
+    assert results == [[1.0], [2.0], [3.0]]
+    assert calls == [["a", "bb", "ccc"]]
+    assert coalescer.stats()["batches"] == 1
+
+
+@pytest.mark.asyncio
+async def test_max_batch_size_splits_batches():
+    calls = []
+    coalescer = EmbeddingCoalescer(make_batch_fn(calls), window_ms=50, max_batch_size=2)
+
+    await asyncio.gather(*[coalescer.submit(t) for t in ["a", "b", "c"]])
+
+    assert calls == [["a", "b"], ["c"]]
+
+
+@pytest.mark.asyncio
+async def test_duplicate_texts_sent_once():
+    calls = []
+    coalescer = EmbeddingCoalescer(make_batch_fn(calls), window_ms=5)
+
+    results = await asyncio.gather(coalescer.submit("same"), coalescer.submit("same"))
+
+    assert results == [[4.0], [4.0]]
+    assert calls == [["same"]]
+
+
+@pytest.mark.asyncio
+async def test_batch_error_propagates_to_every_caller():
+    async def failing(texts):
+        raise RuntimeError("boom")
+
+    coalescer = EmbeddingCoalescer(failing, window_ms=1)
+
+    results = await asyncio.gather(
+        coalescer.submit("a"), coalescer.submit("b"), return_exceptions=True
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_get_embeddings_sends_list_input():
+    service = OpenAILLMService()
+    mock_response = {
+        "data": [
+            {"index": 1, "embedding": [0.2]},
+            {"index": 0, "embedding": [0.1]},
+        ]
+    }
+
+    with patch("app.services.llm_service.settings") as mock_settings, patch(
+        "httpx.AsyncClient.post", new_callable=AsyncMock
+    ) as mock_post:
+        mock_settings.OPENAI_API_KEY = "test_openai_key"
+        mock_post.return_value.json = MagicMock(return_value=mock_response)
+
+        vectors = await service.get_embeddings(["first", "second"])
+
+        assert vectors == [[0.1], [0.2]]
+        _, kwargs = mock_post.call_args
+        assert kwargs["json"]["input"] == ["first", "second"]
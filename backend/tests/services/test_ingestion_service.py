@@ -2,6 +2,8 @@ import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
 from app.services.ingestion_service import IngestionService
 from app.models.schemas.record_req import CreateRecordRequest
+from app.models.domain.graph import GraphData, GraphEvent
+from app.db.graph_writer import GraphWriter
 from datetime import date
 import uuid
 
@@ -21,6 +23,7 @@ def mock_req():
 async def test_create_record_success(mock_req):
     service = IngestionService()
     test_uuid = "test-uuid-1234"
+    graph_data = GraphData(events=[GraphEvent(summary="Test")], emotions=["Happy"])
 
     # Mock dependencies
     with patch(
@@ -29,11 +32,13 @@ async def test_create_record_success(mock_req):
     ) as mock_embed, patch(
         "app.services.ingestion_service.mongo_db"
     ) as mock_mongo, patch(
-        "app.services.ingestion_service.llm_service.generate_graph_cypher",
+        "app.services.ingestion_service.llm_service.extract_entities",
         new_callable=AsyncMock,
-    ) as mock_cypher_gen, patch(
-        "app.services.ingestion_service.neo4j_db.execute_cypher", new_callable=AsyncMock
-    ) as mock_cypher_exec, patch(
+        return_value=graph_data,
+    ) as mock_extract, patch(
+        "app.services.ingestion_service.graph_write_queue.submit_record",
+        new_callable=AsyncMock,
+    ) as mock_write, patch(
         "app.models.domain.record.uuid.uuid4", return_value=test_uuid
     ):
 
@@ -44,8 +49,6 @@ async def test_create_record_success(mock_req):
         mock_mongo.db.__getitem__.return_value = mock_collection
         mock_collection.insert_one.return_value.inserted_id = "mongo_id"
 
-        mock_cypher_gen.return_value = "CREATE (n) RETURN n"
-
         # Execute
         response = await service.create_record(mock_req)
 
@@ -53,8 +56,36 @@ async def test_create_record_success(mock_req):
         assert response.recordId == str(test_uuid)
         mock_embed.assert_awaited_once()
         mock_collection.insert_one.assert_awaited_once()
+        mock_extract.assert_awaited_once_with("Test Title Test Content")
+        mock_write.assert_awaited_once_with(
+            GraphWriter.build_record_params("user123", str(test_uuid), "2023-10-27", graph_data)
+        )
+
+
+@pytest.mark.asyncio
+async def test_create_record_legacy_cypher_mode(mock_req):
+    service = IngestionService()
+
+    with patch(
+        "app.services.ingestion_service.llm_service.get_embedding",
+        new_callable=AsyncMock,
+        return_value=[0.1, 0.2],
+    ), patch("app.services.ingestion_service.mongo_db") as mock_mongo, patch(
+        "app.services.ingestion_service.settings.GRAPH_WRITE_MODE", "cypher"
+    ), patch(
+        "app.services.ingestion_service.llm_service.generate_graph_cypher",
+        new_callable=AsyncMock,
+    ) as mock_cypher_gen, patch(
+        "app.services.ingestion_service.graph_write_queue.submit_cypher", new_callable=AsyncMock
+    ) as mock_cypher_exec, patch("app.models.domain.record.uuid.uuid4", return_value="rec-1"):
+
+        mock_mongo.db.__getitem__.return_value = AsyncMock()
+        mock_cypher_gen.return_value = "CREATE (n) RETURN n"
+
+        await service.create_record(mock_req)
+
         mock_cypher_gen.assert_awaited_once()
-        mock_cypher_exec.assert_awaited_once_with("CREATE (n) RETURN n")
+        mock_cypher_exec.assert_awaited_once_with("user123", "rec-1", "CREATE (n) RETURN n")
 
 
 @pytest.mark.asyncio
@@ -73,3 +104,71 @@ async def test_create_record_db_not_connected(mock_req):
             await service.create_record(mock_req)
 
         assert "Database connection not established" in str(excinfo.value)
+
+
+@pytest.mark.asyncio
+async def test_create_record_does_not_store_zero_vector(mock_req):
+    service = IngestionService()
+
+    with patch(
+        "app.services.ingestion_service.llm_service.get_embedding",
+        new_callable=AsyncMock,
+        return_value=[0.0, 0.0],
+    ), patch("app.services.ingestion_service.mongo_db") as mock_mongo, patch(
+        "app.services.ingestion_service.llm_service.extract_entities",
+        new_callable=AsyncMock,
+        return_value=GraphData(events=[], emotions=[]),
+    ), patch(
+        "app.services.ingestion_service.graph_write_queue.submit_record",
+        new_callable=AsyncMock,
+    ):
+        mock_collection = AsyncMock()
+        mock_mongo.db.__getitem__.return_value = mock_collection
+
+        await service.create_record(mock_req)
+
+        stored = mock_collection.insert_one.call_args[0][0]
+        assert stored["embedding"] is None
+
+
+@pytest.mark.asyncio
+async def test_embed_record_batches_record_and_passage_embeddings():
+    content = "첫 문장입니다. " * 40 + "마지막 문장."  # PASSAGE_MAX_CHARS보다 긴 본문
+
+    async def fake_embeddings(texts):
+        return [[float(i + 1), 0.0] for i in range(len(texts))]
+
+    with patch("app.services.ingestion_service.settings.PASSAGE_RETRIEVAL", True), patch(
+        "app.db.passages.settings.PASSAGE_MAX_CHARS", 120
+    ), patch(
+        "app.services.ingestion_service.llm_service.get_embeddings",
+        new_callable=AsyncMock,
+        side_effect=fake_embeddings,
+    ) as mock_batch, patch(
+        "app.services.ingestion_service.llm_service.get_embedding", new_callable=AsyncMock
+    ) as mock_single:
+        embedding, passages = await IngestionService.embed_record("제목", content)
+
+    mock_batch.assert_awaited_once()
+    mock_single.assert_not_awaited()
+    texts = mock_batch.await_args.args[0]
+    assert texts[0] == f"제목 {content}"
+    assert len(texts) == len(passages) + 1
+    assert len(passages) > 1
+    assert embedding == [1.0, 0.0]
+    assert [p["embedding"][0] for p in passages] == [float(i + 2) for i in range(len(passages))]
+    assert all(p["text"].startswith("제목 ") and p["end"] - p["start"] <= 120 for p in passages)
+
+
+@pytest.mark.asyncio
+async def test_embed_record_short_content_reuses_record_embedding():
+    with patch("app.services.ingestion_service.settings.PASSAGE_RETRIEVAL", True), patch(
+        "app.services.ingestion_service.llm_service.get_embeddings",
+        new_callable=AsyncMock,
+        return_value=[[0.3, 0.4]],
+    ) as mock_batch:
+        embedding, passages = await IngestionService.embed_record("T", "짧은 기록")
+
+    assert mock_batch.await_args.args[0] == ["T 짧은 기록"]
+    assert embedding == [0.3, 0.4]
+    assert passages == [{"start": 0, "end": 5, "text": "T 짧은 기록", "embedding": [0.3, 0.4]}]
@@ -1,6 +1,10 @@
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
-from app.services.llm_service import NvidiaLLMService, OpenAILLMService
+from app.services.llm_service import (
+    AnswerStreamExtractor,
+    NvidiaLLMService,
+    OpenAILLMService,
+)
 
 
 @pytest.fixture
@@ -221,3 +225,36 @@ async def test_rerank_parsing_error(mock_settings):
         # 에러 시 원본 순서 반환
         assert len(result) == 2
         assert result[0]["title"] == "First"
+
+
+# ============== Streaming 테스트 ==============
+
+def test_answer_stream_extractor_handles_split_chunks():
+    """answer 값만 추출하고, 청크 경계에 걸친 escape도 처리하는지 테스트"""
+    extractor = AnswerStreamExtractor()
+    chunks = ['{"ans', 'wer": "안녕\\', 'n반가워 \\u', 'c548", "confidence": 0.9}']
+
+    text = "".join(extractor.feed(c) for c in chunks)
+
+    assert text == "안녕\n반가워 안"
+    assert extractor.done
+
+
+@pytest.mark.asyncio
+async def test_stream_answer_with_reasoning(mock_settings):
+    service = NvidiaLLMService()
+
+    async def fake_stream(headers, payload):
+        assert payload["stream"] is True
+        for chunk in ['{"answer": "기억', '나", "confidence": 0.7, ', '"reasoning_summary": "s"}']:
+            yield chunk
+
+    with patch.object(service, "_stream_chat_api", fake_stream):
+        events = [e async for e in service.stream_answer_with_reasoning("Q?", [], {})]
+
+    tokens = "".join(e["text"] for e in events if e["type"] == "token")
+    assert tokens == "기억나"
+    assert events[-1] == {
+        "type": "result",
+        "data": {"answer": "기억나", "confidence": 0.7, "reasoning_summary": "s"},
+    }
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+from unittest.mock import patch
+from app.models.domain.graph import GraphData
+from app.services.local_llm_service import LocalLLMService
+
+
+def cosine(a, b):
+    return float(np.dot(a, b))
+
+
+@pytest.mark.asyncio
+async def test_embeddings_are_deterministic_and_normalized():
+    service = LocalLLMService(dim=256)
+
+    first = await service.get_embedding("오늘 친구와 카페에 갔다")
+    second = await LocalLLMService(dim=256).get_embedding("오늘 친구와 카페에 갔다")
+
+    assert first == second
+    assert len(first) == 256
+    assert np.linalg.norm(first) == pytest.approx(1.0, rel=1e-5)
+
+
+@pytest.mark.asyncio
+async def test_similar_texts_are_closer():
+    service = LocalLLMService(dim=512)
+
+    query, related, unrelated = await service.get_embeddings(
+        ["친구랑 카페 간 날", "친구와 카페에서 커피를 마셨다", "회사에서 보고서를 작성했다"]
+    )
+
+    assert cosine(query, related) > cosine(query, unrelated)
+
+
+@pytest.mark.asyncio
+async def test_extract_entities_returns_valid_graph_data():
+    service = LocalLLMService(latency_ms=0)
+
+    data = await service.extract_entities("팀장님과 회의했다. 발표가 끝나서 행복했다.")
+
+    assert isinstance(data, GraphData)
+    assert len(data.events) == 2
+    assert "팀장님" in data.events[0].people
+    assert "회의" in data.events[0].actions
+    assert "행복" in data.emotions
+
+
+@pytest.mark.asyncio
+async def test_rerank_and_answer_use_relevant_record():
+    service = LocalLLMService(dim=512)
+    docs = [
+        {"recordId": "r1", "date": "2024-01-01", "title": "회사", "content": "보고서를 작성했다."},
+        {"recordId": "r2", "date": "2024-01-02", "title": "카페", "content": "친구와 카페에서 커피를 마셨다."},
+    ]
+
+    reranked = await service.rerank("카페에서 누구랑 커피 마셨어?", docs, top_k=1)
+    result = await service.generate_answer_with_reasoning("카페에서 누구랑 커피 마셨어?", docs, {})
+
+    assert reranked[0]["recordId"] == "r2"
+    assert "커피" in result["answer"]
+    assert result["confidence"] > 0
+
+
+@pytest.mark.asyncio
+async def test_artificial_latency():
+    service = LocalLLMService(latency_ms=5)
+
+    with patch("app.services.local_llm_service.asyncio.sleep") as mock_sleep:
+        await service.generate_answer_with_reasoning("q", [], {})
+
+    mock_sleep.assert_awaited_once_with(0.005)
+
+
+def test_get_llm_service_local_provider():
+    from app.services.llm_service import get_llm_service
+
+    with patch("app.services.llm_service.settings.LLM_PROVIDER", "local"):
+        assert isinstance(get_llm_service(), LocalLLMService)
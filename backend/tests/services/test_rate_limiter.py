@@ -0,0 +1,140 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from unittest.mock import patch
+from app.services.rate_limiter import LatencyWindow, ProviderScheduler, TokenBucket
+
+
+def http_error(status: int, headers=None) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://example.com")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    return httpx.HTTPStatusError("error", request=request, response=response)
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate_per_minute=600, capacity=1)  # 10/s
+
+    started = time.monotonic()
+    for _ in range(3):
+        await bucket.acquire()
+
+    assert time.monotonic() - started >= 0.18
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded():
+    scheduler = ProviderScheduler("test", max_concurrency=2)
+    active = 0
+    peak = 0
+
+    async def call():
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return "ok"
+
+    results = await asyncio.gather(*[scheduler.run(call) for _ in range(6)])
+
+    assert results == ["ok"] * 6
+    assert peak == 2
+    assert scheduler.stats()["requests"] == 6
+
+
+@pytest.mark.asyncio
+async def test_retries_429_using_retry_after():
+    scheduler = ProviderScheduler("test", max_retries=3, retry_base_delay=10)
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        if calls < 3:
+            raise http_error(429, {"Retry-After": "0"})
+        return "ok"
+
+    assert await scheduler.run(call) == "ok"
+    stats = scheduler.stats()
+    assert stats["retries"] == 2
+    assert stats["throttled"] == 2
+
+
+@pytest.mark.asyncio
+async def test_non_retryable_error_is_raised_immediately():
+    scheduler = ProviderScheduler("test", max_retries=3)
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        raise http_error(400)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await scheduler.run(call)
+
+    assert calls == 1
+    assert scheduler.stats()["failures"] == 1
+
+
+def test_backoff_is_jittered_and_capped():
+    scheduler = ProviderScheduler("test", retry_base_delay=1, retry_max_delay=4)
+
+    delays = [scheduler.backoff_delay(10) for _ in range(50)]
+
+    assert all(0 <= d <= 4 for d in delays)
+    assert len(set(delays)) > 1
+
+
+def test_retry_after_longer_than_max_delay_is_honoured():
+    scheduler = ProviderScheduler("test", retry_base_delay=1, retry_max_delay=4)
+
+    assert scheduler.backoff_delay(0, http_error(429, {"Retry-After": "30"})) == 30.0
+
+
+@pytest.mark.asyncio
+async def test_retry_after_over_limit_fails_fast():
+    scheduler = ProviderScheduler("test", max_retries=3, retry_after_max=60)
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        raise http_error(429, {"Retry-After": "3600"})
+
+    with patch("app.services.rate_limiter.asyncio.sleep") as mock_sleep:
+        with pytest.raises(httpx.HTTPStatusError):
+            await scheduler.run(call)
+
+    assert calls == 1
+    mock_sleep.assert_not_called()
+    stats = scheduler.stats()
+    assert (stats["failures"], stats["retries"], stats["throttled"]) == (1, 0, 1)
+
+
+@pytest.mark.asyncio
+async def test_hedged_request_after_p95_delay():
+    scheduler = ProviderScheduler("test")
+    window = scheduler._latencies.setdefault("embedding", LatencyWindow())
+    for _ in range(20):
+        window.add(0.01)
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(1)
+            return "slow"
+        return "fast"
+
+    with patch("app.services.rate_limiter.settings.LLM_HEDGE_MIN_SAMPLES", 20):
+        result = await scheduler.run(call, kind="embedding", hedge=True)
+
+    assert result == "fast"
+    stats = scheduler.stats()
+    assert stats["hedged"] == 1
+    assert stats["hedge_wins"] == 1
@@ -38,7 +38,13 @@ async def test_answer_question_success(mock_req):
         mock_vec_results = [
             {"_id": mock_object_id, "recordId": "uuid-rec1", "content": "content1", "score": 0.9}
         ]
-        mock_vec_search.return_value = mock_vec_results
+
+        async def fake_search(query_vector, **kwargs):
+            # 질문 임베딩은 Task로 전달되어 검색 안에서 기다림
+            assert await query_vector == [0.1, 0.2]
+            return mock_vec_results
+
+        mock_vec_search.side_effect = fake_search
 
         # Rerank 결과 (동일한 문서 반환)
         mock_rerank.return_value = mock_vec_results
@@ -105,3 +111,127 @@ async def test_answer_question_no_context(mock_req):
 
         assert response.answer == "I don't know."
         assert response.reasoningPath["records"] == []
+
+
+@pytest.mark.asyncio
+async def test_stream_answer_emits_progress_then_tokens(mock_req):
+    service = ReasoningService()
+
+    async def fake_stream(question, context_records, context_graph):
+        yield {"type": "token", "text": "You "}
+        yield {"type": "token", "text": "are."}
+        yield {
+            "type": "result",
+            "data": {"answer": "You are.", "confidence": 0.5, "reasoning_summary": "r"},
+        }
+
+    with patch(
+        "app.services.reasoning_service.llm_service.get_embedding",
+        new_callable=AsyncMock,
+        return_value=[0.1],
+    ), patch(
+        "app.services.reasoning_service.vector_db.search",
+        new_callable=AsyncMock,
+        return_value=[{"_id": "m1", "recordId": "r1", "content": "c"}],
+    ), patch(
+        "app.services.reasoning_service.llm_service.rerank",
+        new_callable=AsyncMock,
+        return_value=[{"_id": "m1", "recordId": "r1", "content": "c", "relevance_score": 0.9}],
+    ), patch(
+        "app.services.reasoning_service.neo4j_db.get_context_subgraph",
+        new_callable=AsyncMock,
+        return_value={"nodes": [{"id": "n1"}], "edges": []},
+    ), patch(
+        "app.services.reasoning_service.llm_service.stream_answer_with_reasoning",
+        fake_stream,
+    ):
+        events = [e async for e in service.stream_answer(mock_req)]
+
+    names = [name for name, _ in events]
+    assert names == ["candidates", "reranked", "graph", "token", "token", "final"]
+    assert events[1][1]["recordIds"] == ["r1"]
+    final = events[-1][1]
+    assert final["answer"] == "You are."
+    assert final["reasoningPath"]["records"] == ["m1"]
+    assert final["reasoningPath"]["graph_snapshot"]["node_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_search_prefers_explicit_filters_over_question_text():
+    request = QuestionRequest(
+        text="지난주에 뭐 했지?", userId="u1", dateFrom="2024-03-01", feel=["기쁨"]
+    )
+    with patch(
+        "app.services.reasoning_service.llm_service.get_embedding",
+        new_callable=AsyncMock,
+        return_value=[0.1],
+    ), patch(
+        "app.services.reasoning_service.vector_db.search",
+        new_callable=AsyncMock,
+        return_value=[{"recordId": "r1"}],
+    ) as mock_search:
+        await ReasoningService._search(request)
+
+    kwargs = mock_search.call_args.kwargs
+    assert kwargs["date_from"] == "2024-03-01"
+    assert kwargs["date_to"] is None
+    assert kwargs["feel"] == ["기쁨"]
+
+
+@pytest.mark.asyncio
+async def test_search_retries_without_inferred_date_range_when_empty():
+    request = QuestionRequest(text="작년 겨울에 누구 만났어?", userId="u1")
+    filters = ReasoningService._filters(request)
+    assert filters["inferred"] is True
+    inferred_from = filters["dateFrom"]
+    assert inferred_from.endswith("-12-01")
+
+    with patch(
+        "app.services.reasoning_service.llm_service.get_embedding",
+        new_callable=AsyncMock,
+        return_value=[0.1],
+    ), patch(
+        "app.services.reasoning_service.vector_db.search",
+        new_callable=AsyncMock,
+        side_effect=[[], [{"recordId": "r1"}]],
+    ) as mock_search:
+        results = await ReasoningService._search(request, filters=filters)
+
+    assert results == [{"recordId": "r1"}]
+    first, second = (call.kwargs for call in mock_search.call_args_list)
+    assert first["date_from"] == inferred_from
+    assert second["date_from"] is None and second["date_to"] is None
+    assert filters["inferred"] is False
+
+
+@pytest.mark.asyncio
+async def test_local_reranker_receives_resolved_question_embedding(mock_req):
+    from app.services.rerank_service import LocalReranker
+
+    local = LocalReranker()
+    documents = [{"recordId": "uuid-rec1", "content": "content1"}]
+
+    with patch(
+        "app.services.reasoning_service.llm_service.get_embedding",
+        new_callable=AsyncMock,
+        return_value=[0.1, 0.2],
+    ), patch(
+        "app.services.reasoning_service.vector_db.search", new_callable=AsyncMock
+    ) as mock_vec_search, patch(
+        "app.services.reasoning_service.reranker", local
+    ), patch.object(
+        local, "rerank", new_callable=AsyncMock, return_value=documents
+    ) as mock_rerank:
+
+        async def fake_search(query_vector, **kwargs):
+            await query_vector
+            return documents
+
+        mock_vec_search.side_effect = fake_search
+        query_embedding = ReasoningService._embed(mock_req)
+        results = await ReasoningService._search(mock_req, query_embedding=query_embedding)
+        await ReasoningService._rerank(mock_req, results, query_embedding)
+
+    kwargs = mock_rerank.call_args.kwargs
+    assert kwargs["query_vector"] == [0.1, 0.2]
+    assert kwargs["user_id"] == "user123"
@@ -0,0 +1,81 @@
+import pytest
+from unittest.mock import AsyncMock, patch, MagicMock
+from app.services.rerank_cache import RerankScoreCache, normalize_query
+from app.services.llm_service import NvidiaLLMService
+
+
+def make_docs():
+    return [
+        {"recordId": "r1", "title": "Cats", "content": "about cats"},
+        {"recordId": "r2", "title": "Dogs", "content": "about dogs"},
+    ]
+
+
+def test_normalize_query_ignores_case_spacing_and_punctuation():
+    assert normalize_query("  What about  CATS? ") == normalize_query("what about cats")
+
+
+def test_put_and_get_scores():
+    cache = RerankScoreCache(max_entries=10, ttl_seconds=60, enabled=True)
+    docs = make_docs()
+    cache.put_scores("q", docs, [0.9, 0.2], "m")
+
+    assert cache.get_scores("q", docs, "m") == {0: 0.9, 1: 0.2}
+    assert cache.get_scores("q", docs, "other-model") == {}
+
+
+def test_content_change_invalidates_automatically():
+    cache = RerankScoreCache(max_entries=10, ttl_seconds=60, enabled=True)
+    docs = make_docs()
+    cache.put_scores("q", docs, [0.9, 0.2], "m")
+
+    docs[0]["content"] = "edited"
+    assert cache.get_scores("q", docs, "m") == {1: 0.2}
+
+
+def test_ttl_and_size_bounds():
+    cache = RerankScoreCache(max_entries=1, ttl_seconds=60, enabled=True)
+    docs = make_docs()
+    cache.put_scores("q", docs, [0.9, 0.2], "m")
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["evictions"] == 1
+
+    expired = RerankScoreCache(max_entries=10, ttl_seconds=-1, enabled=True)
+    expired.put_scores("q", docs, [0.9, 0.2], "m")
+    assert expired.get_scores("q", docs, "m") == {}
+
+
+def test_invalidate_record():
+    cache = RerankScoreCache(max_entries=10, ttl_seconds=60, enabled=True)
+    docs = make_docs()
+    cache.put_scores("q", docs, [0.9, 0.2], "m")
+
+    cache.invalidate_record("r1")
+    assert cache.get_scores("q", docs, "m") == {1: 0.2}
+
+
+@pytest.mark.asyncio
+async def test_rerank_sends_only_uncached_documents():
+    service = NvidiaLLMService()
+    docs = make_docs()
+
+    with patch("app.services.llm_service.settings") as mock_settings, patch(
+        "httpx.AsyncClient.post", new_callable=AsyncMock
+    ) as mock_post:
+        mock_settings.NVIDIA_API_KEY = "test_key"
+        mock_post.return_value.json = MagicMock(
+            return_value={"choices": [{"message": {"content": '{"scores": [0.3, 0.8]}'}}]}
+        )
+        first = await service.rerank("What about dogs?", docs, top_k=2)
+        assert first[0]["recordId"] == "r2"
+
+        docs.append({"recordId": "r3", "title": "Birds", "content": "about birds"})
+        mock_post.return_value.json = MagicMock(
+            return_value={"choices": [{"message": {"content": '{"scores": [0.5]}'}}]}
+        )
+        second = await service.rerank("what about dogs", docs, top_k=3)
+
+        prompt = mock_post.call_args.kwargs["json"]["messages"][0]["content"]
+        assert "Birds" in prompt
+        assert "Cats" not in prompt
+        assert [d["recordId"] for d in second] == ["r2", "r3", "r1"]
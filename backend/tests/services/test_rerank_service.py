@@ -0,0 +1,105 @@
+import time
+import pytest
+from unittest.mock import AsyncMock, patch
+from datetime import datetime, timedelta
+from app.core.tokenizer import tokenize
+from app.services.rerank_service import LocalReranker
+
+
+def test_tokenize_strips_particles_and_adds_bigrams():
+    tokens = tokenize("여자친구와 카페에서 만났다")
+
+    assert "여자친구" in tokens
+    assert "카페" in tokens
+    assert "친구" in tokens  # 음절 bigram
+    assert "카페에서" not in tokens
+
+
+@pytest.mark.asyncio
+async def test_local_rerank_prefers_lexical_and_vector_match():
+    reranker = LocalReranker(weights={"cosine": 0.5, "bm25": 0.5, "time_decay": 0.0, "rrf": 0.0})
+    documents = [
+        {"recordId": "r1", "title": "회사", "content": "야근을 했다", "_vector_score": 0.6},
+        {"recordId": "r2", "title": "데이트", "content": "여자친구와 카페에 갔다", "_vector_score": 0.8},
+        {"recordId": "r3", "title": "운동", "content": "헬스장에 갔다", "_vector_score": 0.5},
+    ]
+
+    result = await reranker.rerank("여자친구랑 카페 간 날", documents, top_k=2)
+
+    assert len(result) == 2
+    assert result[0]["recordId"] == "r2"
+    assert "relevance_score" in result[0]
+
+
+@pytest.mark.asyncio
+async def test_local_rerank_uses_embedding_when_no_vector_score():
+    reranker = LocalReranker(weights={"cosine": 1.0})
+    documents = [
+        {"recordId": "far", "content": "", "embedding": [0.0, 1.0]},
+        {"recordId": "near", "content": "", "embedding": [1.0, 0.1]},
+    ]
+
+    result = await reranker.rerank("q", documents, top_k=2, query_vector=[1.0, 0.0])
+
+    assert result[0]["recordId"] == "near"
+
+
+@pytest.mark.asyncio
+async def test_local_rerank_loads_embeddings_for_text_only_candidates():
+    reranker = LocalReranker(weights={"cosine": 1.0})
+    documents = [
+        {"recordId": "vec", "content": "", "_vector_score": 0.6},
+        {"recordId": "text-near", "content": "", "_text_score": 3.0},
+        {"recordId": "text-far", "content": "", "_text_score": 2.0},
+    ]
+
+    with patch(
+        "app.services.rerank_service.VectorDB.get_embeddings", new_callable=AsyncMock
+    ) as mock_embeddings:
+        mock_embeddings.return_value = {"text-near": [1.0, 0.0], "text-far": [0.0, 1.0]}
+        result = await reranker.rerank(
+            "q", documents, top_k=3, query_vector=[1.0, 0.0], user_id="u1"
+        )
+
+    mock_embeddings.assert_awaited_once_with("u1", ["text-near", "text-far"])
+    assert [d["recordId"] for d in result] == ["text-near", "vec", "text-far"]
+    assert "embedding" not in result[0]
+
+
+@pytest.mark.asyncio
+async def test_local_rerank_empty_documents():
+    assert await LocalReranker().rerank("q", [], top_k=5) == []
+
+
+@pytest.mark.asyncio
+async def test_local_rerank_is_fast_for_50_candidates():
+    today = datetime.now().date().isoformat()
+    content = "오늘은 친구와 함께 한강 공원에서 자전거를 탔다. 날씨가 좋아서 기분이 좋았다. " * 20
+    documents = [
+        {
+            "recordId": f"r{i}",
+            "title": f"일기 {i}",
+            "content": content,
+            "date": today,
+            "_vector_score": 0.5 + i / 100,
+            "_rrf_score": 1 / (60 + i),
+        }
+        for i in range(50)
+    ]
+    reranker = LocalReranker()
+
+    start = time.perf_counter()
+    await reranker.rerank("친구랑 자전거 탄 날", documents, top_k=5)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    assert elapsed_ms < 50  # 일반적으로 수 ms, CI 편차를 고려한 상한
+
+
+def test_learn_weights_favors_informative_feature():
+    rows = [[0.9, 0.1, 0.5, 0.5], [0.2, 0.9, 0.5, 0.5], [0.8, 0.2, 0.5, 0.5], [0.1, 0.8, 0.5, 0.5]]
+    labels = [1, 0, 1, 0]
+
+    weights = LocalReranker.learn_weights(rows, labels)
+
+    assert weights["cosine"] > weights["bm25"]
+    assert abs(sum(weights.values()) - 1.0) < 1e-3